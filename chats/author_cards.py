@@ -0,0 +1,91 @@
+import logging
+from typing import Iterable
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+
+from core.cache import VersionedCacheKey, delete_now_and_on_commit
+
+CHAT_AUTHOR_CARD_KEY = VersionedCacheKey("chats:author_card", version=1)
+CHAT_AUTHOR_CARDS_CONTEXT_KEY = "chat_author_cards"
+CHAT_AUTHOR_CARD_FIELDS = (
+    "id",
+    "first_name",
+    "last_name",
+    "patronymic",
+    "avatar",
+    "is_active",
+)
+logger = logging.getLogger(__name__)
+
+
+def get_chat_author_card_cache_key(user_id: int) -> str:
+    return CHAT_AUTHOR_CARD_KEY(user_id)
+
+
+def _build_card(row: dict) -> dict:
+    card = {field: row[field] for field in CHAT_AUTHOR_CARD_FIELDS}
+    card["speciality"] = row["v2_speciality__name"] or row["speciality"]
+    return card
+
+
+def _read_cached_cards(user_ids: set[int]) -> dict[int, dict]:
+    keys = {get_chat_author_card_cache_key(user_id): user_id for user_id in user_ids}
+    try:
+        cached = cache.get_many(list(keys))
+    except Exception:
+        logger.warning("Failed to read chat author cards", exc_info=True)
+        return {}
+    return {keys[key]: card for key, card in cached.items()}
+
+
+def _write_cached_cards(cards: dict[int, dict]) -> None:
+    try:
+        cache.set_many(
+            {
+                get_chat_author_card_cache_key(user_id): card
+                for user_id, card in cards.items()
+            },
+            timeout=settings.CHAT_AUTHOR_CARD_CACHE_SECONDS,
+        )
+    except Exception:
+        logger.warning("Failed to write chat author cards", exc_info=True)
+
+
+def get_chat_author_cards(user_ids: Iterable[int], memo: dict = None) -> dict[int, dict]:
+    """
+    Compact cards of chat authors without the online flag, by user id.
+
+    Cards are looked up in `memo` (usually serializer context), then in the
+    cache for CHAT_AUTHOR_CARD_CACHE_SECONDS, and the rest are loaded with
+    one query. Found cards are added to `memo`, which is returned.
+    """
+    memo = {} if memo is None else memo
+    missing = set(user_ids) - memo.keys()
+    if missing and settings.CHAT_AUTHOR_CARD_CACHE_SECONDS:
+        memo.update(_read_cached_cards(missing))
+        missing -= memo.keys()
+    if not missing:
+        return memo
+
+    rows = (
+        get_user_model()
+        .objects.filter(pk__in=missing)
+        .values(*CHAT_AUTHOR_CARD_FIELDS, "speciality", "v2_speciality__name")
+    )
+    cards = {row["id"]: _build_card(row) for row in rows}
+    if cards and settings.CHAT_AUTHOR_CARD_CACHE_SECONDS:
+        _write_cached_cards(cards)
+    memo.update(cards)
+    return memo
+
+
+def prefetch_chat_author_cards(context: dict, users: Iterable) -> dict[int, dict]:
+    """Loads cards of all `users` into serializer context at once."""
+    memo = context.setdefault(CHAT_AUTHOR_CARDS_CONTEXT_KEY, {})
+    return get_chat_author_cards({user.pk for user in users if user is not None}, memo)
+
+
+def invalidate_chat_author_card(user_id: int) -> None:
+    delete_now_and_on_commit(get_chat_author_card_cache_key(user_id))
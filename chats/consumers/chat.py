@@ -1,3 +1,4 @@
+import asyncio
 import datetime
 import json
 from json import JSONDecodeError
@@ -11,6 +12,7 @@ from django.core.cache import cache
 from django.utils import timezone
 
 from chats.exceptions import ChatException
+from chats.layers import group_add_many, group_discard_many
 from chats.models import BaseChat
 from chats.utils import get_user_channel_cache_key
 from chats.websockets_settings import (
@@ -19,8 +21,8 @@ from chats.websockets_settings import (
     EventGroupType,
     ChatType,
 )
-from core.constants import ONE_DAY_IN_SECONDS, ONE_WEEK_IN_SECONDS
-from core.utils import get_user_online_cache_key, get_users_online_cache_key
+from core.constants import ONE_WEEK_IN_SECONDS
+from core.presence import get_presence_store
 from projects.models import Collaborator
 from users.models import CustomUser
 from chats.consumers.event_types import DirectEvent, ProjectEvent
@@ -44,6 +46,7 @@ class ChatConsumer(AsyncJsonWebsocketConsumer):
         self.chat: Optional[BaseChat] = None
         self.event = None
         self.joined_rooms: set[str] = set()
+        self.presence_heartbeat: Optional[asyncio.Task] = None
 
     async def connect(self):
         """User connected to websocket"""
@@ -60,22 +63,20 @@ class ChatConsumer(AsyncJsonWebsocketConsumer):
         if not settings.RUNNING_TESTS:
             # get all projects that user is a member of
             project_ids_list = await get_user_project_ids(self.user.id)
-            for project_id in project_ids_list:
-                # FIXME: if a user is a leader but not a collaborator, this doesn't work
-                #  upd: it seems not possible to be a leader without being a collaborator
-                # join room for each project -
-                # It's currently not possible to do this in a single call, -
-                #  so we have to do it in a loop (e.g. that's O(N) calls to layer backend, redis cache that would be) -
-                room_name = f"{EventGroupType.CHATS_RELATED}_{project_id}"
-                await self.channel_layer.group_add(room_name, self.channel_name)
-                self.joined_rooms.add(room_name)
+            # FIXME: if a user is a leader but not a collaborator, this doesn't work
+            #  upd: it seems not possible to be a leader without being a collaborator
+            # join room for each project in a single round trip to the layer backend
+            room_names = [
+                f"{EventGroupType.CHATS_RELATED}_{project_id}"
+                for project_id in project_ids_list
+            ]
+            await group_add_many(self.channel_layer, room_names, self.channel_name)
+            self.joined_rooms.update(room_names)
 
         # set user online
-        user_cache_key = get_user_online_cache_key(self.user)
-        cache.set(user_cache_key, True, ONE_DAY_IN_SECONDS)
-        online_users = cache.get(get_users_online_cache_key(), set())
-        online_users.add(self.user.id)
-        cache.set(get_users_online_cache_key(), online_users)
+        get_presence_store().touch(self.user.id, self.channel_name)
+        if settings.PRESENCE_HEARTBEAT_SECONDS > 0:
+            self.presence_heartbeat = asyncio.ensure_future(self._keep_presence_alive())
         # notify everyone that this user is online
         await self.channel_layer.group_send(
             EventGroupType.GENERAL_EVENTS,
@@ -109,18 +110,35 @@ class ChatConsumer(AsyncJsonWebsocketConsumer):
             # don't need to proccess logic for disconnect
             #  if we are not logged in!
             return
-        online_users = cache.get(get_users_online_cache_key(), set())
-        online_users.discard(self.user.id)
-        cache.set(get_users_online_cache_key(), online_users)
-        cache.delete(get_user_online_cache_key(self.user))
+        if self.presence_heartbeat is not None:
+            self.presence_heartbeat.cancel()
+            self.presence_heartbeat = None
+        # user stays online while any other tab/device is still connected
+        went_offline = get_presence_store().disconnect(self.user.id, self.channel_name)
         room_name = EventGroupType.GENERAL_EVENTS
 
+        await group_discard_many(
+            self.channel_layer,
+            [*self.joined_rooms, EventGroupType.GENERAL_EVENTS],
+            self.channel_name,
+        )
+        self.joined_rooms.clear()
+
+        if not went_offline:
+            return
+
         # TODO: add a User extra-small serializer for this?
         await self.channel_layer.group_send(
             room_name,
             {"type": EventType.SET_OFFLINE, "content": {"user_id": self.user.id}},
         )
 
+    async def _keep_presence_alive(self):
+        """Extends user's presence heartbeat while the connection is open"""
+        while True:
+            await asyncio.sleep(settings.PRESENCE_HEARTBEAT_SECONDS)
+            get_presence_store().touch(self.user.id, self.channel_name)
+
     async def receive_json(self, content, **kwargs):
         """Receive message from WebSocket in JSON format"""
 
@@ -132,6 +150,7 @@ class ChatConsumer(AsyncJsonWebsocketConsumer):
             EventType.NEW_MESSAGE,
             EventType.TYPING,
             EventType.READ_MESSAGE,
+            EventType.READ_UP_TO,
             EventType.DELETE_MESSAGE,
             EventType.EDIT_MESSAGE,
         ]:
@@ -171,6 +190,8 @@ class ChatConsumer(AsyncJsonWebsocketConsumer):
             await self.__process_typing_event(event, room_name)
         elif event.type == EventType.READ_MESSAGE:
             await self.event.process_read_message_event(event, room_name)
+        elif event.type == EventType.READ_UP_TO:
+            await self.event.process_read_up_to_event(event, room_name)
         elif event.type == EventType.DELETE_MESSAGE:
             await self.event.process_delete_message_event(event, room_name)
         elif event.type == EventType.EDIT_MESSAGE:
@@ -220,6 +241,9 @@ class ChatConsumer(AsyncJsonWebsocketConsumer):
     async def message_read(self, event: Event):
         await self.send(json.dumps(event))
 
+    async def read_up_to(self, event: Event):
+        await self.send(json.dumps(event))
+
     async def user_typing(self, event: Event):
         await self.send(json.dumps(event))
 
@@ -239,23 +263,18 @@ class ChatConsumer(AsyncJsonWebsocketConsumer):
         await self.send(json.dumps(event))
 
     async def __process_general_event(self, event: Event, room_name: str):
-        cache_key = get_user_online_cache_key(self.user)
-        users_online_list_key = get_users_online_cache_key()
+        presence = get_presence_store()
         if event.type == EventType.SET_ONLINE:
-            cache.set(cache_key, True, ONE_DAY_IN_SECONDS)
-            users_online_list = cache.get_or_set(users_online_list_key, set())
-            users_online_list.add(self.user.pk)
-            cache.set(users_online_list_key, users_online_list, ONE_DAY_IN_SECONDS)
+            presence.touch(self.user.pk, self.channel_name)
 
             # sent everyone online event that user X is online
             await self.channel_layer.group_send(
                 room_name, {"type": EventType.SET_ONLINE, "user_id": self.user.pk}
             )
         elif event.type == EventType.SET_OFFLINE:
-            cache.delete(cache_key)
-            users_online_list = cache.get_or_set(users_online_list_key, set())
-            users_online_list.remove(self.user.pk)
-            cache.set(users_online_list_key, users_online_list, ONE_DAY_IN_SECONDS)
+            if not presence.disconnect(self.user.pk, self.channel_name):
+                # still online from another connection
+                return
 
             # sent everyone online event that user X is offline
             await self.channel_layer.group_send(
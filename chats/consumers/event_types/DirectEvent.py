@@ -8,16 +8,19 @@ from chats.exceptions import (
 from django.core.cache import cache
 from chats.utils import (
     get_user_channel_cache_key,
-    create_message,
     get_chat_and_user_ids_from_content,
-    match_files_and_messages,
-    orm_create,
-    orm_exists,
+    get_other_user_id,
+    get_read_boundary_from_content,
+    orm_call,
     orm_get,
     orm_save,
-    orm_set,
 )
-from chats.serializers import DirectChatMessageListSerializer
+from chats.services import get_message_data, send_direct_message
+from chats.unread import (
+    discount_deleted_message,
+    mark_read_up_to,
+    read_messages_up_to,
+)
 
 
 class DirectEvent:
@@ -27,49 +30,16 @@ class DirectEvent:
         self.channel_name = channel_name
 
     async def process_new_message_event(self, event: Event, room_name: str):
-        chat_id, other_user = await get_chat_and_user_ids_from_content(
-            event.content, self.user
-        )
-
-        # if chat_id == 17_7, then chat_id will be == 7_17
-        chat_id = DirectChat.get_chat_id_from_users(self.user, other_user)
-
-        # check if chat exists
-        if not await orm_exists(DirectChat.objects.filter(pk=chat_id)):
-            # if not, create such chat
-            chat = await orm_create(DirectChat.objects, pk=chat_id)
-            await orm_set(chat.users, [self.user, other_user])
-
-        reply_to_message = None
-        if event.content["reply_to"] is not None:
-            try:
-                reply_to_message = await orm_get(
-                    DirectChatMessage.objects, pk=event.content["reply_to"]
-                )
-            except DirectChatMessage.DoesNotExist:
-                reply_to_message = None
-
-        msg = await create_message(
-            chat_id=chat_id,
-            chat_model=DirectChatMessage,
-            author=self.user,
-            text=event.content["text"],
-            reply_to=reply_to_message,
-        )
-
-        messages = {
-            "direct_message": msg,
-            "project_message": None,
-        }
-        await match_files_and_messages(event.content["file_urls"], messages)
-
-        serialized_message = await orm_get(
-            DirectChatMessage.objects.select_related("author", "reply_to__author").prefetch_related(
-                "file_to_message__file"
-            ),
-            pk=msg.pk,
+        other_user_id = get_other_user_id(event.content["chat_id"], self.user)
+        # chat check, message, counters and files in one round trip to the db
+        chat_id, message_data = await orm_call(
+            send_direct_message,
+            self.user,
+            other_user_id,
+            event.content["text"],
+            event.content["reply_to"],
+            event.content["file_urls"],
         )
-        message_data = DirectChatMessageListSerializer(serialized_message).data
 
         content = {
             "chat_id": chat_id,
@@ -77,7 +47,7 @@ class DirectEvent:
         }
 
         # send message to user's channel
-        other_user_channel = cache.get(get_user_channel_cache_key(other_user), None)
+        other_user_channel = cache.get(get_user_channel_cache_key(other_user_id), None)
 
         event_data = {"type": EventType.NEW_MESSAGE, "content": content}
 
@@ -97,6 +67,7 @@ class DirectEvent:
             )
         msg.is_read = True
         await orm_save(msg, update_fields=["is_read"])
+        await orm_call(mark_read_up_to, self.user.id, msg)
         # send 2 events to user's channel
         other_user_channel = cache.get(get_user_channel_cache_key(other_user), None)
         json_thingy = {
@@ -113,6 +84,46 @@ class DirectEvent:
             return
         await self.channel_layer.send(other_user_channel, json_thingy)
 
+    async def process_read_up_to_event(self, event: Event, room_name: str):
+        """Reads all messages of the other user up to a message id or timestamp."""
+        chat_id, other_user = await get_chat_and_user_ids_from_content(
+            event.content, self.user
+        )
+        # if chat_id == 17_7, then chat_id will be == 7_17
+        chat_id = DirectChat.get_chat_id_from_users(self.user, other_user)
+        read_boundary = get_read_boundary_from_content(event.content)
+        boundary, read_count = await orm_call(
+            read_messages_up_to,
+            self.user.id,
+            DirectChatMessage,
+            chat_id,
+            **read_boundary,
+        )
+        if boundary is None and "message_id" in read_boundary:
+            raise WrongChatIdException(
+                "Some of chat/message ids are wrong, you can't access this message"
+            )
+        if boundary is None:
+            # nothing was sent before the timestamp
+            return
+
+        # one receipt for the whole batch instead of an event per message
+        other_user_channel = cache.get(get_user_channel_cache_key(other_user), None)
+        event_data = {
+            "type": EventType.READ_UP_TO,
+            "content": {
+                "chat_id": event.content["chat_id"],
+                "chat_type": event.content["chat_type"],
+                "user_id": self.user.id,
+                "message_id": boundary.id,
+                "read_count": read_count,
+            },
+        }
+        await self.channel_layer.send(self.channel_name, event_data)
+        if other_user_channel is None:
+            return
+        await self.channel_layer.send(other_user_channel, event_data)
+
     async def process_delete_message_event(self, event: Event, room_name: str):
         message_id = event.content["message_id"]
 
@@ -121,8 +132,11 @@ class DirectEvent:
         if self.user.id != message.author_id:
             raise UserIsNotAuthor(f"User {self.user.id} is not author {message.text}")
 
+        was_deleted = message.is_deleted
         message.is_deleted = True
         await orm_save(message, update_fields=["is_deleted"])
+        if not was_deleted:
+            await orm_call(discount_deleted_message, message)
 
         chat_id, other_user = await get_chat_and_user_ids_from_content(
             event.content, self.user
@@ -163,13 +177,8 @@ class DirectEvent:
         msg.is_edited = True
         await orm_save(msg, update_fields=["text", "is_edited"])
 
-        serialized_message = await orm_get(
-            DirectChatMessage.objects.select_related("author", "reply_to__author").prefetch_related(
-                "file_to_message__file"
-            ),
-            pk=msg.pk,
-        )
-        message_data = DirectChatMessageListSerializer(serialized_message).data
+        # authors may be read from the db, so serialize in the sync thread
+        message_data = await orm_call(get_message_data, DirectChatMessage, msg.pk)
         content = {
             "chat_id": chat_id,
             "message": message_data,
@@ -1,7 +1,7 @@
 from chats.models import ProjectChat, ProjectChatMessage
 from chats.utils import (
-    create_message,
-    match_files_and_messages,
+    get_read_boundary_from_content,
+    orm_call,
     orm_exists,
     orm_get,
     orm_save,
@@ -14,8 +14,11 @@ from chats.exceptions import (
     UserIsNotAuthor,
 )
 
-from chats.serializers import (
-    ProjectChatMessageListSerializer,
+from chats.services import get_message_data, send_project_message
+from chats.unread import (
+    discount_deleted_message,
+    mark_read_up_to,
+    read_messages_up_to,
 )
 from projects.models import Collaborator
 
@@ -28,50 +31,15 @@ class ProjectEvent:
 
     async def process_new_message_event(self, event: Event, room_name: str):
         chat_id = event.content["chat_id"]
-        chat = await orm_get(
-            ProjectChat.objects.select_related("project__leader"),
-            pk=chat_id,
+        # membership check, message, counters and files in one round trip to the db
+        message_data = await orm_call(
+            send_project_message,
+            self.user,
+            chat_id,
+            event.content["text"],
+            event.content["reply_to"],
+            event.content["file_urls"],
         )
-
-        # check that user is in this chat
-        is_member = chat.project.leader_id == self.user.id or await orm_exists(
-            Collaborator.objects.filter(project_id=chat.project_id, user_id=self.user.id)
-        )
-        if not is_member:
-            raise UserNotInChatException(
-                f"User {self.user.id} is not in project chat {chat_id}"
-            )
-
-        reply_to_message = None
-        if event.content["reply_to"] is not None:
-            try:
-                reply_to_message = await orm_get(
-                    ProjectChatMessage.objects, pk=event.content["reply_to"]
-                )
-            except ProjectChatMessage.DoesNotExist:
-                reply_to_message = None
-
-        msg = await create_message(
-            chat_id=chat_id,
-            chat_model=ProjectChatMessage,
-            author=self.user,
-            text=event.content["text"],
-            reply_to=reply_to_message,
-        )
-
-        messages = {
-            "direct_message": None,
-            "project_message": msg,
-        }
-        await match_files_and_messages(event.content["file_urls"], messages)
-
-        serialized_message = await orm_get(
-            ProjectChatMessage.objects.select_related("author", "reply_to__author").prefetch_related(
-                "file_to_message__file"
-            ),
-            pk=msg.pk,
-        )
-        message_data = ProjectChatMessageListSerializer(serialized_message).data
         content = {
             "chat_id": chat_id,
             "message": message_data,
@@ -101,6 +69,7 @@ class ProjectEvent:
             )
         msg.is_read = True
         await orm_save(msg, update_fields=["is_read"])
+        await orm_call(mark_read_up_to, self.user.id, msg)
         await self.channel_layer.group_send(
             room_name,
             {
@@ -114,6 +83,53 @@ class ProjectEvent:
             },
         )
 
+    async def process_read_up_to_event(self, event: Event, room_name: str):
+        """Reads all messages of other members up to a message id or timestamp."""
+        chat_id = event.content["chat_id"]
+        chat = await orm_get(
+            ProjectChat.objects.select_related("project__leader"),
+            pk=chat_id,
+        )
+        # check that user is in this chat
+        is_member = chat.project.leader_id == self.user.id or await orm_exists(
+            Collaborator.objects.filter(project_id=chat.project_id, user_id=self.user.id)
+        )
+        if not is_member:
+            raise UserNotInChatException(
+                f"User {self.user.id} is not in project chat {chat_id}"
+            )
+
+        read_boundary = get_read_boundary_from_content(event.content)
+        boundary, read_count = await orm_call(
+            read_messages_up_to,
+            self.user.id,
+            ProjectChatMessage,
+            chat.pk,
+            **read_boundary,
+        )
+        if boundary is None and "message_id" in read_boundary:
+            raise WrongChatIdException(
+                "Some of chat/message ids are wrong, you can't access this message"
+            )
+        if boundary is None:
+            # nothing was sent before the timestamp
+            return
+
+        # one receipt for the whole batch instead of an event per message
+        await self.channel_layer.group_send(
+            room_name,
+            {
+                "type": EventType.READ_UP_TO,
+                "content": {
+                    "chat_id": event.content["chat_id"],
+                    "chat_type": event.content["chat_type"],
+                    "user_id": self.user.id,
+                    "message_id": boundary.id,
+                    "read_count": read_count,
+                },
+            },
+        )
+
     async def process_delete_message_event(self, event: Event, room_name: str):
         chat_id = event.content["chat_id"]
         chat = await orm_get(
@@ -134,8 +150,11 @@ class ProjectEvent:
 
         if self.user.id != message.author_id:
             raise UserIsNotAuthor(f"User {self.user.id} is not author {chat_id}")
+        was_deleted = message.is_deleted
         message.is_deleted = True
         await orm_save(message, update_fields=["is_deleted"])
+        if not was_deleted:
+            await orm_call(discount_deleted_message, message)
 
         await self.channel_layer.group_send(
             room_name,
@@ -171,13 +190,8 @@ class ProjectEvent:
         message.is_edited = True
         await orm_save(message, update_fields=["text", "is_edited"])
 
-        serialized_message = await orm_get(
-            ProjectChatMessage.objects.select_related("author", "reply_to__author").prefetch_related(
-                "file_to_message__file"
-            ),
-            pk=message.pk,
-        )
-        message_data = ProjectChatMessageListSerializer(serialized_message).data
+        # authors may be read from the db, so serialize in the sync thread
+        message_data = await orm_call(get_message_data, ProjectChatMessage, message.pk)
         content = {
             "chat_id": chat_id,
             "message": message_data,
@@ -25,3 +25,11 @@ class UserNotMessageAuthorException(ChatException):
 
 class NonMatchingReplyChatIdException(ChatException):
     pass
+
+
+class WrongReadBoundaryException(ChatException):
+    pass
+
+
+class UserFileNotFoundException(ChatException):
+    pass
@@ -0,0 +1,80 @@
+import time
+from collections import defaultdict
+from typing import Iterable
+
+from channels_redis.core import RedisChannelLayer
+
+
+class BulkGroupsRedisChannelLayer(RedisChannelLayer):
+    """
+    Redis channel layer that can join/leave many groups in one round trip.
+
+    Groups are spread over shards by consistent hash, so commands are
+    pipelined per shard: with a single redis host that's exactly one
+    round trip no matter how many groups are passed.
+    """
+
+    def _groups_by_shard(self, groups: Iterable[str]) -> dict[int, list[str]]:
+        shards = defaultdict(list)
+        for group in groups:
+            assert self.valid_group_name(group), "Group name not valid"
+            shards[self.consistent_hash(group)].append(group)
+        return shards
+
+    async def group_add_many(self, groups: Iterable[str], channel: str) -> None:
+        """
+        Adds the channel name to every group in `groups`.
+        """
+        assert self.valid_channel_name(channel), "Channel name not valid"
+        now = time.time()
+        for index, shard_groups in self._groups_by_shard(groups).items():
+            connection = self.connection(index)
+            async with connection.pipeline(transaction=False) as pipe:
+                for group in shard_groups:
+                    group_key = self._group_key(group)
+                    pipe.zadd(group_key, {channel: now})
+                    pipe.expire(group_key, self.group_expiry)
+                await pipe.execute()
+
+    async def group_discard_many(self, groups: Iterable[str], channel: str) -> None:
+        """
+        Removes the channel name from every group in `groups`.
+        """
+        assert self.valid_channel_name(channel), "Channel name not valid"
+        for index, shard_groups in self._groups_by_shard(groups).items():
+            connection = self.connection(index)
+            async with connection.pipeline(transaction=False) as pipe:
+                for group in shard_groups:
+                    pipe.zrem(self._group_key(group), channel)
+                await pipe.execute()
+
+
+async def group_add_many(channel_layer, groups: Iterable[str], channel: str) -> None:
+    """
+    Joins `channel` to all `groups`, using the bulk path if the layer has one.
+
+    Falls back to one `group_add` per group for layers without bulk support
+    (e.g. InMemoryChannelLayer in tests and DEBUG).
+    """
+    groups = list(groups)
+    if not groups:
+        return
+    if hasattr(channel_layer, "group_add_many"):
+        await channel_layer.group_add_many(groups, channel)
+        return
+    for group in groups:
+        await channel_layer.group_add(group, channel)
+
+
+async def group_discard_many(channel_layer, groups: Iterable[str], channel: str) -> None:
+    """
+    Removes `channel` from all `groups`, the counterpart of `group_add_many`.
+    """
+    groups = list(groups)
+    if not groups:
+        return
+    if hasattr(channel_layer, "group_discard_many"):
+        await channel_layer.group_discard_many(groups, channel)
+        return
+    for group in groups:
+        await channel_layer.group_discard(group, channel)
@@ -0,0 +1,26 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from chats.unread import BACKFILL_CHUNK_SIZE, backfill_unread_counters
+
+
+class Command(BaseCommand):
+    help = (
+        "Заполнить счетчики непрочитанных сообщений по флагам is_read "
+        "существующих сообщений личных и проектных чатов. Существующие "
+        "счетчики перезаписываются."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=BACKFILL_CHUNK_SIZE,
+            help="Сколько чатов обрабатывать за один запрос.",
+        )
+
+    def handle(self, *args, **options):
+        if options["chunk_size"] < 1:
+            raise CommandError("--chunk-size должно быть >= 1.")
+
+        written = backfill_unread_counters(chunk_size=options["chunk_size"])
+        self.stdout.write(self.style.SUCCESS(f"Записано счетчиков: {written}"))
@@ -0,0 +1,95 @@
+import asyncio
+import time
+import uuid
+
+from django.core.management.base import BaseCommand, CommandError
+
+from chats.layers import BulkGroupsRedisChannelLayer
+from chats.websockets_settings import EventGroupType
+from core.benchmarks import LatencySummary
+
+MODES = ("loop", "bulk")
+
+
+class Command(BaseCommand):
+    help = (
+        "Замерить задержку подписки ChatConsumer.connect на группы проектов: "
+        "N одновременных потребителей против локального Redis."
+    )
+    requires_system_checks = []
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--redis-url",
+            default="redis://localhost:6379/15",
+            help="Redis, на котором гоняется замер (ключи пишутся под отдельным префиксом).",
+        )
+        parser.add_argument(
+            "--consumers",
+            type=int,
+            default=200,
+            help="Сколько потребителей подключается одновременно.",
+        )
+        parser.add_argument(
+            "--projects",
+            type=int,
+            default=30,
+            help="В скольких проектах состоит каждый пользователь.",
+        )
+        parser.add_argument(
+            "--mode",
+            choices=(*MODES, "both"),
+            default="both",
+            help="loop — group_add на каждую группу, bulk — group_add_many.",
+        )
+
+    def handle(self, *args, **options):
+        if options["consumers"] < 1 or options["projects"] < 0:
+            raise CommandError("--consumers должен быть >= 1, --projects >= 0.")
+
+        modes = MODES if options["mode"] == "both" else (options["mode"],)
+        self.stdout.write(
+            f"consumers={options['consumers']} projects={options['projects']} "
+            f"redis={options['redis_url']}"
+        )
+        for mode in modes:
+            summary, wall = asyncio.run(
+                self._run(
+                    mode,
+                    redis_url=options["redis_url"],
+                    consumers=options["consumers"],
+                    projects=options["projects"],
+                )
+            )
+            self.stdout.write(f"{summary.format(mode)} wall={wall * 1000:.2f}ms")
+
+    async def _run(
+        self, mode: str, *, redis_url: str, consumers: int, projects: int
+    ) -> tuple[LatencySummary, float]:
+        layer = BulkGroupsRedisChannelLayer(
+            hosts=[redis_url], prefix=f"bench-connect-{uuid.uuid4().hex}"
+        )
+        rooms = [
+            f"{EventGroupType.CHATS_RELATED.value}_{project_id}"
+            for project_id in range(projects)
+        ]
+
+        async def connect() -> float:
+            channel_name = await layer.new_channel()
+            started = time.perf_counter()
+            if mode == "bulk":
+                await layer.group_add_many(rooms, channel_name)
+            else:
+                for room in rooms:
+                    await layer.group_add(room, channel_name)
+            await layer.group_add(EventGroupType.GENERAL_EVENTS.value, channel_name)
+            return time.perf_counter() - started
+
+        try:
+            started = time.perf_counter()
+            samples = await asyncio.gather(*(connect() for _ in range(consumers)))
+            wall = time.perf_counter() - started
+        finally:
+            await layer.flush()
+            await layer.close_pools()
+        return LatencySummary.from_seconds(list(samples)), wall
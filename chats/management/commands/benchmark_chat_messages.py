@@ -0,0 +1,117 @@
+import asyncio
+import time
+import uuid
+from datetime import date
+
+from channels.testing import WebsocketCommunicator
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.test import override_settings
+
+from chats.consumers import ChatConsumer
+from chats.models import DirectChat
+from chats.websockets_settings import EventType
+from core.benchmarks import LatencySummary
+
+User = get_user_model()
+
+IN_MEMORY_CHANNEL_LAYERS = {
+    "default": {"BACKEND": "channels.layers.InMemoryChannelLayer"},
+}
+
+
+class Command(BaseCommand):
+    help = (
+        "Замерить пропускную способность new_message в личных чатах: сколько "
+        "сообщений в секунду обрабатывает один процесс (daphne worker) с "
+        "in-memory channel layer и настоящей БД."
+    )
+    requires_system_checks = []
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--messages",
+            type=int,
+            default=500,
+            help="Сколько сообщений отправляет каждое соединение.",
+        )
+        parser.add_argument(
+            "--connections",
+            type=int,
+            default=10,
+            help="Сколько соединений отправляют сообщения одновременно.",
+        )
+
+    def handle(self, *args, **options):
+        if options["messages"] < 1 or options["connections"] < 1:
+            raise CommandError("--messages и --connections должны быть >= 1.")
+
+        prefix = f"bench-messages-{uuid.uuid4().hex[:8]}"
+        users = [
+            User.objects.create(
+                email=f"{prefix}-{index}@example.com",
+                first_name="Benchmark",
+                last_name=str(index),
+                birthday=date(2000, 1, 1),
+            )
+            for index in range(options["connections"] * 2)
+        ]
+        # каждое соединение пишет в свой чат: отправитель - четный пользователь
+        pairs = list(zip(users[::2], users[1::2]))
+        try:
+            with override_settings(CHANNEL_LAYERS=IN_MEMORY_CHANNEL_LAYERS):
+                summary, wall = asyncio.run(self._run(pairs, options["messages"]))
+        finally:
+            DirectChat.objects.filter(users__in=users).delete()
+            User.objects.filter(pk__in=[user.pk for user in users]).delete()
+
+        total = summary.count
+        self.stdout.write(
+            f"connections={options['connections']} messages={total} "
+            f"wall={wall:.2f}s rate={total / wall:.1f} msg/s"
+        )
+        self.stdout.write(summary.format("new_message"))
+
+    async def _run(self, pairs, messages: int) -> tuple[LatencySummary, float]:
+        async def send(sender, recipient) -> list[float]:
+            communicator = WebsocketCommunicator(ChatConsumer.as_asgi(), "/ws/chat/")
+            communicator.scope["user"] = sender
+            connected, _ = await communicator.connect(timeout=10)
+            if not connected:
+                raise CommandError(f"Не удалось подключиться от имени {sender.email}")
+            first_id, second_id = sorted((sender.pk, recipient.pk))
+            samples = []
+            try:
+                for index in range(messages):
+                    started = time.perf_counter()
+                    await communicator.send_json_to(
+                        {
+                            "type": EventType.NEW_MESSAGE.value,
+                            "content": {
+                                "chat_type": "direct",
+                                "chat_id": f"{first_id}_{second_id}",
+                                "text": f"benchmark message {index}",
+                                "reply_to": None,
+                                "file_urls": [],
+                            },
+                        }
+                    )
+                    # ждем эхо своего сообщения, пропуская чужие события
+                    while True:
+                        response = await communicator.receive_json_from(timeout=10)
+                        if "error" in response:
+                            raise CommandError(response["error"])
+                        if response.get("type") == EventType.NEW_MESSAGE.value:
+                            break
+                    samples.append(time.perf_counter() - started)
+            finally:
+                await communicator.disconnect()
+            return samples
+
+        started = time.perf_counter()
+        results = await asyncio.gather(
+            *(send(sender, recipient) for sender, recipient in pairs)
+        )
+        wall = time.perf_counter() - started
+        samples = [sample for result in results for sample in result]
+        return LatencySummary.from_seconds(samples), wall
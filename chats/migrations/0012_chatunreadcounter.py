@@ -0,0 +1,102 @@
+# Generated by Django 4.2.11 on 2026-10-18 06:07
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ("chats", "0011_alter_filetomessage_direct_message_and_more"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ChatUnreadCounter",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("unread_count", models.PositiveIntegerField(default=0)),
+                (
+                    "last_read_message_id",
+                    models.PositiveBigIntegerField(blank=True, null=True),
+                ),
+                (
+                    "direct_chat",
+                    models.ForeignKey(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="unread_counters",
+                        to="chats.directchat",
+                    ),
+                ),
+                (
+                    "project_chat",
+                    models.ForeignKey(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="unread_counters",
+                        to="chats.projectchat",
+                    ),
+                ),
+                (
+                    "user",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="chat_unread_counters",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Счетчик непрочитанных сообщений",
+                "verbose_name_plural": "Счетчики непрочитанных сообщений",
+                "indexes": [
+                    models.Index(
+                        condition=models.Q(("unread_count__gt", 0)),
+                        fields=["user"],
+                        name="chats_unread_user_nonzero_idx",
+                    )
+                ],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name="chatunreadcounter",
+            constraint=models.UniqueConstraint(
+                fields=("user", "direct_chat"), name="chats_unread_user_direct_chat_uniq"
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name="chatunreadcounter",
+            constraint=models.UniqueConstraint(
+                fields=("user", "project_chat"),
+                name="chats_unread_user_project_chat_uniq",
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name="chatunreadcounter",
+            constraint=models.CheckConstraint(
+                check=models.Q(
+                    models.Q(
+                        ("direct_chat__isnull", False), ("project_chat__isnull", True)
+                    ),
+                    models.Q(
+                        ("direct_chat__isnull", True), ("project_chat__isnull", False)
+                    ),
+                    _connector="OR",
+                ),
+                name="chats_unread_exactly_one_chat",
+            ),
+        ),
+    ]
@@ -0,0 +1,81 @@
+# Generated by Django 4.2.11 on 2026-10-18 06:17
+
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+from django.db.models import F, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def fill_last_messages(apps, schema_editor):
+    for chat_name, message_name in (
+        ("DirectChat", "DirectChatMessage"),
+        ("ProjectChat", "ProjectChatMessage"),
+    ):
+        chat_model = apps.get_model("chats", chat_name)
+        latest = (
+            apps.get_model("chats", message_name)
+            .objects.filter(chat_id=OuterRef("pk"))
+            .order_by("-created_at", "-id")
+        )
+        chat_model.objects.update(
+            last_message_id=Subquery(latest.values("id")[:1]),
+            last_activity_at=Coalesce(
+                Subquery(latest.values("created_at")[:1]), F("created_at")
+            ),
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("chats", "0012_chatunreadcounter"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="directchat",
+            name="last_activity_at",
+            field=models.DateTimeField(default=django.utils.timezone.now),
+        ),
+        migrations.AddField(
+            model_name="directchat",
+            name="last_message",
+            field=models.ForeignKey(
+                blank=True,
+                null=True,
+                on_delete=django.db.models.deletion.SET_NULL,
+                related_name="+",
+                to="chats.directchatmessage",
+            ),
+        ),
+        migrations.AddField(
+            model_name="projectchat",
+            name="last_activity_at",
+            field=models.DateTimeField(default=django.utils.timezone.now),
+        ),
+        migrations.AddField(
+            model_name="projectchat",
+            name="last_message",
+            field=models.ForeignKey(
+                blank=True,
+                null=True,
+                on_delete=django.db.models.deletion.SET_NULL,
+                related_name="+",
+                to="chats.projectchatmessage",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="directchat",
+            index=models.Index(
+                fields=["-last_activity_at", "-id"], name="chats_direct_activity_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="projectchat",
+            index=models.Index(
+                fields=["-last_activity_at", "-id"], name="chats_project_activity_idx"
+            ),
+        ),
+        migrations.RunPython(fill_last_messages, migrations.RunPython.noop),
+    ]
@@ -4,6 +4,7 @@ from typing import List
 from django.contrib.auth import get_user_model
 from django.core.exceptions import ValidationError
 from django.db import models
+from django.utils import timezone
 
 from files.models import UserFile
 from projects.models import Project
@@ -17,9 +18,12 @@ class BaseChat(models.Model):
 
     Attributes:
         created_at: A DateTimeField indicating date of creation.
+        last_activity_at: A DateTimeField with the time of the latest message
+            (or of creation), chat lists are sorted by it.
     """
 
     created_at = models.DateTimeField(auto_now_add=True)
+    last_activity_at = models.DateTimeField(default=timezone.now)
 
     def get_last_message(self):
         return self.messages.last()
@@ -82,6 +86,7 @@ class ProjectChat(BaseChat):
 
     Attributes:
         project: A ForeignKey to Project model, indicating project, which chat belongs to.
+        last_message: A ForeignKey to the latest ProjectChatMessage of the chat.
         created_at: A DateTimeField indicating date of creation.
     """
 
@@ -89,6 +94,13 @@ class ProjectChat(BaseChat):
     project = models.ForeignKey(
         Project, on_delete=models.CASCADE, related_name="project_chats"
     )
+    last_message = models.ForeignKey(
+        "ProjectChatMessage",
+        on_delete=models.SET_NULL,
+        related_name="+",
+        null=True,
+        blank=True,
+    )
 
     def get_users(self):
         collaborators = self.project.collaborator_set.all()
@@ -113,6 +125,11 @@ class ProjectChat(BaseChat):
     class Meta:
         verbose_name = "Чат проекта"
         verbose_name_plural = "Чаты проектов"
+        indexes = [
+            models.Index(
+                fields=["-last_activity_at", "-id"], name="chats_project_activity_idx"
+            ),
+        ]
 
 
 class DirectChat(BaseChat):
@@ -120,6 +137,7 @@ class DirectChat(BaseChat):
     DirectChat model
 
     Attributes:
+        last_message: A ForeignKey to the latest DirectChatMessage of the chat.
         created_at: A DateTimeField indicating date of creation.
 
     Methods:
@@ -128,6 +146,13 @@ class DirectChat(BaseChat):
 
     id = models.CharField(primary_key=True, max_length=64)
     users = models.ManyToManyField(User, related_name="direct_chats")
+    last_message = models.ForeignKey(
+        "DirectChatMessage",
+        on_delete=models.SET_NULL,
+        related_name="+",
+        null=True,
+        blank=True,
+    )
 
     def get_users(self):
         return self.users.all()
@@ -181,6 +206,11 @@ class DirectChat(BaseChat):
     class Meta:
         verbose_name = "Личный чат"
         verbose_name_plural = "Личные чаты"
+        indexes = [
+            models.Index(
+                fields=["-last_activity_at", "-id"], name="chats_direct_activity_idx"
+            ),
+        ]
 
 
 class BaseMessage(models.Model):
@@ -313,3 +343,70 @@ class FileToMessage(models.Model):
     class Meta:
         verbose_name = "Связка файла и сообщения"
         verbose_name_plural = "Связки файлов и сообщений"
+
+
+class ChatUnreadCounter(models.Model):
+    """
+    Unread messages of one user in one chat.
+
+    Exactly one of `direct_chat` / `project_chat` is set. Messages of other users
+    after `last_read_message_id` (the read watermark) are counted in `unread_count`.
+
+    Attributes:
+        user: A ForeignKey to the User model, the reader.
+        direct_chat: A ForeignKey to DirectChat model.
+        project_chat: A ForeignKey to ProjectChat model.
+        unread_count: A PositiveIntegerField with the number of unread messages.
+        last_read_message_id: An id of the latest message read by the user.
+    """
+
+    user = models.ForeignKey(
+        User, on_delete=models.CASCADE, related_name="chat_unread_counters"
+    )
+    direct_chat = models.ForeignKey(
+        DirectChat,
+        on_delete=models.CASCADE,
+        related_name="unread_counters",
+        null=True,
+        blank=True,
+    )
+    project_chat = models.ForeignKey(
+        ProjectChat,
+        on_delete=models.CASCADE,
+        related_name="unread_counters",
+        null=True,
+        blank=True,
+    )
+    unread_count = models.PositiveIntegerField(default=0)
+    last_read_message_id = models.PositiveBigIntegerField(null=True, blank=True)
+
+    def __str__(self):
+        return f"ChatUnreadCounter<{self.user_id}, {self.direct_chat_id or self.project_chat_id}>"
+
+    class Meta:
+        verbose_name = "Счетчик непрочитанных сообщений"
+        verbose_name_plural = "Счетчики непрочитанных сообщений"
+        constraints = [
+            models.UniqueConstraint(
+                fields=["user", "direct_chat"], name="chats_unread_user_direct_chat_uniq"
+            ),
+            models.UniqueConstraint(
+                fields=["user", "project_chat"],
+                name="chats_unread_user_project_chat_uniq",
+            ),
+            models.CheckConstraint(
+                check=(
+                    models.Q(direct_chat__isnull=False, project_chat__isnull=True)
+                    | models.Q(direct_chat__isnull=True, project_chat__isnull=False)
+                ),
+                name="chats_unread_exactly_one_chat",
+            ),
+        ]
+        indexes = [
+            # has-unreads and per-chat counts read only the user's non-zero rows
+            models.Index(
+                fields=["user"],
+                name="chats_unread_user_nonzero_idx",
+                condition=models.Q(unread_count__gt=0),
+            ),
+        ]
@@ -1,7 +1,9 @@
 from rest_framework import pagination
 
+from core.pagination import KeysetPagination
 
-class MessageListPagination(pagination.LimitOffsetPagination):
+
+class MessageListOffsetPagination(pagination.LimitOffsetPagination):
     """
     Pagination for messages
 
@@ -13,3 +15,42 @@ class MessageListPagination(pagination.LimitOffsetPagination):
     default_limit = 20
     limit_query_param = "limit"
     offset_query_param = "offset"
+
+
+class MessageListPagination(KeysetPagination):
+    """
+    Cursor pagination for messages, newest first
+
+    For example:
+        /api/v1/chats/directs/1/messages/?limit=10
+        returns the 10 newest messages and a `next` link with an opaque cursor
+        to the older ones. Passing `offset` (or `pagination=offset`) switches
+        to MessageListOffsetPagination.
+    """
+
+    ordering = ("-created_at", "-id")
+    default_limit = MessageListOffsetPagination.default_limit
+    legacy_pagination_class = MessageListOffsetPagination
+
+
+class ChatListPagination(KeysetPagination):
+    """
+    Cursor pagination for chat lists, most recent activity first
+
+    Chat lists were not paginated, so without `limit` and `cursor` the whole
+    list is returned as before. For example:
+        /api/v1/chats/directs/?limit=20
+        returns the 20 most recently active chats and a `next` link.
+    """
+
+    ordering = ("-last_activity_at", "-id")
+    default_limit = 20
+
+    def paginate_queryset(self, queryset, request, view=None):
+        paginated = self.use_legacy(request) or any(
+            param in request.query_params
+            for param in (self.limit_query_param, self.cursor_query_param)
+        )
+        if not paginated:
+            return None
+        return super().paginate_queryset(queryset, request, view)
@@ -0,0 +1,31 @@
+from django.db.models import QuerySet
+
+from chats.models import DirectChat, ProjectChat
+
+LAST_MESSAGE_RELATED = ("last_message__author", "last_message__reply_to__author")
+LAST_MESSAGE_FILES = "last_message__file_to_message__file"
+
+
+def direct_chat_inbox(user) -> QuerySet[DirectChat]:
+    """
+    Direct chats of the user with their last messages, most recent first.
+
+    The last message, its author, the replied message and files are loaded
+    together with the page, opponents are resolved from chat ids by the caller.
+    """
+    return (
+        DirectChat.objects.filter(users=user)
+        .select_related(*LAST_MESSAGE_RELATED)
+        .prefetch_related(LAST_MESSAGE_FILES)
+        .order_by("-last_activity_at", "-id")
+    )
+
+
+def project_chat_inbox(user) -> QuerySet[ProjectChat]:
+    """Project chats of the user with projects and last messages, most recent first."""
+    return (
+        user.get_project_chats()
+        .select_related("project", *LAST_MESSAGE_RELATED)
+        .prefetch_related(LAST_MESSAGE_FILES)
+        .order_by("-last_activity_at", "-id")
+    )
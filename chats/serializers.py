@@ -1,41 +1,122 @@
+from django.db import models
 from rest_framework import serializers
 
+from chats.author_cards import (
+    CHAT_AUTHOR_CARDS_CONTEXT_KEY,
+    get_chat_author_cards,
+    prefetch_chat_author_cards,
+)
 from chats.models import (
     DirectChat,
     ProjectChat,
     DirectChatMessage,
     ProjectChatMessage,
 )
+from core.serializers import OnlineStatusListSerializer, OnlineStatusMixin
 from files.serializers import UserFileSerializer
-from users.serializers import UserListSerializer, UserDetailSerializer, UserChatSerializer
+from users.serializers import UserListSerializer
+
+
+class ChatAuthorListSerializer(OnlineStatusListSerializer):
+    """
+    Loads author cards and online flags of every user on the page at once.
+
+    The child serializer tells which users an item carries through
+    `get_online_status_users(instance)`.
+    """
+
+    def to_representation(self, data):
+        iterable = data.all() if isinstance(data, models.manager.BaseManager) else data
+        items = list(iterable)
+        prefetch_chat_author_cards(
+            self.context,
+            (user for item in items for user in self.child.get_online_status_users(item)),
+        )
+        return super().to_representation(items)
+
+
+class ChatAuthorSerializer(OnlineStatusMixin, serializers.Serializer):
+    """
+    Compact chat author card: id, name, avatar, speciality and online flag.
+
+    Cards come from `chats.author_cards`: cached per user, dropped on profile
+    save and memoized in context, so a page serializes every author once.
+    """
+
+    id = serializers.IntegerField(read_only=True)
+    first_name = serializers.CharField(read_only=True)
+    last_name = serializers.CharField(read_only=True)
+    patronymic = serializers.CharField(read_only=True, allow_null=True)
+    avatar = serializers.URLField(read_only=True, allow_null=True)
+    is_active = serializers.BooleanField(read_only=True)
+    speciality = serializers.CharField(read_only=True, allow_null=True)
+    is_online = serializers.SerializerMethodField()
+
+    class Meta:
+        list_serializer_class = ChatAuthorListSerializer
+
+    def to_representation(self, user):
+        memo = self.context.setdefault(CHAT_AUTHOR_CARDS_CONTEXT_KEY, {})
+        card = get_chat_author_cards([user.pk], memo).get(user.pk)
+        if card is None:
+            # the user was deleted while the page was being built
+            card = {
+                "id": user.pk,
+                "first_name": user.first_name,
+                "last_name": user.last_name,
+                "patronymic": user.patronymic,
+                "avatar": user.avatar,
+                "is_active": user.is_active,
+                "speciality": user.speciality,
+            }
+        return {**card, "is_online": self.get_is_online(user)}
+
+
+def _last_message_users(message) -> list:
+    if message is None:
+        return []
+    return [message.author, message.reply_to.author if message.reply_to else None]
 
 
 class DirectChatListSerializer(serializers.ModelSerializer):
+    """
+    Direct chat in the chat list.
+
+    The opponent is taken from `chat.opponent` (set by the inbox view) or from
+    context, the last message from the denormalized `chat.last_message`.
+    """
+
     last_message = serializers.SerializerMethodField()
     opponent = serializers.SerializerMethodField()
     name = serializers.SerializerMethodField(read_only=True)
     image_address = serializers.SerializerMethodField(read_only=True)
 
+    def _get_opponent_user(self, chat: DirectChat):
+        return getattr(chat, "opponent", None) or self.context.get("opponent")
+
+    def get_online_status_users(self, chat: DirectChat):
+        return [self._get_opponent_user(chat), *_last_message_users(chat.last_message)]
+
     def get_opponent(self, chat: DirectChat):
-        user = self.context.get("opponent")
-        return UserChatSerializer(
-            user, context={"request": self.context.get("request")}
-        ).data
+        user = self._get_opponent_user(chat)
+        return ChatAuthorSerializer(user, context=self.context).data
 
     def get_name(self, chat: DirectChat):
-        user = self.context.get("opponent")
+        user = self._get_opponent_user(chat)
         return user.get_full_name()
 
     def get_image_address(self, chat: DirectChat):
-        user = self.context.get("opponent")
+        user = self._get_opponent_user(chat)
         return user.avatar
 
-    @classmethod
-    def get_last_message(cls, chat: DirectChat):
-        return DirectChatMessageListSerializer(chat.get_last_message()).data
+    def get_last_message(self, chat: DirectChat):
+        return DirectChatMessageListSerializer(
+            chat.last_message, context=self.context
+        ).data
 
     class Meta:
         model = DirectChat
+        list_serializer_class = ChatAuthorListSerializer
         fields = ["id", "opponent", "last_message", "name", "image_address"]
 
 
@@ -44,7 +125,7 @@ class DirectChatDetailSerializer(serializers.ModelSerializer):
 
     def get_opponent(self, chat: DirectChat):
         user = self.context.get("opponent")
-        return UserChatSerializer(
+        return ChatAuthorSerializer(
             user, context={"request": self.context.get("request")}
         ).data
 
@@ -70,11 +151,17 @@ class ProjectChatListSerializer(serializers.ModelSerializer):
         return chat.project.name
 
     @classmethod
-    def get_last_message(cls, chat: ProjectChat):
-        return ProjectChatMessageListSerializer(chat.get_last_message()).data
+    def get_online_status_users(cls, chat: ProjectChat):
+        return _last_message_users(chat.last_message)
+
+    def get_last_message(self, chat: ProjectChat):
+        return ProjectChatMessageListSerializer(
+            chat.last_message, context=self.context
+        ).data
 
     class Meta:
         model = ProjectChat
+        list_serializer_class = ChatAuthorListSerializer
         fields = ["id", "project", "last_message", "image_address", "name"]
 
 
@@ -111,7 +198,7 @@ class DirectChatMessageSerializer(serializers.ModelSerializer):
     This is done to avoid circular imports.
     """
 
-    author = UserDetailSerializer()
+    author = ChatAuthorSerializer()
 
     class Meta:
         model = DirectChatMessage
@@ -128,11 +215,14 @@ class DirectChatMessageSerializer(serializers.ModelSerializer):
 
 
 class DirectChatMessageListSerializer(serializers.ModelSerializer):
-    # author = UserDetailSerializer()
-    author = UserChatSerializer()
+    author = ChatAuthorSerializer()
     reply_to = DirectChatMessageSerializer(allow_null=True)
     files = serializers.SerializerMethodField()
 
+    @classmethod
+    def get_online_status_users(cls, message: DirectChatMessage):
+        return [message.author, message.reply_to.author if message.reply_to else None]
+
     @classmethod
     def get_files(cls, message: DirectChatMessage):
         data = []
@@ -143,6 +233,7 @@ class DirectChatMessageListSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = DirectChatMessage
+        list_serializer_class = ChatAuthorListSerializer
         fields = [
             "id",
             "author",
@@ -161,7 +252,7 @@ class ProjectChatMessageSerializer(serializers.ModelSerializer):
     This is done to avoid circular imports.
     """
 
-    author = UserDetailSerializer()
+    author = ChatAuthorSerializer()
 
     class Meta:
         model = ProjectChatMessage
@@ -178,10 +269,14 @@ class ProjectChatMessageSerializer(serializers.ModelSerializer):
 
 
 class ProjectChatMessageListSerializer(serializers.ModelSerializer):
-    author = UserDetailSerializer()
+    author = ChatAuthorSerializer()
     reply_to = ProjectChatMessageSerializer(allow_null=True)
     files = serializers.SerializerMethodField()
 
+    @classmethod
+    def get_online_status_users(cls, message: ProjectChatMessage):
+        return [message.author, message.reply_to.author if message.reply_to else None]
+
     @classmethod
     def get_files(cls, message: DirectChatMessage):
         data = []
@@ -192,6 +287,7 @@ class ProjectChatMessageListSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = ProjectChatMessage
+        list_serializer_class = ChatAuthorListSerializer
         fields = [
             "id",
             "author",
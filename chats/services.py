@@ -0,0 +1,198 @@
+from typing import Iterable, Type, Union
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import IntegrityError, transaction
+
+from chats.exceptions import (
+    NonMatchingDirectChatIdException,
+    NonMatchingReplyChatIdException,
+    UserFileNotFoundException,
+    UserNotInChatException,
+)
+from chats.models import (
+    DirectChat,
+    DirectChatMessage,
+    FileToMessage,
+    ProjectChat,
+    ProjectChatMessage,
+)
+from chats.serializers import (
+    DirectChatMessageListSerializer,
+    ProjectChatMessageListSerializer,
+)
+from chats.unread import count_new_message, direct_chat_user_ids, project_chat_member_ids
+from files.models import UserFile
+
+User = get_user_model()
+
+Message = Union[DirectChatMessage, ProjectChatMessage]
+
+
+def get_direct_chat_cache_key(chat_id: str) -> str:
+    return f"direct_chat_exists_{chat_id}"
+
+
+def _ensure_direct_chat(chat_id: str) -> None:
+    user_ids = direct_chat_user_ids(chat_id)
+    chat, created = DirectChat.objects.get_or_create(pk=chat_id)
+    if not created:
+        return
+    if User.objects.filter(pk__in=user_ids).count() != len(user_ids):
+        raise NonMatchingDirectChatIdException(
+            f"Some users of chat {chat_id} do not exist"
+        )
+    chat.users.set(user_ids)
+
+
+def _get_reply_to(
+    message_model: Type[Message], chat_id, reply_to_id: int | None
+) -> Message | None:
+    if reply_to_id is None:
+        return None
+    reply_to = (
+        message_model.objects.select_related("author").filter(pk=reply_to_id).first()
+    )
+    if reply_to is not None and reply_to.chat_id != chat_id:
+        raise NonMatchingReplyChatIdException(
+            f"Message {reply_to_id} is not in chat {chat_id}"
+        )
+    return reply_to
+
+
+def _set_prefetched(instance, related_name: str, objects: list) -> None:
+    """Fills the prefetch cache of a reverse relation like prefetch_related() does."""
+    queryset = getattr(instance, related_name).get_queryset()
+    queryset._result_cache = objects
+    queryset._prefetch_done = True
+    instance._prefetched_objects_cache = {related_name: queryset}
+
+
+def _attach_files(message: Message, file_ids: Iterable[str]) -> None:
+    """Links uploaded files to the message with one lookup and one bulk insert."""
+    file_ids = list(dict.fromkeys(file_ids))
+    files = UserFile.objects.in_bulk(file_ids) if file_ids else {}
+    missing = [file_id for file_id in file_ids if file_id not in files]
+    if missing:
+        raise UserFileNotFoundException(f"Files {missing} do not exist")
+
+    message_field = (
+        "direct_message" if isinstance(message, DirectChatMessage) else "project_message"
+    )
+    links = FileToMessage.objects.bulk_create(
+        [
+            FileToMessage(file=files[file_id], **{message_field: message})
+            for file_id in file_ids
+        ]
+    )
+    _set_prefetched(message, "file_to_message", links)
+
+
+def _create_direct_message(
+    chat_id: str,
+    author,
+    text: str,
+    reply_to_id: int | None,
+    file_ids: Iterable[str],
+    chat_exists: bool,
+) -> DirectChatMessage:
+    with transaction.atomic():
+        if not chat_exists:
+            _ensure_direct_chat(chat_id)
+        message = DirectChatMessage.objects.create(
+            chat_id=chat_id,
+            author=author,
+            text=text,
+            reply_to=_get_reply_to(DirectChatMessage, chat_id, reply_to_id),
+        )
+        count_new_message(message, direct_chat_user_ids(chat_id))
+        _attach_files(message, file_ids)
+    return message
+
+
+def send_direct_message(
+    author,
+    other_user_id: int,
+    text: str,
+    reply_to_id: int = None,
+    file_ids: Iterable[str] = (),
+) -> tuple[str, dict]:
+    """
+    Creates a direct message as one unit of work and serializes it.
+
+    The chat, the message, unread counters and file links are written in one
+    transaction. Chat existence is cached for DIRECT_CHAT_EXISTS_CACHE_SECONDS,
+    so usually the chat is not queried at all; if a cached chat turns out to
+    be gone, the insert fails on the foreign key and is retried with the chat
+    created.
+
+    Returns the chat id and the serialized message built from the objects in
+    memory, without reading the message back.
+    """
+    first_id, second_id = sorted((author.pk, other_user_id))
+    chat_id = f"{first_id}_{second_id}"
+    cache_key = get_direct_chat_cache_key(chat_id)
+    cache_seconds = settings.DIRECT_CHAT_EXISTS_CACHE_SECONDS
+    chat_exists = bool(cache_seconds and cache.get(cache_key))
+    try:
+        message = _create_direct_message(
+            chat_id, author, text, reply_to_id, file_ids, chat_exists
+        )
+    except IntegrityError:
+        if not chat_exists:
+            raise
+        cache.delete(cache_key)
+        message = _create_direct_message(
+            chat_id, author, text, reply_to_id, file_ids, chat_exists=False
+        )
+        chat_exists = False
+    if cache_seconds and not chat_exists:
+        cache.set(cache_key, True, cache_seconds)
+    return chat_id, DirectChatMessageListSerializer(message).data
+
+
+def send_project_message(
+    author,
+    chat_id: int,
+    text: str,
+    reply_to_id: int = None,
+    file_ids: Iterable[str] = (),
+) -> dict:
+    """
+    Creates a project chat message as one unit of work and serializes it.
+
+    Membership is checked against the same member ids that get unread
+    counters, so the chat, the members and the message cost one query each.
+    """
+    with transaction.atomic():
+        chat = ProjectChat.objects.select_related("project").get(pk=chat_id)
+        member_ids = project_chat_member_ids(chat.project_id, chat.project.leader_id)
+        if author.pk not in member_ids:
+            raise UserNotInChatException(
+                f"User {author.pk} is not in project chat {chat_id}"
+            )
+        message = ProjectChatMessage.objects.create(
+            chat=chat,
+            author=author,
+            text=text,
+            reply_to=_get_reply_to(ProjectChatMessage, chat.pk, reply_to_id),
+        )
+        count_new_message(message, member_ids)
+        _attach_files(message, file_ids)
+    return ProjectChatMessageListSerializer(message).data
+
+
+def get_message_data(message_model: Type[Message], message_id: int) -> dict:
+    """Reads the message with everything its serializer needs and serializes it."""
+    serializer_class = (
+        DirectChatMessageListSerializer
+        if message_model is DirectChatMessage
+        else ProjectChatMessageListSerializer
+    )
+    message = (
+        message_model.objects.select_related("author", "reply_to__author")
+        .prefetch_related("file_to_message__file")
+        .get(pk=message_id)
+    )
+    return serializer_class(message).data
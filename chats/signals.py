@@ -0,0 +1,36 @@
+from django.contrib.auth import get_user_model
+from django.db.models import Q
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from chats.author_cards import invalidate_chat_author_card
+from chats.models import DirectChatMessage, ProjectChatMessage
+from chats.unread import forget_project_chat_member
+from projects.models import Collaborator
+
+User = get_user_model()
+
+
+@receiver(post_delete, sender=Collaborator)
+def drop_project_chat_unread_counter(sender, instance, **kwargs):
+    forget_project_chat_member(instance.project_id, instance.user_id)
+
+
+@receiver(post_save, sender=DirectChatMessage)
+@receiver(post_save, sender=ProjectChatMessage)
+def set_chat_last_message(sender, instance, created, **kwargs):
+    """Keeps the denormalized last message and activity time of the chat."""
+    if not created:
+        return
+    chat_model = sender._meta.get_field("chat").related_model
+    chat_model.objects.filter(
+        Q(last_message__isnull=True) | Q(last_activity_at__lte=instance.created_at),
+        pk=instance.chat_id,
+    ).update(last_message=instance, last_activity_at=instance.created_at)
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def drop_chat_author_card(sender, instance, **kwargs):
+    """Profile edits show up in chats without waiting for the card to expire."""
+    invalidate_chat_author_card(instance.pk)
@@ -0,0 +1,107 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from chats.author_cards import get_chat_author_cards
+from chats.models import DirectChat, DirectChatMessage
+from chats.serializers import ChatAuthorSerializer
+from chats.tests.constants import TEST_USER1, TEST_USER2
+from core.models import Specialization, SpecializationCategory
+from users.admin import make_active
+
+User = get_user_model()
+
+CARD_QUERY_MARKER = '"core_specialization"."name"'
+
+
+class ChatAuthorCardTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create(**TEST_USER1, speciality="Designer")
+        self.other_user = User.objects.create(**TEST_USER2)
+        self.chat = DirectChat.create_from_two_users(self.user, self.other_user)
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.url = f"/chats/directs/{self.chat.pk}/messages/"
+
+    def card_queries(self, queries) -> int:
+        return sum(CARD_QUERY_MARKER in query["sql"] for query in queries)
+
+    def test_card_has_compact_fields(self):
+        data = ChatAuthorSerializer(self.user).data
+
+        self.assertEqual(
+            set(data),
+            {
+                "id",
+                "first_name",
+                "last_name",
+                "patronymic",
+                "avatar",
+                "is_active",
+                "speciality",
+                "is_online",
+            },
+        )
+        self.assertEqual(data["speciality"], "Designer")
+
+        category = SpecializationCategory.objects.create(name="IT")
+        self.user.v2_speciality = Specialization.objects.create(
+            name="Backend developer", category=category
+        )
+        self.user.save()
+        self.assertEqual(
+            ChatAuthorSerializer(self.user).data["speciality"], "Backend developer"
+        )
+
+    def test_page_loads_each_author_once_and_then_from_cache(self):
+        for index in range(50):
+            DirectChatMessage.objects.create(
+                chat=self.chat,
+                author=self.user if index % 2 else self.other_user,
+                text=f"Message {index}",
+            )
+
+        with CaptureQueriesContext(connection) as cold:
+            response = self.client.get(self.url, {"limit": 50})
+        with CaptureQueriesContext(connection) as warm:
+            self.client.get(self.url, {"limit": 50})
+
+        self.assertEqual(len(response.data["results"]), 50)
+        self.assertEqual(
+            {message["author"]["id"] for message in response.data["results"]},
+            {self.user.id, self.other_user.id},
+        )
+        self.assertEqual(self.card_queries(cold), 1)
+        self.assertEqual(self.card_queries(warm), 0)
+
+    def test_profile_save_drops_cached_card(self):
+        get_chat_author_cards([self.user.id])
+
+        self.user.first_name = "Renamed"
+        self.user.save()
+
+        self.assertEqual(
+            get_chat_author_cards([self.user.id])[self.user.id]["first_name"], "Renamed"
+        )
+
+    def test_admin_activation_drops_cached_card(self):
+        User.objects.filter(pk=self.user.pk).update(is_active=False)
+        get_chat_author_cards([self.user.id])
+
+        make_active(None, None, User.objects.filter(pk=self.user.pk))
+
+        self.assertTrue(get_chat_author_cards([self.user.id])[self.user.id]["is_active"])
+
+    @override_settings(CHAT_AUTHOR_CARD_CACHE_SECONDS=0)
+    def test_disabled_cache_still_memoizes_within_request(self):
+        memo = {}
+        with CaptureQueriesContext(connection) as queries:
+            get_chat_author_cards([self.user.id, self.other_user.id], memo)
+            get_chat_author_cards([self.user.id], memo)
+
+        self.assertEqual(self.card_queries(queries), 1)
+        self.assertIsNone(cache.get(f"chats:author_card:v1:{self.user.id}"))
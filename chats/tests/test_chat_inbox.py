@@ -0,0 +1,135 @@
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from chats.models import DirectChat, DirectChatMessage, ProjectChat, ProjectChatMessage
+from chats.tests.constants import TEST_USER1
+from projects.models import Project
+
+User = get_user_model()
+
+
+class ChatInboxTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create(**TEST_USER1)
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.url = reverse("chats:direct-chat-list")
+        self.opponents = []
+
+    def create_chats(self, count: int) -> list[DirectChat]:
+        chats = []
+        for index in range(count):
+            opponent = User.objects.create(
+                email=f"inbox-{len(self.opponents)}@test.test",
+                password="very_strong_password",
+                first_name="Inbox",
+                last_name=str(index),
+                birthday="2000-01-01",
+            )
+            self.opponents.append(opponent)
+            chat = DirectChat.create_from_two_users(self.user, opponent)
+            reply_to = DirectChatMessage.objects.create(
+                chat=chat, author=self.user, text="question"
+            )
+            DirectChatMessage.objects.create(
+                chat=chat, author=opponent, text="answer", reply_to=reply_to
+            )
+            chats.append(chat)
+        return chats
+
+    def list_queries(self, url, params=None) -> int:
+        # author cards are cached between requests, compare cold requests
+        cache.clear()
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url, params)
+        self.assertEqual(response.status_code, 200)
+        return len(queries)
+
+    def test_direct_chat_list_query_count_does_not_grow(self):
+        self.create_chats(2)
+        few = self.list_queries(self.url)
+        self.create_chats(5)
+        many = self.list_queries(self.url)
+
+        self.assertEqual(few, many)
+        response = self.client.get(self.url)
+        self.assertEqual(len(response.data), 7)
+        last_message = response.data[0]["last_message"]
+        self.assertEqual(last_message["text"], "answer")
+        self.assertEqual(last_message["reply_to"]["text"], "question")
+        self.assertEqual(last_message["reply_to"]["author"]["id"], self.user.id)
+
+    def test_direct_chats_are_ordered_by_last_message(self):
+        old_chat, new_chat = self.create_chats(2)
+        DirectChatMessage.objects.create(chat=old_chat, author=self.user, text="bump")
+
+        response = self.client.get(self.url)
+
+        self.assertEqual(
+            [chat["id"] for chat in response.data], [old_chat.id, new_chat.id]
+        )
+        self.assertEqual(response.data[0]["last_message"]["text"], "bump")
+        self.assertEqual(response.data[0]["opponent"]["id"], self.opponents[0].id)
+
+    def test_direct_chat_list_cursor_pagination(self):
+        chats = self.create_chats(3)
+
+        first_page = self.client.get(self.url, {"limit": 2})
+        second_page = self.client.get(first_page.data["next"])
+
+        self.assertEqual(
+            [chat["id"] for chat in first_page.data["results"]],
+            [chats[2].id, chats[1].id],
+        )
+        self.assertEqual(
+            [chat["id"] for chat in second_page.data["results"]], [chats[0].id]
+        )
+        self.assertIsNone(second_page.data["next"])
+
+    def test_new_message_does_not_move_chat_back(self):
+        [chat] = self.create_chats(1)
+        latest = DirectChat.objects.get(pk=chat.pk).last_message
+        # a message saved after a newer one was already recorded
+        future = timezone.now() + timedelta(minutes=1)
+        DirectChat.objects.filter(pk=chat.pk).update(last_activity_at=future)
+        DirectChatMessage.objects.create(chat=chat, author=self.user, text="late")
+
+        chat.refresh_from_db()
+        self.assertEqual(chat.last_message_id, latest.id)
+        self.assertEqual(chat.last_activity_at, future)
+
+    def test_project_chat_list_query_count_does_not_grow(self):
+        url = reverse("chats:project-chat-list")
+
+        def create_project_chat(index):
+            project = Project.objects.create(
+                leader=self.user, name=f"Inbox {index}", draft=False
+            )
+            chat = ProjectChat.objects.get(project=project)
+            ProjectChatMessage.objects.create(chat=chat, author=self.user, text="hi")
+            return chat
+
+        create_project_chat(0)
+        few = self.list_queries(url)
+        chats = [create_project_chat(index) for index in range(1, 4)]
+        many = self.list_queries(url)
+
+        self.assertEqual(few, many)
+        response = self.client.get(url, {"limit": 2})
+        self.assertEqual(
+            [chat["id"] for chat in response.data["results"]],
+            [chats[2].id, chats[1].id],
+        )
+        self.assertEqual(response.data["results"][0]["last_message"]["text"], "hi")
+        self.assertEqual(
+            ProjectChat.objects.get(pk=chats[0].pk).last_activity_at,
+            ProjectChatMessage.objects.get(chat=chats[0]).created_at,
+        )
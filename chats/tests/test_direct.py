@@ -5,6 +5,7 @@ from django.test import TransactionTestCase
 from chats.consumers import ChatConsumer
 from chats.models import DirectChatMessage
 from chats.tests.constants import TEST_USER1, TEST_USER2, TEST_USER3
+from core.presence import get_presence_store
 
 
 class DirectTests(TransactionTestCase):
@@ -22,6 +23,24 @@ class DirectTests(TransactionTestCase):
         connected, subprotocol = await communicator.connect(timeout=5)
         self.assertTrue(connected)
 
+    async def test_user_stays_online_until_last_connection_closes(self):
+        presence = get_presence_store()
+        presence.clear()
+        first = WebsocketCommunicator(ChatConsumer.as_asgi(), "/ws/chat/")
+        first.scope["user"] = self.user
+        second = WebsocketCommunicator(ChatConsumer.as_asgi(), "/ws/chat/")
+        second.scope["user"] = self.user
+        await first.connect(timeout=5)
+        await second.connect(timeout=5)
+        self.assertTrue(presence.is_online(self.user.id))
+
+        await first.disconnect()
+        self.assertTrue(presence.is_online(self.user.id))
+
+        await second.disconnect()
+        self.assertFalse(presence.is_online(self.user.id))
+        self.assertEqual(presence.count(), 0)
+
     async def test_send_new_message_direct_with_myself(
         self,
     ):  # Chat messages with yourself
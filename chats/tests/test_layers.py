@@ -0,0 +1,54 @@
+from channels.layers import InMemoryChannelLayer
+from django.test import SimpleTestCase
+
+from chats.layers import (
+    BulkGroupsRedisChannelLayer,
+    group_add_many,
+    group_discard_many,
+)
+
+
+class GroupsBulkHelpersTests(SimpleTestCase):
+    async def test_fallback_joins_and_leaves_every_group(self):
+        layer = InMemoryChannelLayer()
+        channel_name = await layer.new_channel()
+        groups = ["CHATS_RELATED_1", "CHATS_RELATED_2", "CHATS_RELATED_3"]
+
+        await group_add_many(layer, groups, channel_name)
+        for group in groups:
+            self.assertIn(channel_name, layer.groups[group])
+
+        await group_discard_many(layer, groups, channel_name)
+        self.assertEqual(layer.groups, {})
+
+    async def test_bulk_layer_method_is_preferred(self):
+        calls = []
+
+        class BulkLayer:
+            async def group_add_many(self, groups, channel):
+                calls.append(("add", groups, channel))
+
+            async def group_discard_many(self, groups, channel):
+                calls.append(("discard", groups, channel))
+
+        await group_add_many(BulkLayer(), iter(["a", "b"]), "specific.x")
+        await group_discard_many(BulkLayer(), ["a"], "specific.x")
+        await group_add_many(BulkLayer(), [], "specific.x")
+
+        self.assertEqual(
+            calls,
+            [("add", ["a", "b"], "specific.x"), ("discard", ["a"], "specific.x")],
+        )
+
+    def test_groups_are_split_by_shard(self):
+        layer = BulkGroupsRedisChannelLayer(
+            hosts=["redis://first:6379", "redis://second:6379"]
+        )
+        groups = [f"CHATS_RELATED_{project_id}" for project_id in range(50)]
+
+        shards = layer._groups_by_shard(groups)
+
+        self.assertEqual(sorted(sum(shards.values(), [])), sorted(groups))
+        for index, shard_groups in shards.items():
+            for group in shard_groups:
+                self.assertEqual(layer.consistent_hash(group), index)
@@ -0,0 +1,70 @@
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from chats.models import DirectChat, DirectChatMessage
+from chats.tests.constants import TEST_USER1, TEST_USER2
+
+
+class DirectChatMessageListPaginationTests(TestCase):
+    def setUp(self):
+        super().setUp()
+        self.user = get_user_model().objects.create(**TEST_USER1)
+        self.other_user = get_user_model().objects.create(**TEST_USER2)
+        self.chat = DirectChat.create_from_two_users(self.user, self.other_user)
+        self.url = f"/chats/directs/{self.chat.pk}/messages/"
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+        created_at = timezone.now() - timedelta(hours=1)
+        self.messages = []
+        for index in range(5):
+            message = DirectChatMessage.objects.create(
+                chat=self.chat, author=self.user, text=f"Message {index}"
+            )
+            # Два сообщения с одинаковым временем: порядок держится на id.
+            DirectChatMessage.objects.filter(pk=message.pk).update(
+                created_at=created_at + timedelta(minutes=index // 2)
+            )
+            self.messages.append(message)
+
+    def ids(self, response) -> list[int]:
+        return [message["id"] for message in response.data["results"]]
+
+    def test_cursor_pages_are_stable_when_new_messages_arrive(self):
+        first_page = self.client.get(self.url, {"limit": 2})
+        DirectChatMessage.objects.create(chat=self.chat, author=self.user, text="New")
+        second_page = self.client.get(first_page.data["next"])
+        third_page = self.client.get(second_page.data["next"])
+
+        self.assertEqual(first_page.status_code, 200)
+        self.assertNotIn("count", first_page.data)
+        self.assertIsNone(first_page.data["previous"])
+        self.assertEqual(self.ids(first_page), [self.messages[4].pk, self.messages[3].pk])
+        self.assertEqual(
+            self.ids(second_page), [self.messages[2].pk, self.messages[1].pk]
+        )
+        self.assertEqual(self.ids(third_page), [self.messages[0].pk])
+        self.assertIsNone(third_page.data["next"])
+
+        previous_page = self.client.get(third_page.data["previous"])
+        self.assertEqual(self.ids(previous_page), self.ids(second_page))
+
+    def test_offset_flag_keeps_limit_offset_contract(self):
+        flagged = self.client.get(self.url, {"limit": 2, "pagination": "offset"})
+        with_offset = self.client.get(self.url, {"limit": 2, "offset": 2})
+
+        self.assertEqual(flagged.data["count"], 5)
+        self.assertEqual(self.ids(flagged), [self.messages[4].pk, self.messages[3].pk])
+        self.assertEqual(with_offset.data["count"], 5)
+        self.assertEqual(
+            self.ids(with_offset), [self.messages[2].pk, self.messages[1].pk]
+        )
+
+    def test_malformed_cursor_returns_404(self):
+        response = self.client.get(self.url, {"cursor": "not-a-cursor"})
+
+        self.assertEqual(response.status_code, 404)
@@ -0,0 +1,194 @@
+from datetime import timedelta
+
+from channels.testing import WebsocketCommunicator
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase, TransactionTestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from chats.consumers import ChatConsumer
+from chats.models import DirectChat, DirectChatMessage, ProjectChat, ProjectChatMessage
+from chats.tests.constants import TEST_USER1, TEST_USER2, TEST_USER3
+from chats.unread import count_new_direct_message, get_unread_counts, read_messages_up_to
+from chats.websockets_settings import EventType
+from projects.models import Collaborator, Project
+
+User = get_user_model()
+
+
+class ReadMessagesUpToTests(TestCase):
+    def setUp(self):
+        self.author = User.objects.create(**TEST_USER1)
+        self.reader = User.objects.create(**TEST_USER2)
+        self.chat = DirectChat.create_from_two_users(self.author, self.reader)
+
+    def send(self, author, text="hello"):
+        message = DirectChatMessage.objects.create(
+            chat=self.chat, author=author, text=text
+        )
+        count_new_direct_message(message)
+        return message
+
+    def test_messages_up_to_boundary_are_read_with_one_update(self):
+        first = self.send(self.author)
+        own = self.send(self.reader)
+        boundary = self.send(self.author)
+        later = self.send(self.author)
+
+        with CaptureQueriesContext(connection) as queries:
+            message, read_count = read_messages_up_to(
+                self.reader.id, DirectChatMessage, self.chat.id, message_id=boundary.id
+            )
+
+        self.assertEqual(message, boundary)
+        self.assertEqual(read_count, 2)
+        message_updates = [
+            query
+            for query in queries
+            if query["sql"].startswith('UPDATE "chats_directchatmessage"')
+        ]
+        self.assertEqual(len(message_updates), 1)
+        read_ids = set(
+            DirectChatMessage.objects.filter(is_read=True).values_list("id", flat=True)
+        )
+        self.assertEqual(read_ids, {first.id, boundary.id})
+        self.assertNotIn(own.id, read_ids)
+        self.assertNotIn(later.id, read_ids)
+        self.assertEqual(get_unread_counts(self.reader.id)["direct"], {self.chat.id: 1})
+
+    def test_timestamp_boundary_uses_latest_earlier_message(self):
+        first = self.send(self.author)
+        second = self.send(self.author)
+
+        message, read_count = read_messages_up_to(
+            self.reader.id, DirectChatMessage, self.chat.id, until=second.created_at
+        )
+        self.assertEqual((message, read_count), (second, 2))
+        self.assertTrue(DirectChatMessage.objects.get(pk=first.pk).is_read)
+
+        message, read_count = read_messages_up_to(
+            self.reader.id,
+            DirectChatMessage,
+            self.chat.id,
+            until=first.created_at - timedelta(minutes=1),
+        )
+        self.assertEqual((message, read_count), (None, 0))
+
+    def test_message_of_other_chat_is_not_a_boundary(self):
+        other_chat = DirectChat.create_from_two_users(
+            self.author, User.objects.create(**TEST_USER3)
+        )
+        message = DirectChatMessage.objects.create(
+            chat=other_chat, author=self.author, text="hello"
+        )
+
+        self.assertEqual(
+            read_messages_up_to(
+                self.reader.id, DirectChatMessage, self.chat.id, message_id=message.id
+            ),
+            (None, 0),
+        )
+        self.assertFalse(DirectChatMessage.objects.filter(is_read=True).exists())
+
+
+class ReadUpToWebsocketTests(TransactionTestCase):
+    reset_sequences = True
+
+    def setUp(self):
+        super().setUp()
+        self.user = User.objects.create(**TEST_USER1)
+        self.other_user = User.objects.create(**TEST_USER2)
+        self.outsider = User.objects.create(**TEST_USER3)
+
+    async def connect(self, user):
+        communicator = WebsocketCommunicator(ChatConsumer.as_asgi(), "/ws/chat/")
+        communicator.scope["user"] = user
+        connected, _ = await communicator.connect(timeout=5)
+        self.assertTrue(connected)
+        return communicator
+
+    async def test_direct_read_up_to_sends_single_receipt(self):
+        chat = DirectChat.create_from_two_users(self.user, self.other_user)
+        messages = [
+            DirectChatMessage.objects.create(chat=chat, author=self.other_user, text="hi")
+            for _ in range(3)
+        ]
+
+        communicator = await self.connect(self.user)
+        await communicator.send_json_to(
+            {
+                "type": EventType.READ_UP_TO,
+                "content": {
+                    "chat_type": "direct",
+                    "chat_id": "1_2",
+                    "message_id": messages[-1].id,
+                },
+            }
+        )
+        response = await communicator.receive_json_from()
+
+        self.assertEqual(response["type"], EventType.READ_UP_TO)
+        self.assertEqual(response["content"]["message_id"], messages[-1].id)
+        self.assertEqual(response["content"]["read_count"], 3)
+        self.assertEqual(response["content"]["user_id"], self.user.id)
+        self.assertTrue(await communicator.receive_nothing())
+        await communicator.disconnect()
+        self.assertEqual(DirectChatMessage.objects.filter(is_read=True).count(), 3)
+
+    async def test_read_up_to_without_boundary_is_an_error(self):
+        DirectChat.create_from_two_users(self.user, self.other_user)
+
+        communicator = await self.connect(self.user)
+        await communicator.send_json_to(
+            {
+                "type": EventType.READ_UP_TO,
+                "content": {
+                    "chat_type": "direct",
+                    "chat_id": "1_2",
+                    "timestamp": "yesterday",
+                },
+            }
+        )
+        response = await communicator.receive_json_from()
+        await communicator.disconnect()
+
+        self.assertIn("error", response)
+
+    async def test_project_read_up_to_by_timestamp(self):
+        project = Project.objects.create(leader=self.user)
+        chat = ProjectChat.objects.create(id=1, project=project)
+        Collaborator.objects.create(user=self.other_user, project=project, role="User")
+        ProjectChatMessage.objects.create(chat=chat, author=self.other_user, text="hi")
+        ProjectChatMessage.objects.create(chat=chat, author=self.user, text="hello")
+        content = {
+            "chat_type": "project",
+            "chat_id": "1",
+            "timestamp": (timezone.now() + timedelta(seconds=1)).isoformat(),
+        }
+
+        communicator = await self.connect(self.outsider)
+        await communicator.send_json_to(
+            {"type": EventType.READ_UP_TO, "content": content}
+        )
+        response = await communicator.receive_json_from()
+        await communicator.disconnect()
+        self.assertIn("error", response)
+
+        communicator = await self.connect(self.user)
+        await communicator.send_json_to(
+            {"type": EventType.READ_UP_TO, "content": content}
+        )
+        response = await communicator.receive_json_from()
+        await communicator.disconnect()
+
+        self.assertEqual(response["type"], EventType.READ_UP_TO)
+        self.assertEqual(response["content"]["read_count"], 1)
+        self.assertEqual(
+            list(
+                ProjectChatMessage.objects.order_by("id").values_list(
+                    "author_id", "is_read"
+                )
+            ),
+            [(self.other_user.id, True), (self.user.id, False)],
+        )
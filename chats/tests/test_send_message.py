@@ -0,0 +1,145 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+
+from chats.exceptions import (
+    NonMatchingReplyChatIdException,
+    UserFileNotFoundException,
+    UserNotInChatException,
+)
+from chats.models import (
+    DirectChat,
+    DirectChatMessage,
+    FileToMessage,
+    ProjectChat,
+    ProjectChatMessage,
+)
+from chats.services import (
+    get_direct_chat_cache_key,
+    send_direct_message,
+    send_project_message,
+)
+from chats.tests.constants import TEST_USER1, TEST_USER2, TEST_USER3
+from chats.unread import get_unread_counts
+from files.models import UserFile
+from projects.models import Project
+
+User = get_user_model()
+
+
+@override_settings(DIRECT_CHAT_EXISTS_CACHE_SECONDS=60)
+class SendDirectMessageTests(TestCase):
+    def setUp(self):
+        self.author = User.objects.create(**TEST_USER1)
+        self.other_user = User.objects.create(**TEST_USER2)
+        self.chat_id = DirectChat.get_chat_id_from_users(self.author, self.other_user)
+        cache.delete(get_direct_chat_cache_key(self.chat_id))
+
+    def create_file(self, name: str) -> UserFile:
+        return UserFile.objects.create(
+            link=f"https://cdn.example.com/{name}",
+            user=self.author,
+            name=name,
+            extension="txt",
+            size=1,
+        )
+
+    def test_first_message_creates_chat_and_counts_unread(self):
+        chat_id, data = send_direct_message(self.author, self.other_user.id, "hello")
+
+        self.assertEqual(chat_id, self.chat_id)
+        self.assertEqual(
+            set(DirectChat.objects.get(pk=chat_id).users.values_list("id", flat=True)),
+            {self.author.id, self.other_user.id},
+        )
+        self.assertEqual(data["text"], "hello")
+        self.assertEqual(data["author"]["id"], self.author.id)
+        self.assertEqual(data["files"], [])
+        self.assertEqual(get_unread_counts(self.other_user.id)["direct"], {chat_id: 1})
+
+    def test_files_are_linked_with_one_insert_and_serialized_from_memory(self):
+        send_direct_message(self.author, self.other_user.id, "warm up")
+        reply_to = DirectChatMessage.objects.get(chat_id=self.chat_id)
+        files = [self.create_file("a.txt"), self.create_file("b.txt")]
+
+        with CaptureQueriesContext(connection) as queries:
+            _, data = send_direct_message(
+                self.author,
+                self.other_user.id,
+                "with files",
+                reply_to.id,
+                [file.link for file in files],
+            )
+
+        statements = [query["sql"] for query in queries]
+        self.assertFalse(any('FROM "chats_directchat"' in sql for sql in statements))
+        self.assertEqual(
+            sum(
+                sql.startswith('INSERT INTO "chats_filetomessage"') for sql in statements
+            ),
+            1,
+        )
+        self.assertFalse(any('FROM "chats_filetomessage"' in sql for sql in statements))
+        self.assertEqual(
+            [file["link"] for file in data["files"]], [file.link for file in files]
+        )
+        self.assertEqual(data["reply_to"]["id"], reply_to.id)
+        self.assertEqual(
+            FileToMessage.objects.filter(direct_message_id=data["id"]).count(), 2
+        )
+
+    def test_missing_file_rolls_message_back(self):
+        with self.assertRaises(UserFileNotFoundException):
+            send_direct_message(
+                self.author,
+                self.other_user.id,
+                "hello",
+                None,
+                ["https://cdn.example.com/x"],
+            )
+
+        self.assertFalse(DirectChatMessage.objects.exists())
+
+    def test_reply_to_message_of_another_chat_is_rejected(self):
+        third_user = User.objects.create(**TEST_USER3)
+        _, data = send_direct_message(self.author, third_user.id, "elsewhere")
+
+        with self.assertRaises(NonMatchingReplyChatIdException):
+            send_direct_message(self.author, self.other_user.id, "reply", data["id"])
+
+
+@override_settings(DIRECT_CHAT_EXISTS_CACHE_SECONDS=60)
+class SendDirectMessageStaleCacheTests(TransactionTestCase):
+    def test_stale_cached_chat_is_created_again(self):
+        author = User.objects.create(**TEST_USER1)
+        other_user = User.objects.create(**TEST_USER2)
+        chat_id = DirectChat.get_chat_id_from_users(author, other_user)
+        cache.set(get_direct_chat_cache_key(chat_id), True)
+
+        send_direct_message(author, other_user.id, "hello")
+
+        self.assertTrue(DirectChat.objects.filter(pk=chat_id).exists())
+        self.assertEqual(DirectChatMessage.objects.filter(chat_id=chat_id).count(), 1)
+
+
+class SendProjectMessageTests(TestCase):
+    def setUp(self):
+        self.leader = User.objects.create(**TEST_USER1)
+        self.outsider = User.objects.create(**TEST_USER2)
+        self.project = Project.objects.create(leader=self.leader, draft=False)
+        self.chat = ProjectChat.objects.get(project=self.project)
+
+    def test_member_message_is_created_and_serialized(self):
+        data = send_project_message(self.leader, self.chat.id, "hello")
+
+        self.assertEqual(data["text"], "hello")
+        self.assertEqual(data["author"]["id"], self.leader.id)
+        self.assertEqual(ProjectChatMessage.objects.filter(chat=self.chat).count(), 1)
+
+    def test_outsider_cannot_send(self):
+        with self.assertRaises(UserNotInChatException):
+            send_project_message(self.outsider, self.chat.id, "hello")
+
+        self.assertFalse(ProjectChatMessage.objects.exists())
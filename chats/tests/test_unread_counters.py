@@ -0,0 +1,204 @@
+from channels.testing import WebsocketCommunicator
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, TransactionTestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from chats.consumers import ChatConsumer
+from chats.models import (
+    ChatUnreadCounter,
+    DirectChat,
+    DirectChatMessage,
+    ProjectChat,
+    ProjectChatMessage,
+)
+from chats.tests.constants import TEST_USER1, TEST_USER2, TEST_USER3
+from chats.unread import (
+    count_new_direct_message,
+    count_new_project_message,
+    discount_deleted_message,
+    get_unread_counts,
+    mark_read_up_to,
+)
+from projects.models import Collaborator, Project
+
+User = get_user_model()
+
+
+class UnreadCountersTests(TestCase):
+    def setUp(self):
+        self.author = User.objects.create(**TEST_USER1)
+        self.reader = User.objects.create(**TEST_USER2)
+        self.member = User.objects.create(**TEST_USER3)
+        self.direct_chat = DirectChat.create_from_two_users(self.author, self.reader)
+        self.project = Project.objects.create(leader=self.author)
+        Collaborator.objects.get_or_create(
+            user=self.member, project=self.project, defaults={"role": "User"}
+        )
+        self.project_chat = ProjectChat.objects.create(project=self.project)
+
+    def send_direct(self, author, text="hello"):
+        message = DirectChatMessage.objects.create(
+            chat=self.direct_chat, author=author, text=text
+        )
+        count_new_direct_message(message)
+        return message
+
+    def send_project(self, author, text="hello"):
+        message = ProjectChatMessage.objects.create(
+            chat=self.project_chat, author=author, text=text
+        )
+        count_new_project_message(message, self.project.leader_id)
+        return message
+
+    def test_new_messages_are_counted_for_other_members(self):
+        self.send_direct(self.author)
+        self.send_direct(self.author)
+        self.send_project(self.member)
+
+        self.assertEqual(
+            get_unread_counts(self.reader.id),
+            {"direct": {self.direct_chat.id: 2}, "project": {}},
+        )
+        self.assertEqual(
+            get_unread_counts(self.author.id),
+            {"direct": {}, "project": {self.project_chat.id: 1}},
+        )
+        self.assertEqual(get_unread_counts(self.member.id), {"direct": {}, "project": {}})
+
+    def test_read_moves_watermark_and_recounts_tail(self):
+        first = self.send_direct(self.author)
+        second = self.send_direct(self.author)
+        self.send_direct(self.author)
+
+        mark_read_up_to(self.reader.id, second)
+        self.assertEqual(
+            get_unread_counts(self.reader.id)["direct"], {self.direct_chat.id: 1}
+        )
+
+        mark_read_up_to(self.reader.id, first)
+        counter = ChatUnreadCounter.objects.get(
+            user=self.reader, direct_chat=self.direct_chat
+        )
+        self.assertEqual(counter.unread_count, 1)
+        self.assertEqual(counter.last_read_message_id, second.id)
+
+    def test_deleted_unread_message_is_discounted(self):
+        read = self.send_direct(self.author)
+        unread = self.send_direct(self.author)
+        mark_read_up_to(self.reader.id, read)
+
+        read.is_deleted = True
+        discount_deleted_message(read)
+        self.assertEqual(
+            get_unread_counts(self.reader.id)["direct"], {self.direct_chat.id: 1}
+        )
+
+        unread.is_deleted = True
+        discount_deleted_message(unread)
+        self.assertEqual(get_unread_counts(self.reader.id)["direct"], {})
+
+    def test_leaving_project_drops_counter(self):
+        self.send_project(self.author)
+
+        Collaborator.objects.filter(user=self.member, project=self.project).delete()
+
+        self.assertEqual(get_unread_counts(self.member.id)["project"], {})
+
+    def test_has_unreads_is_single_query(self):
+        self.send_direct(self.author)
+        client = APIClient()
+        client.force_authenticate(self.reader)
+
+        with CaptureQueriesContext(connection) as queries:
+            response = client.get(reverse("chats:has-chat-unreads"))
+
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.data["has_unreads"])
+        self.assertEqual(
+            response.data["unread_counts"],
+            {"direct": {self.direct_chat.id: 1}, "project": {}},
+        )
+        self.assertEqual(len(queries), 1)
+
+    def test_backfill_rebuilds_counters_from_read_flags(self):
+        DirectChatMessage.objects.create(
+            chat=self.direct_chat, author=self.author, text="a", is_read=True
+        )
+        DirectChatMessage.objects.create(
+            chat=self.direct_chat, author=self.author, text="b"
+        )
+        DirectChatMessage.objects.create(
+            chat=self.direct_chat, author=self.reader, text="c"
+        )
+        ProjectChatMessage.objects.create(
+            chat=self.project_chat, author=self.author, text="d"
+        )
+        ProjectChatMessage.objects.create(
+            chat=self.project_chat, author=self.author, text="e", is_deleted=True
+        )
+
+        call_command("backfill_chat_unread_counters", "--chunk-size", "1", verbosity=0)
+
+        self.assertEqual(
+            get_unread_counts(self.reader.id)["direct"], {self.direct_chat.id: 1}
+        )
+        self.assertEqual(
+            get_unread_counts(self.author.id)["direct"], {self.direct_chat.id: 1}
+        )
+        self.assertEqual(
+            get_unread_counts(self.member.id)["project"], {self.project_chat.id: 1}
+        )
+        self.assertEqual(get_unread_counts(self.author.id)["project"], {})
+
+
+class UnreadCountersWebsocketTests(TransactionTestCase):
+    reset_sequences = True
+
+    def setUp(self):
+        super().setUp()
+        self.user = User.objects.create(**TEST_USER1)
+        self.other_user = User.objects.create(**TEST_USER2)
+
+    async def connect(self, user):
+        communicator = WebsocketCommunicator(ChatConsumer.as_asgi(), "/ws/chat/")
+        communicator.scope["user"] = user
+        connected, _ = await communicator.connect(timeout=5)
+        self.assertTrue(connected)
+        return communicator
+
+    async def test_events_maintain_counter(self):
+        communicator = await self.connect(self.other_user)
+        await communicator.send_json_to(
+            {
+                "type": "new_message",
+                "content": {
+                    "chat_type": "direct",
+                    "chat_id": "1_2",
+                    "text": "hello world",
+                    "reply_to": None,
+                    "file_urls": [],
+                },
+            }
+        )
+        response = await communicator.receive_json_from()
+        await communicator.disconnect()
+        self.assertEqual(get_unread_counts(self.user.id)["direct"], {"1_2": 1})
+
+        communicator = await self.connect(self.user)
+        await communicator.send_json_to(
+            {
+                "type": "message_read",
+                "content": {
+                    "chat_type": "direct",
+                    "chat_id": "1_2",
+                    "message_id": response["content"]["message"]["id"],
+                },
+            }
+        )
+        await communicator.receive_json_from()
+        await communicator.disconnect()
+        self.assertEqual(get_unread_counts(self.user.id)["direct"], {})
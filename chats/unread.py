@@ -0,0 +1,264 @@
+from collections import defaultdict
+from itertools import islice
+from typing import Iterable, Union
+
+from django.db import transaction
+from django.db.models import Count, F, Max, Q, Subquery, Value
+from django.db.models.functions import Coalesce, Greatest
+
+from chats.models import (
+    ChatUnreadCounter,
+    DirectChat,
+    DirectChatMessage,
+    ProjectChat,
+    ProjectChatMessage,
+)
+from projects.models import Collaborator
+
+Message = Union[DirectChatMessage, ProjectChatMessage]
+BACKFILL_CHUNK_SIZE = 500
+
+
+def _chat_field(message: Message) -> str:
+    """Name of the counter's chat field for the message model."""
+    if isinstance(message, DirectChatMessage):
+        return "direct_chat_id"
+    return "project_chat_id"
+
+
+def direct_chat_user_ids(chat_id: str) -> set[int]:
+    return set(map(int, chat_id.split("_")))
+
+
+def project_chat_member_ids(project_id: int, leader_id: int) -> set[int]:
+    member_ids = set(
+        Collaborator.objects.filter(project_id=project_id).values_list(
+            "user_id", flat=True
+        )
+    )
+    member_ids.add(leader_id)
+    return member_ids
+
+
+def _ensure_counters(chat_field: str, chat_id, user_ids: Iterable[int]) -> None:
+    ChatUnreadCounter.objects.bulk_create(
+        [
+            ChatUnreadCounter(user_id=user_id, **{chat_field: chat_id})
+            for user_id in user_ids
+        ],
+        ignore_conflicts=True,
+    )
+
+
+def count_new_message(message: Message, member_ids: Iterable[int]) -> None:
+    """
+    Adds the new message to the unread counters of the other chat members.
+
+    Missing counters are created first, so concurrent messages only ever
+    increment existing rows.
+    """
+    recipient_ids = set(member_ids) - {message.author_id}
+    if not recipient_ids:
+        return
+    chat_field = _chat_field(message)
+    _ensure_counters(chat_field, message.chat_id, recipient_ids)
+    ChatUnreadCounter.objects.filter(
+        user_id__in=recipient_ids, **{chat_field: message.chat_id}
+    ).update(unread_count=F("unread_count") + 1)
+
+
+def count_new_direct_message(message: DirectChatMessage) -> None:
+    count_new_message(message, direct_chat_user_ids(message.chat_id))
+
+
+def count_new_project_message(message: ProjectChatMessage, leader_id: int) -> None:
+    # project chat id is the project id
+    count_new_message(message, project_chat_member_ids(message.chat_id, leader_id))
+
+
+def _unread_after(message_model, chat_id, user_id: int, message_id: int) -> Subquery:
+    """Number of visible messages of other users after `message_id`."""
+    unread = (
+        message_model.objects.filter(chat_id=chat_id, id__gt=message_id, is_deleted=False)
+        .exclude(author_id=user_id)
+        .order_by()
+        .values("chat_id")
+        .annotate(total=Count("id"))
+        .values("total")
+    )
+    return Coalesce(Subquery(unread), Value(0))
+
+
+def mark_read_up_to(user_id: int, message: Message) -> None:
+    """
+    Moves the user's read watermark to `message` and recounts the unread tail.
+
+    The watermark never moves back, so repeated or out-of-order read events
+    do not change the counter.
+    """
+    chat_field = _chat_field(message)
+    _ensure_counters(chat_field, message.chat_id, [user_id])
+    ChatUnreadCounter.objects.filter(
+        Q(last_read_message_id__isnull=True) | Q(last_read_message_id__lt=message.id),
+        user_id=user_id,
+        **{chat_field: message.chat_id},
+    ).update(
+        last_read_message_id=message.id,
+        unread_count=_unread_after(type(message), message.chat_id, user_id, message.id),
+    )
+
+
+def read_messages_up_to(
+    user_id: int, message_model, chat_id, *, message_id: int = None, until=None
+) -> tuple[Message | None, int]:
+    """
+    Marks all unread messages of other members up to a boundary as read.
+
+    The boundary is message `message_id` of the chat or, if it is not given,
+    the latest message created not later than `until`. Messages are flipped
+    with one UPDATE and the user's watermark moves to the boundary.
+
+    Returns the boundary message (None if there is none) and the number of
+    flipped messages.
+    """
+    messages = message_model.objects.filter(chat_id=chat_id)
+    if message_id is not None:
+        boundary = messages.filter(pk=message_id).first()
+    else:
+        boundary = (
+            messages.filter(created_at__lte=until).order_by("-created_at", "-id").first()
+        )
+    if boundary is None:
+        return None, 0
+
+    with transaction.atomic():
+        flipped = (
+            messages.filter(id__lte=boundary.id, is_read=False)
+            .exclude(author_id=user_id)
+            .update(is_read=True)
+        )
+        mark_read_up_to(user_id, boundary)
+    return boundary, flipped
+
+
+def discount_deleted_message(message: Message) -> None:
+    """Removes a deleted message from the counters of members who have not read it."""
+    ChatUnreadCounter.objects.filter(
+        Q(last_read_message_id__isnull=True) | Q(last_read_message_id__lt=message.id),
+        unread_count__gt=0,
+        **{_chat_field(message): message.chat_id},
+    ).exclude(user_id=message.author_id).update(
+        unread_count=Greatest(F("unread_count") - 1, Value(0))
+    )
+
+
+def get_unread_counts(user_id: int) -> dict[str, dict]:
+    """Per-chat unread counts of the user, read from the partial index in one query."""
+    counts = {"direct": {}, "project": {}}
+    counters = ChatUnreadCounter.objects.filter(
+        user_id=user_id, unread_count__gt=0
+    ).values_list("direct_chat_id", "project_chat_id", "unread_count")
+    for direct_chat_id, project_chat_id, unread_count in counters:
+        if direct_chat_id is not None:
+            counts["direct"][direct_chat_id] = unread_count
+        else:
+            counts["project"][project_chat_id] = unread_count
+    return counts
+
+
+def forget_project_chat_member(project_id: int, user_id: int) -> None:
+    """Drops counters of a user who left the project."""
+    ChatUnreadCounter.objects.filter(user_id=user_id, project_chat_id=project_id).delete()
+
+
+def _build_counters(
+    message_model, chat_field: str, chat_members: dict
+) -> list[ChatUnreadCounter]:
+    """
+    Counters from the `is_read` flags of the messages in a chunk of chats.
+
+    Unread are visible messages of other users with `is_read=False`; the
+    watermark is the latest read message of other users.
+    """
+    authors = defaultdict(list)
+    stats = (
+        message_model.objects.filter(chat_id__in=list(chat_members))
+        .order_by()
+        .values("chat_id", "author_id")
+        .annotate(
+            unread=Count("id", filter=Q(is_read=False, is_deleted=False)),
+            last_read=Max("id", filter=Q(is_read=True)),
+        )
+    )
+    for row in stats:
+        authors[row["chat_id"]].append(row)
+
+    counters = []
+    for chat_id, rows in authors.items():
+        for user_id in chat_members[chat_id]:
+            others = [row for row in rows if row["author_id"] != user_id]
+            if not others:
+                continue
+            read_ids = [
+                row["last_read"] for row in others if row["last_read"] is not None
+            ]
+            counters.append(
+                ChatUnreadCounter(
+                    user_id=user_id,
+                    unread_count=sum(row["unread"] for row in others),
+                    last_read_message_id=max(read_ids, default=None),
+                    **{chat_field: chat_id},
+                )
+            )
+    return counters
+
+
+def _save_counters(counters: list[ChatUnreadCounter], chat_field: str) -> int:
+    ChatUnreadCounter.objects.bulk_create(
+        counters,
+        update_conflicts=True,
+        unique_fields=["user", chat_field.removesuffix("_id")],
+        update_fields=["unread_count", "last_read_message_id"],
+    )
+    return len(counters)
+
+
+def _iter_chunks(queryset, chunk_size: int):
+    rows = queryset.iterator(chunk_size=chunk_size)
+    while chunk := list(islice(rows, chunk_size)):
+        yield chunk
+
+
+def backfill_unread_counters(chunk_size: int = BACKFILL_CHUNK_SIZE) -> int:
+    """
+    Rebuilds unread counters of all chats from the messages, chunk by chunk.
+
+    Returns the number of written counters. Existing counters are overwritten.
+    """
+    written = 0
+    for chat_ids in _iter_chunks(
+        DirectChat.objects.order_by("id").values_list("id", flat=True), chunk_size
+    ):
+        chat_members = {chat_id: direct_chat_user_ids(chat_id) for chat_id in chat_ids}
+        with transaction.atomic():
+            written += _save_counters(
+                _build_counters(DirectChatMessage, "direct_chat_id", chat_members),
+                "direct_chat_id",
+            )
+
+    for chats in _iter_chunks(
+        ProjectChat.objects.order_by("id").values_list("id", "project__leader_id"),
+        chunk_size,
+    ):
+        chat_members = {chat_id: {leader_id} for chat_id, leader_id in chats}
+        collaborators = Collaborator.objects.filter(
+            project_id__in=list(chat_members)
+        ).values_list("project_id", "user_id")
+        for project_id, user_id in collaborators:
+            chat_members[project_id].add(user_id)
+        with transaction.atomic():
+            written += _save_counters(
+                _build_counters(ProjectChatMessage, "project_chat_id", chat_members),
+                "project_chat_id",
+            )
+    return written
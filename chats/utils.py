@@ -1,16 +1,17 @@
-from typing import Union, Type
+from datetime import timezone as dt_timezone
+from typing import Union
 
+from channels.db import database_sync_to_async
 from django.conf import settings
 from django.contrib.auth import get_user_model
-from django.core.exceptions import ValidationError
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
 
 from chats.exceptions import (
-    NonMatchingReplyChatIdException,
     WrongChatIdException,
     NonMatchingDirectChatIdException,
+    WrongReadBoundaryException,
 )
-from chats.models import DirectChatMessage, ProjectChatMessage, FileToMessage
-from files.models import UserFile
 
 User = get_user_model()
 
@@ -47,6 +48,13 @@ async def orm_set(manager, values):
     await manager.aset(values)
 
 
+async def orm_call(func, *args, **kwargs):
+    """Runs a synchronous function doing several queries as one unit."""
+    if settings.RUNNING_TESTS:
+        return func(*args, **kwargs)
+    return await database_sync_to_async(func)(*args, **kwargs)
+
+
 def clean_message_text(text: str) -> str:
     """
     Cleans message text. -
@@ -63,51 +71,13 @@ def validate_message_text(text: str) -> bool:
     return 0 < len(text) <= 8192
 
 
-def get_user_channel_cache_key(user: User) -> str:
-    return f"user_channel_{user.pk}"
-
-
-async def create_message(
-    chat_id: Union[str, int],
-    chat_model: Union[Type[DirectChatMessage], Type[ProjectChatMessage]],
-    author: User,
-    text: str,
-    reply_to: int = None,
-) -> Union[DirectChatMessage, ProjectChatMessage]:
-    """
-    Creates message.
-
-    Args:
-        chat_id: An integer representing chat id.
-        chat_model: A chat model.
-        author: A user instance.
-        text: A string representing message text.
-        reply_to: An integer representing message id to reply to.
-
-    Returns:
-        A message instance.
-
-    Raises:
-        NonMatchingReplyChatIdException: If reply_to message is not in chat.
-    """
-
-    try:
-        return await orm_create(
-            chat_model.objects,
-            chat_id=chat_id,
-            author=author,
-            text=text,
-            reply_to=reply_to,
-        )
-    except ValidationError:
-        raise NonMatchingReplyChatIdException(
-            f"Message {reply_to} is not in chat {chat_id}"
-        )
+def get_user_channel_cache_key(user: Union[User, int]) -> str:
+    user_id = getattr(user, "pk", user)
+    return f"user_channel_{user_id}"
 
 
-async def get_chat_and_user_ids_from_content(content, current_user) -> tuple[str, User]:
-    chat_id = content["chat_id"]
-
+def get_other_user_id(chat_id: str, current_user) -> int:
+    """Id of the other member of direct chat `chat_id`, without queries."""
     # check if chat_id is in the format of <user1_id>_<user2_id>
     try:
         user1_id, user2_id = map(int, chat_id.split("_"))
@@ -117,39 +87,46 @@ async def get_chat_and_user_ids_from_content(content, current_user) -> tuple[str
             f" <user1_id>_<user2_id>, where user1_id < user2_id"
         )
 
-    # check if user is a member of this chat and get other user
-    if user1_id == current_user.id or user2_id == current_user.id:
-        other_user = await orm_get(
-            User.objects,
-            id=user1_id if user1_id != current_user.id else user2_id
-        )
-    else:
+    # check if user is a member of this chat
+    if current_user.id not in (user1_id, user2_id):
         raise NonMatchingDirectChatIdException(
             f"User {current_user.id} is not a member of chat {chat_id}"
         )
+    return user1_id if user1_id != current_user.id else user2_id
+
+
+async def get_chat_and_user_ids_from_content(content, current_user) -> tuple[str, User]:
+    chat_id = content["chat_id"]
+    other_user = await orm_get(User.objects, id=get_other_user_id(chat_id, current_user))
     return chat_id, other_user
 
 
-async def create_file_to_message(
-    direct_message: Union[str, None, DirectChatMessage],
-    project_message: Union[str, None, ProjectChatMessage],
-    file: str,
-) -> FileToMessage:
-    return await orm_create(
-        FileToMessage.objects,
-        direct_message=direct_message, project_message=project_message, file=file
-    )
-
-
-async def match_files_and_messages(file_urls, messages):
-    for url in file_urls:
-        file = await orm_get(UserFile.objects, pk=url)
-        # implicitly matches a file and a message
-        await create_file_to_message(
-            direct_message=messages["direct_message"],
-            project_message=messages["project_message"],
-            file=file,
+def get_read_boundary_from_content(content) -> dict:
+    """
+    Boundary of a `read_up_to` event: `message_id` or ISO `timestamp`.
+
+    Returns keyword arguments for `chats.unread.read_messages_up_to`.
+    """
+    if content.get("message_id") is not None:
+        try:
+            return {"message_id": int(content["message_id"])}
+        except (TypeError, ValueError):
+            raise WrongReadBoundaryException(
+                f'Message id "{content["message_id"]}" is not an integer'
+            )
+
+    timestamp = content.get("timestamp")
+    try:
+        until = parse_datetime(timestamp) if isinstance(timestamp, str) else None
+    except ValueError:
+        until = None
+    if until is None:
+        raise WrongReadBoundaryException(
+            "read_up_to needs message_id or timestamp in ISO 8601 format"
         )
+    if timezone.is_naive(until):
+        until = timezone.make_aware(until, dt_timezone.utc)
+    return {"until": until}
 
 
 def get_all_files(messages):
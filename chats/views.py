@@ -13,8 +13,9 @@ from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 
 from chats.models import ProjectChat, DirectChat
-from chats.pagination import MessageListPagination
+from chats.pagination import ChatListPagination, MessageListPagination
 from chats.permissions import IsProjectChatMember, IsChatMember
+from chats.selectors import direct_chat_inbox, project_chat_inbox
 from chats.serializers import (
     DirectChatListSerializer,
     DirectChatMessageListSerializer,
@@ -23,6 +24,7 @@ from chats.serializers import (
     ProjectChatDetailSerializer,
     DirectChatDetailSerializer,
 )
+from chats.unread import get_unread_counts
 from chats.utils import get_all_files
 from files.models import UserFile
 from files.serializers import UserFileSerializer
@@ -33,39 +35,48 @@ User = get_user_model()
 class DirectChatList(ListAPIView):
     serializer_class = DirectChatListSerializer
     permission_classes = [IsAuthenticated]
+    pagination_class = ChatListPagination
 
     def get_queryset(self):
-        return DirectChat.objects.prefetch_related("users").filter(
-            users=self.request.user
-        )
+        return direct_chat_inbox(self.request.user)
 
-    def get(self, request, *args, **kwargs):
-        chats = self.get_queryset()
-        serialized_chats = []
+    def attach_opponents(self, chats) -> list[DirectChat]:
+        """
+        Sets `chat.opponent` from the chat ids with one users query.
+
+        Chats with yourself and chats whose opponent was deleted are skipped.
+        """
+        opponent_ids = {}
         for chat in chats:
-            try:
-                user1_id, _ = map(int, chat.id.split("_"))
-                # TODO сделать проверку на удаление профиля
-                if user1_id == request.user.id:
-                    opponent = chat.users.all()[1]
-                else:
-                    opponent = chat.users.first()
-
-                context = {"opponent": opponent}
-                serialized_chat = DirectChatListSerializer(chat, context=context).data
-                serialized_chats.append(serialized_chat)
-            except IndexError:
-                pass
-        return Response(serialized_chats, status=status.HTTP_200_OK)
+            user_ids = set(map(int, chat.id.split("_"))) - {self.request.user.id}
+            if len(user_ids) == 1:
+                opponent_ids[chat.id] = user_ids.pop()
+
+        opponents = User.objects.in_bulk(set(opponent_ids.values()))
+        chats_with_opponents = []
+        for chat in chats:
+            chat.opponent = opponents.get(opponent_ids.get(chat.id))
+            if chat.opponent is not None:
+                chats_with_opponents.append(chat)
+        return chats_with_opponents
+
+    def get(self, request, *args, **kwargs):
+        queryset = self.get_queryset()
+        page = self.paginate_queryset(queryset)
+        chats = self.attach_opponents(page if page is not None else queryset)
+        serializer = self.get_serializer(chats, many=True)
+        if page is not None:
+            return self.get_paginated_response(serializer.data)
+        return Response(serializer.data, status=status.HTTP_200_OK)
 
 
 class ProjectChatList(ListAPIView):
     serializer_class = ProjectChatListSerializer
     permission_classes = [IsAuthenticated]
+    pagination_class = ChatListPagination
 
     def get_queryset(self):
-        user = self.request.user
-        return user.get_project_chats()
+        return project_chat_inbox(self.request.user)
 
 
 class ProjectChatDetail(RetrieveAPIView):
@@ -139,7 +150,8 @@ class DirectChatMessageList(ListCreateAPIView):
         return (
             self.request.user.direct_chats.get(id=self.kwargs["id"])
             .messages.filter(is_deleted=False)
-            .order_by("-created_at")
+            .select_related("author", "reply_to__author")
+            .order_by("-created_at", "-id")
             .all()
         )
 
@@ -154,7 +166,8 @@ class ProjectChatMessageList(ListCreateAPIView):
             return (
                 ProjectChat.objects.get(id=self.kwargs["id"])
                 .messages.filter(is_deleted=False)
-                .order_by("-created_at")
+                .select_related("author", "reply_to__author")
+                .order_by("-created_at", "-id")
                 .all()
             )
         except ProjectChat.DoesNotExist:
@@ -192,7 +205,7 @@ class ProjectChatFileList(ListCreateAPIView):
 
 
 class HasChatUnreadsView(GenericAPIView):
-    """Returns True if user has unread messages"""
+    """Returns True if user has unread messages and unread counts per chat"""
 
     permission_classes = [IsAuthenticated]
 
@@ -206,30 +219,25 @@ class HasChatUnreadsView(GenericAPIView):
                         "has_unreads": openapi.Schema(
                             type=openapi.TYPE_BOOLEAN,
                             description="True if user has unread messages",
-                        )
+                        ),
+                        "unread_counts": openapi.Schema(
+                            type=openapi.TYPE_OBJECT,
+                            description=(
+                                "Unread messages per chat id, only chats with unreads: "
+                                '{"direct": {"1_2": 3}, "project": {"5": 1}}'
+                            ),
+                        ),
                     },
                 ),
             )
         }
     )
     def get(self, request, *args, **kwargs):
-        user = request.user
-        # get all user chats
-        direct_messages = user.direct_chats.all().prefetch_related("messages")
-        project_chats = user.get_project_chats().prefetch_related("messages")
-
-        has_direct_messages_unread = (
-            direct_messages.filter(messages__is_read=False)
-            .exclude(messages__is_deleted=True)
-            .distinct()
-            .exists()
-        )
-        has_project_messages_unread = (
-            project_chats.filter(messages__is_read=False)
-            .exclude(messages__is_deleted=True)
-            .distinct()
-            .exists()
-        )
+        # counters are maintained by the chat websocket events (chats.unread)
+        unread_counts = get_unread_counts(request.user.id)
         return Response(
-            {"has_unreads": has_direct_messages_unread or has_project_messages_unread}
+            {
+                "has_unreads": bool(unread_counts["direct"] or unread_counts["project"]),
+                "unread_counts": unread_counts,
+            }
         )
@@ -12,6 +12,7 @@ class EventType(str, Enum):
     NEW_MESSAGE = "new_message"
     DELETE_MESSAGE = "delete_message"
     READ_MESSAGE = "message_read"
+    READ_UP_TO = "read_up_to"
     TYPING = "user_typing"
     EDIT_MESSAGE = "edit_message"
 
@@ -5,6 +5,8 @@ from django.contrib.auth import get_user_model
 from django.utils.translation import gettext_lazy as _
 from rest_framework.exceptions import AuthenticationFailed
 
+from users.auth_cache import get_auth_user
+
 User = get_user_model()
 
 
@@ -64,7 +66,9 @@ class TokenAuthentication:
         except jwt.exceptions.ExpiredSignatureError:
             raise AuthenticationFailed(_("Token expired."))
 
-        user = User.objects.get(pk=user_id)
+        user = get_auth_user(user_id)
+        if user is None:
+            raise AuthenticationFailed(_("User not found."))
         return user
 
 
@@ -0,0 +1,33 @@
+import statistics
+from dataclasses import dataclass
+
+
+@dataclass(frozen=True)
+class LatencySummary:
+    """Сводка по замерам длительности в миллисекундах."""
+
+    count: int
+    mean_ms: float
+    p50_ms: float
+    p95_ms: float
+    max_ms: float
+
+    @classmethod
+    def from_seconds(cls, samples: list[float]) -> "LatencySummary":
+        if not samples:
+            return cls(count=0, mean_ms=0.0, p50_ms=0.0, p95_ms=0.0, max_ms=0.0)
+        ordered = sorted(sample * 1000 for sample in samples)
+        p95_index = max(0, round(len(ordered) * 0.95) - 1)
+        return cls(
+            count=len(ordered),
+            mean_ms=statistics.fmean(ordered),
+            p50_ms=statistics.median(ordered),
+            p95_ms=ordered[p95_index],
+            max_ms=ordered[-1],
+        )
+
+    def format(self, label: str) -> str:
+        return (
+            f"{label}: n={self.count} mean={self.mean_ms:.2f}ms "
+            f"p50={self.p50_ms:.2f}ms p95={self.p95_ms:.2f}ms max={self.max_ms:.2f}ms"
+        )
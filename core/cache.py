@@ -0,0 +1,40 @@
+import logging
+
+from django.core.cache import cache
+from django.db import transaction
+
+logger = logging.getLogger(__name__)
+
+
+class VersionedCacheKey:
+    """
+    Keys of per-object cache entries, like "users:auth:v1:42".
+
+    Bump `version` together with the shape of the cached value, so entries
+    written by the previous code are not read.
+    """
+
+    def __init__(self, prefix: str, version: int) -> None:
+        self.prefix = prefix
+        self.version = version
+
+    def __call__(self, object_id) -> str:
+        return f"{self.prefix}:v{self.version}:{object_id}"
+
+
+def delete_now_and_on_commit(key: str) -> None:
+    """
+    Drops the cache entry now and once more after the current transaction commits.
+
+    The second delete removes an entry that a concurrent reader filled with the
+    old row before the commit. Cache errors are only logged.
+    """
+
+    def delete():
+        try:
+            cache.delete(key)
+        except Exception:
+            logger.warning("Failed to invalidate cache key %s", key, exc_info=True)
+
+    delete()
+    transaction.on_commit(delete)
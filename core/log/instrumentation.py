@@ -0,0 +1,178 @@
+import json
+import random
+import time
+from contextlib import ExitStack
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import connections
+from loguru import logger
+
+DEFAULT_SLOW_REQUEST_MS = 1000
+DEFAULT_MAX_CAPTURED_QUERIES = 50
+MAX_CAPTURED_SQL_LENGTH = 2000
+CACHE_READ_METHODS = ("get", "get_many")
+CACHE_WRITE_METHODS = ("set", "add", "delete", "set_many", "delete_many", "incr", "touch")
+
+_current_metrics: ContextVar["RequestMetrics | None"] = ContextVar(
+    "request_metrics", default=None
+)
+_MISSING = object()
+
+
+@dataclass
+class RequestMetrics:
+    """Counters collected while one HTTP request is handled."""
+
+    capture_sql: int = DEFAULT_MAX_CAPTURED_QUERIES
+    db_queries: int = 0
+    db_time: float = 0.0
+    cache_hits: int = 0
+    cache_misses: int = 0
+    cache_writes: int = 0
+    queries: list[dict] = field(default_factory=list)
+    # depth of nested cache calls, e.g. BaseCache.get_many() calling get()
+    cache_depth: int = 0
+
+    def record_query(self, sql: str, duration: float) -> None:
+        self.db_queries += 1
+        self.db_time += duration
+        if len(self.queries) < self.capture_sql:
+            self.queries.append(
+                {
+                    "sql": sql[:MAX_CAPTURED_SQL_LENGTH],
+                    "duration_ms": round(duration * 1000, 2),
+                }
+            )
+
+    def db_wrapper(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.record_query(sql, time.perf_counter() - started)
+
+
+def is_enabled() -> bool:
+    return bool(getattr(settings, "REQUEST_METRICS_ENABLED", False))
+
+
+def _instrument_cache_method(method, name: str):
+    @wraps(method)
+    def wrapper(self, *args, **kwargs):
+        metrics = _current_metrics.get()
+        if metrics is None or metrics.cache_depth:
+            return method(self, *args, **kwargs)
+
+        metrics.cache_depth += 1
+        try:
+            if name == "get":
+                key, *rest = args
+                default = rest[0] if rest else kwargs.pop("default", None)
+                value = method(self, key, _MISSING, *rest[1:], **kwargs)
+                if value is _MISSING:
+                    metrics.cache_misses += 1
+                    return default
+                metrics.cache_hits += 1
+                return value
+            if name == "get_many":
+                keys = list(args[0])
+                values = method(self, keys, *args[1:], **kwargs)
+                metrics.cache_hits += len(values)
+                metrics.cache_misses += len(keys) - len(values)
+                return values
+            metrics.cache_writes += 1
+            return method(self, *args, **kwargs)
+        finally:
+            metrics.cache_depth -= 1
+
+    wrapper._request_metrics_instrumented = True
+    return wrapper
+
+
+def instrument_caches() -> None:
+    """
+    Wraps read/write methods of the configured cache backend classes.
+
+    Django has no hooks for cache calls, so the methods are wrapped once per
+    class. Outside a measured request a wrapper only reads a context variable.
+    """
+    for alias in settings.CACHES:
+        backend_class = type(caches[alias])
+        for name in CACHE_READ_METHODS + CACHE_WRITE_METHODS:
+            method = getattr(backend_class, name)
+            if getattr(method, "_request_metrics_instrumented", False):
+                continue
+            setattr(backend_class, name, _instrument_cache_method(method, name))
+
+
+def _view_name(request) -> str | None:
+    match = getattr(request, "resolver_match", None)
+    if match is None:
+        return None
+    return match.view_name or match._func_path
+
+
+def _response_size(response) -> int | None:
+    if getattr(response, "streaming", False):
+        return None
+    return len(response.content)
+
+
+def measure_request(request, get_response):
+    """
+    Handles the request collecting wall time, SQL and cache counters.
+
+    Every request slower than REQUEST_METRICS_SLOW_MS is logged at WARNING
+    with its captured SQL; other requests are logged at INFO with probability
+    REQUEST_METRICS_SAMPLE_RATE. Metrics go to loguru as one JSON line.
+    """
+    slow_ms = getattr(settings, "REQUEST_METRICS_SLOW_MS", DEFAULT_SLOW_REQUEST_MS)
+    metrics = RequestMetrics(
+        capture_sql=getattr(
+            settings, "REQUEST_METRICS_MAX_QUERIES", DEFAULT_MAX_CAPTURED_QUERIES
+        )
+    )
+    token = _current_metrics.set(metrics)
+    started = time.perf_counter()
+    try:
+        with ExitStack() as stack:
+            for alias in connections:
+                stack.enter_context(
+                    connections[alias].execute_wrapper(metrics.db_wrapper)
+                )
+            response = get_response(request)
+    finally:
+        _current_metrics.reset(token)
+
+    duration_ms = (time.perf_counter() - started) * 1000
+    slow = duration_ms >= slow_ms
+    sample_rate = getattr(settings, "REQUEST_METRICS_SAMPLE_RATE", 0.0)
+    if not slow and random.random() >= sample_rate:
+        return response
+
+    payload = {
+        "view": _view_name(request),
+        "method": request.method,
+        "path": request.path,
+        "status": response.status_code,
+        "duration_ms": round(duration_ms, 2),
+        "db_queries": metrics.db_queries,
+        "db_time_ms": round(metrics.db_time * 1000, 2),
+        "cache_hits": metrics.cache_hits,
+        "cache_misses": metrics.cache_misses,
+        "cache_writes": metrics.cache_writes,
+        "response_bytes": _response_size(response),
+        "slow": slow,
+    }
+    if slow:
+        payload["queries"] = metrics.queries
+    logger.bind(request_metrics=payload).log(
+        "WARNING" if slow else "INFO",
+        "request_metrics {}",
+        json.dumps(payload, ensure_ascii=False, default=str),
+    )
+    return response
@@ -4,6 +4,7 @@ import logging
 from django.conf import settings
 from loguru import logger
 
+from core.log.instrumentation import instrument_caches, is_enabled, measure_request
 from core.log.utils import InterceptHandler
 
 
@@ -30,8 +31,14 @@ class CustomLoguruMiddleware:
         _add_logger_handler(f"{settings.BASE_DIR}/log/info.log", "INFO")
         _add_logger_handler(f"{settings.BASE_DIR}/log/warning.log", "WARNING")
 
+        if is_enabled():
+            instrument_caches()
+
     def __call__(self, request):
-        response = self.get_response(request)
+        if is_enabled():
+            response = measure_request(request, self.get_response)
+        else:
+            response = self.get_response(request)
         logger.info(f"{request.method} {request.get_full_path()}")
         return response
 
@@ -0,0 +1,20 @@
+# Generated by Django 4.2.11 on 2026-10-18 05:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0015_alter_skill_options_alter_skilltoobject_options"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="skilltoobject",
+            index=models.Index(
+                fields=["content_type", "skill", "object_id"],
+                name="skill_to_object_lookup_idx",
+            ),
+        ),
+    ]
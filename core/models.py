@@ -164,6 +164,13 @@ class SkillToObject(models.Model):
     class Meta(TypedModelMeta):
         verbose_name = "Ссылка на навык"
         verbose_name_plural = "Ссылки на навыки"
+        indexes = [
+            # skill -> objects lookup for recommendations
+            models.Index(
+                fields=["content_type", "skill", "object_id"],
+                name="skill_to_object_lookup_idx",
+            ),
+        ]
 
     def __str__(self):
         try:
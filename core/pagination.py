@@ -1,7 +1,176 @@
+import base64
+import binascii
+import json
+from collections import OrderedDict
+
+from django.core.exceptions import ValidationError
+from django.db.models import Q, QuerySet
 from rest_framework import pagination
+from rest_framework.exceptions import NotFound
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
 
 
 class Pagination(pagination.LimitOffsetPagination):
     default_limit = 10
     limit_query_param = "limit"
     offset_query_param = "offset"
+
+
+class KeysetPagination(pagination.BasePagination):
+    """
+    Keyset-пагинация по уникальному кортежу полей сортировки.
+
+    Курсор - непрозрачная base64-строка с ключом крайнего элемента страницы,
+    следующая страница строится условием `(a, b) < (a0, b0)` вместо OFFSET.
+    Поэтому нет `COUNT(*)`, глубина прокрутки не влияет на стоимость запроса,
+    а новые элементы в начале списка не сдвигают уже загруженные страницы.
+
+    `ordering` должен заканчиваться уникальным полем (обычно `-id`), все поля
+    сортируются в одном направлении.
+
+    Прежний limit/offset контракт отдается `legacy_pagination_class`, если в
+    запросе есть `?pagination=offset` или параметр `offset`.
+    """
+
+    ordering: tuple[str, ...] = ("-id",)
+    default_limit = 10
+    max_limit = 100
+    limit_query_param = "limit"
+    cursor_query_param = "cursor"
+    mode_query_param = "pagination"
+    legacy_mode = "offset"
+    legacy_pagination_class: type[pagination.BasePagination] = Pagination
+    invalid_cursor_message = "Invalid cursor"
+
+    def __init__(self):
+        self.legacy_paginator = None
+
+    def use_legacy(self, request) -> bool:
+        legacy_paginator_class = self.legacy_pagination_class
+        offset_query_param = getattr(legacy_paginator_class, "offset_query_param", None)
+        return request.query_params.get(self.mode_query_param) == self.legacy_mode or (
+            offset_query_param is not None and offset_query_param in request.query_params
+        )
+
+    def paginate_queryset(self, queryset: QuerySet, request, view=None):
+        if self.use_legacy(request):
+            self.legacy_paginator = self.legacy_pagination_class()
+            return self.legacy_paginator.paginate_queryset(queryset, request, view)
+
+        self.request = request
+        self.base_url = remove_query_param(
+            request.build_absolute_uri(), self.mode_query_param
+        )
+        self.limit = self.get_limit(request)
+        key, reverse = self.decode_cursor(request, queryset)
+
+        ordering = self.ordering
+        if reverse:
+            ordering = tuple(_invert(field) for field in ordering)
+        queryset = queryset.order_by(*ordering)
+        if key is not None:
+            queryset = queryset.filter(self._after(ordering, key))
+
+        page = list(queryset[: self.limit + 1])
+        has_more = len(page) > self.limit
+        page = page[: self.limit]
+        if reverse:
+            page.reverse()
+
+        self.page = page
+        self.has_next = has_more if not reverse else key is not None
+        self.has_previous = key is not None if not reverse else has_more
+        return page
+
+    def get_paginated_response(self, data):
+        if self.legacy_paginator is not None:
+            return self.legacy_paginator.get_paginated_response(data)
+        return Response(
+            OrderedDict(
+                [
+                    ("next", self.get_next_link()),
+                    ("previous", self.get_previous_link()),
+                    ("results", data),
+                ]
+            )
+        )
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            "type": "object",
+            "properties": {
+                "next": {"type": "string", "nullable": True, "format": "uri"},
+                "previous": {"type": "string", "nullable": True, "format": "uri"},
+                "results": schema,
+            },
+        }
+
+    def get_limit(self, request) -> int:
+        try:
+            limit = int(request.query_params[self.limit_query_param])
+        except (KeyError, ValueError):
+            return self.default_limit
+        if limit <= 0:
+            return self.default_limit
+        return min(limit, self.max_limit)
+
+    def get_next_link(self) -> str | None:
+        if not self.has_next or not self.page:
+            return None
+        return self.encode_cursor(self.page[-1], reverse=False)
+
+    def get_previous_link(self) -> str | None:
+        if not self.has_previous or not self.page:
+            return None
+        return self.encode_cursor(self.page[0], reverse=True)
+
+    def encode_cursor(self, item, *, reverse: bool) -> str:
+        key = [
+            self._field(item._meta, field).value_to_string(item)
+            for field in self._field_names()
+        ]
+        payload = json.dumps({"k": key, "r": reverse}, separators=(",", ":"))
+        cursor = base64.urlsafe_b64encode(payload.encode()).decode()
+        return replace_query_param(self.base_url, self.cursor_query_param, cursor)
+
+    def decode_cursor(self, request, queryset: QuerySet) -> tuple[list | None, bool]:
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None, False
+        try:
+            payload = json.loads(base64.urlsafe_b64decode(encoded.encode()))
+            raw_key, reverse = payload["k"], bool(payload["r"])
+            field_names = self._field_names()
+            if len(raw_key) != len(field_names):
+                raise ValueError
+            key = [
+                self._field(queryset.model._meta, name).to_python(value)
+                for name, value in zip(field_names, raw_key)
+            ]
+        except (binascii.Error, ValueError, TypeError, KeyError, ValidationError):
+            raise NotFound(self.invalid_cursor_message)
+        return key, reverse
+
+    def _field_names(self) -> list[str]:
+        return [field.lstrip("-") for field in self.ordering]
+
+    @staticmethod
+    def _field(opts, name: str):
+        return opts.pk if name == "pk" else opts.get_field(name)
+
+    @staticmethod
+    def _after(ordering: tuple[str, ...], key: list) -> Q:
+        """Условие "строго после ключа" для лексикографического порядка."""
+        condition = Q()
+        equal = Q()
+        for field, value in zip(ordering, key):
+            name = field.lstrip("-")
+            lookup = "lt" if field.startswith("-") else "gt"
+            condition |= equal & Q(**{f"{name}__{lookup}": value})
+            equal &= Q(**{name: value})
+        return condition
+
+
+def _invert(field: str) -> str:
+    return field[1:] if field.startswith("-") else f"-{field}"
@@ -0,0 +1,205 @@
+import threading
+import time
+from functools import lru_cache
+from typing import Iterable
+
+from django.conf import settings
+from django.utils.module_loading import import_string
+
+DEFAULT_PRESENCE_TTL_SECONDS = 90
+
+
+class BasePresenceStore:
+    """
+    Online-присутствие пользователей на уровне отдельных websocket-соединений.
+
+    Пользователь онлайн, пока у него есть хотя бы одно соединение, heartbeat
+    которого моложе `ttl` секунд. Соединения, чей воркер умер без `disconnect`,
+    сами выпадают из выборки по истечении `ttl`.
+    """
+
+    def __init__(self, ttl: int = DEFAULT_PRESENCE_TTL_SECONDS, **kwargs):
+        self.ttl = ttl
+
+    def touch(self, user_id: int, connection_id: str) -> None:
+        """Регистрирует соединение или продлевает его heartbeat."""
+        raise NotImplementedError
+
+    def disconnect(self, user_id: int, connection_id: str) -> bool:
+        """Удаляет соединение; возвращает True, если пользователь ушел офлайн."""
+        raise NotImplementedError
+
+    def remove_user(self, user_id: int) -> None:
+        """Снимает онлайн со всех соединений пользователя."""
+        raise NotImplementedError
+
+    def is_online(self, user_id: int) -> bool:
+        return user_id in self.online_many([user_id])
+
+    def online_many(self, user_ids: Iterable[int]) -> set[int]:
+        """Возвращает подмножество `user_ids`, которые сейчас онлайн."""
+        raise NotImplementedError
+
+    def count(self) -> int:
+        """Количество пользователей онлайн."""
+        raise NotImplementedError
+
+    def clear(self) -> None:
+        raise NotImplementedError
+
+
+class InMemoryPresenceStore(BasePresenceStore):
+    """Хранилище в памяти процесса: для тестов и локального DEBUG."""
+
+    def __init__(self, ttl: int = DEFAULT_PRESENCE_TTL_SECONDS, **kwargs):
+        super().__init__(ttl=ttl, **kwargs)
+        self._lock = threading.Lock()
+        self._connections: dict[int, dict[str, float]] = {}
+
+    def _alive(self, user_id: int, now: float) -> dict[str, float]:
+        connections = self._connections.get(user_id, {})
+        alive = {key: expires for key, expires in connections.items() if expires > now}
+        if alive:
+            self._connections[user_id] = alive
+        else:
+            self._connections.pop(user_id, None)
+        return alive
+
+    def touch(self, user_id: int, connection_id: str) -> None:
+        with self._lock:
+            now = time.time()
+            self._alive(user_id, now)
+            self._connections.setdefault(user_id, {})[connection_id] = now + self.ttl
+
+    def disconnect(self, user_id: int, connection_id: str) -> bool:
+        with self._lock:
+            self._connections.get(user_id, {}).pop(connection_id, None)
+            return not self._alive(user_id, time.time())
+
+    def remove_user(self, user_id: int) -> None:
+        with self._lock:
+            self._connections.pop(user_id, None)
+
+    def online_many(self, user_ids: Iterable[int]) -> set[int]:
+        with self._lock:
+            now = time.time()
+            return {user_id for user_id in set(user_ids) if self._alive(user_id, now)}
+
+    def count(self) -> int:
+        with self._lock:
+            now = time.time()
+            return sum(
+                1 for user_id in list(self._connections) if self._alive(user_id, now)
+            )
+
+    def clear(self) -> None:
+        with self._lock:
+            self._connections.clear()
+
+
+# Удаляет соединение, чистит протухшие и пересчитывает срок жизни пользователя
+# по самому свежему из оставшихся соединений. Возвращает 1, если соединений
+# не осталось и пользователь ушел офлайн.
+REDIS_DISCONNECT_SCRIPT = """
+redis.call('ZREM', KEYS[2], ARGV[2])
+redis.call('ZREMRANGEBYSCORE', KEYS[2], '-inf', ARGV[3])
+local newest = redis.call('ZRANGE', KEYS[2], -1, -1, 'WITHSCORES')
+if #newest == 0 then
+    redis.call('DEL', KEYS[2])
+    redis.call('ZREM', KEYS[1], ARGV[1])
+    return 1
+end
+redis.call('ZADD', KEYS[1], newest[2], ARGV[1])
+return 0
+"""
+
+
+class RedisPresenceStore(BasePresenceStore):
+    """
+    Хранилище на sorted sets в Redis.
+
+    `<prefix>:users` - пользователь -> срок жизни его самого свежего соединения,
+    `<prefix>:connections:<user_id>` - соединение -> срок жизни его heartbeat.
+    Проверка онлайна и подсчет читают только `<prefix>:users`.
+    """
+
+    def __init__(
+        self,
+        url: str = "redis://localhost:6379/0",
+        prefix: str = "presence",
+        ttl: int = DEFAULT_PRESENCE_TTL_SECONDS,
+        **kwargs,
+    ):
+        # импорт здесь, чтобы DEBUG/тесты на InMemoryPresenceStore не требовали redis
+        import redis
+
+        super().__init__(ttl=ttl, **kwargs)
+        self.prefix = prefix
+        self.client = redis.Redis.from_url(url)
+        self._disconnect_script = self.client.register_script(REDIS_DISCONNECT_SCRIPT)
+
+    @property
+    def users_key(self) -> str:
+        return f"{self.prefix}:users"
+
+    def connections_key(self, user_id: int) -> str:
+        return f"{self.prefix}:connections:{user_id}"
+
+    def touch(self, user_id: int, connection_id: str) -> None:
+        now = time.time()
+        expires_at = now + self.ttl
+        connections_key = self.connections_key(user_id)
+        pipe = self.client.pipeline()
+        pipe.zadd(connections_key, {connection_id: expires_at})
+        pipe.zremrangebyscore(connections_key, "-inf", now)
+        pipe.expire(connections_key, self.ttl)
+        pipe.zadd(self.users_key, {user_id: expires_at})
+        pipe.execute()
+
+    def disconnect(self, user_id: int, connection_id: str) -> bool:
+        went_offline = self._disconnect_script(
+            keys=[self.users_key, self.connections_key(user_id)],
+            args=[user_id, connection_id, time.time()],
+        )
+        return bool(went_offline)
+
+    def remove_user(self, user_id: int) -> None:
+        pipe = self.client.pipeline()
+        pipe.delete(self.connections_key(user_id))
+        pipe.zrem(self.users_key, user_id)
+        pipe.execute()
+
+    def online_many(self, user_ids: Iterable[int]) -> set[int]:
+        user_ids = list(set(user_ids))
+        if not user_ids:
+            return set()
+        now = time.time()
+        scores = self.client.zmscore(self.users_key, user_ids)
+        return {
+            user_id
+            for user_id, expires_at in zip(user_ids, scores)
+            if expires_at is not None and expires_at > now
+        }
+
+    def count(self) -> int:
+        pipe = self.client.pipeline()
+        pipe.zremrangebyscore(self.users_key, "-inf", time.time())
+        pipe.zcard(self.users_key)
+        _, online_count = pipe.execute()
+        return online_count
+
+    def clear(self) -> None:
+        keys = list(self.client.scan_iter(match=f"{self.prefix}:*"))
+        if keys:
+            self.client.delete(*keys)
+
+
+@lru_cache(maxsize=None)
+def get_presence_store() -> BasePresenceStore:
+    config = getattr(
+        settings,
+        "PRESENCE_STORE",
+        {"BACKEND": "core.presence.InMemoryPresenceStore"},
+    )
+    store_class = import_string(config["BACKEND"])
+    return store_class(**config.get("OPTIONS", {}))
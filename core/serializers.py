@@ -1,6 +1,12 @@
+from typing import Iterable
+
+from django.db import models
 from rest_framework import serializers
 
 from .models import SkillToObject, SkillCategory, Skill
+from .presence import get_presence_store
+
+ONLINE_STATUSES_CONTEXT_KEY = "online_statuses"
 
 
 class EmptySerializer(serializers.Serializer):
@@ -48,3 +54,57 @@ class SkillsSerializer(serializers.ModelSerializer[SkillCategory]):
     class Meta:
         model = SkillCategory
         fields = ["id", "name", "skills"]
+
+
+def prefetch_online_statuses(context: dict, users: Iterable) -> dict[int, bool]:
+    """
+    Resolves online flags of `users` with one presence lookup and stores them
+    in serializer context, so every nested `is_online` reads from memory.
+    """
+    statuses = context.setdefault(ONLINE_STATUSES_CONTEXT_KEY, {})
+    user_ids = {user.pk for user in users if user is not None} - statuses.keys()
+    if user_ids:
+        online_user_ids = get_presence_store().online_many(user_ids)
+        statuses.update({user_id: user_id in online_user_ids for user_id in user_ids})
+    return statuses
+
+
+def get_online_status(context: dict, user_id: int) -> bool:
+    statuses = context.get(ONLINE_STATUSES_CONTEXT_KEY)
+    if statuses is not None and user_id in statuses:
+        return statuses[user_id]
+    return get_presence_store().is_online(user_id)
+
+
+class OnlineStatusListSerializer(serializers.ListSerializer):
+    """
+    Prefetches online flags for every user on the page before serializing it.
+
+    The child serializer tells which users an item carries through
+    `get_online_status_users(instance)`.
+    """
+
+    def to_representation(self, data):
+        iterable = data.all() if isinstance(data, models.manager.BaseManager) else data
+        items = list(iterable)
+        prefetch_online_statuses(
+            self.context,
+            (user for item in items for user in self.child.get_online_status_users(item)),
+        )
+        return super().to_representation(items)
+
+
+class OnlineStatusMixin:
+    """
+    `is_online` for user serializers: the current user is always online, others
+    are read from prefetched context or, for a single object, from presence store.
+    """
+
+    def get_online_status_users(self, user) -> list:
+        return [user]
+
+    def get_is_online(self, user) -> bool:
+        request = self.context.get("request")
+        if request and request.user.is_authenticated and request.user.id == user.id:
+            return True
+        return get_online_status(self.context, user.id)
@@ -0,0 +1,29 @@
+from unittest.mock import patch
+
+from django.core.cache import cache
+from django.test import TestCase
+
+from core.cache import VersionedCacheKey, delete_now_and_on_commit
+
+
+class VersionedCacheKeyTests(TestCase):
+    def test_key_contains_prefix_version_and_id(self):
+        self.assertEqual(
+            VersionedCacheKey("users:auth", version=2)(42), "users:auth:v2:42"
+        )
+
+    def test_entry_is_deleted_now_and_after_commit(self):
+        cache.set("core:test:v1:1", "old")
+
+        with self.captureOnCommitCallbacks(execute=True):
+            delete_now_and_on_commit("core:test:v1:1")
+            self.assertIsNone(cache.get("core:test:v1:1"))
+            # запись, заполненная старой строкой до коммита
+            cache.set("core:test:v1:1", "stale")
+
+        self.assertIsNone(cache.get("core:test:v1:1"))
+
+    def test_cache_errors_are_not_raised(self):
+        with patch("core.cache.cache.delete", side_effect=ConnectionError):
+            with self.assertLogs("core.cache", level="WARNING"):
+                delete_now_and_on_commit("core:test:v1:1")
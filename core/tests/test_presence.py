@@ -0,0 +1,50 @@
+from unittest.mock import patch
+
+from django.test import SimpleTestCase
+
+from core.presence import InMemoryPresenceStore
+
+
+class InMemoryPresenceStoreTests(SimpleTestCase):
+    def setUp(self):
+        self.store = InMemoryPresenceStore(ttl=60)
+
+    def test_user_is_online_while_any_connection_is_alive(self):
+        self.store.touch(1, "specific.tab-1")
+        self.store.touch(1, "specific.tab-2")
+        self.store.touch(2, "specific.tab-3")
+
+        self.assertEqual(self.store.count(), 2)
+        self.assertFalse(self.store.disconnect(1, "specific.tab-1"))
+        self.assertTrue(self.store.is_online(1))
+        self.assertTrue(self.store.disconnect(1, "specific.tab-2"))
+        self.assertFalse(self.store.is_online(1))
+        self.assertEqual(self.store.count(), 1)
+
+    def test_online_many_returns_only_online_ids(self):
+        self.store.touch(1, "specific.a")
+        self.store.touch(3, "specific.b")
+
+        self.assertEqual(self.store.online_many([1, 2, 3, 4]), {1, 3})
+        self.assertEqual(self.store.online_many([]), set())
+
+    def test_connection_expires_without_heartbeat(self):
+        with patch("core.presence.time.time", return_value=1000.0):
+            self.store.touch(1, "specific.stale")
+            self.store.touch(2, "specific.fresh")
+        with patch("core.presence.time.time", return_value=1050.0):
+            self.store.touch(2, "specific.fresh")
+
+        with patch("core.presence.time.time", return_value=1070.0):
+            self.assertFalse(self.store.is_online(1))
+            self.assertTrue(self.store.is_online(2))
+            self.assertEqual(self.store.count(), 1)
+
+    def test_remove_user_drops_all_connections(self):
+        self.store.touch(1, "specific.a")
+        self.store.touch(1, "specific.b")
+
+        self.store.remove_user(1)
+
+        self.assertFalse(self.store.is_online(1))
+        self.assertEqual(self.store.count(), 0)
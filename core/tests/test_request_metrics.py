@@ -0,0 +1,97 @@
+import json
+
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.test import RequestFactory, TestCase, override_settings
+from loguru import logger
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+
+from core.log.instrumentation import instrument_caches, measure_request
+from users.tests.helpers import build_user
+
+
+class RequestMetricsTestMixin:
+    def setUp(self):
+        super().setUp()
+        self.records = []
+        handler_id = logger.add(
+            self.records.append,
+            level="INFO",
+            filter=lambda record: "request_metrics" in record["extra"],
+        )
+        self.addCleanup(logger.remove, handler_id)
+
+    def payloads(self):
+        return [
+            json.loads(message.record["message"].split(" ", 1)[1])
+            for message in self.records
+        ]
+
+
+@override_settings(REQUEST_METRICS_ENABLED=True, REQUEST_METRICS_SAMPLE_RATE=1.0)
+class RequestMetricsMiddlewareTests(RequestMetricsTestMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.user = build_user(email="request-metrics@example.com")
+        self.client = APIClient()
+        self.client.credentials(
+            HTTP_AUTHORIZATION=f"Bearer {AccessToken.for_user(self.user)}"
+        )
+
+    def test_sampled_request_is_logged_with_counters(self):
+        response = self.client.get("/auth/users/current/")
+
+        [payload] = self.payloads()
+        self.assertEqual(payload["view"], "users:users.views.CurrentUser")
+        self.assertEqual(payload["method"], "GET")
+        self.assertEqual(payload["status"], 200)
+        self.assertGreater(payload["db_queries"], 0)
+        self.assertEqual(payload["response_bytes"], len(response.content))
+        self.assertFalse(payload["slow"])
+        self.assertNotIn("queries", payload)
+
+    @override_settings(REQUEST_METRICS_SAMPLE_RATE=0.0, REQUEST_METRICS_SLOW_MS=0)
+    def test_slow_request_is_logged_with_sql(self):
+        self.client.get("/auth/users/current/")
+
+        [payload] = self.payloads()
+        self.assertTrue(payload["slow"])
+        self.assertEqual(len(payload["queries"]), payload["db_queries"])
+        self.assertIn("SELECT", payload["queries"][0]["sql"])
+
+    @override_settings(REQUEST_METRICS_SAMPLE_RATE=0.0)
+    def test_fast_request_outside_sample_is_not_logged(self):
+        self.client.get("/auth/users/current/")
+
+        self.assertEqual(self.payloads(), [])
+
+    @override_settings(REQUEST_METRICS_ENABLED=False)
+    def test_disabled_metrics_are_not_logged(self):
+        self.client.get("/auth/users/current/")
+
+        self.assertEqual(self.payloads(), [])
+
+
+@override_settings(REQUEST_METRICS_SAMPLE_RATE=1.0)
+class MeasureRequestTests(RequestMetricsTestMixin, TestCase):
+    def test_cache_operations_are_counted_once(self):
+        instrument_caches()
+        cache.set("request-metrics:hit", "value")
+
+        def view(request):
+            cache.get("request-metrics:hit")
+            cache.get("request-metrics:miss", "default")
+            cache.get_many(["request-metrics:hit", "request-metrics:miss"])
+            cache.set("request-metrics:new", "value")
+            cache.get_or_set("request-metrics:hit", "other")
+            return HttpResponse("ok")
+
+        measure_request(RequestFactory().get("/metrics/"), view)
+
+        [payload] = self.payloads()
+        self.assertEqual(payload["cache_hits"], 3)
+        self.assertEqual(payload["cache_misses"], 2)
+        self.assertEqual(payload["cache_writes"], 1)
+        self.assertEqual(payload["response_bytes"], 2)
+        self.assertIsNone(payload["view"])
@@ -1,16 +1,24 @@
+import itertools
 import logging
 import io
+import tempfile
 import urllib.parse
 import unicodedata
-import pandas as pd
+from typing import IO, Callable, Iterable, Iterator
 
 from django.core.mail import EmailMultiAlternatives
-from django.http import HttpResponse
+from django.http import FileResponse, HttpResponse
+from django.http.response import HttpResponseBase
+from openpyxl import Workbook
 from openpyxl.cell.cell import ILLEGAL_CHARACTERS_RE
 
 
 logger = logging.getLogger()
 EXCEL_CELL_MAX = 32767
+XLSX_CONTENT_TYPE = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+
+# progress(done, total) - колбэк прогресса длинных выгрузок (см. exports).
+ProgressCallback = Callable[[int, int], None]
 
 
 class Email:
@@ -30,14 +38,6 @@ class Email:
         email.send()
 
 
-def get_user_online_cache_key(user) -> str:
-    return f"online_user_{user.pk}"
-
-
-def get_users_online_cache_key() -> str:
-    return "online_users"
-
-
 class XlsxFileToExport:
     """
     Формирует XLSX в памяти.
@@ -51,10 +51,12 @@ class XlsxFileToExport:
 
     def write_data_to_xlsx(self, data: list[dict], sheet_name: str = "scores") -> None:
         try:
-            data_frames = pd.DataFrame(data)
+            # Колонки - объединение ключей строк в порядке появления, как у DataFrame.
+            columns = list(dict.fromkeys(key for row in data for key in row))
+            writer = XlsxStreamWriter(sheet_name=sheet_name)
+            writer.append_dicts(data, columns=columns, sanitize=False)
             buffer = io.BytesIO()
-            with pd.ExcelWriter(buffer, engine="openpyxl") as writer:
-                data_frames.to_excel(writer, sheet_name=sheet_name, index=False)
+            writer.save(buffer)
             buffer.seek(0)
             self._buffer = buffer
         except Exception as e:
@@ -76,6 +78,62 @@ class XlsxFileToExport:
             self._buffer = None
 
 
+class XlsxStreamWriter:
+    """
+    Построчная запись XLSX через write-only лист openpyxl.
+
+    Строки сразу уходят во временный XML-файл openpyxl и не копятся в памяти,
+    поэтому потребление памяти не зависит от числа строк. `save()` без
+    аргумента собирает книгу во временный файл на диске, который отдается
+    `build_xlsx_streaming_response`.
+    """
+
+    def __init__(self, sheet_name: str = "Sheet"):
+        self._workbook = Workbook(write_only=True)
+        self._worksheet = self._workbook.create_sheet(title=sheet_name)
+
+    def append(self, values: Iterable, *, sanitize: bool = True) -> None:
+        if sanitize:
+            values = [sanitize_excel_value(value) for value in values]
+        self._worksheet.append(values)
+
+    def append_dicts(
+        self,
+        rows: Iterable[dict],
+        *,
+        columns: list[str] | None = None,
+        sanitize: bool = True,
+    ) -> None:
+        """Пишет заголовок и строки; без `columns` колонки берутся из первой строки."""
+        rows = iter(rows)
+        if columns is None:
+            first_row = next(rows, None)
+            if first_row is None:
+                return
+            columns = list(first_row)
+            rows = itertools.chain([first_row], rows)
+        self.append(columns, sanitize=sanitize)
+        for row in rows:
+            self.append([row.get(column) for column in columns], sanitize=sanitize)
+
+    def save(self, file: IO[bytes] | None = None) -> IO[bytes]:
+        if file is None:
+            file = tempfile.TemporaryFile()
+        self._workbook.save(file)
+        file.seek(0)
+        return file
+
+
+def iter_with_progress(
+    items: Iterable, total: int, progress: ProgressCallback | None
+) -> Iterator:
+    """Отдает элементы как есть и сообщает `progress(done, total)` после каждого."""
+    for done, item in enumerate(items, start=1):
+        yield item
+        if progress is not None:
+            progress(done, total)
+
+
 def sanitize_filename(filename: str) -> str:
     normalized_name = unicodedata.normalize("NFKD", filename)
     safe_chars = [
@@ -108,14 +166,21 @@ def sanitize_excel_value(value):
 
 
 def build_xlsx_download_response(binary_data: bytes, *, base_name: str) -> HttpResponse:
+    response = HttpResponse(binary_data, content_type=XLSX_CONTENT_TYPE)
+    return _set_xlsx_attachment(response, base_name)
+
+
+def build_xlsx_streaming_response(file: IO[bytes], *, base_name: str) -> FileResponse:
+    """Отдает готовый XLSX-файл блоками; файл закрывается вместе с ответом."""
+    response = FileResponse(file, content_type=XLSX_CONTENT_TYPE)
+    return _set_xlsx_attachment(response, base_name)
+
+
+def _set_xlsx_attachment(response: HttpResponseBase, base_name: str) -> HttpResponseBase:
     safe_name = sanitize_filename(base_name)
     encoded_file_name = urllib.parse.quote(f"{safe_name}.xlsx")
     fallback_filename = f"{ascii_filename(base_name)}.xlsx"
 
-    response = HttpResponse(
-        binary_data,
-        content_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-    )
     response["Content-Disposition"] = (
         "attachment; "
         f"filename=\"{fallback_filename}\"; "
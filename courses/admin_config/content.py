@@ -3,7 +3,7 @@ from django.http import Http404
 from django.urls import path
 
 from courses.models import Course, CourseLesson, CourseModule, CourseTask, CourseTaskOption
-from courses.services.export_course_results import build_course_results_export_response
+from exports.admin import start_admin_export
 
 from .forms import CourseAdminForm, CourseModuleAdminForm, CourseTaskAdminForm
 from .helpers import UserFileUploadAdminMixin
@@ -104,7 +104,7 @@ class CourseAdmin(UserFileUploadAdminMixin, admin.ModelAdmin):
         course = self.get_object(request, object_id)
         if course is None:
             raise Http404("Курс не найден.")
-        return build_course_results_export_response(course)
+        return start_admin_export(request, "course_results", {"course_id": course.id})
 
     def save_model(self, request, obj, form, change):
         avatar_upload = form.cleaned_data.get("avatar_upload")
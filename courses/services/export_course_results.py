@@ -1,12 +1,17 @@
 import io
 from collections import defaultdict
+from typing import IO
 from zoneinfo import ZoneInfo
 
 from django.utils import timezone
 from django.db.models import Prefetch
-from openpyxl import Workbook
 
-from core.utils import build_xlsx_download_response, sanitize_excel_value
+from core.utils import (
+    ProgressCallback,
+    XlsxStreamWriter,
+    build_xlsx_download_response,
+    iter_with_progress,
+)
 from courses.models import (
     Course,
     CourseLesson,
@@ -242,21 +247,25 @@ def _build_headers(tasks: list[CourseTask]) -> list[str]:
     return [*BASE_HEADERS, *[_task_header(task) for task in tasks]]
 
 
-def build_course_results_workbook_bytes(course: Course) -> bytes:
+def write_course_results(
+    writer: XlsxStreamWriter,
+    course: Course,
+    progress: ProgressCallback | None = None,
+) -> None:
     tasks = _export_tasks(course)
     published_lessons = _published_lessons_with_tasks(course)
     course_progresses = _started_course_progresses(course)
-    user_ids = [progress.user_id for progress in course_progresses]
+    user_ids = [course_progress.user_id for course_progress in course_progresses]
     task_ids = [task.id for task in tasks]
 
     lesson_progress_map = _lesson_progresses_by_user(user_ids, course)
     answers_map = _answers_by_user_and_task(user_ids, task_ids)
 
-    workbook = Workbook(write_only=True)
-    worksheet = workbook.create_sheet(title="Результаты курса")
-    worksheet.append([sanitize_excel_value(value) for value in _build_headers(tasks)])
+    writer.append(_build_headers(tasks))
 
-    for course_progress in course_progresses:
+    for course_progress in iter_with_progress(
+        course_progresses, len(course_progresses), progress
+    ):
         lesson_progresses = lesson_progress_map.get(course_progress.user_id, [])
         row = [
             _full_name(course_progress.user),
@@ -272,17 +281,31 @@ def build_course_results_workbook_bytes(course: Course) -> bytes:
                     answers_map.get((course_progress.user_id, task.id))
                 )
             )
-        worksheet.append([sanitize_excel_value(value) for value in row])
+        writer.append(row)
+
 
-    buffer = io.BytesIO()
-    workbook.save(buffer)
-    buffer.seek(0)
-    return buffer.getvalue()
+def build_course_results_workbook_bytes(course: Course) -> bytes:
+    writer = XlsxStreamWriter(sheet_name="Результаты курса")
+    write_course_results(writer, course)
+    return writer.save(io.BytesIO()).getvalue()
 
 
-def build_course_results_export_response(course: Course):
-    binary_data = build_course_results_workbook_bytes(course)
+def build_course_results_export_file(
+    course: Course, progress: ProgressCallback | None = None
+) -> IO[bytes]:
+    """Та же книга во временном файле, для фоновой выгрузки (exports)."""
+    writer = XlsxStreamWriter(sheet_name="Результаты курса")
+    write_course_results(writer, course, progress)
+    return writer.save()
 
+
+def course_results_export_base_name(course: Course) -> str:
     date_suffix = timezone.now().astimezone(MSK_TZ).strftime("%d.%m.%Y")
-    base_name = f"course-results - {course.title} - {date_suffix}"
-    return build_xlsx_download_response(binary_data, base_name=base_name)
+    return f"course-results - {course.title} - {date_suffix}"
+
+
+def build_course_results_export_response(course: Course):
+    binary_data = build_course_results_workbook_bytes(course)
+    return build_xlsx_download_response(
+        binary_data, base_name=course_results_export_base_name(course)
+    )
@@ -1,4 +1,5 @@
 from io import BytesIO
+from unittest.mock import patch
 
 from django.test import Client, TestCase
 from django.urls import reverse
@@ -20,6 +21,8 @@ from courses.models import (
 )
 from courses.services.answers import TaskAnswerSubmitPayload, submit_user_task_answer
 from courses.services.progress import recalculate_user_progresses_for_lesson
+from exports.models import ExportJob
+from exports.tasks import run_export_job_task
 
 from .helpers import (
     create_choice_question_task,
@@ -41,14 +44,37 @@ class CourseResultsExportTests(TestCase):
         self.admin_user = create_staff_user()
         self.client = Client()
         self.client.force_login(self.admin_user)
+        # выгрузка уходит в Celery после коммита: выполняем ее на месте,
+        # не полагаясь на CELERY_TASK_ALWAYS_EAGER из настроек
+        delay_patcher = patch(
+            "exports.tasks.run_export_job_task.delay", side_effect=run_export_job_task
+        )
+        delay_patcher.start()
+        self.addCleanup(delay_patcher.stop)
 
     def _read_workbook_rows(self, response):
-        workbook = load_workbook(filename=BytesIO(response.content), read_only=True)
+        content = b"".join(response.streaming_content)
+        workbook = load_workbook(filename=BytesIO(content), read_only=True)
         worksheet = workbook[workbook.sheetnames[0]]
         return list(worksheet.iter_rows(values_only=True))
 
+    def _export_response(self, course):
+        # Админка ставит фоновую выгрузку и ведет на страницу задания;
+        # в тестах задача выполняется сразу после коммита (см. setUp).
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.get(
+                reverse("admin:courses_export_results", args=[course.id])
+            )
+        job = ExportJob.objects.get(kind="course_results", params={"course_id": course.id})
+        self.assertRedirects(
+            response,
+            reverse("admin:exports_exportjob_change", args=[job.id]),
+            fetch_redirect_response=False,
+        )
+        return self.client.get(reverse("admin:exports_exportjob_download", args=[job.id]))
+
     def _export_rows(self, course):
-        response = self.client.get(reverse("admin:courses_export_results", args=[course.id]))
+        response = self._export_response(course)
         self.assertEqual(response.status_code, 200)
         return self._read_workbook_rows(response)
 
@@ -127,9 +153,7 @@ class CourseResultsExportTests(TestCase):
         )
         recalculate_user_progresses_for_lesson(student, lesson)
 
-        response = self.client.get(
-            reverse("admin:courses_export_results", args=[course.id])
-        )
+        response = self._export_response(course)
         rows = self._read_workbook_rows(response)
 
         self.assertEqual(response.status_code, 200)
@@ -196,9 +220,7 @@ class CourseResultsExportTests(TestCase):
         )
         recalculate_user_progresses_for_lesson(student, lesson)
 
-        response = self.client.get(
-            reverse("admin:courses_export_results", args=[course.id])
-        )
+        response = self._export_response(course)
         rows = self._read_workbook_rows(response)
 
         self.assertEqual(response.status_code, 200)
@@ -244,9 +266,7 @@ class CourseResultsExportTests(TestCase):
         )
         recalculate_user_progresses_for_lesson(student, lesson_two)
 
-        response = self.client.get(
-            reverse("admin:courses_export_results", args=[course.id])
-        )
+        response = self._export_response(course)
         rows = self._read_workbook_rows(response)
 
         self.assertEqual(response.status_code, 200)
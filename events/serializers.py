@@ -1,10 +1,12 @@
 from django.contrib.auth import get_user_model
-from django.core.cache import cache
 from rest_framework import serializers
 from taggit.serializers import TaggitSerializer, TagListSerializerField
 
-from core.serializers import SkillToObjectSerializer
-from core.utils import get_user_online_cache_key
+from core.serializers import (
+    OnlineStatusListSerializer,
+    SkillToObjectSerializer,
+    get_online_status,
+)
 from events.models import Event
 from users.serializers import MemberSerializer
 
@@ -59,14 +61,15 @@ class RegisteredUserListSerializer(serializers.ModelSerializer):
     skills = SkillToObjectSerializer(many=True, read_only=True)
     is_online = serializers.SerializerMethodField()
 
-    @classmethod
-    def get_is_online(cls, user: USER) -> bool:
-        cache_key = get_user_online_cache_key(user)
-        is_online = cache.get(cache_key, False)
-        return is_online
+    def get_online_status_users(self, user: USER) -> list[USER]:
+        return [user]
+
+    def get_is_online(self, user: USER) -> bool:
+        return get_online_status(self.context, user.id)
 
     class Meta:
         model = USER
+        list_serializer_class = OnlineStatusListSerializer
         fields = [
             "id",
             "user_type",
@@ -0,0 +1,104 @@
+from django.contrib import admin, messages
+from django.http import Http404, HttpRequest
+from django.shortcuts import get_object_or_404, redirect
+from django.urls import path, reverse
+from django.utils.html import format_html
+
+from core.utils import build_xlsx_streaming_response
+from exports.exceptions import ExportError
+from exports.models import ExportJob
+from exports.registry import EXPORT_KINDS
+from exports.services import can_access_export_job, enqueue_export, open_export_result
+
+
+def start_admin_export(request: HttpRequest, kind: str, params: dict | None = None):
+    """
+    Ставит выгрузку из админки и ведет на страницу задания.
+
+    Файл строится в Celery, так что запрос не упирается в таймаут прокси;
+    на странице задания видны прогресс и ссылка на скачивание.
+    """
+    job = enqueue_export(kind, params or {}, request.user)
+    messages.info(
+        request,
+        f"Выгрузка «{EXPORT_KINDS[kind].title}» поставлена в очередь. "
+        "Обновите страницу, чтобы увидеть прогресс.",
+    )
+    return redirect("admin:exports_exportjob_change", job.id)
+
+
+@admin.register(ExportJob)
+class ExportJobAdmin(admin.ModelAdmin):
+    list_display = (
+        "id",
+        "kind",
+        "status",
+        "progress",
+        "requested_by",
+        "datetime_created",
+        "expires_at",
+        "download_link",
+    )
+    list_display_links = ("id", "kind")
+    list_filter = ("kind", "status")
+    readonly_fields = (
+        "kind",
+        "params",
+        "requested_by",
+        "status",
+        "progress",
+        "error",
+        "file_name",
+        "datetime_created",
+        "datetime_started",
+        "datetime_finished",
+        "expires_at",
+        "download_link",
+    )
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def has_module_permission(self, request):
+        return request.user.is_active and request.user.is_staff
+
+    def has_view_permission(self, request, obj=None):
+        # Страница задания открывается сразу после запуска выгрузки из любой
+        # админки, поэтому права на модель не нужны - хватает доступа к выгрузке.
+        if not self.has_module_permission(request):
+            return False
+        return obj is None or can_access_export_job(request.user, obj)
+
+    @admin.display(description="Файл")
+    def download_link(self, obj: ExportJob):
+        if not obj.is_ready:
+            return "-"
+        return format_html(
+            '<a href="{}">Скачать</a>',
+            reverse("admin:exports_exportjob_download", args=[obj.id]),
+        )
+
+    def get_urls(self):
+        default_urls = super().get_urls()
+        custom_urls = [
+            path(
+                "<int:object_id>/download/",
+                self.admin_site.admin_view(self.download_view),
+                name="exports_exportjob_download",
+            ),
+        ]
+        return custom_urls + default_urls
+
+    def download_view(self, request, object_id):
+        job = get_object_or_404(ExportJob, pk=object_id)
+        if not can_access_export_job(request.user, job):
+            raise Http404
+        try:
+            file = open_export_result(job)
+        except ExportError as e:
+            messages.error(request, str(e))
+            return redirect("admin:exports_exportjob_change", job.id)
+        return build_xlsx_streaming_response(file, base_name=job.file_name)
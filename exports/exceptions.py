@@ -0,0 +1,22 @@
+class ExportError(Exception):
+    """Базовая ошибка фоновых выгрузок."""
+
+
+class UnknownExportKind(ExportError):
+    pass
+
+
+class ExportParamsError(ExportError):
+    pass
+
+
+class ExportAccessDenied(ExportError):
+    pass
+
+
+class ExportNotReady(ExportError):
+    pass
+
+
+class ExportResultExpired(ExportError):
+    pass
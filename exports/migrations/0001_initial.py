@@ -0,0 +1,122 @@
+# Generated by Django 4.2.11 on 2026-10-18 05:22
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ExportJob",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("kind", models.CharField(max_length=64, verbose_name="Тип выгрузки")),
+                (
+                    "params",
+                    models.JSONField(blank=True, default=dict, verbose_name="Параметры"),
+                ),
+                (
+                    "dedupe_key",
+                    models.CharField(db_index=True, editable=False, max_length=64),
+                ),
+                (
+                    "status",
+                    models.CharField(
+                        choices=[
+                            ("pending", "В очереди"),
+                            ("running", "Выполняется"),
+                            ("success", "Готово"),
+                            ("failed", "Ошибка"),
+                            ("expired", "Файл удален"),
+                        ],
+                        default="pending",
+                        max_length=16,
+                        verbose_name="Статус",
+                    ),
+                ),
+                (
+                    "progress",
+                    models.PositiveSmallIntegerField(
+                        default=0, verbose_name="Прогресс, %"
+                    ),
+                ),
+                (
+                    "error",
+                    models.TextField(blank=True, default="", verbose_name="Ошибка"),
+                ),
+                (
+                    "file_name",
+                    models.CharField(
+                        blank=True, default="", max_length=255, verbose_name="Имя файла"
+                    ),
+                ),
+                (
+                    "result_key",
+                    models.CharField(
+                        blank=True, default="", editable=False, max_length=255
+                    ),
+                ),
+                (
+                    "datetime_created",
+                    models.DateTimeField(auto_now_add=True, verbose_name="Создано"),
+                ),
+                (
+                    "datetime_started",
+                    models.DateTimeField(blank=True, null=True, verbose_name="Начато"),
+                ),
+                (
+                    "datetime_finished",
+                    models.DateTimeField(blank=True, null=True, verbose_name="Завершено"),
+                ),
+                (
+                    "expires_at",
+                    models.DateTimeField(
+                        blank=True,
+                        db_index=True,
+                        null=True,
+                        verbose_name="Файл хранится до",
+                    ),
+                ),
+                (
+                    "requested_by",
+                    models.ForeignKey(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.SET_NULL,
+                        related_name="export_jobs",
+                        to=settings.AUTH_USER_MODEL,
+                        verbose_name="Запросил",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Выгрузка",
+                "verbose_name_plural": "Выгрузки",
+                "ordering": ("-datetime_created",),
+            },
+        ),
+        migrations.AddConstraint(
+            model_name="exportjob",
+            constraint=models.UniqueConstraint(
+                condition=models.Q(("status__in", ("pending", "running"))),
+                fields=("dedupe_key",),
+                name="export_job_single_active_per_key",
+            ),
+        ),
+    ]
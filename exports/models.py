@@ -0,0 +1,86 @@
+import hashlib
+import json
+
+from django.conf import settings
+from django.db import models
+from django.db.models import Q
+
+
+class ExportJob(models.Model):
+    """
+    Фоновая выгрузка XLSX.
+
+    Задание создается в запросе, строится Celery-задачей `run_export_job_task`,
+    а готовый файл хранится в хранилище выгрузок до `expires_at`.
+    Одинаковые (`kind`, `params`) выгрузки, пока одна из них в работе,
+    сводятся к одному заданию по `dedupe_key`.
+    """
+
+    class Status(models.TextChoices):
+        PENDING = "pending", "В очереди"
+        RUNNING = "running", "Выполняется"
+        SUCCESS = "success", "Готово"
+        FAILED = "failed", "Ошибка"
+        EXPIRED = "expired", "Файл удален"
+
+    ACTIVE_STATUSES = (Status.PENDING, Status.RUNNING)
+
+    kind = models.CharField(max_length=64, verbose_name="Тип выгрузки")
+    params = models.JSONField(default=dict, blank=True, verbose_name="Параметры")
+    dedupe_key = models.CharField(max_length=64, db_index=True, editable=False)
+    requested_by = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="export_jobs",
+        verbose_name="Запросил",
+    )
+    status = models.CharField(
+        max_length=16,
+        choices=Status.choices,
+        default=Status.PENDING,
+        verbose_name="Статус",
+    )
+    progress = models.PositiveSmallIntegerField(default=0, verbose_name="Прогресс, %")
+    error = models.TextField(blank=True, default="", verbose_name="Ошибка")
+    file_name = models.CharField(
+        max_length=255, blank=True, default="", verbose_name="Имя файла"
+    )
+    result_key = models.CharField(max_length=255, blank=True, default="", editable=False)
+    datetime_created = models.DateTimeField(auto_now_add=True, verbose_name="Создано")
+    datetime_started = models.DateTimeField(null=True, blank=True, verbose_name="Начато")
+    datetime_finished = models.DateTimeField(
+        null=True, blank=True, verbose_name="Завершено"
+    )
+    expires_at = models.DateTimeField(
+        null=True, blank=True, db_index=True, verbose_name="Файл хранится до"
+    )
+
+    class Meta:
+        verbose_name = "Выгрузка"
+        verbose_name_plural = "Выгрузки"
+        ordering = ("-datetime_created",)
+        constraints = [
+            models.UniqueConstraint(
+                fields=("dedupe_key",),
+                condition=Q(status__in=("pending", "running")),
+                name="export_job_single_active_per_key",
+            )
+        ]
+
+    def __str__(self):
+        return f"ExportJob<{self.id}> {self.kind} - {self.status}"
+
+    @staticmethod
+    def build_dedupe_key(kind: str, params: dict) -> str:
+        payload = json.dumps([kind, params], sort_keys=True, ensure_ascii=False)
+        return hashlib.sha256(payload.encode()).hexdigest()
+
+    @property
+    def is_active(self) -> bool:
+        return self.status in self.ACTIVE_STATUSES
+
+    @property
+    def is_ready(self) -> bool:
+        return self.status == self.Status.SUCCESS
@@ -0,0 +1,187 @@
+"""
+Типы фоновых выгрузок.
+
+Каждый `ExportKind` знает, как проверить параметры, кому выгрузка доступна и
+как ее построить. Построители импортируются внутри функций, чтобы exports
+не загружал сервисы всех app при импорте.
+"""
+
+from dataclasses import dataclass, field
+from typing import IO, Callable
+
+from core.utils import ProgressCallback
+from exports.exceptions import ExportParamsError, UnknownExportKind
+
+
+@dataclass(frozen=True)
+class ExportFile:
+    file: IO[bytes]
+    base_name: str
+
+
+@dataclass(frozen=True)
+class ExportKind:
+    name: str
+    title: str
+    build: Callable[[dict, ProgressCallback], ExportFile]
+    has_access: Callable[[object, dict], bool]
+    clean_params: Callable[[dict], dict] = field(default=lambda params: {})
+
+
+def _is_staff(user, params: dict) -> bool:
+    return bool(getattr(user, "is_staff", False))
+
+
+def _is_program_staff_or_manager(user, params: dict) -> bool:
+    from partner_programs.models import PartnerProgram
+
+    if getattr(user, "is_staff", False) or getattr(user, "is_superuser", False):
+        return True
+    program = PartnerProgram.objects.filter(pk=params["program_id"]).first()
+    return program is not None and program.is_manager(user)
+
+
+def _clean_object_id(params: dict, key: str, model) -> int:
+    try:
+        object_id = int(params[key])
+    except (KeyError, TypeError, ValueError):
+        raise ExportParamsError(f"Параметр {key} обязателен и должен быть числом.")
+    if not model.objects.filter(pk=object_id).exists():
+        raise ExportParamsError(f"Объект {key}={object_id} не найден.")
+    return object_id
+
+
+def _clean_program_params(params: dict) -> dict:
+    from partner_programs.models import PartnerProgram
+
+    return {"program_id": _clean_object_id(params, "program_id", PartnerProgram)}
+
+
+def _clean_program_projects_params(params: dict) -> dict:
+    return {
+        **_clean_program_params(params),
+        "only_submitted": params.get("only_submitted") in (True, 1, "1", "true", "True"),
+    }
+
+
+def _clean_course_params(params: dict) -> dict:
+    from courses.models import Course
+
+    return {"course_id": _clean_object_id(params, "course_id", Course)}
+
+
+def _build_users_activity(params: dict, progress: ProgressCallback) -> ExportFile:
+    from users.services.exports import build_users_activity_export_file
+
+    return ExportFile(
+        file=build_users_activity_export_file(progress),
+        base_name="активность_пользователей",
+    )
+
+
+def _build_users_emails(params: dict, progress: ProgressCallback) -> ExportFile:
+    from users.services.exports import build_users_emails_export_file
+
+    return ExportFile(file=build_users_emails_export_file(progress), base_name="users")
+
+
+def _build_program_participants(params: dict, progress: ProgressCallback) -> ExportFile:
+    from partner_programs.models import PartnerProgram
+    from partner_programs.services import build_program_participants_export_file
+
+    export_file = build_program_participants_export_file(
+        program=PartnerProgram.objects.get(pk=params["program_id"]),
+        progress=progress,
+    )
+    return ExportFile(file=export_file.file, base_name=export_file.base_name)
+
+
+def _build_program_scores(params: dict, progress: ProgressCallback) -> ExportFile:
+    from partner_programs.models import PartnerProgram
+    from partner_programs.services import build_program_project_scores_export_file
+
+    export_file = build_program_project_scores_export_file(
+        program=PartnerProgram.objects.get(pk=params["program_id"]),
+        progress=progress,
+    )
+    return ExportFile(file=export_file.file, base_name=export_file.base_name)
+
+
+def _build_program_projects(params: dict, progress: ProgressCallback) -> ExportFile:
+    from partner_programs.models import PartnerProgram
+    from partner_programs.services import build_program_projects_export_file
+
+    export_file = build_program_projects_export_file(
+        program=PartnerProgram.objects.get(pk=params["program_id"]),
+        only_submitted=params["only_submitted"],
+        progress=progress,
+    )
+    return ExportFile(file=export_file.file, base_name=export_file.base_name)
+
+
+def _build_course_results(params: dict, progress: ProgressCallback) -> ExportFile:
+    from courses.models import Course
+    from courses.services.export_course_results import (
+        build_course_results_export_file,
+        course_results_export_base_name,
+    )
+
+    course = Course.objects.get(pk=params["course_id"])
+    return ExportFile(
+        file=build_course_results_export_file(course, progress),
+        base_name=course_results_export_base_name(course),
+    )
+
+
+EXPORT_KINDS: dict[str, ExportKind] = {
+    kind.name: kind
+    for kind in (
+        ExportKind(
+            name="users_activity",
+            title="Активность пользователей",
+            build=_build_users_activity,
+            has_access=_is_staff,
+        ),
+        ExportKind(
+            name="users_emails",
+            title="Почты пользователей",
+            build=_build_users_emails,
+            has_access=_is_staff,
+        ),
+        ExportKind(
+            name="program_participants",
+            title="Участники программы",
+            build=_build_program_participants,
+            has_access=_is_staff,
+            clean_params=_clean_program_params,
+        ),
+        ExportKind(
+            name="program_scores",
+            title="Оценки проектов программы",
+            build=_build_program_scores,
+            has_access=_is_program_staff_or_manager,
+            clean_params=_clean_program_params,
+        ),
+        ExportKind(
+            name="program_projects",
+            title="Проекты программы",
+            build=_build_program_projects,
+            has_access=_is_program_staff_or_manager,
+            clean_params=_clean_program_projects_params,
+        ),
+        ExportKind(
+            name="course_results",
+            title="Результаты курса",
+            build=_build_course_results,
+            has_access=_is_staff,
+            clean_params=_clean_course_params,
+        ),
+    )
+}
+
+
+def get_export_kind(name: str) -> ExportKind:
+    try:
+        return EXPORT_KINDS[name]
+    except KeyError:
+        raise UnknownExportKind(f"Неизвестный тип выгрузки: {name}.")
@@ -0,0 +1,35 @@
+from django.urls import reverse
+from rest_framework import serializers
+
+from exports.models import ExportJob
+
+
+class ExportJobCreateSerializer(serializers.Serializer):
+    kind = serializers.CharField(max_length=64)
+    params = serializers.DictField(required=False, default=dict)
+
+
+class ExportJobSerializer(serializers.ModelSerializer):
+    download_url = serializers.SerializerMethodField()
+
+    class Meta:
+        model = ExportJob
+        fields = [
+            "id",
+            "kind",
+            "params",
+            "status",
+            "progress",
+            "error",
+            "file_name",
+            "datetime_created",
+            "datetime_finished",
+            "expires_at",
+            "download_url",
+        ]
+        read_only_fields = fields
+
+    def get_download_url(self, job: ExportJob) -> str | None:
+        if not job.is_ready:
+            return None
+        return reverse("exports:download", args=[job.id])
@@ -0,0 +1,184 @@
+import logging
+import uuid
+from datetime import timedelta
+from typing import IO
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+
+from exports.exceptions import ExportAccessDenied, ExportNotReady, ExportResultExpired
+from exports.models import ExportJob
+from exports.registry import get_export_kind
+from exports.storage import ExportStorage, get_export_storage
+
+logger = logging.getLogger()
+
+# Прогресс пишется в БД не чаще, чем раз в PROGRESS_STEP процентов.
+PROGRESS_STEP = 5
+
+
+def can_access_export_job(user, job: ExportJob) -> bool:
+    """Доступ к заданию есть у всех, кому разрешено запросить ту же выгрузку."""
+    if job.requested_by_id is not None and job.requested_by_id == user.id:
+        return True
+    return get_export_kind(job.kind).has_access(user, job.params)
+
+
+def enqueue_export(kind: str, params: dict, user) -> ExportJob:
+    """
+    Ставит выгрузку в очередь и возвращает задание.
+
+    Если такая же выгрузка (тот же `kind` и параметры) уже в очереди или
+    строится, возвращается она, второй раз файл не строится.
+    """
+    export_kind = get_export_kind(kind)
+    params = export_kind.clean_params(params or {})
+    if not export_kind.has_access(user, params):
+        raise ExportAccessDenied("Недостаточно прав для этой выгрузки.")
+
+    dedupe_key = ExportJob.build_dedupe_key(kind, params)
+    active_jobs = ExportJob.objects.filter(
+        dedupe_key=dedupe_key, status__in=ExportJob.ACTIVE_STATUSES
+    )
+    job = active_jobs.first()
+    if job is not None:
+        return job
+
+    try:
+        with transaction.atomic():
+            job = ExportJob.objects.create(
+                kind=kind,
+                params=params,
+                dedupe_key=dedupe_key,
+                requested_by=user if user.is_authenticated else None,
+            )
+    except IntegrityError:
+        # Параллельный запрос успел создать такое же задание.
+        job = active_jobs.first()
+        if job is None:
+            raise
+        return job
+
+    transaction.on_commit(lambda: _schedule(job.id))
+    return job
+
+
+def _schedule(job_id: int) -> None:
+    from exports.tasks import run_export_job_task
+
+    run_export_job_task.delay(job_id)
+
+
+class ExportProgress:
+    """Колбэк `progress(done, total)`, который обновляет `ExportJob.progress`."""
+
+    def __init__(self, job_id: int):
+        self.job_id = job_id
+        self.reported = 0
+
+    def __call__(self, done: int, total: int) -> None:
+        if total <= 0:
+            return
+        # 100% ставит только завершение задания.
+        percent = min(99, done * 100 // total)
+        if percent - self.reported < PROGRESS_STEP:
+            return
+        self.reported = percent
+        ExportJob.objects.filter(pk=self.job_id).update(progress=percent)
+
+
+def run_export_job(job_id: int, storage: ExportStorage | None = None) -> ExportJob | None:
+    """
+    Строит файл выгрузки и кладет его в хранилище.
+
+    Задание забирается атомарным переводом pending -> running, поэтому
+    повторная доставка Celery-задачи его второй раз не построит.
+    """
+    claimed = ExportJob.objects.filter(pk=job_id, status=ExportJob.Status.PENDING).update(
+        status=ExportJob.Status.RUNNING, datetime_started=timezone.now()
+    )
+    if not claimed:
+        return None
+
+    job = ExportJob.objects.get(pk=job_id)
+    storage = storage or get_export_storage()
+    try:
+        export_file = get_export_kind(job.kind).build(job.params, ExportProgress(job.id))
+        result_key = f"{job.id}-{uuid.uuid4().hex}.xlsx"
+        with export_file.file:
+            storage.save(result_key, export_file.file)
+    except Exception as e:
+        logger.error(f"Export job {job.id} ({job.kind}) failed: {e}", exc_info=True)
+        job.status = ExportJob.Status.FAILED
+        job.error = str(e)
+        job.datetime_finished = timezone.now()
+        job.save(update_fields=["status", "error", "datetime_finished"])
+        return job
+
+    now = timezone.now()
+    job.status = ExportJob.Status.SUCCESS
+    job.progress = 100
+    job.file_name = export_file.base_name
+    job.result_key = result_key
+    job.datetime_finished = now
+    job.expires_at = now + timedelta(seconds=settings.EXPORTS_RESULT_TTL_SECONDS)
+    job.save(
+        update_fields=[
+            "status",
+            "progress",
+            "file_name",
+            "result_key",
+            "datetime_finished",
+            "expires_at",
+        ]
+    )
+    return job
+
+
+def open_export_result(job: ExportJob, storage: ExportStorage | None = None) -> IO[bytes]:
+    if job.status == ExportJob.Status.EXPIRED or (
+        job.is_ready and job.expires_at and job.expires_at <= timezone.now()
+    ):
+        raise ExportResultExpired("Срок хранения файла выгрузки истек.")
+    if not job.is_ready:
+        raise ExportNotReady("Выгрузка еще не готова.")
+    storage = storage or get_export_storage()
+    try:
+        return storage.open(job.result_key)
+    except FileNotFoundError:
+        raise ExportResultExpired("Срок хранения файла выгрузки истек.")
+
+
+def cleanup_export_jobs(storage: ExportStorage | None = None) -> dict[str, int]:
+    """
+    Удаляет файлы выгрузок с истекшим сроком и снимает зависшие задания.
+
+    Зависшим считается задание, которое дольше `EXPORTS_JOB_TIMEOUT_SECONDS`
+    в очереди или в работе (например, воркер упал): оно помечается ошибкой и
+    больше не мешает поставить ту же выгрузку заново.
+    """
+    storage = storage or get_export_storage()
+    now = timezone.now()
+
+    expired = 0
+    expired_jobs = ExportJob.objects.filter(
+        status=ExportJob.Status.SUCCESS, expires_at__lte=now
+    )
+    for job in expired_jobs.iterator():
+        storage.delete(job.result_key)
+        ExportJob.objects.filter(pk=job.pk, status=ExportJob.Status.SUCCESS).update(
+            status=ExportJob.Status.EXPIRED, result_key=""
+        )
+        expired += 1
+
+    stale = ExportJob.objects.filter(
+        status__in=ExportJob.ACTIVE_STATUSES,
+        datetime_created__lte=now
+        - timedelta(seconds=settings.EXPORTS_JOB_TIMEOUT_SECONDS),
+    ).update(
+        status=ExportJob.Status.FAILED,
+        error="Превышено время выполнения выгрузки.",
+        datetime_finished=now,
+    )
+    return {"expired": expired, "stale": stale}
@@ -0,0 +1,133 @@
+import os
+import shutil
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import IO
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+
+from core.utils import XLSX_CONTENT_TYPE
+from files.exceptions import SelectelDownloadError, SelectelUploadError
+from files.swift import SwiftClient, get_swift_client
+
+
+class ExportStorage(ABC):
+    """Хранилище готовых файлов выгрузок, ключ - `ExportJob.result_key`."""
+
+    @abstractmethod
+    def save(self, key: str, file: IO[bytes]) -> None:
+        pass
+
+    @abstractmethod
+    def open(self, key: str) -> IO[bytes]:
+        """Открывает файл на чтение; если его уже нет - `FileNotFoundError`."""
+
+    @abstractmethod
+    def delete(self, key: str) -> None:
+        pass
+
+
+class LocalExportStorage(ExportStorage):
+    """Каталог на диске; подходит, когда web и celery делят файловую систему."""
+
+    def __init__(self, root: str | Path | None = None):
+        self.root = Path(root or settings.EXPORTS_ROOT)
+
+    def save(self, key: str, file: IO[bytes]) -> None:
+        path = self._path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(path, "wb") as destination:
+            shutil.copyfileobj(file, destination)
+
+    def open(self, key: str) -> IO[bytes]:
+        return open(self._path(key), "rb")
+
+    def delete(self, key: str) -> None:
+        try:
+            os.remove(self._path(key))
+        except FileNotFoundError:
+            pass
+
+    def _path(self, key: str) -> Path:
+        return self.root / key
+
+
+class SwiftExportStorage(ExportStorage):
+    """
+    Объекты `<key>` в приватном контейнере Selectel `EXPORTS_SWIFT_CONTAINER`.
+
+    В выгрузках персональные данные, поэтому публичный контейнер медиа для них
+    не подходит: файлы отдает только `open` с токеном бэкенда. Swift сам
+    удаляет объект (и сегменты большого объекта) через `X-Delete-After`, так
+    что файл не переживет TTL, даже если очистка заданий не дойдет до него.
+    """
+
+    def __init__(
+        self,
+        client: SwiftClient | None = None,
+        ttl: int | None = None,
+        base_url: str | None = None,
+    ):
+        if settings.EXPORTS_SWIFT_CONTAINER == settings.SELECTEL_CONTAINER_NAME:
+            raise ImproperlyConfigured(
+                "EXPORTS_SWIFT_CONTAINER must be a private container, "
+                "not the public media container."
+            )
+        self._client = client
+        self.ttl = settings.EXPORTS_RESULT_TTL_SECONDS if ttl is None else ttl
+        self.base_url = base_url or settings.EXPORTS_SWIFT_URL
+
+    @property
+    def client(self) -> SwiftClient:
+        if self._client is None:
+            self._client = get_swift_client()
+        return self._client
+
+    def save(self, key: str, file: IO[bytes]) -> None:
+        size = file.seek(0, os.SEEK_END)
+        file.seek(0)
+        response = self.client.upload(
+            self._url(key),
+            file,
+            size=size,
+            headers={
+                "Content-Type": XLSX_CONTENT_TYPE,
+                "X-Delete-After": str(self.ttl),
+            },
+        )
+        if not response.ok:
+            raise SelectelUploadError(
+                f"Couldn't upload an export to Selectel Swift API (selcdn): "
+                f"{response.status_code}"
+            )
+
+    def open(self, key: str) -> IO[bytes]:
+        response = self.client.get(self._url(key), stream=True)
+        if response.status_code == 404:
+            response.close()
+            raise FileNotFoundError(key)
+        if not response.ok:
+            response.close()
+            raise SelectelDownloadError(
+                f"Couldn't download an export from Selectel Swift API (selcdn): "
+                f"{response.status_code}"
+            )
+        response.raw.decode_content = True
+        return response.raw
+
+    def delete(self, key: str) -> None:
+        self.client.delete(self._url(key))
+
+    def _url(self, key: str) -> str:
+        return f"{self.base_url}{key}"
+
+
+EXPORT_STORAGES = {
+    "local": LocalExportStorage,
+    "swift": SwiftExportStorage,
+}
+
+
+def get_export_storage() -> ExportStorage:
+    return EXPORT_STORAGES[settings.EXPORTS_STORAGE]()
@@ -0,0 +1,13 @@
+from exports.services import cleanup_export_jobs, run_export_job
+from procollab.celery import app
+
+
+@app.task
+def run_export_job_task(job_id: int) -> str | None:
+    job = run_export_job(job_id)
+    return job.status if job else None
+
+
+@app.task
+def cleanup_export_jobs_task() -> dict[str, int]:
+    return cleanup_export_jobs()
@@ -0,0 +1,125 @@
+import io
+import tempfile
+from datetime import timedelta
+from unittest.mock import patch
+
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from openpyxl import load_workbook
+from rest_framework.test import APIClient
+
+from exports.models import ExportJob
+from exports.services import run_export_job
+from partner_programs.tests.helpers import (
+    create_partner_program,
+    create_program_project,
+    create_project,
+    create_user,
+)
+
+
+class ExportJobApiTests(TestCase):
+    def setUp(self):
+        tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmpdir.cleanup)
+        settings_override = override_settings(
+            EXPORTS_STORAGE="local", EXPORTS_ROOT=tmpdir.name
+        )
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+        self.client = APIClient()
+        self.manager = create_user(prefix="exports-api-manager")
+        self.program = create_partner_program(name="Api Export Program")
+        self.program.managers.add(self.manager)
+        create_program_project(self.program, project=create_project(name="Exported"))
+        self.client.force_authenticate(self.manager)
+
+        delay_patcher = patch("exports.tasks.run_export_job_task.delay")
+        self.delay = delay_patcher.start()
+        self.addCleanup(delay_patcher.stop)
+
+    def create_job(self, **params):
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(
+                "/exports/",
+                {
+                    "kind": "program_projects",
+                    "params": {"program_id": self.program.id, **params},
+                },
+                format="json",
+            )
+        self.assertEqual(response.status_code, 202)
+        return response
+
+    def test_export_is_queued_polled_and_downloaded(self):
+        job_id = self.create_job().data["id"]
+        self.delay.assert_called_once_with(job_id)
+
+        response = self.client.get(f"/exports/{job_id}/")
+        self.assertEqual(response.data["status"], ExportJob.Status.PENDING)
+        self.assertIsNone(response.data["download_url"])
+        response = self.client.get(f"/exports/{job_id}/download/")
+        self.assertEqual(response.status_code, 409)
+
+        run_export_job(job_id)
+
+        response = self.client.get(f"/exports/{job_id}/")
+        self.assertEqual(response.data["status"], ExportJob.Status.SUCCESS)
+        self.assertEqual(response.data["progress"], 100)
+        self.assertEqual(
+            response.data["download_url"], reverse("exports:download", args=[job_id])
+        )
+        response = self.client.get(response.data["download_url"])
+        self.assertEqual(response.status_code, 200)
+        self.assertIn(".xlsx", response["Content-Disposition"])
+        workbook = load_workbook(io.BytesIO(b"".join(response.streaming_content)))
+        rows = list(workbook.active.iter_rows(values_only=True))
+        self.assertEqual(rows[1][1], "Exported")
+
+    def test_repeated_request_returns_running_job(self):
+        first = self.create_job().data["id"]
+        second = self.create_job().data["id"]
+
+        self.assertEqual(first, second)
+        self.delay.assert_called_once()
+
+    def test_expired_result_is_gone(self):
+        job_id = self.create_job().data["id"]
+        run_export_job(job_id)
+        ExportJob.objects.filter(pk=job_id).update(
+            expires_at=timezone.now() - timedelta(seconds=1)
+        )
+
+        response = self.client.get(f"/exports/{job_id}/download/")
+
+        self.assertEqual(response.status_code, 410)
+
+    def test_job_is_hidden_from_users_without_access(self):
+        job_id = self.create_job().data["id"]
+        self.client.force_authenticate(create_user(prefix="exports-api-stranger"))
+
+        self.assertEqual(self.client.get(f"/exports/{job_id}/").status_code, 404)
+        self.assertEqual(self.client.get(f"/exports/{job_id}/download/").status_code, 404)
+
+    def test_bad_requests(self):
+        response = self.client.post("/exports/", {"kind": "unknown"}, format="json")
+        self.assertEqual(response.status_code, 400)
+
+        response = self.client.post("/exports/", {"kind": "users_emails"}, format="json")
+        self.assertEqual(response.status_code, 403)
+
+    def test_program_export_endpoint_can_run_in_background(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.get(
+                f"/programs/{self.program.id}/export-projects/?background=1&only_submitted=1"
+            )
+
+        self.assertEqual(response.status_code, 202)
+        job = ExportJob.objects.get(pk=response.data["id"])
+        self.assertEqual(job.kind, "program_projects")
+        self.assertEqual(
+            job.params, {"program_id": self.program.id, "only_submitted": True}
+        )
+        self.delay.assert_called_once_with(job.id)
@@ -0,0 +1,301 @@
+import io
+import tempfile
+from datetime import timedelta
+from unittest.mock import MagicMock, patch
+
+from django.core.exceptions import ImproperlyConfigured
+from django.db import IntegrityError, transaction
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.utils import timezone
+from openpyxl import load_workbook
+
+from exports.exceptions import (
+    ExportAccessDenied,
+    ExportNotReady,
+    ExportParamsError,
+    ExportResultExpired,
+    UnknownExportKind,
+)
+from exports.models import ExportJob
+from exports.services import (
+    ExportProgress,
+    cleanup_export_jobs,
+    enqueue_export,
+    open_export_result,
+    run_export_job,
+)
+from exports.storage import LocalExportStorage, SwiftExportStorage
+from partner_programs.models import PartnerProgramUserProfile
+from partner_programs.tests.helpers import (
+    create_partner_program,
+    create_project,
+    create_user,
+)
+from project_rates.models import Criteria, ProjectScore
+
+
+class ExportJobTestCase(TestCase):
+    def setUp(self):
+        tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmpdir.cleanup)
+        settings_override = override_settings(
+            EXPORTS_STORAGE="local", EXPORTS_ROOT=tmpdir.name
+        )
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        self.storage = LocalExportStorage(tmpdir.name)
+
+        self.staff = create_user(prefix="exports-staff", is_staff=True)
+        self.program = create_partner_program(
+            name="Export Program",
+            data_schema={"school": {"name": "School"}, "hidden": {}},
+        )
+
+    def create_participant(self, **data):
+        user = create_user(prefix="exports-participant", first_name="Anna")
+        return PartnerProgramUserProfile.objects.create(
+            user=user, partner_program=self.program, partner_program_data=data
+        )
+
+    def read_rows(self, job):
+        with open_export_result(job, self.storage) as file:
+            workbook = load_workbook(io.BytesIO(file.read()))
+        return list(workbook.active.iter_rows(values_only=True))
+
+
+class EnqueueExportTests(ExportJobTestCase):
+    def test_job_is_scheduled_after_commit(self):
+        with patch("exports.tasks.run_export_job_task.delay") as delay:
+            with self.captureOnCommitCallbacks(execute=True):
+                job = enqueue_export(
+                    "program_participants", {"program_id": self.program.id}, self.staff
+                )
+
+        self.assertEqual(job.status, ExportJob.Status.PENDING)
+        self.assertEqual(job.requested_by, self.staff)
+        delay.assert_called_once_with(job.id)
+
+    def test_identical_requests_share_active_job(self):
+        other_staff = create_user(prefix="exports-other-staff", is_staff=True)
+        with patch("exports.tasks.run_export_job_task.delay") as delay:
+            with self.captureOnCommitCallbacks(execute=True):
+                first = enqueue_export(
+                    "program_participants", {"program_id": self.program.id}, self.staff
+                )
+                second = enqueue_export(
+                    "program_participants",
+                    {"program_id": str(self.program.id)},
+                    other_staff,
+                )
+
+        self.assertEqual(first.id, second.id)
+        self.assertEqual(ExportJob.objects.count(), 1)
+        delay.assert_called_once()
+
+    def test_finished_job_does_not_block_new_export(self):
+        with patch("exports.tasks.run_export_job_task.delay"):
+            first = enqueue_export("users_emails", {}, self.staff)
+            ExportJob.objects.filter(pk=first.pk).update(status=ExportJob.Status.SUCCESS)
+            second = enqueue_export("users_emails", {}, self.staff)
+
+        self.assertNotEqual(first.id, second.id)
+
+    def test_database_allows_single_active_job_per_key(self):
+        with patch("exports.tasks.run_export_job_task.delay"):
+            job = enqueue_export("users_emails", {}, self.staff)
+
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            ExportJob.objects.create(kind=job.kind, dedupe_key=job.dedupe_key)
+
+    def test_invalid_requests_are_rejected(self):
+        member = create_user(prefix="exports-member")
+
+        with self.assertRaises(UnknownExportKind):
+            enqueue_export("unknown", {}, self.staff)
+        with self.assertRaises(ExportParamsError):
+            enqueue_export("program_participants", {"program_id": "x"}, self.staff)
+        with self.assertRaises(ExportParamsError):
+            enqueue_export("program_participants", {"program_id": 0}, self.staff)
+        with self.assertRaises(ExportAccessDenied):
+            enqueue_export("users_emails", {}, member)
+        self.assertFalse(ExportJob.objects.exists())
+
+    def test_program_manager_can_export_program_projects_only(self):
+        manager = create_user(prefix="exports-manager")
+        self.program.managers.add(manager)
+
+        with patch("exports.tasks.run_export_job_task.delay"):
+            job = enqueue_export(
+                "program_projects", {"program_id": self.program.id}, manager
+            )
+            with self.assertRaises(ExportAccessDenied):
+                enqueue_export(
+                    "program_participants", {"program_id": self.program.id}, manager
+                )
+
+        self.assertEqual(
+            job.params, {"program_id": self.program.id, "only_submitted": False}
+        )
+
+
+class RunExportJobTests(ExportJobTestCase):
+    def enqueue(self, kind="program_participants", params=None):
+        with patch("exports.tasks.run_export_job_task.delay"):
+            return enqueue_export(
+                kind, params or {"program_id": self.program.id}, self.staff
+            )
+
+    def test_successful_job_stores_file_until_ttl(self):
+        self.create_participant(school="Lyceum 1", hidden="secret")
+        job = self.enqueue()
+
+        with self.assertRaises(ExportNotReady):
+            open_export_result(job, self.storage)
+        job = run_export_job(job.id, self.storage)
+
+        self.assertEqual(job.status, ExportJob.Status.SUCCESS)
+        self.assertEqual(job.progress, 100)
+        self.assertTrue(job.file_name.startswith("Export Program"))
+        self.assertAlmostEqual(
+            job.expires_at - job.datetime_finished,
+            timedelta(days=1),
+            delta=timedelta(seconds=1),
+        )
+        rows = self.read_rows(job)
+        self.assertEqual(
+            rows[0], ("Имя", "Фамилия", "Отчество", "Почта", "Дата рождения", "School")
+        )
+        self.assertEqual(rows[1][0], "Anna")
+        self.assertEqual(rows[1][5], "Lyceum 1")
+
+    def test_job_is_built_once(self):
+        job = self.enqueue()
+
+        self.assertIsNotNone(run_export_job(job.id, self.storage))
+        self.assertIsNone(run_export_job(job.id, self.storage))
+
+    def test_failed_build_is_recorded(self):
+        job = self.enqueue()
+
+        with patch(
+            "partner_programs.services.build_program_participants_export_file",
+            side_effect=RuntimeError("boom"),
+        ):
+            job = run_export_job(job.id, self.storage)
+
+        self.assertEqual(job.status, ExportJob.Status.FAILED)
+        self.assertEqual(job.error, "boom")
+        with self.assertRaises(ExportNotReady):
+            open_export_result(job, self.storage)
+
+    def test_progress_is_written_in_steps(self):
+        job = self.enqueue()
+        progress = ExportProgress(job.id)
+
+        # 5%, 10%, ..., 95%: одна запись на каждые PROGRESS_STEP процентов
+        with self.assertNumQueries(19):
+            for done in range(1, 201):
+                progress(done, 200)
+        job.refresh_from_db()
+        self.assertEqual(job.progress, 95)
+
+    def test_progress_is_reported_while_building(self):
+        for _ in range(3):
+            self.create_participant()
+        job = self.enqueue()
+        reported = []
+
+        with patch("exports.services.ExportProgress.__call__", autospec=True) as progress:
+            progress.side_effect = lambda self, done, total: reported.append(
+                (done, total)
+            )
+            run_export_job(job.id, self.storage)
+
+        self.assertEqual(reported, [(1, 3), (2, 3), (3, 3)])
+
+    def test_program_scores_progress_counts_projects(self):
+        criteria = Criteria.objects.create(
+            partner_program=self.program, name="Score", type="str"
+        )
+        experts = [create_user(prefix="exports-expert") for _ in range(2)]
+        for _ in range(2):
+            project = create_project()
+            for expert in experts:
+                ProjectScore.objects.create(
+                    criteria=criteria, user=expert, project=project, value="5"
+                )
+        job = self.enqueue(kind="program_scores")
+        reported = []
+
+        with patch("exports.services.ExportProgress.__call__", autospec=True) as progress:
+            progress.side_effect = lambda self, done, total: reported.append(
+                (done, total)
+            )
+            job = run_export_job(job.id, self.storage)
+
+        self.assertEqual(job.status, ExportJob.Status.SUCCESS)
+        self.assertEqual(reported, [(1, 2), (2, 2)])
+        self.assertEqual(len(self.read_rows(job)), 5)
+
+
+class CleanupExportJobsTests(ExportJobTestCase):
+    def test_expired_files_are_deleted(self):
+        with patch("exports.tasks.run_export_job_task.delay"):
+            job = enqueue_export(
+                "program_participants", {"program_id": self.program.id}, self.staff
+            )
+        job = run_export_job(job.id, self.storage)
+        ExportJob.objects.filter(pk=job.pk).update(
+            expires_at=timezone.now() - timedelta(minutes=1)
+        )
+        job.refresh_from_db()
+        with self.assertRaises(ExportResultExpired):
+            open_export_result(job, self.storage)
+
+        result = cleanup_export_jobs(self.storage)
+
+        self.assertEqual(result, {"expired": 1, "stale": 0})
+        job.refresh_from_db()
+        self.assertEqual(job.status, ExportJob.Status.EXPIRED)
+        self.assertEqual(list(self.storage.root.iterdir()), [])
+
+    def test_stale_active_jobs_are_failed(self):
+        with patch("exports.tasks.run_export_job_task.delay"):
+            job = enqueue_export("users_emails", {}, self.staff)
+        ExportJob.objects.filter(pk=job.pk).update(
+            datetime_created=timezone.now() - timedelta(days=1)
+        )
+
+        result = cleanup_export_jobs(self.storage)
+
+        self.assertEqual(result, {"expired": 0, "stale": 1})
+        job.refresh_from_db()
+        self.assertEqual(job.status, ExportJob.Status.FAILED)
+
+
+@override_settings(
+    SELECTEL_CONTAINER_NAME="media",
+    EXPORTS_SWIFT_CONTAINER="exports",
+    EXPORTS_SWIFT_URL="https://swift.test/v1/SEL_1/exports/",
+)
+class SwiftExportStorageTests(SimpleTestCase):
+    def test_exports_go_to_private_container_with_expiry(self):
+        client = MagicMock()
+        storage = SwiftExportStorage(client=client, ttl=60)
+
+        storage.save("job/report.xlsx", io.BytesIO(b"data"))
+        storage.delete("job/report.xlsx")
+
+        url = "https://swift.test/v1/SEL_1/exports/job/report.xlsx"
+        client.upload.assert_called_once()
+        self.assertEqual(client.upload.call_args.args[0], url)
+        self.assertEqual(client.upload.call_args.kwargs["size"], 4)
+        self.assertEqual(
+            client.upload.call_args.kwargs["headers"]["X-Delete-After"], "60"
+        )
+        client.delete.assert_called_once_with(url)
+
+    @override_settings(EXPORTS_SWIFT_CONTAINER="media")
+    def test_public_media_container_is_rejected(self):
+        with self.assertRaises(ImproperlyConfigured):
+            SwiftExportStorage(client=MagicMock())
@@ -0,0 +1,15 @@
+from django.urls import path
+
+from exports.views import (
+    ExportJobDetailView,
+    ExportJobDownloadView,
+    ExportJobListCreateView,
+)
+
+app_name = "exports"
+
+urlpatterns = [
+    path("", ExportJobListCreateView.as_view(), name="list"),
+    path("<int:job_id>/", ExportJobDetailView.as_view(), name="detail"),
+    path("<int:job_id>/download/", ExportJobDownloadView.as_view(), name="download"),
+]
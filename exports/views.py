@@ -0,0 +1,87 @@
+from django.http import Http404
+from django.shortcuts import get_object_or_404
+from rest_framework import status
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from core.utils import build_xlsx_streaming_response
+from exports.exceptions import (
+    ExportAccessDenied,
+    ExportNotReady,
+    ExportParamsError,
+    ExportResultExpired,
+    UnknownExportKind,
+)
+from exports.models import ExportJob
+from exports.serializers import ExportJobCreateSerializer, ExportJobSerializer
+from exports.services import can_access_export_job, enqueue_export, open_export_result
+
+EXPORT_JOBS_LIST_LIMIT = 20
+
+
+def export_job_accepted_response(job: ExportJob) -> Response:
+    return Response(ExportJobSerializer(job).data, status=status.HTTP_202_ACCEPTED)
+
+
+def get_accessible_export_job(user, job_id: int) -> ExportJob:
+    job = get_object_or_404(ExportJob, pk=job_id)
+    # Чужое задание не раскрываем даже статусом 403.
+    if not can_access_export_job(user, job):
+        raise Http404
+    return job
+
+
+class ExportJobListCreateView(APIView):
+    """
+    GET - последние выгрузки пользователя.
+    POST {kind, params} - ставит выгрузку в очередь и сразу отвечает 202 с
+    заданием; статус опрашивается через detail, файл - через download.
+    """
+
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        jobs = ExportJob.objects.filter(requested_by=request.user)[
+            :EXPORT_JOBS_LIST_LIMIT
+        ]
+        return Response(ExportJobSerializer(jobs, many=True).data)
+
+    def post(self, request):
+        serializer = ExportJobCreateSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        try:
+            job = enqueue_export(
+                serializer.validated_data["kind"],
+                serializer.validated_data["params"],
+                request.user,
+            )
+        except (UnknownExportKind, ExportParamsError) as e:
+            return Response({"detail": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        except ExportAccessDenied as e:
+            return Response({"detail": str(e)}, status=status.HTTP_403_FORBIDDEN)
+        return export_job_accepted_response(job)
+
+
+class ExportJobDetailView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request, job_id: int):
+        job = get_accessible_export_job(request.user, job_id)
+        return Response(ExportJobSerializer(job).data)
+
+
+class ExportJobDownloadView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request, job_id: int):
+        job = get_accessible_export_job(request.user, job_id)
+        try:
+            file = open_export_result(job)
+        except ExportNotReady as e:
+            return Response(
+                {"detail": str(e), "status": job.status}, status=status.HTTP_409_CONFLICT
+            )
+        except ExportResultExpired as e:
+            return Response({"detail": str(e)}, status=status.HTTP_410_GONE)
+        return build_xlsx_streaming_response(file, base_name=job.file_name)
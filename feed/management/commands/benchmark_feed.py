@@ -0,0 +1,196 @@
+import random
+import time
+import uuid
+from datetime import timedelta
+
+from django.contrib.contenttypes.models import ContentType
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.db.models import Exists, OuterRef, Q, QuerySet
+from django.utils import timezone
+
+from core.benchmarks import LatencySummary
+from core.models import Like
+from feed.services import get_feed_queryset
+from feed.visibility import refresh_news_feed_visibility
+from news.models import News
+from projects.models import Project
+from users.models import CustomUser
+from vacancy.models import Vacancy
+
+MODES = ("subquery", "flag")
+FEED_TYPES = ["project", "vacancy", "news", "customuser"]
+
+
+def get_subquery_feed_queryset(model_names: list[str], user) -> QuerySet[News]:
+    """Прежний запрос /feed/: видимость через NOT IN подзапросы на каждый запрос."""
+    queryset = (
+        News.objects.select_related("content_type")
+        .filter(content_type__model__in=model_names)
+        .annotate(
+            is_user_liked=Exists(
+                Like.objects.filter(
+                    content_type=ContentType.objects.get_for_model(News),
+                    object_id=OuterRef("pk"),
+                    user=user,
+                )
+            )
+        )
+        .order_by("-datetime_created")
+    )
+    existing_object_filters = {
+        "project": Project.objects.filter(draft=False, is_public=True).values_list(
+            "id", flat=True
+        ),
+        "vacancy": Vacancy.objects.filter(
+            is_active=True,
+            project__draft=False,
+            project__is_public=True,
+        ).values_list("id", flat=True),
+    }
+    for model_name, ids_queryset in existing_object_filters.items():
+        queryset = queryset.exclude(
+            Q(content_type__model=model_name) & ~Q(object_id__in=ids_queryset)
+        )
+    return queryset
+
+
+class Command(BaseCommand):
+    help = (
+        "Замерить задержку страницы /feed/ (count + страница) на синтетических "
+        "новостях: NOT IN подзапросы против News.is_feed_visible. "
+        "Данные создаются в транзакции и откатываются после замера."
+    )
+    requires_system_checks = []
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--news",
+            type=int,
+            default=100_000,
+            help="Сколько синтетических новостей создать.",
+        )
+        parser.add_argument(
+            "--projects",
+            type=int,
+            default=5_000,
+            help="Сколько проектов создать (часть из них черновики или приватные).",
+        )
+        parser.add_argument(
+            "--vacancies",
+            type=int,
+            default=2_000,
+            help="Сколько вакансий создать.",
+        )
+        parser.add_argument(
+            "--requests",
+            type=int,
+            default=50,
+            help="Сколько страниц запросить в каждом режиме.",
+        )
+        parser.add_argument(
+            "--max-page",
+            type=int,
+            default=50,
+            help="Страницы выбираются случайно из первых N по 10 записей.",
+        )
+        parser.add_argument(
+            "--mode",
+            choices=(*MODES, "both"),
+            default="both",
+            help="subquery — прежний запрос, flag — News.is_feed_visible.",
+        )
+
+    def handle(self, *args, **options):
+        if min(options["news"], options["projects"], options["requests"]) < 1:
+            raise CommandError("--news, --projects и --requests должны быть >= 1.")
+
+        modes = MODES if options["mode"] == "both" else (options["mode"],)
+        self.stdout.write(
+            f"news={options['news']} projects={options['projects']} "
+            f"vacancies={options['vacancies']} requests={options['requests']}"
+        )
+        with transaction.atomic():
+            user = self._seed(
+                news=options["news"],
+                projects=options["projects"],
+                vacancies=options["vacancies"],
+            )
+            for mode in modes:
+                summary = self._run(
+                    mode,
+                    user=user,
+                    requests=options["requests"],
+                    max_page=options["max_page"],
+                )
+                self.stdout.write(summary.format(mode))
+            transaction.set_rollback(True)
+
+    def _seed(self, *, news: int, projects: int, vacancies: int) -> CustomUser:
+        user = CustomUser.objects.create_user(
+            email=f"feed-benchmark-{uuid.uuid4().hex}@example.com",
+            password=None,
+            first_name="Feed",
+            last_name="Benchmark",
+            birthday="2000-01-01",
+        )
+        project_objects = Project.objects.bulk_create(
+            Project(
+                name=f"Benchmark project {index}",
+                leader=user,
+                draft=index % 5 == 0,
+                is_public=index % 7 != 0,
+            )
+            for index in range(projects)
+        )
+        vacancy_objects = Vacancy.objects.bulk_create(
+            Vacancy(
+                project=random.choice(project_objects),
+                role=f"Benchmark vacancy {index}",
+                description="Benchmark",
+                is_active=index % 3 != 0,
+            )
+            for index in range(vacancies)
+        )
+
+        content_types = ContentType.objects.get_for_models(Project, Vacancy, CustomUser)
+        targets = [
+            (content_types[Project], [project.pk for project in project_objects]),
+            (content_types[Vacancy], [vacancy.pk for vacancy in vacancy_objects] or [0]),
+            (content_types[CustomUser], [user.pk]),
+        ]
+        now = timezone.now()
+        News.objects.bulk_create(
+            (
+                News(
+                    content_type=content_type,
+                    object_id=random.choice(object_ids),
+                    text=f"Benchmark news {index}",
+                    datetime_created=now - timedelta(seconds=index),
+                )
+                for index in range(news)
+                for content_type, object_ids in [random.choice(targets)]
+            ),
+            batch_size=5_000,
+        )
+        # bulk_create обходит сигналы ленты, поэтому флаг считается одним проходом.
+        refresh_news_feed_visibility(Project)
+        refresh_news_feed_visibility(Vacancy)
+        with connection.cursor() as cursor:
+            cursor.execute(f"ANALYZE {News._meta.db_table}")
+        return user
+
+    def _run(self, mode: str, *, user, requests: int, max_page: int) -> LatencySummary:
+        build_queryset = (
+            get_feed_queryset if mode == "flag" else get_subquery_feed_queryset
+        )
+
+        samples = []
+        for _ in range(requests):
+            offset = random.randrange(max_page) * 10
+            started = time.perf_counter()
+            queryset = build_queryset(FEED_TYPES, user).prefetch_related(None)
+            queryset.count()
+            list(queryset[offset:][:10])
+            samples.append(time.perf_counter() - started)
+        return LatencySummary.from_seconds(samples)
@@ -1,11 +1,20 @@
 from rest_framework.pagination import LimitOffsetPagination
 
+from core.pagination import KeysetPagination
 
-class ReactNewsFeedPagination(LimitOffsetPagination):
+
+class ReactNewsFeedOffsetPagination(LimitOffsetPagination):
     default_limit = 10
     max_limit = 100
 
 
+class ReactNewsFeedPagination(KeysetPagination):
+    ordering = ("-datetime_created", "-id")
+    default_limit = ReactNewsFeedOffsetPagination.default_limit
+    max_limit = ReactNewsFeedOffsetPagination.max_limit
+    legacy_pagination_class = ReactNewsFeedOffsetPagination
+
+
 class NewsCommentPagination(LimitOffsetPagination):
     default_limit = 20
     max_limit = 100
@@ -1,5 +1,5 @@
 from django.contrib.contenttypes.models import ContentType
-from django.db.models import Count, Exists, OuterRef, Q, QuerySet, Value
+from django.db.models import Exists, OuterRef, Q, QuerySet, Value
 from django.db.models.functions import Concat
 from django.http import Http404
 from django.shortcuts import get_object_or_404
@@ -29,12 +29,9 @@ def _with_feed_annotations(queryset: QuerySet[News], user) -> QuerySet[News]:
         object_id=OuterRef("pk"),
         user=user,
     )
-    return queryset.annotate(
-        likes_count=Count("likes", distinct=True),
-        comments_count=Count("comments", distinct=True),
-        views_count=Count("views", distinct=True),
-        is_user_liked=Exists(user_like),
-    )
+    # likes_count/comments_count/views_count читаются из денормализованных
+    # полей News, поэтому страница ленты не агрегирует generic-связи.
+    return queryset.annotate(is_user_liked=Exists(user_like))
 
 
 def _content_source(source: str):
@@ -1,4 +1,3 @@
-from django.contrib.contenttypes.models import ContentType
 from django.db import transaction
 from django.shortcuts import get_object_or_404
 from django.utils import timezone
@@ -10,7 +9,6 @@ from rest_framework.response import Response
 from rest_framework.views import APIView
 
 from notifications.events import notify_news_comment_created
-from core.models import Like, View
 from core.services import add_view, set_like
 from feed.news_pagination import NewsCommentPagination, ReactNewsFeedPagination
 from feed.news_selectors import (
@@ -63,16 +61,11 @@ class ReactNewsSetLikedView(APIView):
         serializer.is_valid(raise_exception=True)
         is_liked = serializer.validated_data["is_liked"]
         set_like(news, request.user, is_liked)
-
-        content_type = ContentType.objects.get_for_model(News)
-        likes_count = Like.objects.filter(
-            content_type=content_type,
-            object_id=news.pk,
-        ).count()
+        news.refresh_from_db(fields=["likes_count"])
         return Response(
             {
                 "is_user_liked": is_liked,
-                "likes_count": likes_count,
+                "likes_count": news.likes_count,
             }
         )
 
@@ -84,13 +77,8 @@ class ReactNewsSetViewedView(APIView):
     def post(self, request: Request, news_id: int) -> Response:
         news = get_react_feed_news_or_404(news_id=news_id, user=request.user)
         add_view(news, request.user)
-
-        content_type = ContentType.objects.get_for_model(News)
-        views_count = View.objects.filter(
-            content_type=content_type,
-            object_id=news.pk,
-        ).count()
-        return Response({"views_count": views_count})
+        news.refresh_from_db(fields=["views_count"])
+        return Response({"views_count": news.views_count})
 
 
 class ReactNewsCommentListCreateView(generics.ListCreateAPIView):
@@ -1,6 +1,5 @@
 from rest_framework import serializers
 
-from core.services import get_views_count, get_likes_count
 from feed.mapping import CONTENT_OBJECT_MAPPING, CONTENT_OBJECT_SERIALIZER_MAPPING
 from files.serializers import UserFileSerializer
 from news.mapping import NewsMapping
@@ -34,10 +33,10 @@ class FeedNewsContentSerializer(serializers.ModelSerializer):
         return serializer.data
 
     def get_views_count(self, obj):
-        return get_views_count(obj)
+        return obj.views_count
 
     def get_likes_count(self, obj):
-        return get_likes_count(obj)
+        return obj.likes_count
 
     def get_name(self, obj):
         if obj.content_type.model == CustomUser.__name__.lower():
@@ -49,7 +48,7 @@ class FeedNewsContentSerializer(serializers.ModelSerializer):
         return NewsMapping.get_image_address(obj.content_object)
 
     def get_is_user_liked(self, obj):
-        return obj.id in self.context.get("liked_news")
+        return obj.is_user_liked
 
     class Meta:
         model = News
@@ -1,4 +1,5 @@
 from django.contrib.contenttypes.models import ContentType
+from django.db.models import Exists, OuterRef, QuerySet
 
 from core.models import Like
 from feed.constants import SIGNALS_MODELS
@@ -7,12 +8,29 @@ from news.services import FEED_RECORD_TEXT
 from users.models import CustomUser
 
 
-def get_liked_news(user: CustomUser, queryset: list[News]) -> list[int]:
-    obj_type = ContentType.objects.get_for_model(News)
-    liked_news = Like.objects.filter(
-        content_type=obj_type, object_id__in=[news.id for news in queryset], user=user
-    ).values_list("object_id", flat=True)
-    return liked_news
+def get_feed_queryset(model_names: list[str], user: CustomUser) -> QuerySet[News]:
+    """
+    Записи `/feed/` выбранных типов, новые сверху.
+
+    Видимость проектов и вакансий заранее посчитана в `News.is_feed_visible`
+    (см. `feed.visibility`), поэтому страница читается range scan по
+    частичному индексу, а состояние лайка считается в том же запросе.
+    """
+    user_like = Like.objects.filter(
+        content_type=ContentType.objects.get_for_model(News),
+        object_id=OuterRef("pk"),
+        user=user,
+    )
+    return (
+        News.objects.select_related("content_type")
+        .prefetch_related("content_object", "files")
+        .filter(
+            content_type__in=ContentType.objects.filter(model__in=model_names),
+            is_feed_visible=True,
+        )
+        .annotate(is_user_liked=Exists(user_like))
+        .order_by("-datetime_created")
+    )
 
 
 # signals services
@@ -1,7 +1,10 @@
-from django.db.models.signals import post_save, post_delete
+from django.contrib.contenttypes.models import ContentType
+from django.db.models.signals import post_save, post_delete, pre_save
 from django.dispatch import receiver
 
 from feed.services import create_news_for_model, delete_news_for_model
+from feed.visibility import is_feed_visible, refresh_news_feed_visibility
+from news.models import News
 from projects.models import Project
 
 from vacancy.models import Vacancy
@@ -13,11 +16,13 @@ def create_news_on_save(sender, instance, created, **kwargs):
         create_news_for_model(instance)
     else:
         delete_news_for_model(instance)
+    refresh_news_feed_visibility(Vacancy, [instance.id])
 
 
 @receiver(post_delete, sender=Vacancy)
 def delete_news_vacancy(sender, instance, **kwargs):
     delete_news_for_model(instance)
+    refresh_news_feed_visibility(Vacancy, [instance.id])
 
 
 @receiver(post_save, sender=Project)
@@ -26,8 +31,20 @@ def create_news_on_created_project(sender, instance, created, **kwargs):
         create_news_for_model(instance)
     else:
         delete_news_for_model(instance)
+    # Записи вакансий проекта пересчитывает projects.signals.update_vacancy.
+    refresh_news_feed_visibility(Project, [instance.id])
 
 
 @receiver(post_delete, sender=Project)
 def delete_news_project(sender, instance, **kwargs):
     delete_news_for_model(instance)
+    refresh_news_feed_visibility(Project, [instance.id])
+
+
+@receiver(pre_save, sender=News)
+def set_news_feed_visibility(sender, instance, **kwargs):
+    if instance._state.adding:
+        instance.is_feed_visible = is_feed_visible(
+            ContentType.objects.get_for_id(instance.content_type_id),
+            instance.object_id,
+        )
@@ -1,23 +1,31 @@
 from django.test import TestCase
 
 from core.services import set_like
-from feed.services import create_news_for_model, delete_news_for_model, get_liked_news
+from feed.services import (
+    create_news_for_model,
+    delete_news_for_model,
+    get_feed_queryset,
+)
 from news.models import News
 from news.services import FEED_RECORD_TEXT
 from news.tests.helpers import create_news_for, create_project, create_user
 
 
 class FeedServiceTests(TestCase):
-    def test_get_liked_news_returns_ids_liked_by_user(self):
+    def test_get_feed_queryset_annotates_like_state_of_user(self):
         user = create_user(prefix="feed-liked-user")
         project = create_project(name="Liked feed project")
         liked_news = create_news_for(project, text="Liked feed news")
         other_news = create_news_for(project, text="Other feed news")
         set_like(liked_news, user, True)
 
-        liked_ids = get_liked_news(user, [liked_news, other_news])
+        liked_state = dict(
+            get_feed_queryset(["project"], user)
+            .filter(pk__in=[liked_news.pk, other_news.pk])
+            .values_list("id", "is_user_liked")
+        )
 
-        self.assertEqual(list(liked_ids), [liked_news.id])
+        self.assertEqual(liked_state, {liked_news.pk: True, other_news.pk: False})
 
     def test_create_news_for_model_creates_single_feed_record(self):
         project = create_project(name="Feed record project")
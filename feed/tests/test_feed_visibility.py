@@ -0,0 +1,92 @@
+from datetime import timedelta
+from unittest.mock import patch
+
+from django.test import TestCase
+from django.utils import timezone
+
+from feed.services import create_news_for_model
+from feed.tests.helpers import create_vacancy
+from feed.visibility import refresh_news_feed_visibility
+from news.models import News
+from news.services import FEED_RECORD_TEXT
+from news.tests.helpers import create_news_for, create_partner_program, create_project
+from partner_programs.models import PartnerProgram, PartnerProgramProject
+from partner_programs.services.publishing import publish_finished_program_projects
+from projects.models import Project
+from vacancy.tasks import email_notificate_vacancy_outdated
+
+
+class FeedVisibilityTests(TestCase):
+    def assertVisible(self, news: News, expected: bool):
+        news.refresh_from_db(fields=["is_feed_visible"])
+        self.assertIs(news.is_feed_visible, expected)
+
+    def test_new_news_gets_visibility_of_its_content_object(self):
+        public_news = create_news_for(create_project(), text="Public")
+        private_news = create_news_for(create_project(is_public=False), text="Private")
+        program_news = create_news_for(create_partner_program(), text="Program")
+
+        self.assertVisible(public_news, True)
+        self.assertVisible(private_news, False)
+        self.assertVisible(program_news, True)
+
+    def test_project_changes_refresh_project_and_vacancy_news(self):
+        vacancy = create_vacancy(role="Visibility vacancy")
+        project = vacancy.project
+        project_news = create_news_for(project, text="Project update")
+        vacancy_record = News.objects.get_news(vacancy).get(text=FEED_RECORD_TEXT)
+
+        project.is_public = False
+        project.save(update_fields=["is_public"])
+        self.assertVisible(project_news, False)
+        self.assertVisible(vacancy_record, False)
+
+        project.is_public = True
+        project.save(update_fields=["is_public"])
+        self.assertVisible(project_news, True)
+        self.assertVisible(vacancy_record, True)
+
+    def test_deleted_project_hides_its_remaining_news(self):
+        project = create_project()
+        project_news = create_news_for(project, text="Orphan soon")
+
+        project.delete()
+
+        self.assertVisible(project_news, False)
+
+    def test_bulk_updates_outside_signals_refresh_visibility(self):
+        vacancy = create_vacancy(role="Outdated vacancy")
+        vacancy_record = News.objects.get_news(vacancy).get(text=FEED_RECORD_TEXT)
+        type(vacancy).objects.filter(pk=vacancy.pk).update(
+            datetime_created=vacancy.datetime_created.replace(year=2000)
+        )
+
+        with patch("vacancy.tasks.send_email.delay"):
+            email_notificate_vacancy_outdated()
+
+        self.assertVisible(vacancy_record, False)
+
+    def test_publishing_finished_program_projects_shows_their_news(self):
+        program = create_partner_program()
+        PartnerProgram.objects.filter(pk=program.pk).update(
+            publish_projects_after_finish=True,
+            datetime_finished=timezone.now() - timedelta(days=1),
+        )
+        project = create_project(is_public=False)
+        create_news_for_model(project)
+        PartnerProgramProject.objects.create(partner_program=program, project=project)
+        record = News.objects.get_news(project).get(text=FEED_RECORD_TEXT)
+        self.assertVisible(record, False)
+
+        publish_finished_program_projects()
+
+        self.assertVisible(record, True)
+
+    def test_refresh_without_ids_recomputes_every_record(self):
+        project = create_project()
+        news = create_news_for(project, text="Drifted")
+        Project.objects.filter(pk=project.pk).update(draft=True)
+
+        refresh_news_feed_visibility(Project)
+
+        self.assertVisible(news, False)
@@ -126,6 +126,30 @@ class ReactNewsFeedAPITests(TestCase):
             [oldest.pk],
         )
 
+    def test_cursor_pagination_has_no_count_and_survives_new_posts(self):
+        program = create_partner_program(name="Cursor program")
+        same_time = timezone.now() - timedelta(hours=1)
+        posts = [create_news_for(program, text=f"Post {index}") for index in range(3)]
+        News.objects.filter(pk__in=[post.pk for post in posts]).update(
+            datetime_created=same_time
+        )
+
+        first_page = self.client.get("/feed/news/?limit=2")
+        create_news_for(program, text="Fresh post")
+        second_page = self.client.get(first_page.data["next"])
+
+        self.assertEqual(first_page.status_code, 200)
+        self.assertEqual(set(first_page.data), {"next", "previous", "results"})
+        self.assertEqual(
+            [item["id"] for item in first_page.data["results"]],
+            [posts[2].pk, posts[1].pk],
+        )
+        self.assertEqual(
+            [item["id"] for item in second_page.data["results"]],
+            [posts[0].pk],
+        )
+        self.assertIsNone(second_page.data["next"])
+
     def test_search_matches_text_and_source_name_inside_selected_tab(self):
         matching_program = create_partner_program(name="Quantum accelerator")
         name_match = create_news_for(matching_program, text="General update")
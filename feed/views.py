@@ -1,11 +1,9 @@
-from django.db.models import Q, QuerySet
+from django.db.models import QuerySet
 from rest_framework.views import APIView
 
 from feed.pagination import FeedPagination
-from feed.services import get_liked_news
+from feed.services import get_feed_queryset
 from news.models import News
-from projects.models import Project
-from vacancy.models import Vacancy
 
 from .serializers import FeedItemResponseSerializer
 
@@ -28,42 +26,14 @@ class NewSimpleFeed(APIView):
         ]
 
     def get_queryset(self) -> QuerySet[News]:
-        filters = self._get_filter_data()
-
-        queryset = (
-            News.objects.select_related("content_type")
-            .prefetch_related("content_object", "files")
-            .filter(content_type__model__in=filters)
-            .order_by("-datetime_created")
-        )
-
-        existing_object_filters = {
-            "project": Project.objects.filter(draft=False, is_public=True).values_list(
-                "id", flat=True
-            ),
-            "vacancy": Vacancy.objects.filter(
-                is_active=True,
-                project__draft=False,
-                project__is_public=True,
-            ).values_list("id", flat=True),
-        }
-        for model_name, ids_queryset in existing_object_filters.items():
-            queryset = queryset.exclude(
-                Q(content_type__model=model_name)
-                & ~Q(object_id__in=ids_queryset)
-            )
-
-        return queryset
+        return get_feed_queryset(self._get_filter_data(), self.request.user)
 
     def get(self, *args, **kwargs):
         paginator = self.pagination_class()
         paginated_data = paginator.paginate_queryset(self.get_queryset(), self.request)
         serializer = FeedItemResponseSerializer(
             paginated_data,
-            context={
-                "user": self.request.user,
-                "liked_news": get_liked_news(self.request.user, paginated_data),
-            },
+            context={"user": self.request.user},
             many=True,
         )
         return paginator.get_paginated_response(serializer.data)
@@ -0,0 +1,55 @@
+from typing import Iterable
+
+from django.contrib.contenttypes.models import ContentType
+from django.db.models import Exists, OuterRef, QuerySet
+
+from news.models import News
+from projects.models import Project
+from vacancy.models import Vacancy
+
+
+def get_feed_visible_projects() -> QuerySet[Project]:
+    return Project.objects.filter(draft=False, is_public=True)
+
+
+def get_feed_visible_vacancies() -> QuerySet[Vacancy]:
+    return Vacancy.objects.filter(
+        is_active=True,
+        project__draft=False,
+        project__is_public=True,
+    )
+
+
+FEED_VISIBILITY_QUERYSETS = {
+    Project: get_feed_visible_projects,
+    Vacancy: get_feed_visible_vacancies,
+}
+
+
+def is_feed_visible(content_type: ContentType, object_id: int) -> bool:
+    """Видна ли в `/feed/` запись, привязанная к объекту `content_type/object_id`."""
+    visible_queryset = FEED_VISIBILITY_QUERYSETS.get(content_type.model_class())
+    if visible_queryset is None:
+        return True
+    return visible_queryset().filter(pk=object_id).exists()
+
+
+def refresh_news_feed_visibility(
+    model: type[Project] | type[Vacancy],
+    object_ids: Iterable[int] | None = None,
+) -> int:
+    """
+    Пересчитывает `News.is_feed_visible` для записей проектов или вакансий.
+
+    `object_ids=None` пересчитывает все записи модели. Вызывается сигналами
+    `feed.signals`/`projects.signals` и кодом, который меняет видимость
+    массовым `update()` в обход сигналов.
+    """
+    news = News.objects.filter(content_type=ContentType.objects.get_for_model(model))
+    if object_ids is not None:
+        object_ids = list(object_ids)
+        if not object_ids:
+            return 0
+        news = news.filter(object_id__in=object_ids)
+    visible_objects = FEED_VISIBILITY_QUERYSETS[model]().filter(pk=OuterRef("object_id"))
+    return news.update(is_feed_visible=Exists(visible_objects))
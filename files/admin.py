@@ -4,6 +4,7 @@ from django.contrib import admin
 from django.forms import ModelForm, FileField
 from django.db.models import QuerySet
 
+from files.images import delete_user_file
 from files.service import CDN, SelectelSwiftStorage
 from files.models import UserFile
 
@@ -75,13 +76,11 @@ class UserFileAdmin(admin.ModelAdmin):
         super().save_model(request, obj, form, change)
 
     def delete_model(self, request, obj):
-        self.cdn.delete(obj.link)
-        obj.delete()
+        delete_user_file(self.cdn.storage, obj)
 
     def delete_queryset(self, request, queryset):
         for obj in queryset:
-            self.cdn.delete(obj.link)
-        queryset.delete()
+            delete_user_file(self.cdn.storage, obj)
 
     def get_queryset(self, request) -> QuerySet[UserFile]:
         qs = super().get_queryset(request)
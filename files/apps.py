@@ -5,3 +5,6 @@ class FilesConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "files"
     verbose_name = "Файлы"
+
+    def ready(self):
+        import files.signals  # noqa: F401
@@ -1,2 +1,6 @@
 class SelectelUploadError(Exception):
     pass
+
+
+class SelectelDownloadError(Exception):
+    pass
@@ -1,9 +1,34 @@
+import hashlib
+import uuid
+
 import webp
 from PIL import Image
 
 
-def convert_image_to_webp(image, quality: int = 70):
+def encode_webp(pil_image: Image.Image, quality: int = 70):
     config = webp.WebPConfig.new(preset=webp.WebPPreset.PHOTO, quality=quality)
-    pil_image = Image.open(image.file)
     webp_image = webp.WebPPicture.from_pil(pil_image)
     return webp_image.encode(config)
+
+
+def convert_image_to_webp(image, quality: int = 70):
+    pil_image = Image.open(image.file)
+    return encode_webp(pil_image, quality)
+
+
+def hash_uploaded_file(file) -> str:
+    """sha256 of an uploaded file, read chunk by chunk"""
+    digest = hashlib.sha256()
+    for chunk in file.chunks():
+        digest.update(chunk)
+    return digest.hexdigest()
+
+
+def get_object_url(link: str) -> str:
+    """Url of the stored object behind a file link, without the upload suffix"""
+    return link.split("?", 1)[0]
+
+
+def make_upload_link(object_url: str) -> str:
+    """Link of one more upload of an already stored object, unique per upload"""
+    return f"{object_url}?upload={uuid.uuid4().hex}"
@@ -0,0 +1,166 @@
+import io
+from urllib.parse import urlsplit
+
+from django.apps import apps
+from django.conf import settings
+from django.db.models import Model, Q
+from PIL import Image, ImageOps
+
+from files.helpers import encode_webp, get_object_url
+from files.models import UserFile
+from files.service import Storage
+
+WEBP_QUALITY = 70
+# name -> max side in px; None keeps the original size
+IMAGE_DERIVATIVES = {
+    "webp": None,
+    "thumbnail_1280": 1280,
+    "thumbnail_512": 512,
+    "thumbnail_128": 128,
+}
+# uploads with these extensions are stored as is and get derivatives later
+TRANSCODED_EXTENSIONS = (".jpg", ".jpeg", ".png")
+# model label -> fields that keep a link to an uploaded image; the link is
+# switched to the WebP version on save and once process_image builds it
+IMAGE_LINK_FIELDS = {
+    "users.CustomUser": ("avatar",),
+    "projects.Project": ("image_address", "cover_image_address"),
+    "partner_programs.PartnerProgram": (
+        "image_address",
+        "cover_image_address",
+        "advertisement_image_address",
+    ),
+    "events.Event": ("cover_url",),
+}
+
+
+def build_image_derivatives(
+    storage: Storage, content: bytes, content_hash: str
+) -> dict[str, str]:
+    """
+    Decodes the image once and uploads its WebP version and thumbnails.
+
+    A thumbnail that is not smaller than the image itself links to the full WebP.
+    """
+    with Image.open(io.BytesIO(content)) as source:
+        image = ImageOps.exif_transpose(source)
+        has_alpha = "A" in image.getbands() or "transparency" in image.info
+        image = image.convert("RGBA" if has_alpha else "RGB")
+
+    derivatives = {}
+    for name, max_side in IMAGE_DERIVATIVES.items():
+        if max_side is not None and max_side >= max(image.size):
+            derivatives[name] = derivatives["webp"]
+            continue
+        variant = image
+        if max_side is not None:
+            variant = image.copy()
+            variant.thumbnail((max_side, max_side))
+        url = storage.generate_derivative_url(content_hash, name)
+        storage.put(url, encode_webp(variant, WEBP_QUALITY).buffer(), "image/webp")
+        derivatives[name] = url
+    return derivatives
+
+
+def get_cached_derivatives(content_hash: str) -> dict[str, str]:
+    """Derivatives already built for the same content by any earlier upload"""
+    return (
+        UserFile.objects.filter(content_hash=content_hash)
+        .exclude(derivatives={})
+        .values_list("derivatives", flat=True)
+        .first()
+    ) or {}
+
+
+def process_image(storage: Storage, link: str) -> dict[str, str]:
+    """
+    Fills `UserFile.derivatives` for an uploaded image.
+
+    Transcoding happens only for content that has never been seen before,
+    re-uploads of the same image reuse derivatives of the earlier file.
+    """
+    user_file = UserFile.objects.filter(link=link).first()
+    if user_file is None or not user_file.content_hash:
+        return {}
+    if user_file.derivatives:
+        return user_file.derivatives
+
+    derivatives = get_cached_derivatives(user_file.content_hash)
+    if not derivatives:
+        content = storage.download(get_object_url(link))
+        derivatives = build_image_derivatives(storage, content, user_file.content_hash)
+
+    UserFile.objects.filter(content_hash=user_file.content_hash, derivatives={}).update(
+        derivatives=derivatives
+    )
+    links = list(
+        UserFile.objects.filter(content_hash=user_file.content_hash).values_list(
+            "link", flat=True
+        )
+    )
+    replace_image_links(links, derivatives["webp"])
+    return derivatives
+
+
+def get_webp_link(link: str | None) -> str | None:
+    """
+    Link of the WebP version of an uploaded image, if it is already built.
+
+    Any other link is returned as is, and only links of untranscoded uploads
+    cost a query.
+    """
+    if not link or not link.startswith(settings.SELECTEL_SWIFT_URL):
+        return link
+    if not urlsplit(link).path.lower().endswith(TRANSCODED_EXTENSIONS):
+        return link
+    derivatives = (
+        UserFile.objects.filter(link=link).values_list("derivatives", flat=True).first()
+    )
+    return (derivatives or {}).get("webp", link)
+
+
+def use_webp_links(instance: Model, update_fields=None) -> None:
+    """Swaps image links of an instance from IMAGE_LINK_FIELDS for ready WebP versions"""
+    for field in IMAGE_LINK_FIELDS.get(instance._meta.label, ()):
+        if update_fields is None or field in update_fields:
+            setattr(instance, field, get_webp_link(getattr(instance, field)))
+
+
+def replace_image_links(links: list[str], webp_link: str) -> None:
+    """
+    Switches links stored before the WebP version was built to it.
+
+    Rows are saved one by one, so post_save receivers drop cached copies.
+    """
+    for label, fields in IMAGE_LINK_FIELDS.items():
+        model = apps.get_model(label)
+        for field in fields:
+            for instance in model.objects.filter(**{f"{field}__in": links}):
+                setattr(instance, field, webp_link)
+                instance.save(update_fields=[field])
+
+
+def delete_user_file(storage: Storage, user_file: UserFile) -> None:
+    """
+    Deletes the file with its stored object and derivatives.
+
+    Re-uploads of the same content share one object, so it is deleted only with
+    the last file that links to it.
+    """
+    object_url = get_object_url(user_file.link)
+    user_file.delete()
+    if not UserFile.objects.filter(
+        Q(link=object_url) | Q(link__startswith=f"{object_url}?")
+    ).exists():
+        storage.delete(object_url, user_file.size)
+    delete_unused_derivatives(storage, user_file)
+
+
+def delete_unused_derivatives(storage: Storage, user_file: UserFile) -> None:
+    """Deletes derivatives of a removed file unless another file shares them"""
+    if not user_file.derivatives:
+        return
+    if UserFile.objects.filter(content_hash=user_file.content_hash).exists():
+        return
+    for url in set(user_file.derivatives.values()):
+        storage.delete(url)
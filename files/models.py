@@ -15,6 +15,8 @@ class UserFile(models.Model):
         name: Name of the file
         extension: Extension of the file
         size: Size of the file in bytes
+        content_hash: sha256 of the uploaded content, used to dedupe re-uploads
+        derivatives: WebP versions of an image, {name: link}, filled in the background
     """
 
     link = models.URLField(primary_key=True, null=False)
@@ -28,6 +30,8 @@ class UserFile(models.Model):
     extension = models.TextField(blank=True, default="")
     mime_type = models.CharField(max_length=256, default="")
     size = models.PositiveBigIntegerField(null=False, blank=True, default=1)
+    content_hash = models.CharField(max_length=64, blank=True, default="", db_index=True)
+    derivatives = models.JSONField(default=dict, blank=True, editable=False)
 
     def __str__(self):
         filename_with_extension = f"{self.name}.{self.extension}"
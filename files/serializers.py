@@ -14,4 +14,5 @@ class UserFileSerializer(ModelSerializer):
             "link",
             "user",
             "datetime_uploaded",
+            "derivatives",
         ]
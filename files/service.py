@@ -1,15 +1,14 @@
 import time
 from abc import ABC, abstractmethod
 
-import requests
-from django.conf import settings
 from django.contrib.auth import get_user_model
 from django.core.files.uploadedfile import InMemoryUploadedFile, TemporaryUploadedFile
 from requests import Response
 
 from files.constants import SUPPORTED_IMAGES_TYPES
-from files.exceptions import SelectelUploadError
+from files.exceptions import SelectelDownloadError, SelectelUploadError
 from files.helpers import convert_image_to_webp
+from files.swift import SwiftClient, get_swift_client
 from files.typings import FileInfo
 from procollab.settings import SELECTEL_SWIFT_URL
 
@@ -18,16 +17,20 @@ User = get_user_model()
 
 class File:
     def __init__(
-        self, file: TemporaryUploadedFile | InMemoryUploadedFile, quality: int = 70
+        self,
+        file: TemporaryUploadedFile | InMemoryUploadedFile,
+        quality: int = 70,
+        transcode_images: bool = True,
     ):
         self.size = file.size
         self.name = File._get_name(file)
         self.extension = File._get_extension(file)
+        # not read() here: TemporaryUploadedFile is streamed to storage from disk
         self.buffer = file.open(mode="rb")
         self.content_type = file.content_type
 
         # we can compress given type of image
-        if self.content_type in SUPPORTED_IMAGES_TYPES:
+        if transcode_images and self.content_type in SUPPORTED_IMAGES_TYPES:
             webp_image = convert_image_to_webp(file, quality)
             self.buffer = webp_image.buffer()
             self.size = webp_image.size
@@ -50,18 +53,36 @@ class File:
 
 class Storage(ABC):
     @abstractmethod
-    def delete(self, url: str) -> Response:
-        pass
+    def delete(self, url: str, size: int | None = None) -> Response:
+        """`size` in bytes, when known, saves a HEAD to tell large objects apart"""
 
     @abstractmethod
     def upload(self, file: File, user: User) -> FileInfo:
         pass
 
+    @abstractmethod
+    def download(self, url: str) -> bytes:
+        pass
+
+    @abstractmethod
+    def put(self, url: str, data: bytes, content_type: str) -> None:
+        pass
+
+    @abstractmethod
+    def generate_derivative_url(self, content_hash: str, name: str) -> str:
+        pass
+
 
 class SelectelSwiftStorage(Storage):
-    def delete(self, url: str) -> Response:
-        token = self._get_auth_token()
-        return requests.delete(url, headers={"X-Auth-Token": token})
+    def __init__(self, client: SwiftClient | None = None) -> None:
+        self._client = client
+
+    @property
+    def client(self) -> SwiftClient:
+        return self._client or get_swift_client()
+
+    def delete(self, url: str, size: int | None = None) -> Response:
+        return self.client.delete(url, size=size)
 
     def upload(self, file: File, user: User) -> FileInfo:
         url = self._upload(file, user)
@@ -73,18 +94,47 @@ class SelectelSwiftStorage(Storage):
             size=file.size,
         )
 
+    def download(self, url: str) -> bytes:
+        response = self.client.get(url)
+        if not response.ok:
+            raise SelectelDownloadError(
+                f"Couldn't download a file from Selectel Swift API (selcdn): "
+                f"{response.status_code}"
+            )
+        return response.content
+
+    def put(self, url: str, data: bytes, content_type: str) -> None:
+        response = self.client.upload(
+            url, data, size=len(data), headers={"Content-Type": content_type}
+        )
+        if not response.ok:
+            raise SelectelUploadError(
+                f"Couldn't upload a file to Selectel Swift API (selcdn): "
+                f"{response.status_code}"
+            )
+
+    def generate_derivative_url(self, content_hash: str, name: str) -> str:
+        """
+        Generates url of an image derivative, shared by every file with the same content
+        Returns:
+            url: str looks like /derivatives/contentHash/name.webp
+        """
+        return f"{SELECTEL_SWIFT_URL}derivatives/{content_hash}/{name}.webp"
+
     def _upload(self, file: File, user: User) -> str:
-        token = self._get_auth_token()
         url = self._generate_url(file, user)
 
-        requests.put(
+        response = self.client.upload(
             url,
-            headers={
-                "X-Auth-Token": token,
-                "Content-Type": file.content_type,
-            },
-            data=file.buffer,
+            file.buffer,
+            size=file.size,
+            headers={"Content-Type": file.content_type},
         )
+        if not response.ok:
+            raise SelectelUploadError(
+                f"Couldn't upload a file to Selectel Swift API (selcdn): "
+                f"{response.status_code}"
+            )
 
         return url
 
@@ -102,44 +152,25 @@ class SelectelSwiftStorage(Storage):
             f".{file.extension}"
         )
 
-    @staticmethod
-    def _get_auth_token():
+    def _get_auth_token(self) -> str:
         """
-        Returns auth token
+        Returns auth token (cached process-wide until it expires)
         """
-
-        data = {
-            "auth": {
-                "identity": {
-                    "methods": ["password"],
-                    "password": {
-                        "user": {
-                            "id": settings.SELECTEL_CONTAINER_USERNAME,
-                            "password": settings.SELECTEL_CONTAINER_PASSWORD,
-                        }
-                    },
-                }
-            }
-        }
-        response = requests.post(settings.SELECTEL_AUTH_TOKEN_URL, json=data)
-        if response.status_code not in [200, 201]:
-            raise SelectelUploadError(
-                "Couldn't generate a token for Selectel Swift API (selcdn)"
-            )
-        return response.headers["x-subject-token"]
+        return self.client.get_token()
 
 
 class CDN:
     def __init__(self, storage: Storage) -> None:
         self.storage = storage
 
-    def delete(self, url: str) -> Response:
-        return self.storage.delete(url)
+    def delete(self, url: str, size: int | None = None) -> Response:
+        return self.storage.delete(url, size)
 
     def upload(
         self,
         file: TemporaryUploadedFile | InMemoryUploadedFile,
         user: User,
         quality: int = 70,
+        transcode_images: bool = True,
     ) -> FileInfo:
-        return self.storage.upload(File(file, quality), user)
+        return self.storage.upload(File(file, quality, transcode_images), user)
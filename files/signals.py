@@ -0,0 +1,10 @@
+from django.db.models.signals import pre_save
+from django.dispatch import receiver
+
+from files.images import use_webp_links
+
+
+@receiver(pre_save)
+def use_webp_image_links(sender, instance, update_fields=None, **kwargs):
+    """Image links from IMAGE_LINK_FIELDS are stored as WebP once it is built."""
+    use_webp_links(instance, update_fields)
@@ -0,0 +1,402 @@
+import io
+import json
+import threading
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from functools import lru_cache
+from typing import Any
+from urllib.parse import unquote, urlsplit
+
+import requests
+from django.conf import settings
+from requests import Response
+from requests.adapters import HTTPAdapter
+
+from files.exceptions import SelectelUploadError
+
+# Keystone v3 выдает токен на сутки; если срок не пришел в ответе, считаем
+# его заметно короче, чтобы не упереться в 401 на середине загрузки.
+DEFAULT_TOKEN_TTL_SECONDS = 60 * 60
+TOKEN_REFRESH_MARGIN_SECONDS = 60
+RETRY_STATUSES = frozenset({500, 502, 503, 504})
+DEFAULT_SEGMENT_SIZE = 256 * 1024 * 1024
+SEGMENTS_SUFFIX = ".segments"
+
+
+@dataclass(slots=True, frozen=True)
+class SwiftToken:
+    value: str
+    expires_at: float  # time.monotonic()
+
+    def is_fresh(self, margin: float = TOKEN_REFRESH_MARGIN_SECONDS) -> bool:
+        return time.monotonic() + margin < self.expires_at
+
+
+class SwiftClient:
+    """
+    HTTP-клиент Selectel Swift (selcdn) с общим пулом соединений.
+
+    - токен Keystone кешируется до истечения и обновляется под блокировкой,
+      так что параллельные загрузки не запрашивают его одновременно;
+    - запросы идут через один `requests.Session` с keep-alive пулом;
+    - у каждого запроса есть таймаут, сетевые ошибки и 5xx повторяются
+      ограниченное число раз с экспоненциальной паузой, 401 один раз
+      повторяется с новым токеном;
+    - файлы больше `segment_size` загружаются как Static Large Object:
+      сегменты по очереди, затем манифест; срок удаления объекта получают
+      и сегменты.
+    """
+
+    def __init__(
+        self,
+        auth_url: str,
+        username: str,
+        password: str,
+        *,
+        timeout: float | tuple[float, float] = (5, 60),
+        retries: int = 2,
+        backoff: float = 0.5,
+        pool_size: int = 10,
+        segment_size: int = DEFAULT_SEGMENT_SIZE,
+    ):
+        self.auth_url = auth_url
+        self.username = username
+        self.password = password
+        self.timeout = timeout
+        self.retries = retries
+        self.backoff = backoff
+        self.segment_size = segment_size
+
+        self.session = requests.Session()
+        # Повторы делаем сами: urllib3 не умеет перематывать тело PUT.
+        adapter = HTTPAdapter(
+            pool_connections=pool_size, pool_maxsize=pool_size, max_retries=0
+        )
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+        self._token: SwiftToken | None = None
+        self._token_lock = threading.Lock()
+
+    def get_token(self) -> str:
+        token = self._token
+        if token is not None and token.is_fresh():
+            return token.value
+        with self._token_lock:
+            token = self._token
+            if token is None or not token.is_fresh():
+                token = self._token = self._authenticate()
+        return token.value
+
+    def invalidate_token(self, value: str | None = None) -> None:
+        """Сбрасывает токен; с `value` - только если его еще никто не обновил."""
+        with self._token_lock:
+            if value is None or (self._token and self._token.value == value):
+                self._token = None
+
+    def get(self, url: str, *, stream: bool = False) -> Response:
+        """С `stream=True` тело не читается заранее: его отдают через `response.raw`."""
+        return self.request("GET", url, stream=stream)
+
+    def put(self, url: str, data: Any, headers: dict[str, str] | None = None) -> Response:
+        return self.request("PUT", url, data=data, headers=headers)
+
+    def head(self, url: str) -> Response:
+        return self.request("HEAD", url)
+
+    def delete(self, url: str, *, size: int | None = None) -> Response:
+        """
+        Удаляет объект; Static Large Object - вместе с сегментами.
+
+        SLO узнается по `size` больше `segment_size` или, если размер неизвестен,
+        по заголовку `X-Static-Large-Object` из HEAD. Удаление SLO - bulk-запрос,
+        который отвечает 200 даже при ошибках, поэтому статус ответа берется
+        из его тела.
+        """
+        if size is None:
+            head = self.head(url)
+            if not head.ok:
+                return head
+            is_large = head.headers.get("X-Static-Large-Object", "").lower() == "true"
+        else:
+            is_large = size > self.segment_size
+        if not is_large:
+            return self.request("DELETE", url)
+        response = self.request(
+            "DELETE",
+            f"{url}?multipart-manifest=delete",
+            headers={"Accept": "application/json"},
+        )
+        if response.ok and response.content:
+            _apply_bulk_delete_status(response)
+        return response
+
+    def upload(
+        self,
+        url: str,
+        data: Any,
+        *,
+        size: int,
+        headers: dict[str, str] | None = None,
+    ) -> Response:
+        """
+        Загружает объект потоком, не читая его в память целиком.
+
+        Тело отправляется блоками из файла; если `size` больше `segment_size`,
+        объект режется на сегменты и собирается манифестом SLO.
+        """
+        if size <= self.segment_size:
+            return self.put(url, data, headers)
+        if isinstance(data, (bytes, bytearray, memoryview)):
+            data = io.BytesIO(data)
+        return self._upload_large_object(url, data, size=size, headers=headers)
+
+    def request(
+        self,
+        method: str,
+        url: str,
+        *,
+        data: Any = None,
+        headers: dict[str, str] | None = None,
+        stream: bool = False,
+    ) -> Response:
+        start_position = data.tell() if _is_seekable(data) else None
+        reauthenticated = False
+        attempt = 0
+        while True:
+            if start_position is not None:
+                data.seek(start_position)
+            token = self.get_token()
+            try:
+                response = self.session.request(
+                    method,
+                    url,
+                    data=data,
+                    headers={**(headers or {}), "X-Auth-Token": token},
+                    timeout=self.timeout,
+                    stream=stream,
+                )
+            except (requests.ConnectionError, requests.Timeout):
+                if attempt >= self.retries or not self._can_resend(data, start_position):
+                    raise
+            else:
+                if response.status_code == 401 and not reauthenticated:
+                    self.invalidate_token(token)
+                    reauthenticated = True
+                    if self._can_resend(data, start_position):
+                        response.close()
+                        continue
+                    return response
+                if (
+                    response.status_code not in RETRY_STATUSES
+                    or attempt >= self.retries
+                    or not self._can_resend(data, start_position)
+                ):
+                    return response
+                # Незакрытый потоковый ответ держит соединение вне пула.
+                response.close()
+            time.sleep(self.backoff * 2**attempt)
+            attempt += 1
+
+    def _upload_large_object(
+        self,
+        url: str,
+        data: Any,
+        *,
+        size: int,
+        headers: dict[str, str] | None,
+    ) -> Response:
+        start = data.tell()
+        headers = _absolute_expiry(headers)
+        # Сегменты истекают вместе с манифестом, иначе после него они
+        # остаются в контейнере навсегда.
+        segment_headers = {
+            name: value
+            for name, value in (headers or {}).items()
+            if name.lower() == "x-delete-at"
+        }
+        manifest = []
+        for index, offset in enumerate(range(0, size, self.segment_size)):
+            segment_url = f"{url}{SEGMENTS_SUFFIX}/{index:08d}"
+            segment = FileSegment(
+                data, start + offset, min(self.segment_size, size - offset)
+            )
+            response = self.put(segment_url, segment, segment_headers or None)
+            if not response.ok:
+                self._delete_segments(url, len(manifest))
+                return response
+            manifest.append(
+                {
+                    "path": _object_path(segment_url),
+                    "etag": response.headers.get("Etag", "").strip('"') or None,
+                    "size_bytes": len(segment),
+                }
+            )
+
+        response = self.put(
+            f"{url}?multipart-manifest=put",
+            json.dumps(manifest).encode(),
+            headers,
+        )
+        if not response.ok:
+            self._delete_segments(url, len(manifest))
+        return response
+
+    def _delete_segments(self, url: str, count: int) -> None:
+        """Убирает уже загруженные сегменты неудавшейся загрузки."""
+        for index in range(count):
+            try:
+                self.request("DELETE", f"{url}{SEGMENTS_SUFFIX}/{index:08d}")
+            except (requests.ConnectionError, requests.Timeout):
+                pass
+
+    def _authenticate(self) -> SwiftToken:
+        payload = {
+            "auth": {
+                "identity": {
+                    "methods": ["password"],
+                    "password": {
+                        "user": {"id": self.username, "password": self.password}
+                    },
+                }
+            }
+        }
+        try:
+            response = self.session.post(
+                self.auth_url, json=payload, timeout=self.timeout
+            )
+        except (requests.ConnectionError, requests.Timeout) as e:
+            raise SelectelUploadError(
+                "Couldn't generate a token for Selectel Swift API (selcdn)"
+            ) from e
+        if response.status_code not in [200, 201]:
+            raise SelectelUploadError(
+                "Couldn't generate a token for Selectel Swift API (selcdn)"
+            )
+        return SwiftToken(
+            value=response.headers["x-subject-token"],
+            expires_at=time.monotonic() + _token_ttl(response),
+        )
+
+    @staticmethod
+    def _can_resend(data: Any, start_position: int | None) -> bool:
+        # Итератор/генератор уже прочитан: повторить такой запрос нельзя.
+        return (
+            data is None
+            or isinstance(data, (bytes, bytearray, memoryview, str))
+            or (start_position is not None)
+        )
+
+
+class FileSegment(io.RawIOBase):
+    """
+    Окно `[offset, offset + length)` файла для загрузки одного сегмента.
+
+    `requests` берет длину из `__len__` и читает тело блоками, так что в памяти
+    одновременно находится только один блок; `seek` позволяет повторить
+    запрос сегмента.
+    """
+
+    def __init__(self, file, offset: int, length: int):
+        super().__init__()
+        self.file = file
+        self.offset = offset
+        self.length = length
+        self.position = 0
+
+    def __len__(self) -> int:
+        return self.length
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    def tell(self) -> int:
+        return self.position
+
+    def seek(self, position: int, whence: int = io.SEEK_SET) -> int:
+        base = {io.SEEK_SET: 0, io.SEEK_CUR: self.position, io.SEEK_END: self.length}
+        self.position = min(max(base[whence] + position, 0), self.length)
+        return self.position
+
+    def read(self, size: int = -1) -> bytes:
+        remaining = self.length - self.position
+        if size is None or size < 0 or size > remaining:
+            size = remaining
+        if size == 0:
+            return b""
+        self.file.seek(self.offset + self.position)
+        chunk = self.file.read(size)
+        self.position += len(chunk)
+        return chunk
+
+
+def _object_path(url: str) -> str:
+    """`https://host/v1/<account>/<container>/<object>` -> `/<container>/<object>`."""
+    return "/" + unquote(urlsplit(url).path).split("/", 3)[3]
+
+
+def _absolute_expiry(headers: dict[str, str] | None) -> dict[str, str] | None:
+    """
+    Заменяет `X-Delete-After` на `X-Delete-At`, отсчитанный от начала загрузки.
+
+    Сегменты грузятся по очереди, и относительный срок у каждого отсчитывался
+    бы от своего PUT; с абсолютным все части объекта истекают одновременно.
+    """
+    if not headers:
+        return headers
+    result = {}
+    for name, value in headers.items():
+        if name.lower() == "x-delete-after":
+            result["X-Delete-At"] = str(int(time.time()) + int(value))
+        else:
+            result[name] = value
+    return result
+
+
+def _apply_bulk_delete_status(response: Response) -> None:
+    """Переносит в `status_code` итог bulk-удаления из JSON-тела ответа."""
+    try:
+        result = response.json()
+        status = int(result["Response Status"].split()[0])
+    except (ValueError, KeyError, TypeError, AttributeError, IndexError):
+        response.status_code = 502
+        return
+    if result.get("Errors") and status < 400:
+        status = 502
+    response.status_code = status
+
+
+def _is_seekable(data: Any) -> bool:
+    try:
+        return bool(data.seekable()) if hasattr(data, "seekable") else False
+    except (OSError, ValueError):
+        return False
+
+
+def _token_ttl(response: Response) -> float:
+    try:
+        expires_at = response.json()["token"]["expires_at"]
+        expires = datetime.fromisoformat(expires_at.replace("Z", "+00:00"))
+        return max(0.0, expires.timestamp() - time.time())
+    except (ValueError, KeyError, TypeError, AttributeError):
+        return DEFAULT_TOKEN_TTL_SECONDS
+
+
+@lru_cache(maxsize=None)
+def get_swift_client() -> SwiftClient:
+    """Общий на процесс клиент: один пул соединений и один кеш токена."""
+    return SwiftClient(
+        settings.SELECTEL_AUTH_TOKEN_URL,
+        settings.SELECTEL_CONTAINER_USERNAME,
+        settings.SELECTEL_CONTAINER_PASSWORD,
+        timeout=(
+            settings.SELECTEL_CONNECT_TIMEOUT_SECONDS,
+            settings.SELECTEL_READ_TIMEOUT_SECONDS,
+        ),
+        retries=settings.SELECTEL_REQUEST_RETRIES,
+        segment_size=settings.SELECTEL_SEGMENT_SIZE_BYTES,
+    )
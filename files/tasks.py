@@ -0,0 +1,9 @@
+from files.images import process_image
+from files.service import SelectelSwiftStorage
+from procollab.celery import app
+
+
+@app.task
+def process_image_task(link: str) -> dict[str, str]:
+    """Builds WebP and thumbnails of an uploaded image off the request thread."""
+    return process_image(SelectelSwiftStorage(), link)
@@ -0,0 +1,623 @@
+import hashlib
+import io
+import json
+import threading
+from datetime import datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from tempfile import TemporaryFile
+from types import SimpleNamespace
+from unittest.mock import patch
+from urllib.parse import urlencode
+
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import SimpleTestCase, TestCase, override_settings
+from PIL import Image
+from rest_framework.test import APIClient
+
+from chats.models import FileToMessage
+from chats.services import send_direct_message
+from events.tests.helpers import build_event
+from files.exceptions import SelectelUploadError
+from files.images import delete_unused_derivatives, get_webp_link, process_image
+from files.models import UserFile
+from files.service import SelectelSwiftStorage, Storage
+from files.swift import SwiftClient
+from files.typings import FileInfo
+from partner_programs.tests.helpers import create_partner_program
+from projects.models import Project
+from users.models import CustomUser
+
+
+class SwiftStandIn(BaseHTTPRequestHandler):
+    """Минимальный Keystone + Swift: выдает токены, принимает PUT/DELETE."""
+
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_POST(self):
+        state = self.server.state
+        body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        with state.lock:
+            state.auth_requests += 1
+            token = f"token-{state.auth_requests}"
+            state.valid_tokens.add(token)
+        expires_at = datetime.now(timezone.utc) + state.token_ttl
+        self._reply(
+            201,
+            json.dumps({"token": {"expires_at": expires_at.isoformat()}}).encode(),
+            {"x-subject-token": token, "Content-Type": "application/json"},
+        )
+        state.auth_payloads.append(json.loads(body))
+
+    def do_PUT(self):
+        body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        if self._reject():
+            return
+        path, _, query = self.path.partition("?")
+        state = self.server.state
+        state.put_sizes.append(len(body))
+        state.put_headers[path] = dict(self.headers)
+        if query == "multipart-manifest=put":
+            state.manifests[path] = json.loads(body)
+        else:
+            state.objects[path] = body
+        self._reply(201, headers={"Etag": f'"etag-{len(body)}"'})
+
+    def do_HEAD(self):
+        if self._reject():
+            return
+        state = self.server.state
+        if self.path in state.manifests:
+            self._reply(200, headers={"X-Static-Large-Object": "True"})
+        else:
+            self._reply(200 if self.path in state.objects else 404)
+
+    def do_DELETE(self):
+        if self._reject():
+            return
+        path, _, query = self.path.partition("?")
+        state = self.server.state
+        state.deletes.append(self.path)
+        if query != "multipart-manifest=delete":
+            state.objects.pop(path, None)
+            self._reply(204)
+            return
+        # Bulk-ответ SLO: 200 и итог в теле, даже если удалить не удалось.
+        manifest = state.manifests.pop(path, None)
+        if manifest is None:
+            result = {"Response Status": "400 Bad Request", "Errors": [[path, "400"]]}
+        else:
+            account = path.split("/", 3)[2]
+            for segment in manifest:
+                state.objects.pop(f"/v1/{account}{segment['path']}", None)
+            result = {"Response Status": "200 OK", "Errors": []}
+        self._reply(200, json.dumps(result).encode())
+
+    def _reject(self) -> bool:
+        state = self.server.state
+        with state.lock:
+            state.connections.add(self.client_address)
+            state.object_requests += 1
+            fail = state.failures.pop(0) if state.failures else None
+        if fail is not None:
+            self._reply(fail)
+            return True
+        if self.headers.get("X-Auth-Token") not in state.valid_tokens:
+            self._reply(401)
+            return True
+        return False
+
+    def _reply(self, status, body=b"", headers=None):
+        self.send_response(status)
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+class SwiftClientTests(SimpleTestCase):
+    def setUp(self):
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), SwiftStandIn)
+        self.server.state = SimpleNamespace(
+            lock=threading.Lock(),
+            auth_requests=0,
+            auth_payloads=[],
+            object_requests=0,
+            valid_tokens=set(),
+            token_ttl=timedelta(hours=24),
+            connections=set(),
+            failures=[],
+            objects={},
+            manifests={},
+            put_sizes=[],
+            put_headers={},
+            deletes=[],
+        )
+        self.state = self.server.state
+        thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        thread.start()
+        self.addCleanup(thread.join)
+        self.addCleanup(self.server.server_close)
+        self.addCleanup(self.server.shutdown)
+
+        host, port = self.server.server_address
+        self.base_url = f"http://{host}:{port}"
+        self.client = SwiftClient(
+            f"{self.base_url}/v3/auth/tokens",
+            "user",
+            "password",
+            timeout=5,
+            backoff=0,
+            segment_size=1024,
+        )
+        self.addCleanup(self.client.session.close)
+
+    def test_token_is_requested_once_and_connection_is_reused(self):
+        for index in range(5):
+            response = self.client.put(f"{self.base_url}/c/{index}.txt", data=b"data")
+            self.assertEqual(response.status_code, 201)
+        self.client.delete(f"{self.base_url}/c/0.txt")
+
+        self.assertEqual(self.state.auth_requests, 1)
+        self.assertEqual(len(self.state.connections), 1)
+        self.assertEqual(
+            self.state.auth_payloads[0]["auth"]["identity"]["password"]["user"],
+            {"id": "user", "password": "password"},
+        )
+        self.assertNotIn("/c/0.txt", self.state.objects)
+
+    def test_concurrent_uploads_share_one_token(self):
+        threads = [
+            threading.Thread(
+                target=self.client.put, args=(f"{self.base_url}/c/{index}", b"x")
+            )
+            for index in range(8)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(self.state.auth_requests, 1)
+        self.assertEqual(len(self.state.objects), 8)
+
+    def test_token_is_refreshed_before_expiry(self):
+        self.state.token_ttl = timedelta(seconds=30)
+
+        self.client.put(f"{self.base_url}/c/1", data=b"x")
+        self.client.put(f"{self.base_url}/c/2", data=b"x")
+
+        self.assertEqual(self.state.auth_requests, 2)
+
+    def test_revoked_token_is_replaced_once(self):
+        self.client.put(f"{self.base_url}/c/1", data=b"x")
+        self.state.valid_tokens.clear()
+
+        response = self.client.put(f"{self.base_url}/c/2", data=io.BytesIO(b"payload"))
+
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(self.state.auth_requests, 2)
+        self.assertEqual(self.state.objects["/c/2"], b"payload")
+
+    def test_server_errors_are_retried_with_rewound_body(self):
+        self.state.failures = [503, 502]
+
+        response = self.client.put(f"{self.base_url}/c/1", data=io.BytesIO(b"payload"))
+
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(self.state.object_requests, 3)
+        self.assertEqual(self.state.objects["/c/1"], b"payload")
+
+    def test_retries_are_bounded(self):
+        self.state.failures = [503, 503, 503, 503]
+
+        response = self.client.put(f"{self.base_url}/c/1", data=b"x")
+
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(self.state.object_requests, self.client.retries + 1)
+
+    def test_storage_raises_on_failed_upload(self):
+        self.state.failures = [503] * (self.client.retries + 1)
+        storage = SelectelSwiftStorage(client=self.client)
+        file = SimpleNamespace(
+            name="report",
+            extension="pdf",
+            content_type="application/pdf",
+            buffer=b"x",
+            size=1,
+        )
+        user = SimpleNamespace(email="user@example.com")
+
+        with patch("files.service.SELECTEL_SWIFT_URL", f"{self.base_url}/c/"):
+            with self.assertRaises(SelectelUploadError):
+                storage.upload(file, user)
+        self.assertEqual(self.state.object_requests, self.client.retries + 1)
+
+    def test_small_upload_is_a_single_put(self):
+        response = self.client.upload(
+            f"{self.base_url}/v1/SEL_1/media/small.txt", b"x" * 1024, size=1024
+        )
+
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(self.state.put_sizes, [1024])
+        self.assertEqual(self.state.manifests, {})
+
+    def test_large_upload_is_streamed_in_segments(self):
+        payload = bytes(range(256)) * 10
+        url = f"{self.base_url}/v1/SEL_1/media/large.pdf"
+        with TemporaryFile() as file:
+            file.write(payload)
+            file.seek(0)
+            self.state.failures = [None, 503]
+
+            response = self.client.upload(
+                url, file, size=len(payload), headers={"Content-Type": "application/pdf"}
+            )
+
+        self.assertEqual(response.status_code, 201)
+        self.assertLessEqual(max(self.state.put_sizes), 1024)
+        manifest = self.state.manifests["/v1/SEL_1/media/large.pdf"]
+        self.assertEqual(
+            [segment["path"] for segment in manifest],
+            [f"/media/large.pdf.segments/{index:08d}" for index in range(3)],
+        )
+        self.assertEqual(
+            [segment["size_bytes"] for segment in manifest], [1024, 1024, 512]
+        )
+        self.assertEqual([segment["etag"] for segment in manifest][-1], "etag-512")
+        self.assertEqual(
+            b"".join(
+                self.state.objects[f"/v1/SEL_1{segment['path']}"] for segment in manifest
+            ),
+            payload,
+        )
+
+    def test_segments_expire_with_the_manifest(self):
+        url = f"{self.base_url}/v1/SEL_1/exports/large.xlsx"
+
+        with patch("files.swift.time.time", return_value=1_000_000):
+            self.client.upload(
+                url, b"x" * 2048, size=2048, headers={"X-Delete-After": "60"}
+            )
+
+        self.assertEqual(len(self.state.put_headers), 3)
+        for headers in self.state.put_headers.values():
+            self.assertEqual(headers["X-Delete-At"], "1000060")
+            self.assertNotIn("X-Delete-After", headers)
+
+    def test_large_object_is_deleted_with_segments(self):
+        url = f"{self.base_url}/v1/SEL_1/media/large.bin"
+        self.client.upload(url, b"x" * 2048, size=2048)
+
+        response = self.client.delete(url)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.state.objects, {})
+        self.assertEqual(self.state.manifests, {})
+        self.assertEqual(
+            self.state.deletes, ["/v1/SEL_1/media/large.bin?multipart-manifest=delete"]
+        )
+
+    def test_small_object_is_deleted_without_manifest_query(self):
+        url = f"{self.base_url}/v1/SEL_1/media/small.txt"
+        self.client.upload(url, b"x", size=1)
+        requests_before = self.state.object_requests
+
+        response = self.client.delete(url, size=1)
+
+        self.assertEqual(response.status_code, 204)
+        self.assertEqual(self.state.deletes, ["/v1/SEL_1/media/small.txt"])
+        self.assertEqual(self.state.object_requests, requests_before + 1)
+        self.assertEqual(self.state.objects, {})
+
+    def test_failed_bulk_delete_is_reported(self):
+        url = f"{self.base_url}/v1/SEL_1/media/small.txt"
+        self.client.upload(url, b"x", size=1)
+
+        response = self.client.delete(url, size=4096)
+
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(response.ok)
+
+    def test_failed_segment_removes_uploaded_segments(self):
+        self.state.failures = [None, 503, 503, 503]
+        url = f"{self.base_url}/v1/SEL_1/media/large.bin"
+
+        response = self.client.upload(url, b"x" * 2048, size=2048)
+
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(self.state.objects, {})
+        self.assertEqual(self.state.manifests, {})
+
+
+class InMemoryStorage(Storage):
+    def __init__(self):
+        self.objects = {}
+        self.downloads = []
+        self.deleted = []
+
+    def delete(self, url, size=None):
+        self.deleted.append(url)
+        self.objects.pop(url, None)
+
+    def upload(self, file, user):
+        raise NotImplementedError
+
+    def download(self, url):
+        self.downloads.append(url)
+        return self.objects[url]
+
+    def put(self, url, data, content_type):
+        self.objects[url] = bytes(data)
+
+    def generate_derivative_url(self, content_hash, name):
+        return f"https://cdn.test/derivatives/{content_hash}/{name}.webp"
+
+
+def make_png(width: int, height: int) -> bytes:
+    buffer = io.BytesIO()
+    Image.new("RGB", (width, height), "teal").save(buffer, format="PNG")
+    return buffer.getvalue()
+
+
+def create_user(email: str) -> CustomUser:
+    return CustomUser.objects.create_user(
+        email=email,
+        password="testpass123",
+        first_name="Test",
+        last_name="User",
+        birthday="2000-01-01",
+        is_active=True,
+    )
+
+
+class ImagePipelineTests(TestCase):
+    def setUp(self):
+        self.storage = InMemoryStorage()
+        self.user = create_user("image-pipeline@example.com")
+
+    def create_image_file(self, link, content, user=None):
+        self.storage.objects[link] = content
+        return UserFile.objects.create(
+            link=link,
+            user=user or self.user,
+            mime_type="image/png",
+            content_hash=hashlib.sha256(content).hexdigest(),
+        )
+
+    def test_webp_and_thumbnails_are_built_from_one_download(self):
+        user_file = self.create_image_file(
+            "https://cdn.test/photo.png", make_png(2000, 1000)
+        )
+
+        derivatives = process_image(self.storage, user_file.link)
+
+        self.assertEqual(self.storage.downloads, [user_file.link])
+        self.assertEqual(
+            set(derivatives), {"webp", "thumbnail_1280", "thumbnail_512", "thumbnail_128"}
+        )
+        sizes = {
+            name: Image.open(io.BytesIO(self.storage.objects[url])).size
+            for name, url in derivatives.items()
+        }
+        self.assertEqual(sizes["webp"], (2000, 1000))
+        self.assertEqual(sizes["thumbnail_512"], (512, 256))
+        self.assertEqual(sizes["thumbnail_128"], (128, 64))
+        user_file.refresh_from_db()
+        self.assertEqual(user_file.derivatives, derivatives)
+
+    def test_small_image_thumbnails_reuse_webp(self):
+        user_file = self.create_image_file("https://cdn.test/icon.png", make_png(100, 80))
+
+        derivatives = process_image(self.storage, user_file.link)
+
+        self.assertEqual(set(derivatives.values()), {derivatives["webp"]})
+
+    def test_same_content_reuses_cached_derivatives(self):
+        content = make_png(600, 600)
+        first = self.create_image_file("https://cdn.test/first.png", content)
+        derivatives = process_image(self.storage, first.link)
+        other_user = create_user("image-pipeline-other@example.com")
+        second = self.create_image_file(
+            "https://cdn.test/second.png", content, other_user
+        )
+        stored_objects = len(self.storage.objects)
+
+        self.assertEqual(process_image(self.storage, second.link), derivatives)
+        self.assertEqual(self.storage.downloads, [first.link])
+        self.assertEqual(len(self.storage.objects), stored_objects)
+
+    def test_derivatives_are_deleted_with_the_last_file(self):
+        content = make_png(600, 600)
+        first = self.create_image_file("https://cdn.test/first.png", content)
+        second = self.create_image_file("https://cdn.test/second.png", content)
+        derivatives = process_image(self.storage, first.link)
+        first.refresh_from_db()
+        second.refresh_from_db()
+
+        first.delete()
+        delete_unused_derivatives(self.storage, first)
+        self.assertEqual(self.storage.deleted, [])
+
+        second.delete()
+        delete_unused_derivatives(self.storage, second)
+        self.assertEqual(set(self.storage.deleted), set(derivatives.values()))
+
+
+class FileUploadViewTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = create_user("file-upload@example.com")
+        self.client.force_authenticate(self.user)
+
+    def post_image(self, content):
+        info = FileInfo(
+            url=f"https://cdn.test/{hashlib.md5(content).hexdigest()}.png",
+            size=len(content),
+            name="photo",
+            extension="png",
+            mime_type="image/png",
+        )
+        with (
+            patch("files.views.FileView.cdn.upload", return_value=info) as upload,
+            patch("files.views.process_image_task.delay") as delay,
+            self.captureOnCommitCallbacks(execute=True),
+        ):
+            response = self.client.post(
+                "/files/",
+                {"file": SimpleUploadedFile("photo.png", content, "image/png")},
+                format="multipart",
+            )
+        return response, upload, delay
+
+    def test_image_is_stored_as_is_and_transcoded_in_background(self):
+        response, upload, delay = self.post_image(make_png(40, 40))
+
+        self.assertEqual(response.status_code, 201)
+        self.assertFalse(upload.call_args.kwargs["transcode_images"])
+        delay.assert_called_once_with(response.data["url"])
+        self.assertEqual(
+            len(UserFile.objects.get(link=response.data["url"]).content_hash), 64
+        )
+
+    def test_reupload_creates_own_file_sharing_the_stored_object(self):
+        content = make_png(40, 40)
+        first_response, _, _ = self.post_image(content)
+        second_response, upload, delay = self.post_image(content)
+
+        self.assertEqual(second_response.status_code, 201)
+        first_link = first_response.data["url"]
+        second_link = second_response.data["url"]
+        self.assertNotEqual(second_link, first_link)
+        self.assertTrue(second_link.startswith(f"{first_link}?upload="))
+        upload.assert_not_called()
+        delay.assert_called_once_with(second_link)
+        self.assertEqual(UserFile.objects.filter(user=self.user).count(), 2)
+
+    def test_reupload_reuses_ready_derivatives(self):
+        content = make_png(40, 40)
+        first_response, _, _ = self.post_image(content)
+        derivatives = {"webp": "https://cdn.test/derivatives/x/webp.webp"}
+        UserFile.objects.filter(link=first_response.data["url"]).update(
+            derivatives=derivatives
+        )
+
+        second_response, _, delay = self.post_image(content)
+
+        delay.assert_not_called()
+        self.assertEqual(
+            UserFile.objects.get(link=second_response.data["url"]).derivatives,
+            derivatives,
+        )
+
+    def test_same_upload_can_be_attached_to_two_messages(self):
+        other_user = create_user("file-upload-other@example.com")
+        content = b"same bytes"
+        links = []
+        for _ in range(2):
+            info = FileInfo(
+                url="https://cdn.test/report.pdf",
+                size=len(content),
+                name="report",
+                extension="pdf",
+                mime_type="application/pdf",
+            )
+            with patch("files.views.FileView.cdn.upload", return_value=info):
+                response = self.client.post(
+                    "/files/",
+                    {"file": SimpleUploadedFile("report.pdf", content)},
+                    format="multipart",
+                )
+            links.append(response.data["url"])
+
+        for link in links:
+            send_direct_message(self.user, other_user.id, "report", None, [link])
+
+        self.assertEqual(FileToMessage.objects.count(), 2)
+
+    def test_shared_object_is_deleted_with_the_last_upload(self):
+        content = make_png(40, 40)
+        links = [self.post_image(content)[0].data["url"] for _ in range(2)]
+        UserFile.objects.update(
+            derivatives={"webp": "https://cdn.test/derivatives/x/webp.webp"}
+        )
+
+        with patch("files.views.FileView.cdn.storage.delete") as delete:
+            response = self.client.delete(f"/files/?{urlencode({'link': links[0]})}")
+            self.assertEqual(response.status_code, 204)
+            delete.assert_not_called()
+            self.assertTrue(UserFile.objects.filter(link=links[1]).exists())
+
+            self.client.delete(f"/files/?{urlencode({'link': links[1]})}")
+
+        self.assertEqual(
+            {call.args[0] for call in delete.call_args_list},
+            {links[0], "https://cdn.test/derivatives/x/webp.webp"},
+        )
+        self.assertFalse(UserFile.objects.exists())
+
+
+@override_settings(SELECTEL_SWIFT_URL="https://cdn.test/")
+class ImageLinkConsumerTests(TestCase):
+    def setUp(self):
+        self.storage = InMemoryStorage()
+        self.user = create_user("image-consumer@example.com")
+        self.link = "https://cdn.test/avatar.png"
+        self.storage.objects[self.link] = make_png(300, 300)
+        UserFile.objects.create(
+            link=self.link,
+            user=self.user,
+            mime_type="image/png",
+            content_hash="a" * 64,
+        )
+
+    def test_links_set_before_derivatives_are_switched_to_webp(self):
+        self.user.avatar = self.link
+        self.user.save()
+        project = Project.objects.create(
+            leader=self.user, image_address=self.link, cover_image_address=self.link
+        )
+
+        program = create_partner_program(
+            image_address=self.link, advertisement_image_address=self.link
+        )
+        event = build_event(cover_url=self.link)
+
+        derivatives = process_image(self.storage, self.link)
+
+        self.user.refresh_from_db()
+        project.refresh_from_db()
+        program.refresh_from_db()
+        event.refresh_from_db()
+        self.assertEqual(self.user.avatar, derivatives["webp"])
+        self.assertEqual(project.image_address, derivatives["webp"])
+        self.assertEqual(project.cover_image_address, derivatives["webp"])
+        self.assertEqual(program.image_address, derivatives["webp"])
+        self.assertEqual(program.advertisement_image_address, derivatives["webp"])
+        self.assertEqual(event.cover_url, derivatives["webp"])
+
+    def test_links_set_after_derivatives_are_stored_as_webp(self):
+        derivatives = process_image(self.storage, self.link)
+
+        self.user.avatar = self.link
+        self.user.save()
+        event = build_event(cover_url=self.link)
+
+        self.user.refresh_from_db()
+        event.refresh_from_db()
+        self.assertEqual(self.user.avatar, derivatives["webp"])
+        self.assertEqual(event.cover_url, derivatives["webp"])
+        self.assertEqual(
+            get_webp_link("https://example.com/a.png"), "https://example.com/a.png"
+        )
+
+    def test_other_url_fields_keep_the_original(self):
+        process_image(self.storage, self.link)
+
+        event = build_event(cover_url=self.link, website_url=self.link)
+
+        event.refresh_from_db()
+        self.assertEqual(event.website_url, self.link)
@@ -4,9 +4,13 @@ from rest_framework import permissions, status
 from rest_framework.generics import get_object_or_404
 from rest_framework.response import Response
 
-from files.service import CDN, SelectelSwiftStorage
+from files.constants import SUPPORTED_IMAGES_TYPES
+from files.helpers import get_object_url, hash_uploaded_file, make_upload_link
+from files.images import delete_user_file
+from files.service import CDN, File, SelectelSwiftStorage
 from files.models import UserFile
 from files.serializers import UserFileSerializer
+from files.tasks import process_image_task
 
 
 class FileView(generics.GenericAPIView):
@@ -20,18 +24,41 @@ class FileView(generics.GenericAPIView):
     def post(self, request):
         """
         Creates a UserFile object and uploads the file to Selectel
+        Images are stored as is, WebP and thumbnails are built in the background.
+        Re-uploading the same content creates a new UserFile with its own link,
+        but reuses the stored object and derivatives of the earlier upload.
         """
-
-        info = self.cdn.upload(request.FILES["file"], request.user)
-        UserFile.objects.create(
-            user=request.user,
-            link=info.url,
-            name=info.name,
-            size=info.size,
-            extension=info.extension,
-            mime_type=info.mime_type,
-        )
-        return Response({"url": info.url}, status=status.HTTP_201_CREATED)
+        uploaded_file = request.FILES["file"]
+        content_hash = hash_uploaded_file(uploaded_file)
+        existing = UserFile.objects.filter(
+            user=request.user, content_hash=content_hash
+        ).first()
+        if existing is not None:
+            user_file = UserFile.objects.create(
+                user=request.user,
+                link=make_upload_link(get_object_url(existing.link)),
+                name=File._get_name(uploaded_file),
+                size=existing.size,
+                extension=existing.extension,
+                mime_type=existing.mime_type,
+                content_hash=content_hash,
+                derivatives=existing.derivatives,
+            )
+        else:
+            info = self.cdn.upload(uploaded_file, request.user, transcode_images=False)
+            user_file = UserFile.objects.create(
+                user=request.user,
+                link=info.url,
+                name=info.name,
+                size=info.size,
+                extension=info.extension,
+                mime_type=info.mime_type,
+                content_hash=content_hash,
+            )
+        if user_file.mime_type in SUPPORTED_IMAGES_TYPES and not user_file.derivatives:
+            link = user_file.link
+            transaction.on_commit(lambda: process_image_task.delay(link))
+        return Response({"url": user_file.link}, status=status.HTTP_201_CREATED)
 
     def delete(self, request, *args, **kwargs):
         """deletes the file (only if the request is sent by the user who owns it!)
@@ -50,6 +77,6 @@ class FileView(generics.GenericAPIView):
         instance = get_object_or_404(self.get_queryset(), link=link)
         if instance.user != request.user:
             return Response(status=status.HTTP_403_FORBIDDEN)
-        self.cdn.delete(instance.link)  # delete the file via api
-        instance.delete()  # delete the UserFile object
+        # the file is deleted via api unless another upload shares it
+        delete_user_file(self.cdn.storage, instance)
         return Response(status=status.HTTP_204_NO_CONTENT)
@@ -0,0 +1,21 @@
+# Generated by Django 4.2.11 on 2026-10-18 05:38
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        (
+            "mailing",
+            "0009_rename_mailing_ma_scenari_73b1f9_idx_mailing_mai_scenari_eed98a_idx_and_more",
+        ),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="mailingschema",
+            name="datetime_updated",
+            field=models.DateTimeField(auto_now=True),
+        ),
+    ]
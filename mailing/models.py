@@ -16,6 +16,7 @@ class MailingSchema(models.Model):
     name = models.CharField(max_length=100, unique=True)
     schema = models.JSONField(default=get_default_mailing_schema, null=True, blank=True)
     template = models.TextField()
+    datetime_updated = models.DateTimeField(auto_now=True)
 
     class Meta:
         verbose_name = "Схема шаблона письма"
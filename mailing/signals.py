@@ -0,0 +1,11 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from mailing.models import MailingSchema
+from mailing.template_cache import template_cache
+
+
+@receiver(post_save, sender=MailingSchema)
+@receiver(post_delete, sender=MailingSchema)
+def invalidate_schema_template(sender, instance, **kwargs):
+    template_cache.invalidate("schema", instance.id)
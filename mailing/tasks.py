@@ -1,9 +1,12 @@
 import logging
+import time
+from dataclasses import dataclass, field
 from datetime import timedelta
 
+from django.db.models import Case, QuerySet, TextField, Value, When
 from django.utils import timezone
 
-from mailing.constants import FAILED_ANYMAIL_STATUSES
+from mailing.constants import FAILED_ANYMAIL_STATUSES, MAILING_USERS_BATCH_SIZE
 from mailing.models import MailingScenarioLog
 from mailing.rendering import render_subject
 from mailing.scenarios import RecipientRule, SCENARIOS, TriggerType
@@ -20,10 +23,65 @@ from partner_programs.selectors import (
     programs_with_submission_deadline_on,
 )
 from procollab.celery import app
+from users.activity_buffer import flush_last_activity
 
 logger = logging.getLogger(__name__)
 
 
+@dataclass
+class ScenarioSendStats:
+    sent: int = 0
+    failed: int = 0
+    status_updates: int = 0
+
+
+@dataclass
+class ScenarioOutcomes:
+    """Итоги отправки по пользователям, которые еще не записаны в логи."""
+
+    sent_user_ids: list[int] = field(default_factory=list)
+    failed_errors: dict[int, str] = field(default_factory=dict)
+
+    def __len__(self) -> int:
+        return len(self.sent_user_ids) + len(self.failed_errors)
+
+    def send(self, user_id: int) -> None:
+        self.sent_user_ids.append(user_id)
+
+    def fail(self, user_id: int, error: str) -> None:
+        self.failed_errors[user_id] = error
+
+    def flush(self, pending_logs: QuerySet) -> int:
+        """
+        Записывает накопленные итоги в логи со статусом pending: один UPDATE
+        для отправленных и один для упавших (текст ошибки через CASE).
+        Возвращает число выполненных UPDATE.
+        """
+        updates = 0
+        if self.sent_user_ids:
+            pending_logs.filter(user_id__in=self.sent_user_ids).update(
+                status=MailingScenarioLog.Status.SENT,
+                sent_at=timezone.now(),
+                error="",
+            )
+            updates += 1
+        if self.failed_errors:
+            pending_logs.filter(user_id__in=list(self.failed_errors)).update(
+                status=MailingScenarioLog.Status.FAILED,
+                error=Case(
+                    *(
+                        When(user_id=user_id, then=Value(error))
+                        for user_id, error in self.failed_errors.items()
+                    ),
+                    output_field=TextField(),
+                ),
+            )
+            updates += 1
+        self.sent_user_ids = []
+        self.failed_errors = {}
+        return updates
+
+
 def _get_programs_for_scenario(scenario, target_date):
     match scenario.trigger:
         case TriggerType.PROGRAM_SUBMISSION_DEADLINE:
@@ -70,7 +128,7 @@ def _deadline_date(program):
 def _send_scenario_for_program(scenario, program, scheduled_for, target_date):
     recipients = _get_recipients(scenario, program, target_date)
     if not recipients.exists():
-        return 0
+        return ScenarioSendStats()
 
     pending_or_sent_ids = MailingScenarioLog.objects.filter(
         scenario_code=scenario.code,
@@ -85,7 +143,7 @@ def _send_scenario_for_program(scenario, program, scheduled_for, target_date):
     recipients_to_send = list(recipients.exclude(id__in=pending_or_sent_ids))
     user_ids = [user.id for user in recipients_to_send]
     if not user_ids:
-        return 0
+        return ScenarioSendStats()
 
     logger.info(
         "Scenario %s program=%s scheduled_for=%s recipients=%s",
@@ -124,8 +182,18 @@ def _send_scenario_for_program(scenario, program, scheduled_for, target_date):
     def context_builder(user):
         return scenario.context_builder(program, user, reference_date)
 
-    sent_count = 0
-    failed_count = 0
+    stats = ScenarioSendStats()
+    outcomes = ScenarioOutcomes()
+
+    def flush_outcomes():
+        stats.status_updates += outcomes.flush(
+            MailingScenarioLog.objects.filter(
+                scenario_code=scenario.code,
+                program=program,
+                scheduled_for=scheduled_for,
+                status=MailingScenarioLog.Status.PENDING,
+            )
+        )
 
     def _normalize_status(status_value):
         if status_value is None:
@@ -143,7 +211,6 @@ def _send_scenario_for_program(scenario, program, scheduled_for, target_date):
         return {str(status_value).lower()}
 
     def status_callback(user, msg):
-        nonlocal sent_count, failed_count
         status = getattr(msg, "anymail_status", None)
         message_id = getattr(status, "message_id", None) if status else None
         status_set = _normalize_status(getattr(status, "status", None))
@@ -151,35 +218,17 @@ def _send_scenario_for_program(scenario, program, scheduled_for, target_date):
         is_failed = not status_set or bool(status_set & FAILED_ANYMAIL_STATUSES)
 
         if not message_id:
-            failed_count += 1
-            MailingScenarioLog.objects.filter(
-                scenario_code=scenario.code,
-                program=program,
-                scheduled_for=scheduled_for,
-                status=MailingScenarioLog.Status.PENDING,
-                user_id=user.id,
-            ).update(
-                status=MailingScenarioLog.Status.FAILED,
-                error="anymail_status missing",
-            )
+            stats.failed += 1
+            outcomes.fail(user.id, "anymail_status missing")
             logger.warning(
                 "Scenario %s user=%s anymail_status missing",
                 scenario.code,
                 user.id,
             )
-            return
-
-        if is_failed:
-            failed_count += 1
-            MailingScenarioLog.objects.filter(
-                scenario_code=scenario.code,
-                program=program,
-                scheduled_for=scheduled_for,
-                status=MailingScenarioLog.Status.PENDING,
-                user_id=user.id,
-            ).update(
-                status=MailingScenarioLog.Status.FAILED,
-                error=f"anymail_status={status_str} anymail_id={message_id}",
+        elif is_failed:
+            stats.failed += 1
+            outcomes.fail(
+                user.id, f"anymail_status={status_str} anymail_id={message_id}"
             )
             logger.error(
                 "Scenario %s user=%s anymail_id=%s status=%s",
@@ -188,27 +237,21 @@ def _send_scenario_for_program(scenario, program, scheduled_for, target_date):
                 message_id,
                 status_str,
             )
-            return
+        else:
+            stats.sent += 1
+            outcomes.send(user.id)
+            logger.info(
+                "Scenario %s user=%s anymail_id=%s status=%s",
+                scenario.code,
+                user.id,
+                message_id,
+                status_str,
+            )
 
-        sent_count += 1
-        MailingScenarioLog.objects.filter(
-            scenario_code=scenario.code,
-            program=program,
-            scheduled_for=scheduled_for,
-            status=MailingScenarioLog.Status.PENDING,
-            user_id=user.id,
-        ).update(
-            status=MailingScenarioLog.Status.SENT,
-            sent_at=timezone.now(),
-            error="",
-        )
-        logger.info(
-            "Scenario %s user=%s anymail_id=%s status=%s",
-            scenario.code,
-            user.id,
-            message_id,
-            status_str,
-        )
+        # Колбэк вызывается по письмам батча подряд, поэтому сброс по размеру
+        # батча дает по одному UPDATE на статус для каждого батча.
+        if len(outcomes) >= MAILING_USERS_BATCH_SIZE:
+            flush_outcomes()
 
     try:
         num_sent = send_mass_mail_from_template(
@@ -219,7 +262,8 @@ def _send_scenario_for_program(scenario, program, scheduled_for, target_date):
             status_callback=status_callback,
         )
     except Exception as exc:
-        MailingScenarioLog.objects.filter(
+        flush_outcomes()
+        stats.failed += MailingScenarioLog.objects.filter(
             scenario_code=scenario.code,
             program=program,
             scheduled_for=scheduled_for,
@@ -229,22 +273,21 @@ def _send_scenario_for_program(scenario, program, scheduled_for, target_date):
         logger.exception(
             "Scenario %s failed for program %s", scenario.code, program.id
         )
-        return 0
+        return stats
 
-    pending_qs = MailingScenarioLog.objects.filter(
+    flush_outcomes()
+    pending_count = MailingScenarioLog.objects.filter(
         scenario_code=scenario.code,
         program=program,
         scheduled_for=scheduled_for,
         status=MailingScenarioLog.Status.PENDING,
         user_id__in=user_ids,
+    ).update(
+        status=MailingScenarioLog.Status.FAILED,
+        error="anymail_status missing",
     )
-    pending_count = pending_qs.count()
     if pending_count:
-        pending_qs.update(
-            status=MailingScenarioLog.Status.FAILED,
-            error="anymail_status missing",
-        )
-        failed_count += pending_count
+        stats.failed += pending_count
         logger.warning(
             "Scenario %s program=%s pending left after send: %s",
             scenario.code,
@@ -257,16 +300,24 @@ def _send_scenario_for_program(scenario, program, scheduled_for, target_date):
         scenario.code,
         program.id,
         num_sent,
-        sent_count,
-        failed_count,
+        stats.sent,
+        stats.failed,
     )
-    return sent_count
+    return stats
 
 
 @app.task
 def run_program_mailings() -> int:
+    # сценарии неактивных аккаунтов читают last_activity: сбрасываем буфер,
+    # чтобы не написать пользователю, зашедшему за последнюю минуту
+    try:
+        flush_last_activity()
+    except Exception:
+        logger.warning("Failed to flush last_activity before mailings", exc_info=True)
     today = timezone.localdate()
-    total_sent = 0
+    started = time.monotonic()
+    total = ScenarioSendStats()
+    programs_count = 0
     for scenario in SCENARIOS:
         if scenario.trigger == TriggerType.PROGRAM_SUBMISSION_DEADLINE:
             target_date = today + timedelta(days=scenario.offset_days)
@@ -274,8 +325,18 @@ def run_program_mailings() -> int:
             target_date = today - timedelta(days=scenario.offset_days)
         programs = _get_programs_for_scenario(scenario, target_date)
         for program in programs:
-            total_sent += _send_scenario_for_program(
-                scenario, program, today, target_date
-            )
-    logger.info("Program mailings sent: %s", total_sent)
-    return total_sent
+            stats = _send_scenario_for_program(scenario, program, today, target_date)
+            programs_count += 1
+            total.sent += stats.sent
+            total.failed += stats.failed
+            total.status_updates += stats.status_updates
+    logger.info(
+        "Program mailings summary: programs=%s sent=%s failed=%s "
+        "status_updates=%s duration=%.2fs",
+        programs_count,
+        total.sent,
+        total.failed,
+        total.status_updates,
+        time.monotonic() - started,
+    )
+    return total.sent
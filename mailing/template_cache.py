@@ -0,0 +1,80 @@
+import os
+import threading
+from collections import OrderedDict
+from collections.abc import Callable, Hashable
+from pathlib import Path
+
+from django.conf import settings
+from django.template import Template
+
+
+class CompiledTemplateCache:
+    """
+    LRU-кеш скомпилированных `Template` в памяти процесса.
+
+    Ключ включает версию источника (время изменения схемы или mtime файла),
+    поэтому измененный шаблон компилируется заново, а старая запись со временем
+    вытесняется. Кеш общий для потоков отправки, доступ под блокировкой.
+    """
+
+    def __init__(self, maxsize: int):
+        self.maxsize = maxsize
+        self._templates: OrderedDict[Hashable, Template] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._templates)
+
+    def get(self, key: Hashable, load: Callable[[], str]) -> Template:
+        """Шаблон по ключу; при промахе `load()` отдает исходный текст."""
+        with self._lock:
+            template = self._templates.get(key)
+            if template is not None:
+                self._templates.move_to_end(key)
+                return template
+
+        template = Template(load())
+        with self._lock:
+            self._templates[key] = template
+            self._templates.move_to_end(key)
+            while len(self._templates) > self.maxsize:
+                self._templates.popitem(last=False)
+        return template
+
+    def invalidate(self, namespace: str, object_id: Hashable) -> None:
+        """Удаляет все версии шаблона с ключом `(namespace, object_id, ...)`."""
+        with self._lock:
+            for key in [
+                key
+                for key in self._templates
+                if isinstance(key, tuple) and key[:2] == (namespace, object_id)
+            ]:
+                del self._templates[key]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._templates.clear()
+
+
+template_cache = CompiledTemplateCache(settings.MAILING_TEMPLATE_CACHE_SIZE)
+
+
+def get_string_template(template_string: str) -> Template:
+    """Шаблон по его тексту, когда версия источника неизвестна."""
+    return template_cache.get(("string", template_string), lambda: template_string)
+
+
+def get_schema_template(schema) -> Template:
+    """Шаблон `MailingSchema`, ключ - id схемы и время ее изменения."""
+    return template_cache.get(
+        ("schema", schema.id, schema.datetime_updated), lambda: schema.template
+    )
+
+
+def get_file_template(path: str | os.PathLike) -> Template:
+    """Шаблон из файла, ключ - путь и mtime: файл читается только после изменения."""
+    path = Path(path)
+    mtime_ns = path.stat().st_mtime_ns
+    return template_cache.get(
+        ("file", str(path), mtime_ns), lambda: path.read_text(encoding="utf-8")
+    )
@@ -1,10 +1,13 @@
 from datetime import timedelta
 from unittest.mock import patch
 
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
 from django.utils import timezone
 
 from mailing.models import MailingScenarioLog
+from partner_programs.models import PartnerProgramUserProfile
 from mailing.tasks import run_program_mailings
 from partner_programs.selectors import (
     program_participants_with_inactive_account,
@@ -52,6 +55,23 @@ def _fake_failed_send_mass_mail_from_template(
     return len(users)
 
 
+def _fake_mixed_send_mass_mail_from_template(
+    users,
+    subject,
+    template_name,
+    context_builder=None,
+    status_callback=None,
+):
+    for index, user in enumerate(users):
+        if index % 5 == 0:
+            status_callback(user, object())
+        elif index % 3 == 0:
+            status_callback(user, _SentMessage(user.id, status="rejected"))
+        else:
+            status_callback(user, _SentMessage(user.id))
+    return len(users)
+
+
 class ProgramInactiveAccountSelectorsTests(TestCase):
     def setUp(self):
         self.today = timezone.localdate()
@@ -252,3 +272,83 @@ class ProgramInactiveAccountScenariosTests(TestCase):
         self.assertEqual(log.status, MailingScenarioLog.Status.FAILED)
         self.assertIn("anymail_status=rejected", log.error)
         self.assertEqual(send_mail_mock.call_count, 1)
+
+    @patch(
+        "mailing.tasks.send_mass_mail_from_template",
+        side_effect=_fake_mixed_send_mass_mail_from_template,
+    )
+    def test_statuses_are_persisted_with_bulk_updates(self, send_mail_mock):
+        program = create_program(
+            datetime_registration_ends=aware_datetime(self.today + timedelta(days=20)),
+            datetime_started=aware_datetime(self.today - timedelta(days=15)),
+        )
+        users = CustomUser.objects.bulk_create(
+            CustomUser(
+                email=f"bulk-{index}@example.com",
+                first_name="Bulk",
+                last_name="User",
+                birthday="2000-01-01",
+                is_active=True,
+            )
+            for index in range(150)
+        )
+        PartnerProgramUserProfile.objects.bulk_create(
+            PartnerProgramUserProfile(
+                user=user, partner_program=program, partner_program_data={}
+            )
+            for user in users
+        )
+        PartnerProgramUserProfile.objects.filter(partner_program=program).update(
+            datetime_created=aware_datetime(self.today - timedelta(days=3))
+        )
+
+        with CaptureQueriesContext(connection) as queries:
+            sent_count = run_program_mailings()
+
+        log_updates = [
+            query["sql"]
+            for query in queries.captured_queries
+            if query["sql"].startswith('UPDATE "mailing_mailingscenariolog"')
+        ]
+        # сброс failed -> pending, по sent и failed на каждый из двух батчей,
+        # перевод оставшихся pending в failed
+        self.assertEqual(len(log_updates), 6)
+
+        logs = {
+            log.user_id: log
+            for log in MailingScenarioLog.objects.filter(
+                program=program, scheduled_for=self.today
+            )
+        }
+        recipients = send_mail_mock.call_args.args[0]
+        self.assertEqual(len(recipients), 150)
+        expected_sent = 0
+        for index, user in enumerate(recipients):
+            log = logs[user.id]
+            if index % 5 == 0:
+                self.assertEqual(log.status, MailingScenarioLog.Status.FAILED)
+                self.assertEqual(log.error, "anymail_status missing")
+            elif index % 3 == 0:
+                self.assertEqual(log.status, MailingScenarioLog.Status.FAILED)
+                self.assertEqual(
+                    log.error, f"anymail_status=rejected anymail_id=msg-{user.id}"
+                )
+            else:
+                expected_sent += 1
+                self.assertEqual(log.status, MailingScenarioLog.Status.SENT)
+                self.assertIsNotNone(log.sent_at)
+                self.assertEqual(log.error, "")
+        self.assertEqual(sent_count, expected_sent)
+
+        # повторный запуск досылает только упавшие письма
+        run_program_mailings()
+        self.assertEqual(send_mail_mock.call_count, 2)
+        retried = send_mail_mock.call_args.args[0]
+        self.assertEqual(
+            {user.id for user in retried},
+            {
+                user_id
+                for user_id, log in logs.items()
+                if log.status == MailingScenarioLog.Status.FAILED
+            },
+        )
@@ -0,0 +1,77 @@
+import os
+import tempfile
+from pathlib import Path
+from unittest.mock import patch
+
+from django.template import Context, Template
+from django.test import TestCase
+
+from mailing.template_cache import (
+    CompiledTemplateCache,
+    get_file_template,
+    get_schema_template,
+    get_string_template,
+    template_cache,
+)
+
+from .helpers import create_mailing_schema
+
+
+class CompiledTemplateCacheTests(TestCase):
+    def setUp(self):
+        template_cache.clear()
+        self.addCleanup(template_cache.clear)
+
+    def test_least_recently_used_template_is_evicted(self):
+        cache = CompiledTemplateCache(maxsize=2)
+        first = cache.get("first", lambda: "first")
+        cache.get("second", lambda: "second")
+
+        self.assertIs(cache.get("first", lambda: "changed"), first)
+        cache.get("third", lambda: "third")
+
+        self.assertEqual(len(cache), 2)
+        self.assertIs(cache.get("first", lambda: "changed"), first)
+        self.assertEqual(cache.get("second", lambda: "reloaded").source, "reloaded")
+
+    def test_string_template_is_compiled_once(self):
+        with patch("mailing.template_cache.Template", wraps=Template) as compile_template:
+            first = get_string_template("Hello {{ name }}")
+            second = get_string_template("Hello {{ name }}")
+
+        self.assertIs(first, second)
+        compile_template.assert_called_once()
+        self.assertEqual(first.render(Context({"name": "Anna"})), "Hello Anna")
+
+    def test_schema_template_follows_schema_updates(self):
+        schema = create_mailing_schema(template="Old {{ title }}")
+        old_template = get_schema_template(schema)
+        self.assertIs(get_schema_template(schema), old_template)
+
+        schema.template = "New {{ title }}"
+        schema.save()
+
+        self.assertEqual(len(template_cache), 0)
+        new_template = get_schema_template(schema)
+        self.assertEqual(new_template.render(Context({"title": "T"})), "New T")
+
+    def test_file_template_is_reread_only_after_change(self):
+        tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmpdir.cleanup)
+        path = Path(tmpdir.name) / "email.html"
+        path.write_text("Hi {{ user }}", encoding="utf-8")
+
+        with patch.object(
+            Path, "read_text", autospec=True, side_effect=Path.read_text
+        ) as read_text:
+            first = get_file_template(path)
+            self.assertIs(get_file_template(path), first)
+            self.assertEqual(read_text.call_count, 1)
+
+            path.write_text("Bye {{ user }}", encoding="utf-8")
+            stat = path.stat()
+            os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+            changed = get_file_template(path)
+
+        self.assertEqual(read_text.call_count, 2)
+        self.assertEqual(changed.source, "Bye {{ user }}")
@@ -1,14 +1,19 @@
+import time
 from unittest.mock import Mock, patch
 
+from django.core import mail
 from django.test import TestCase
 
 from mailing.typing import EmailDataToPrepare
 from mailing.utils import (
+    build_message,
     create_message_groups,
     prepare_mail_data,
     send_mass_mail,
     send_mass_mail_from_template,
+    send_message_pairs,
 )
+from users.models import CustomUser
 
 from .helpers import create_mailing_schema, create_user
 
@@ -42,7 +47,7 @@ class MailingPrepareDataTests(TestCase):
         self.assertEqual(list(mail_data["users"]), [user])
         self.assertNotIn(other_user, list(mail_data["users"]))
         self.assertEqual(mail_data["subject"], "Subject")
-        self.assertEqual(mail_data["template_string"], schema.template)
+        self.assertEqual(mail_data["template_string"].source, schema.template)
         self.assertEqual(
             mail_data["template_context"],
             {"title": "Custom title", "text": "Custom text"},
@@ -57,9 +62,7 @@ class MailingSendUtilsTests(TestCase):
 
         self.assertEqual([len(group) for group in groups], [100, 100, 5])
 
-    @patch("mailing.utils.send_group_messages")
-    def test_send_mass_mail_renders_template_for_each_user(self, send_group_messages):
-        send_group_messages.side_effect = lambda messages: len(messages)
+    def test_send_mass_mail_renders_template_for_each_user(self):
         first_user = create_user("first@example.com")
         second_user = create_user("second@example.com")
 
@@ -71,25 +74,19 @@ class MailingSendUtilsTests(TestCase):
         )
 
         self.assertEqual(sent_count, 2)
-        send_group_messages.assert_called_once()
-        messages = send_group_messages.call_args.args[0]
+        messages = sorted(mail.outbox, key=lambda message: message.to)
         self.assertEqual(messages[0].to, [first_user.email])
         self.assertEqual(messages[0].subject, "Subject")
         self.assertIn("Hello first@example.com: Reminder", messages[0].body)
+        self.assertEqual(messages[0].alternatives, [(messages[0].body, "text/html")])
         self.assertEqual(messages[1].to, [second_user.email])
         self.assertIn("Hello second@example.com: Reminder", messages[1].body)
 
-    @patch("mailing.utils.send_group_messages")
     @patch("mailing.utils.get_template")
-    def test_send_mass_mail_from_template_calls_status_callback(
-        self,
-        get_template,
-        send_group_messages,
-    ):
+    def test_send_mass_mail_from_template_calls_status_callback(self, get_template):
         template = Mock()
         template.render.side_effect = lambda context: f"Hello {context['user'].email}"
         get_template.return_value = template
-        send_group_messages.side_effect = lambda messages: len(messages)
         user = create_user("template-recipient@example.com")
         handled_user_ids = []
 
@@ -104,7 +101,131 @@ class MailingSendUtilsTests(TestCase):
 
         self.assertEqual(sent_count, 1)
         get_template.assert_called_once_with("email/template.html")
+        template.render.assert_called_once()
         self.assertEqual(handled_user_ids, [user.id])
-        message = send_group_messages.call_args.args[0][0]
+        message = mail.outbox[0]
         self.assertEqual(message.to, [user.email])
         self.assertIn("Hello template-recipient@example.com", message.body)
+
+
+def _recipients(count: int) -> list[CustomUser]:
+    return [
+        CustomUser(id=index + 1, email=f"recipient-{index}@example.com")
+        for index in range(count)
+    ]
+
+
+class MailingPipelineTests(TestCase):
+    def test_large_mailing_is_sent_in_batches_over_reused_connections(self):
+        recipients = _recipients(250)
+        handled = []
+
+        with patch("mailing.utils.mail.get_connection", wraps=mail.get_connection) as (
+            get_connection
+        ):
+            sent_count = send_message_pairs(
+                (
+                    (user, build_message(user, "Subject", f"Hello {user.email}"))
+                    for user in recipients
+                ),
+                status_callback=lambda user, msg: handled.append(user.id),
+                workers=3,
+            )
+
+        self.assertEqual(sent_count, 250)
+        # соединения открываются по мере нужды, не больше одного на поток
+        self.assertLessEqual(get_connection.call_count, 3)
+        self.assertEqual(len(mail.outbox), 250)
+        self.assertEqual(
+            sorted(message.to[0] for message in mail.outbox),
+            sorted(user.email for user in recipients),
+        )
+        self.assertEqual(sorted(handled), [user.id for user in recipients])
+
+    def test_sending_starts_before_audience_is_rendered(self):
+        outbox_sizes = []
+
+        def context_builder(user):
+            outbox_sizes.append(len(mail.outbox))
+            return {}
+
+        with patch("mailing.utils.get_template") as get_template, self.settings(
+            MAILING_SEND_WORKERS=1, MAILING_MAX_IN_FLIGHT_BATCHES=1
+        ):
+            get_template.return_value.render.return_value = "Hello"
+            sent_count = send_mass_mail_from_template(
+                _recipients(350),
+                "Subject",
+                "email/template.html",
+                context_builder=context_builder,
+            )
+
+        self.assertEqual(sent_count, 350)
+        # третий батч рендерится только после отправки первого
+        self.assertGreaterEqual(outbox_sizes[200], 100)
+        self.assertGreaterEqual(outbox_sizes[300], 200)
+
+    def test_given_connection_is_reused_and_left_open(self):
+        connection = mail.get_connection()
+        recipients = _recipients(150)
+
+        with patch.object(connection, "close") as close, patch(
+            "mailing.utils.mail.get_connection"
+        ) as get_connection:
+            sent_count = send_mass_mail(
+                recipients, "Subject", "Hi {{ user.email }}", connection=connection
+            )
+
+        self.assertEqual(sent_count, 150)
+        get_connection.assert_not_called()
+        close.assert_not_called()
+
+    def test_failed_batch_stops_mailing(self):
+        handled = []
+
+        with patch("mailing.utils.get_template"), patch(
+            "mailing.utils.send_group_messages", side_effect=RuntimeError("smtp down")
+        ), self.assertRaisesMessage(RuntimeError, "smtp down"):
+            send_mass_mail_from_template(
+                _recipients(10),
+                "Subject",
+                "email/template.html",
+                status_callback=lambda user, msg: handled.append(user.id),
+            )
+
+        self.assertEqual(handled, [])
+
+    def test_single_message_opens_one_connection(self):
+        with patch(
+            "mailing.utils.mail.get_connection", wraps=mail.get_connection
+        ) as get_connection, self.settings(MAILING_SEND_WORKERS=8):
+            sent_count = send_mass_mail(_recipients(1), "Subject", "Hi")
+
+        self.assertEqual(sent_count, 1)
+        self.assertEqual(get_connection.call_count, 1)
+
+    def test_batches_sent_before_a_failure_are_reported(self):
+        recipients = _recipients(400)
+        failing_email = recipients[-1].email
+        sent_emails = []
+        handled = []
+
+        def send_group(messages, connection=None):
+            if any(message.to[0] == failing_email for message in messages):
+                raise RuntimeError("smtp down")
+            time.sleep(0.1)
+            sent_emails.extend(message.to[0] for message in messages)
+            return len(messages)
+
+        with patch(
+            "mailing.utils.send_group_messages", side_effect=send_group
+        ), self.assertRaisesMessage(RuntimeError, "smtp down"):
+            send_message_pairs(
+                ((user, build_message(user, "Subject", "Hi")) for user in recipients),
+                status_callback=lambda user, msg: handled.append(user.email),
+                workers=4,
+                max_in_flight=4,
+            )
+
+        self.assertEqual(len(sent_emails), 300)
+        self.assertEqual(sorted(handled), sorted(sent_emails))
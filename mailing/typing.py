@@ -2,8 +2,8 @@ from dataclasses import dataclass
 from typing import TypedDict, Annotated, TypeAlias
 
 from django.db.models import QuerySet
+from django.template import Template
 
-from mailing.models import MailingSchema
 from users.models import CustomUser
 
 UsersType: TypeAlias = QuerySet[CustomUser] | list[CustomUser]
@@ -12,7 +12,7 @@ UsersType: TypeAlias = QuerySet[CustomUser] | list[CustomUser]
 class MailDataDict(TypedDict):
     users: UsersType
     subject: str
-    template_string: MailingSchema.template
+    template_string: Template
     template_context: dict
 
 
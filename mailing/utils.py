@@ -1,7 +1,10 @@
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
 from functools import singledispatch
-from typing import Dict, List, Union, Annotated, Callable
+from itertools import islice
+from queue import Empty, SimpleQueue
+from typing import Dict, Iterable, Iterator, List, Union, Annotated, Callable
 
-from procollab import settings
+from django.conf import settings
 from .constants import MAILING_USERS_BATCH_SIZE
 from .models import MailingSchema
 from users.models import CustomUser
@@ -13,10 +16,23 @@ from django.core.mail import EmailMultiAlternatives
 from django.template import Context, Template
 from django.template.loader import get_template
 
+from .template_cache import get_schema_template, get_string_template
 from .typing import MailDataDict, EmailDataToPrepare
 
 User = get_user_model()
 
+MessagePair = tuple[User, EmailMultiAlternatives]
+StatusCallback = Callable[[User, EmailMultiAlternatives], None]
+
+
+def filter_schema_context(mail_schema: MailingSchema, context_data: dict) -> dict:
+    """Оставляет из `context_data` только переменные, объявленные в схеме."""
+    return {
+        variable_name: context_data[variable_name]
+        for variable_name in mail_schema.schema
+        if variable_name in context_data
+    }
+
 
 @singledispatch
 def prepare_mail_data(post_data):
@@ -43,16 +59,13 @@ def _(post_data: EmailDataToPrepare) -> MailDataDict:
     schema_id = post_data.schema_id
     subject = post_data.subject
     mail_schema = MailingSchema.objects.get(pk=schema_id)
-    context = {}
-    for variable_name in mail_schema.schema:
-        if variable_name in post_data.context_data:
-            context[variable_name] = post_data.context_data[variable_name]
+    context = filter_schema_context(mail_schema, post_data.context_data)
 
     users_to_send = CustomUser.objects.filter(pk__in=post_data.users_ids)
     return {
         "users": users_to_send,
         "subject": subject,
-        "template_string": mail_schema.template,
+        "template_string": get_schema_template(mail_schema),
         "template_context": context,
     }
 
@@ -65,10 +78,32 @@ def create_message_groups(messages: list) -> list[list]:
     return grouped_messages
 
 
+def iter_message_groups(
+    messages: Iterable, batch_size: int = MAILING_USERS_BATCH_SIZE
+) -> Iterator[list]:
+    """Ленивый аналог `create_message_groups`: батчи без списка всех писем."""
+    messages = iter(messages)
+    while group := list(islice(messages, batch_size)):
+        yield group
+
+
+def _iter_users(users: django.db.models.QuerySet | Iterable[User]) -> Iterator[User]:
+    if isinstance(users, django.db.models.QuerySet):
+        return users.iterator(chunk_size=MAILING_USERS_BATCH_SIZE)
+    return iter(users)
+
+
+def build_message(user: User, subject: str, body: str) -> EmailMultiAlternatives:
+    """Письмо с одним и тем же отрендеренным HTML в теле и в text/html."""
+    msg = EmailMultiAlternatives(subject, body, settings.EMAIL_USER, [user.email])
+    msg.attach_alternative(body, "text/html")
+    return msg
+
+
 def send_mail(
     user: User,
     subject: str,
-    template_string: str,
+    template_string: str | Template,
     template_context: Union[
         Dict,
         List,
@@ -78,17 +113,111 @@ def send_mail(
     return send_mass_mail([user], subject, template_string, template_context, connection)
 
 
-def send_group_messages(messages: list) -> int:
+def send_group_messages(messages: list, connection=None) -> int:
+    if connection is not None:
+        return connection.send_messages(messages)
     connection = mail.get_connection()
     num_sent = connection.send_messages(messages)
     connection.close()
     return num_sent
 
 
+def send_message_pairs(
+    message_pairs: Iterable[MessagePair],
+    status_callback: StatusCallback | None = None,
+    connection=None,
+    workers: int | None = None,
+    max_in_flight: int | None = None,
+) -> int:
+    """
+    Отправляет письма конвейером: батчи по MAILING_USERS_BATCH_SIZE уходят в
+    пул из `workers` потоков по мере рендеринга, не дожидаясь всей аудитории.
+
+    В работе одновременно не больше `max_in_flight` батчей, поэтому память не
+    зависит от размера рассылки. Соединение с backend открывается, только когда
+    все открытые заняты, и держится до конца рассылки, так что одно письмо
+    стоит одного соединения. Переданное `connection` используется как есть
+    одним потоком и не закрывается.
+    `status_callback` вызывается в вызывающем потоке после отправки батча.
+    Ошибка отправки останавливает выдачу новых батчей, но уже запущенные
+    дожидаются: их письма ушли, поэтому для них вызывается `status_callback`.
+    После этого первая ошибка пробрасывается дальше.
+    """
+    if connection is not None:
+        workers = 1
+    elif workers is None:
+        workers = settings.MAILING_SEND_WORKERS
+    workers = max(1, workers)
+    if max_in_flight is None:
+        max_in_flight = settings.MAILING_MAX_IN_FLIGHT_BATCHES
+    max_in_flight = max(workers, max_in_flight)
+
+    connections: SimpleQueue = SimpleQueue()
+    own_connections = []
+    if connection is not None:
+        connections.put(connection)
+
+    def acquire_connection():
+        try:
+            return connections.get_nowait()
+        except Empty:
+            own_connection = mail.get_connection()
+            own_connection.open()
+            own_connections.append(own_connection)
+            return own_connection
+
+    def send(group: list[MessagePair]) -> int:
+        group_connection = acquire_connection()
+        try:
+            return send_group_messages([msg for _, msg in group], group_connection)
+        finally:
+            connections.put(group_connection)
+
+    errors = []
+
+    def collect(done) -> int:
+        sent = 0
+        for future in done:
+            group = in_flight.pop(future)
+            try:
+                sent += future.result() or 0
+            except Exception as error:
+                errors.append(error)
+                continue
+            if status_callback is not None:
+                for user, msg in group:
+                    status_callback(user, msg)
+        return sent
+
+    num_sent = 0
+    in_flight = {}
+    executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="mailing")
+    try:
+        try:
+            for group in iter_message_groups(message_pairs):
+                if len(in_flight) >= max_in_flight:
+                    wait(in_flight, return_when=FIRST_COMPLETED)
+                num_sent += collect([future for future in in_flight if future.done()])
+                if errors:
+                    break
+                in_flight[executor.submit(send, group)] = group
+        finally:
+            # запущенные батчи досылаются и отмечаются и при ошибке
+            done, _ = wait(in_flight)
+            num_sent += collect(done)
+        if errors:
+            raise errors[0]
+    finally:
+        executor.shutdown(wait=True)
+        for own_connection in own_connections:
+            own_connection.close()
+    return num_sent
+
+
 def send_mass_mail(
     users: django.db.models.QuerySet | List[User],
     subject: str,
-    template_string: str,
+    template_string: str | Template,
     template_context: Union[
         MailDataDict,
         list,
@@ -100,31 +229,24 @@ def send_mass_mail(
     Throws an error if template render is unsuccessful.
     Args:
         users: - The list of users who should receive the email.
-        template_string: str of template_path
+        template_string: Template text or an already compiled Template
         subject: Subject of mail.
         template_context: Context for template render.
         connection: Connection to mail backend
     """
-    if template_context is None:
-        template_context = {}
+    template_context = dict(template_context or {})
+    if isinstance(template_string, Template):
+        template = template_string
+    else:
+        template = get_string_template(template_string)
 
-    template = Template(template_string)
-    messages = []
-    for user in users:
-        template_context["user"] = user
-        html_msg = template.render(Context(template_context))
-        plain_msg = template.render(Context(template_context))
-        msg = EmailMultiAlternatives(
-            subject, plain_msg, settings.EMAIL_USER, [user.email]
-        )
-        msg.attach_alternative(html_msg, "text/html")
-        messages.append(msg)
-
-    grouped_messages = create_message_groups(messages)
-    num_sent: int = 0
-    for group in grouped_messages:
-        num_sent += send_group_messages(group)
-    return num_sent
+    def iter_message_pairs() -> Iterator[MessagePair]:
+        for user in _iter_users(users):
+            template_context["user"] = user
+            body = template.render(Context(template_context))
+            yield user, build_message(user, subject, body)
+
+    return send_message_pairs(iter_message_pairs(), connection=connection)
 
 
 def send_mass_mail_from_template(
@@ -137,7 +259,7 @@ def send_mass_mail_from_template(
         dict,
     ] = None,
     context_builder=None,
-    status_callback: Callable[[User, EmailMultiAlternatives], None] | None = None,
+    status_callback: StatusCallback | None = None,
     connection=None,
 ) -> Annotated[int, "Количество отосланных сообщений"]:
     """
@@ -148,26 +270,15 @@ def send_mass_mail_from_template(
         template_context = {}
 
     template = get_template(template_name)
-    message_pairs: list[tuple[User, EmailMultiAlternatives]] = []
-    for user in users:
-        context = dict(template_context)
-        if context_builder is not None:
-            context.update(context_builder(user))
-        context["user"] = user
-        html_msg = template.render(context)
-        plain_msg = template.render(context)
-        msg = EmailMultiAlternatives(
-            subject, plain_msg, settings.EMAIL_USER, [user.email]
-        )
-        msg.attach_alternative(html_msg, "text/html")
-        message_pairs.append((user, msg))
-
-    grouped_messages = create_message_groups(message_pairs)
-    num_sent: int = 0
-    for group in grouped_messages:
-        messages = [msg for _, msg in group]
-        num_sent += send_group_messages(messages)
-        if status_callback is not None:
-            for user, msg in group:
-                status_callback(user, msg)
-    return num_sent
+
+    def iter_message_pairs() -> Iterator[MessagePair]:
+        for user in _iter_users(users):
+            context = dict(template_context)
+            if context_builder is not None:
+                context.update(context_builder(user))
+            context["user"] = user
+            yield user, build_message(user, subject, template.render(context))
+
+    return send_message_pairs(
+        iter_message_pairs(), status_callback=status_callback, connection=connection
+    )
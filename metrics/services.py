@@ -1,7 +1,6 @@
 from django.contrib.auth import get_user_model
-from django.core.cache import cache
 
-from core.utils import get_users_online_cache_key
+from core.presence import get_presence_store
 from projects.models import Project
 from users.models import Expert, Investor, Member, Mentor
 from vacancy.models import Vacancy
@@ -18,8 +17,7 @@ def add_total_count(data: dict[str, int], model) -> dict[str, int]:
 
 
 def get_current_online_users_count() -> int:
-    users_online_list_key = get_users_online_cache_key()
-    return len(cache.get_or_set(users_online_list_key, set()))
+    return get_presence_store().count()
 
 
 def collect_metrics_payload() -> dict[str, int]:
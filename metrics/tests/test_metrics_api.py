@@ -2,7 +2,7 @@ from django.core.cache import cache
 from django.test import TestCase
 from rest_framework.test import APIClient
 
-from core.utils import get_users_online_cache_key
+from core.presence import get_presence_store
 from metrics.tests.helpers import create_project, create_user, create_vacancy
 
 
@@ -10,6 +10,7 @@ class MetricsAPITests(TestCase):
     def setUp(self):
         self.client = APIClient()
         cache.clear()
+        get_presence_store().clear()
 
     def test_anonymous_user_cannot_access_metrics(self):
         response = self.client.get("/")
@@ -21,7 +22,10 @@ class MetricsAPITests(TestCase):
         user = create_user(prefix="metrics-regular")
         project = create_project(leader=user)
         create_vacancy(project=project)
-        cache.set(get_users_online_cache_key(), {staff.id, user.id})
+        presence = get_presence_store()
+        presence.touch(staff.id, "specific.first")
+        presence.touch(user.id, "specific.second")
+        presence.touch(user.id, "specific.third")
         self.client.force_authenticate(staff)
 
         response = self.client.get("/")
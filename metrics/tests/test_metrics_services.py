@@ -1,7 +1,7 @@
 from django.core.cache import cache
 from django.test import TestCase
 
-from core.utils import get_users_online_cache_key
+from core.presence import get_presence_store
 from metrics.services import add_total_count, collect_metrics_payload
 from metrics.tests.helpers import create_project, create_user, create_vacancy
 from users.models import CustomUser
@@ -10,6 +10,7 @@ from users.models import CustomUser
 class MetricsServiceTests(TestCase):
     def setUp(self):
         cache.clear()
+        get_presence_store().clear()
 
     def test_collect_metrics_payload_counts_supported_models_and_online_users(self):
         online_user = create_user(
@@ -26,7 +27,10 @@ class MetricsServiceTests(TestCase):
         )
         project = create_project(leader=leader)
         create_vacancy(project=project)
-        cache.set(get_users_online_cache_key(), {online_user.id, leader.id})
+        presence = get_presence_store()
+        presence.touch(online_user.id, "specific.first")
+        presence.touch(leader.id, "specific.second")
+        presence.touch(leader.id, "specific.third")
 
         payload = collect_metrics_payload()
 
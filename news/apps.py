@@ -5,3 +5,6 @@ class NewsConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "news"
     verbose_name = "Новости"
+
+    def ready(self):
+        import news.signals  # noqa: F401
@@ -0,0 +1,74 @@
+from django.contrib.contenttypes.models import ContentType
+from django.db.models import Count, F, IntegerField, OuterRef, Q, Subquery, Value
+from django.db.models.functions import Coalesce, Greatest
+
+from core.models import Like, View
+from news.models import News, NewsComment
+
+LIKES_COUNT = "likes_count"
+VIEWS_COUNT = "views_count"
+COMMENTS_COUNT = "comments_count"
+NEWS_COUNTER_FIELDS = (LIKES_COUNT, VIEWS_COUNT, COMMENTS_COUNT)
+
+
+def is_news_content_type(content_type_id: int) -> bool:
+    return content_type_id == ContentType.objects.get_for_model(News).id
+
+
+def adjust_news_counter(news_id: int, field: str, delta: int) -> None:
+    """
+    Атомарно сдвигает счетчик новости на `delta`.
+
+    Счетчик не уходит ниже нуля: повторное удаление или гонка с пересчетом
+    не должны ломать CHECK-ограничение положительного поля.
+    """
+    News.objects.filter(pk=news_id).update(
+        **{field: Greatest(F(field) + delta, Value(0))}
+    )
+
+
+def _count_subquery(queryset, field: str) -> Coalesce:
+    counts = queryset.order_by().values(field).annotate(total=Count("id")).values("total")
+    return Coalesce(Subquery(counts, output_field=IntegerField()), Value(0))
+
+
+def reconcile_news_counters(batch_size: int = 500) -> int:
+    """
+    Пересчитывает счетчики по `core.Like`, `core.View` и `NewsComment`.
+
+    Обновляет только разошедшиеся строки и возвращает их количество.
+    """
+    news_content_type = ContentType.objects.get_for_model(News)
+    generic_filter = {"content_type": news_content_type, "object_id": OuterRef("pk")}
+    drifted = (
+        News.objects.annotate(
+            actual_likes=_count_subquery(
+                Like.objects.filter(**generic_filter), "object_id"
+            ),
+            actual_views=_count_subquery(
+                View.objects.filter(**generic_filter), "object_id"
+            ),
+            actual_comments=_count_subquery(
+                NewsComment.objects.filter(news=OuterRef("pk")), "news"
+            ),
+        )
+        .filter(
+            ~Q(likes_count=F("actual_likes"))
+            | ~Q(views_count=F("actual_views"))
+            | ~Q(comments_count=F("actual_comments"))
+        )
+        .order_by()
+        .values_list("id", "actual_likes", "actual_views", "actual_comments")
+    )
+
+    fixed = [
+        News(
+            id=news_id,
+            likes_count=likes_count,
+            views_count=views_count,
+            comments_count=comments_count,
+        )
+        for news_id, likes_count, views_count, comments_count in drifted.iterator()
+    ]
+    News.objects.bulk_update(fixed, NEWS_COUNTER_FIELDS, batch_size=batch_size)
+    return len(fixed)
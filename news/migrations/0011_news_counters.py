@@ -0,0 +1,59 @@
+from django.db import migrations, models
+from django.db.models import Count, IntegerField, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+
+
+def _count_subquery(queryset, field):
+    counts = queryset.order_by().values(field).annotate(total=Count("id")).values("total")
+    return Coalesce(Subquery(counts, output_field=IntegerField()), Value(0))
+
+
+def backfill_news_counters(apps, schema_editor):
+    News = apps.get_model("news", "News")
+    NewsComment = apps.get_model("news", "NewsComment")
+    Like = apps.get_model("core", "Like")
+    View = apps.get_model("core", "View")
+    ContentType = apps.get_model("contenttypes", "ContentType")
+
+    news_content_type_id = (
+        ContentType.objects.filter(app_label="news", model="news")
+        .values_list("id", flat=True)
+        .first()
+    )
+    generic_filter = {
+        "content_type_id": news_content_type_id,
+        "object_id": OuterRef("pk"),
+    }
+    News.objects.update(
+        likes_count=_count_subquery(Like.objects.filter(**generic_filter), "object_id"),
+        views_count=_count_subquery(View.objects.filter(**generic_filter), "object_id"),
+        comments_count=_count_subquery(
+            NewsComment.objects.filter(news=OuterRef("pk")), "news"
+        ),
+    )
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("core", "0015_alter_skill_options_alter_skilltoobject_options"),
+        ("news", "0010_news_audience_newscomment"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="news",
+            name="comments_count",
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name="news",
+            name="likes_count",
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name="news",
+            name="views_count",
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(backfill_news_counters, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,66 @@
+from django.db import migrations, models
+from django.db.models import Exists, OuterRef
+
+
+def backfill_news_feed_visibility(apps, schema_editor):
+    News = apps.get_model("news", "News")
+    Project = apps.get_model("projects", "Project")
+    Vacancy = apps.get_model("vacancy", "Vacancy")
+    ContentType = apps.get_model("contenttypes", "ContentType")
+
+    visible_objects = {
+        ("projects", "project"): Project.objects.filter(draft=False, is_public=True),
+        ("vacancy", "vacancy"): Vacancy.objects.filter(
+            is_active=True,
+            project__draft=False,
+            project__is_public=True,
+        ),
+    }
+    for (app_label, model), queryset in visible_objects.items():
+        content_type_id = (
+            ContentType.objects.filter(app_label=app_label, model=model)
+            .values_list("id", flat=True)
+            .first()
+        )
+        if content_type_id is None:
+            continue
+        News.objects.filter(content_type_id=content_type_id).update(
+            is_feed_visible=Exists(queryset.filter(pk=OuterRef("object_id")))
+        )
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("news", "0011_news_counters"),
+        ("projects", "0033_delete_projectnews"),
+        ("vacancy", "0009_vacancy_specialization"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="news",
+            name="is_feed_visible",
+            field=models.BooleanField(default=True, editable=False),
+        ),
+        migrations.AddIndex(
+            model_name="news",
+            index=models.Index(
+                fields=["-datetime_created", "-id"], name="news_created_id_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="news",
+            index=models.Index(
+                condition=models.Q(("is_feed_visible", True)),
+                fields=["-datetime_created", "content_type"],
+                name="news_feed_visible_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="news",
+            index=models.Index(
+                fields=["content_type", "object_id"], name="news_content_object_idx"
+            ),
+        ),
+        migrations.RunPython(backfill_news_feed_visibility, migrations.RunPython.noop),
+    ]
@@ -38,6 +38,14 @@ class News(models.Model):
         Like,
         related_query_name="project_news",
     )
+    # Денормализованные счетчики: двигаются сигналами news.signals, дрейф
+    # исправляет периодическая задача news.tasks.reconcile_news_counters_task.
+    likes_count = models.PositiveIntegerField(default=0, editable=False)
+    views_count = models.PositiveIntegerField(default=0, editable=False)
+    comments_count = models.PositiveIntegerField(default=0, editable=False)
+    # Видимость записи в /feed/ по состоянию связанного проекта или вакансии.
+    # Поддерживается feed.signals, см. feed.visibility.
+    is_feed_visible = models.BooleanField(default=True, editable=False)
     pin = models.BooleanField(
         blank=True,
         default=False,
@@ -85,6 +93,23 @@ class News(models.Model):
         verbose_name = "Новость"
         verbose_name_plural = "Новости"
         ordering = ["-datetime_created"]
+        indexes = [
+            # Лента и React-лента читают страницы по убыванию даты: индексы
+            # превращают выборку страницы в range scan без сортировки.
+            models.Index(
+                fields=["-datetime_created", "-id"],
+                name="news_created_id_idx",
+            ),
+            models.Index(
+                fields=["-datetime_created", "content_type"],
+                condition=models.Q(is_feed_visible=True),
+                name="news_feed_visible_idx",
+            ),
+            models.Index(
+                fields=["content_type", "object_id"],
+                name="news_content_object_idx",
+            ),
+        ]
         constraints = [
             models.CheckConstraint(
                 check=models.Q(audience__in=("platform", "program_participants")),
@@ -1,7 +1,7 @@
 from django.contrib.auth import get_user_model
 from rest_framework import serializers
 
-from core.services import is_fan, get_likes_count, get_views_count
+from core.services import is_fan
 from files.models import UserFile
 from files.serializers import UserFileSerializer
 from news.mapping import NewsMapping
@@ -80,10 +80,10 @@ class BaseNewsResponseSerializer(serializers.ModelSerializer[News]):
         return NewsMapping.get_image_address(obj.content_object)
 
     def get_views_count(self, obj):
-        return get_views_count(obj)
+        return obj.views_count
 
     def get_likes_count(self, obj):
-        return get_likes_count(obj)
+        return obj.likes_count
 
     def get_is_user_liked(self, obj):
         user = self.context.get("user")
@@ -0,0 +1,47 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from core.models import Like, View
+from news.counters import (
+    COMMENTS_COUNT,
+    LIKES_COUNT,
+    VIEWS_COUNT,
+    adjust_news_counter,
+    is_news_content_type,
+)
+from news.models import NewsComment
+
+
+@receiver(post_save, sender=Like)
+def increment_news_likes(sender, instance, created, **kwargs):
+    if created and is_news_content_type(instance.content_type_id):
+        adjust_news_counter(instance.object_id, LIKES_COUNT, 1)
+
+
+@receiver(post_delete, sender=Like)
+def decrement_news_likes(sender, instance, **kwargs):
+    if is_news_content_type(instance.content_type_id):
+        adjust_news_counter(instance.object_id, LIKES_COUNT, -1)
+
+
+@receiver(post_save, sender=View)
+def increment_news_views(sender, instance, created, **kwargs):
+    if created and is_news_content_type(instance.content_type_id):
+        adjust_news_counter(instance.object_id, VIEWS_COUNT, 1)
+
+
+@receiver(post_delete, sender=View)
+def decrement_news_views(sender, instance, **kwargs):
+    if is_news_content_type(instance.content_type_id):
+        adjust_news_counter(instance.object_id, VIEWS_COUNT, -1)
+
+
+@receiver(post_save, sender=NewsComment)
+def increment_news_comments(sender, instance, created, **kwargs):
+    if created:
+        adjust_news_counter(instance.news_id, COMMENTS_COUNT, 1)
+
+
+@receiver(post_delete, sender=NewsComment)
+def decrement_news_comments(sender, instance, **kwargs):
+    adjust_news_counter(instance.news_id, COMMENTS_COUNT, -1)
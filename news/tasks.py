@@ -0,0 +1,13 @@
+import logging
+
+from news.counters import reconcile_news_counters
+from procollab.celery import app
+
+logger = logging.getLogger(__name__)
+
+
+@app.task
+def reconcile_news_counters_task() -> int:
+    fixed_count = reconcile_news_counters()
+    logger.info("Reconciled counters for %s news", fixed_count)
+    return fixed_count
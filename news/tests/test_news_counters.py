@@ -0,0 +1,61 @@
+from django.test import TestCase
+
+from core.services import add_like, add_view, remove_like, remove_view
+from news.counters import reconcile_news_counters
+from news.models import News, NewsComment
+
+from .helpers import create_news_for, create_project, create_user
+
+
+class NewsCountersTests(TestCase):
+    def setUp(self):
+        self.project = create_project()
+        self.news = create_news_for(self.project, text="Counted news")
+        self.user = create_user()
+
+    def assertCounters(self, likes: int, views: int, comments: int):
+        self.news.refresh_from_db()
+        self.assertEqual(
+            (self.news.likes_count, self.news.views_count, self.news.comments_count),
+            (likes, views, comments),
+        )
+
+    def test_like_view_and_comment_services_move_counters(self):
+        other_user = create_user()
+
+        add_like(self.news, self.user)
+        add_like(self.news, self.user)
+        add_like(self.news, other_user)
+        add_view(self.news, self.user)
+        comment = NewsComment.objects.create(news=self.news, author=self.user, text="Hi")
+        self.assertCounters(likes=2, views=1, comments=1)
+
+        remove_like(self.news, self.user)
+        remove_like(self.news, self.user)
+        remove_view(self.news, self.user)
+        comment.delete()
+        self.assertCounters(likes=1, views=0, comments=0)
+
+    def test_likes_of_other_objects_do_not_touch_news(self):
+        add_like(self.project, self.user)
+        add_view(self.project, self.user)
+
+        self.assertCounters(likes=0, views=0, comments=0)
+
+    def test_reconcile_fixes_only_drifted_news(self):
+        add_like(self.news, self.user)
+        add_view(self.news, self.user)
+        untouched = create_news_for(self.project, text="In sync")
+        News.objects.filter(pk=self.news.pk).update(
+            likes_count=10,
+            views_count=0,
+            comments_count=3,
+        )
+
+        fixed_count = reconcile_news_counters()
+
+        self.assertEqual(fixed_count, 1)
+        self.assertCounters(likes=1, views=1, comments=0)
+        untouched.refresh_from_db()
+        self.assertEqual(untouched.likes_count, 0)
+        self.assertEqual(reconcile_news_counters(), 0)
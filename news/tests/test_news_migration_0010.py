@@ -40,7 +40,7 @@ class NewsMigration0010PostgreSQLTests(TransactionTestCase):
 
     def tearDown(self):
         self.executor.loader.build_graph()
-        self.executor.migrate(self.migrate_to)
+        self.executor.migrate(self.executor.loader.graph.leaf_nodes("news"))
         super().tearDown()
 
     def test_applies_after_updating_existing_news_rows(self):
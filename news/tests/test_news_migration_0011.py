@@ -0,0 +1,83 @@
+import unittest
+
+from django.db import connection
+from django.db.migrations.executor import MigrationExecutor
+from django.test import TransactionTestCase
+
+from .helpers import create_user
+
+
+@unittest.skipUnless(
+    connection.vendor == "postgresql",
+    "PostgreSQL-only regression for the news counters backfill.",
+)
+class NewsMigration0011PostgreSQLTests(TransactionTestCase):
+    migrate_from = [
+        ("core", "0015_alter_skill_options_alter_skilltoobject_options"),
+        ("news", "0010_news_audience_newscomment"),
+    ]
+    migrate_to = [("news", "0011_news_counters")]
+
+    def setUp(self):
+        super().setUp()
+        self.executor = MigrationExecutor(connection)
+        self.executor.migrate(self.migrate_from)
+        self.apps = self.executor.loader.project_state(self.migrate_from).apps
+
+    def tearDown(self):
+        self.executor.loader.build_graph()
+        self.executor.migrate(self.executor.loader.graph.leaf_nodes("news"))
+        super().tearDown()
+
+    def test_backfills_counters_from_existing_rows(self):
+        ContentType = self.apps.get_model("contenttypes", "ContentType")
+        News = self.apps.get_model("news", "News")
+        NewsComment = self.apps.get_model("news", "NewsComment")
+        Like = self.apps.get_model("core", "Like")
+        View = self.apps.get_model("core", "View")
+        news_content_type, _ = ContentType.objects.get_or_create(
+            app_label="news",
+            model="news",
+        )
+        project_content_type, _ = ContentType.objects.get_or_create(
+            app_label="projects",
+            model="project",
+        )
+        # Схема users в БД актуальная, поэтому пользователей создаем текущей моделью.
+        first_user = create_user()
+        second_user = create_user()
+        popular = News.objects.create(
+            content_type=project_content_type,
+            object_id=1,
+            text="Popular",
+        )
+        quiet = News.objects.create(
+            content_type=project_content_type,
+            object_id=1,
+            text="Quiet",
+        )
+        for user in (first_user, second_user):
+            Like.objects.create(
+                user_id=user.id, content_type=news_content_type, object_id=popular.id
+            )
+            View.objects.create(
+                user_id=user.id, content_type=news_content_type, object_id=popular.id
+            )
+        View.objects.create(
+            user_id=first_user.id, content_type=news_content_type, object_id=quiet.id
+        )
+        NewsComment.objects.create(news=popular, author_id=first_user.id, text="First")
+
+        self.executor.loader.build_graph()
+        self.executor.migrate(self.migrate_to)
+        migrated_apps = self.executor.loader.project_state(self.migrate_to).apps
+        MigratedNews = migrated_apps.get_model("news", "News")
+
+        self.assertEqual(
+            list(
+                MigratedNews.objects.order_by("id").values_list(
+                    "likes_count", "views_count", "comments_count"
+                )
+            ),
+            [(2, 2, 1), (0, 1, 0)],
+        )
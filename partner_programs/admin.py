@@ -1,16 +1,12 @@
 # Roadmap: DEV-073
 
-import re
-
-import tablib
 from django import forms
 from django.contrib import admin
 from django.db.models import QuerySet
 from django.http import HttpRequest
 from django.urls import path
-from django.utils import timezone
 
-from core.utils import XlsxFileToExport, build_xlsx_download_response
+from exports.admin import start_admin_export
 from mailing.views import MailingTemplateRender
 from partner_programs.models import (
     Application,
@@ -29,7 +25,6 @@ from partner_programs.models import (
     TeamInvite,
     TeamMember,
 )
-from partner_programs.services import prepare_project_scores_export_data
 
 
 @admin.register(Application)
@@ -604,80 +599,12 @@ class PartnerProgramAdmin(admin.ModelAdmin):
         return res
 
     def get_export_file_view(self, request, object_id):
-        program = PartnerProgram.objects.get(pk=object_id)
-        return self.get_export_file(program)
-
-    def get_export_file(self, partner_program: PartnerProgram):
-        json_schema = partner_program.data_schema
-
-        profiles = PartnerProgramUserProfile.objects.filter(
-            partner_program=partner_program
-        )
-        to_delete_from_json_scheme = []
-        column_names = ["Имя", "Фамилия", "Отчество", "Почта", "Дата рождения"]
-        for field_key in json_schema:
-            if "name" not in json_schema[field_key]:
-                to_delete_from_json_scheme.append(field_key)
-            else:
-                column_names.append(json_schema[field_key]["name"])
-
-        for field_key in to_delete_from_json_scheme:
-            del json_schema[field_key]
-
-        response_data = tablib.Dataset(headers=column_names)
-        for profile in profiles:
-            if profile.user is None:
-                row = [""] * 5
-            else:
-                row = [
-                    profile.user.first_name,
-                    profile.user.last_name,
-                    profile.user.patronymic,
-                    profile.user.email,
-                    str(profile.user.birthday),
-                ]
-
-            json_data = profile.partner_program_data
-            ILLEGAL_CHARACTERS_RE = re.compile(r"[\000-\010]|[\013-\014]|[\016-\037]")
-
-            for key in json_schema:
-                value = json_data.get(key, "")  # Получаем значение из json_data
-                cleaned_value = ILLEGAL_CHARACTERS_RE.sub(
-                    "", value
-                )  # Удаляем недопустимые символы из значения
-                row.append(cleaned_value)  # Добавляем очищенное значение в row
-
-            response_data.append(row)
-
-        binary_data = response_data.export("xlsx")
-        file_name = (
-            f"{partner_program.name} {timezone.now().strftime('%d-%m-%Y %H:%M:%S')}"
+        return start_admin_export(
+            request, "program_participants", {"program_id": object_id}
         )
-        return build_xlsx_download_response(binary_data, base_name=file_name)
 
     def get_export_rates_view(self, request, object_id):
-        rates_data_to_write: list[dict] = self._get_prepared_rates_data_for_export(
-            object_id
-        )
-
-        xlsx_file_writer = XlsxFileToExport()
-        xlsx_file_writer.write_data_to_xlsx(rates_data_to_write)
-        binary_data_to_export: bytes = xlsx_file_writer.get_binary_data_from_self_file()
-        xlsx_file_writer.clear_buffer()
-
-        program_name = PartnerProgram.objects.get(pk=object_id).name
-        date_suffix = timezone.now().strftime("%d.%m.%y")
-        base_name = f"scores - {program_name or 'program'} - {date_suffix}"
-        return build_xlsx_download_response(binary_data_to_export, base_name=base_name)
-
-    def _get_prepared_rates_data_for_export(self, program_id: int) -> list[dict]:
-        """
-        Готовит данные для выгрузки оценок проектов.
-        Порядок колонок: название проекта → фамилия эксперта → доп. поля программы →
-        критерии → комментарий.
-        Если у проекта несколько экспертов, на каждый проект-эксперт создаётся отдельная строка.
-        """
-        return prepare_project_scores_export_data(program_id)
+        return start_admin_export(request, "program_scores", {"program_id": object_id})
 
 
 @admin.register(PartnerProgramUserProfile)
@@ -53,8 +53,10 @@ from partner_programs.services.exports import (
     ProgramExportFile,
     ProjectScoreDataPreparer,
     build_program_field_columns,
+    build_program_participants_export_file,
     build_program_project_scores_export_file,
     build_program_projects_export_file,
+    iter_project_scores_export_rows,
     prepare_project_scores_export_data,
     row_dict_for_link,
 )
@@ -118,6 +120,7 @@ __all__ = [
     "apply_project_to_program",
     "accept_team_invite",
     "build_program_field_columns",
+    "build_program_participants_export_file",
     "build_program_project_scores_export_file",
     "build_program_projects_export_file",
     "change_application_participation_mode",
@@ -128,6 +131,7 @@ __all__ = [
     "get_filtered_program_project_links",
     "get_team_invite_candidates",
     "decline_team_invite",
+    "iter_project_scores_export_rows",
     "prepare_project_scores_export_data",
     "publish_finished_program_projects",
     "register_user_to_program",
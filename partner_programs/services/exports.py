@@ -1,18 +1,18 @@
-import io
+import itertools
 import logging
 from collections import OrderedDict
 from dataclasses import dataclass
+from operator import attrgetter
+from typing import IO, Iterator
 
 from django.db.models import Prefetch
 from django.utils import timezone
-from openpyxl import Workbook
 
-from core.utils import XlsxFileToExport, sanitize_excel_value
+from core.utils import ProgressCallback, XlsxStreamWriter, iter_with_progress
 from partner_programs.models import (
     PartnerProgram,
     PartnerProgramField,
     PartnerProgramFieldValue,
-    PartnerProgramProject,
     PartnerProgramUserProfile,
 )
 from project_rates.models import Criteria, ProjectScore
@@ -20,10 +20,14 @@ from projects.models import Collaborator
 
 logger = logging.getLogger()
 
+EXPORT_CHUNK_SIZE = 500
+
 
 @dataclass(frozen=True)
 class ProgramExportFile:
-    binary_data: bytes
+    """Готовый XLSX во временном файле; отдается `build_xlsx_streaming_response`."""
+
+    file: IO[bytes]
     base_name: str
 
 
@@ -269,10 +273,51 @@ def row_dict_for_link(
     return row
 
 
+def build_program_participants_export_file(
+    *,
+    program: PartnerProgram,
+    progress: ProgressCallback | None = None,
+) -> ProgramExportFile:
+    """Анкеты участников программы: ФИО, почта и поля `data_schema` с `name`."""
+    schema_keys = [key for key, field in program.data_schema.items() if "name" in field]
+    profiles = PartnerProgramUserProfile.objects.filter(
+        partner_program=program
+    ).select_related("user")
+    total = profiles.count() if progress else 0
+
+    writer = XlsxStreamWriter(sheet_name="Участники")
+    writer.append(
+        ["Имя", "Фамилия", "Отчество", "Почта", "Дата рождения"]
+        + [program.data_schema[key]["name"] for key in schema_keys]
+    )
+    for profile in iter_with_progress(
+        profiles.iterator(chunk_size=EXPORT_CHUNK_SIZE), total, progress
+    ):
+        if profile.user is None:
+            row = [""] * 5
+        else:
+            row = [
+                profile.user.first_name,
+                profile.user.last_name,
+                profile.user.patronymic,
+                profile.user.email,
+                str(profile.user.birthday),
+            ]
+        data = profile.partner_program_data or {}
+        row.extend(data.get(key, "") for key in schema_keys)
+        writer.append(row)
+
+    date_suffix = timezone.now().strftime("%d-%m-%Y %H:%M:%S")
+    return ProgramExportFile(
+        file=writer.save(), base_name=f"{program.name} {date_suffix}"
+    )
+
+
 def build_program_projects_export_file(
     *,
     program: PartnerProgram,
     only_submitted: bool,
+    progress: ProgressCallback | None = None,
 ) -> ProgramExportFile:
     extra_cols = build_program_field_columns(program)
     header_pairs = BASE_COLUMNS + extra_cols
@@ -297,47 +342,43 @@ def build_program_projects_export_file(
     )
     if only_submitted:
         links_qs = links_qs.filter(submitted=True)
+    total = links_qs.count() if progress else 0
 
-    workbook = Workbook(write_only=True)
-    worksheet = workbook.create_sheet(title="Проекты")
-    worksheet.append([title for _, title in header_pairs])
+    writer = XlsxStreamWriter(sheet_name="Проекты")
+    writer.append([title for _, title in header_pairs])
 
     extra_keys_order = [key for key, _ in extra_cols]
-    for row_number, program_project_link in enumerate(links_qs, start=1):
+    # iterator(chunk_size) держит в памяти только одну пачку связей с prefetch.
+    links = iter_with_progress(
+        links_qs.iterator(chunk_size=EXPORT_CHUNK_SIZE), total, progress
+    )
+    for row_number, program_project_link in enumerate(links, start=1):
         row_dict = row_dict_for_link(
             program_project_link=program_project_link,
             extra_field_keys_order=extra_keys_order,
             row_number=row_number,
         )
-        raw_values = [row_dict.get(key, "") for key, _ in header_pairs]
-        worksheet.append([sanitize_excel_value(value) for value in raw_values])
-
-    buffer = io.BytesIO()
-    workbook.save(buffer)
-    buffer.seek(0)
+        writer.append([row_dict.get(key, "") for key, _ in header_pairs])
 
     label = "projects_review" if only_submitted else "projects"
     date_suffix = timezone.now().strftime("%d.%m.%y")
     base_name = f"{label} - {program.name or 'program'} - {date_suffix}"
-    return ProgramExportFile(binary_data=buffer.getvalue(), base_name=base_name)
+    return ProgramExportFile(file=writer.save(), base_name=base_name)
 
 
 def build_program_project_scores_export_file(
     *,
     program: PartnerProgram,
+    progress: ProgressCallback | None = None,
 ) -> ProgramExportFile:
-    rates_data_to_write = prepare_project_scores_export_data(program.id)
-    xlsx_file_writer = XlsxFileToExport()
-    xlsx_file_writer.write_data_to_xlsx(rates_data_to_write)
-    binary_data_to_export: bytes = xlsx_file_writer.get_binary_data_from_self_file()
-    xlsx_file_writer.clear_buffer()
+    writer = XlsxStreamWriter(sheet_name="scores")
+    writer.append_dicts(
+        iter_project_scores_export_rows(program.id, progress=progress), sanitize=False
+    )
 
     date_suffix = timezone.now().strftime("%d.%m.%y")
     base_name = f"scores - {program.name or 'program'} - {date_suffix}"
-    return ProgramExportFile(
-        binary_data=binary_data_to_export,
-        base_name=base_name,
-    )
+    return ProgramExportFile(file=writer.save(), base_name=base_name)
 
 
 def prepare_project_scores_export_data(program_id: int) -> list[dict]:
@@ -347,13 +388,29 @@ def prepare_project_scores_export_data(program_id: int) -> list[dict]:
     критерии → комментарий.
     Если у проекта несколько экспертов, на каждый проект-эксперт создаётся отдельная строка.
     """
+    return list(iter_project_scores_export_rows(program_id))
+
+
+def iter_project_scores_export_rows(
+    program_id: int,
+    chunk_size: int = EXPORT_CHUNK_SIZE,
+    progress: ProgressCallback | None = None,
+) -> Iterator[dict]:
+    """
+    Построчная версия `prepare_project_scores_export_data`.
+
+    Оценки читаются `.iterator(chunk_size=...)` в порядке проектов, значения
+    полей программы подгружаются на пачку из `chunk_size` проектов, так что
+    в памяти одновременно только одна пачка. `progress(done, total)` получает
+    число выгруженных проектов с оценками.
+    """
     criterias = list(
         Criteria.objects.filter(partner_program__id=program_id)
         .select_related("partner_program")
         .order_by("id")
     )
     if not criterias:
-        return []
+        return
 
     comment_criteria = next(
         (criteria for criteria in criterias if criteria.name == "Комментарий"),
@@ -372,11 +429,54 @@ def prepare_project_scores_export_data(program_id: int) -> list[dict]:
         .select_related("user", "criteria", "project")
         .order_by("project_id", "criteria_id", "id")
     )
-    scores_dict: dict[int, list[ProjectScore]] = {}
-    for score in scores:
-        scores_dict.setdefault(score.project_id, []).append(score)
+    total = scores.values("project_id").distinct().count() if progress else 0
+    scores_by_project = (
+        (project_id, list(project_scores))
+        for project_id, project_scores in itertools.groupby(
+            scores.iterator(chunk_size=chunk_size), key=attrgetter("project_id")
+        )
+    )
+
+    has_rows = False
+    done = 0
+    while batch := list(itertools.islice(scores_by_project, chunk_size)):
+        field_values_by_project = _get_program_field_values(
+            program_id, [project_id for project_id, _ in batch]
+        )
+        for project_id, project_scores in batch:
+            field_values_map = field_values_by_project.get(project_id, {})
+            project = project_scores[0].project
+
+            scores_by_expert: dict[int, list[ProjectScore]] = {}
+            for score in project_scores:
+                scores_by_expert.setdefault(score.user_id, []).append(score)
 
-    if not scores_dict:
+            for _, expert_scores in scores_by_expert.items():
+                row_data: dict[str, str] = {}
+                row_data["Название проекта"] = getattr(project, "name", "")
+                row_data["Фамилия эксперта"] = expert_scores[0].user.last_name
+
+                for field in program_fields:
+                    row_data[field.label] = field_values_map.get(field.id, "")
+
+                scores_map: dict[int, str] = {
+                    score.criteria_id: score.value for score in expert_scores
+                }
+
+                for criteria in criterias_without_comment:
+                    row_data[criteria.name] = scores_map.get(criteria.id, "")
+
+                if comment_criteria:
+                    row_data["Комментарий"] = scores_map.get(comment_criteria.id, "")
+
+                has_rows = True
+                yield row_data
+
+            done += 1
+            if progress is not None:
+                progress(done, total)
+
+    if not has_rows:
         empty_row: dict[str, str] = {
             "Название проекта": "",
             "Фамилия эксперта": "",
@@ -387,74 +487,22 @@ def prepare_project_scores_export_data(program_id: int) -> list[dict]:
             empty_row[criteria.name] = ""
         if comment_criteria:
             empty_row["Комментарий"] = ""
-        return [empty_row]
-
-    project_ids = list(scores_dict.keys())
-
-    field_values_prefetch = Prefetch(
-        "field_values",
-        queryset=PartnerProgramFieldValue.objects.select_related("field").filter(
-            program_project__partner_program_id=program_id,
-            program_project__project_id__in=project_ids,
-        ),
-        to_attr="_prefetched_field_values",
+        yield empty_row
+
+
+def _get_program_field_values(
+    program_id: int, project_ids: list[int]
+) -> dict[int, dict[int, str]]:
+    """{project_id: {field_id: value}} для пачки проектов программы."""
+    field_values = PartnerProgramFieldValue.objects.select_related(
+        "field", "program_project"
+    ).filter(
+        program_project__partner_program_id=program_id,
+        program_project__project_id__in=project_ids,
     )
-    program_projects = (
-        PartnerProgramProject.objects.filter(
-            partner_program_id=program_id, project_id__in=project_ids
-        )
-        .select_related("project")
-        .prefetch_related(field_values_prefetch)
-    )
-    program_project_by_project_id: dict[int, PartnerProgramProject] = {
-        link.project_id: link for link in program_projects
-    }
-
-    prepared_projects_rates_data: list[dict] = []
-    for project_id, project_scores in scores_dict.items():
-        project_link = program_project_by_project_id.get(project_id)
-        project = (
-            project_link.project
-            if project_link
-            else (project_scores[0].project if project_scores else None)
-        )
-
-        field_values_map: dict[int, str] = {}
-        field_values = (
-            getattr(project_link, "_prefetched_field_values", None)
-            if project_link
-            else None
-        )
-        if field_values:
-            for field_value in field_values:
-                field_values_map[field_value.field_id] = field_value.get_value()
-
-        scores_by_expert: dict[int, list[ProjectScore]] = {}
-        for score in project_scores:
-            scores_by_expert.setdefault(score.user_id, []).append(score)
-
-        for _, expert_scores in scores_by_expert.items():
-            row_data: dict[str, str] = {}
-            row_data["Название проекта"] = (
-                getattr(project, "name", "") if project else ""
-            )
-            row_data["Фамилия эксперта"] = (
-                expert_scores[0].user.last_name if expert_scores else ""
-            )
-
-            for field in program_fields:
-                row_data[field.label] = field_values_map.get(field.id, "")
-
-            scores_map: dict[int, str] = {
-                score.criteria_id: score.value for score in expert_scores
-            }
-
-            for criteria in criterias_without_comment:
-                row_data[criteria.name] = scores_map.get(criteria.id, "")
-
-            if comment_criteria:
-                row_data["Комментарий"] = scores_map.get(comment_criteria.id, "")
-
-            prepared_projects_rates_data.append(row_data)
-
-    return prepared_projects_rates_data
+    values_by_project: dict[int, dict[int, str]] = {}
+    for field_value in field_values:
+        values_by_project.setdefault(field_value.program_project.project_id, {})[
+            field_value.field_id
+        ] = field_value.get_value()
+    return values_by_project
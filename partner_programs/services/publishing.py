@@ -1,11 +1,14 @@
 from django.utils import timezone
 
+from feed.visibility import refresh_news_feed_visibility
+
 from partner_programs.models import (
     PartnerProgram,
     PartnerProgramProject,
     PartnerProgramUserProfile,
 )
 from projects.models import Project
+from vacancy.models import Vacancy
 
 
 def publish_finished_program_projects(now=None) -> int:
@@ -28,8 +31,18 @@ def publish_finished_program_projects(now=None) -> int:
     ).values_list("project_id", flat=True)
     project_ids = link_project_ids.union(profile_project_ids)
 
-    return Project.objects.filter(
+    published_projects = Project.objects.filter(
         id__in=project_ids,
         is_public=False,
         draft=False,
-    ).update(is_public=True)
+    )
+    published_ids = list(published_projects.values_list("id", flat=True))
+    updated_count = published_projects.update(is_public=True)
+    # update() обходит сигналы ленты: записи проектов и их вакансий
+    # пересчитываются явно.
+    refresh_news_feed_visibility(Project, published_ids)
+    refresh_news_feed_visibility(
+        Vacancy,
+        Vacancy.objects.filter(project_id__in=published_ids).values_list("id", flat=True),
+    )
+    return updated_count
@@ -5,7 +5,9 @@ from openpyxl import load_workbook
 from rest_framework.test import APIClient
 
 from partner_programs.models import PartnerProgramFieldValue
+from core.utils import XlsxFileToExport
 from partner_programs.services import (
+    iter_project_scores_export_rows,
     prepare_project_scores_export_data,
     row_dict_for_link,
 )
@@ -79,7 +81,9 @@ class PartnerProgramProjectScoresExportTests(TestCase):
         self.assertEqual(response.status_code, 200)
         self.assertIn(".xlsx", response["Content-Disposition"])
 
-        workbook = load_workbook(io.BytesIO(response.content), read_only=True)
+        workbook = load_workbook(
+            io.BytesIO(b"".join(response.streaming_content)), read_only=True
+        )
         rows = list(workbook.active.iter_rows(values_only=True))
         workbook.close()
 
@@ -95,7 +99,9 @@ class PartnerProgramProjectScoresExportTests(TestCase):
         self.assertEqual(row_by_expert["Petrov"]["Score"], "8")
         self.assertIsNone(row_by_expert["Petrov"]["Комментарий"])
 
-    def test_scores_export_data_returns_empty_row_when_criteria_exist_without_scores(self):
+    def test_scores_export_data_returns_empty_row_when_criteria_exist_without_scores(
+        self,
+    ):
         Criteria.objects.create(
             partner_program=self.program,
             name="Score",
@@ -116,6 +122,46 @@ class PartnerProgramProjectScoresExportTests(TestCase):
         self.assertEqual(export_data[0]["Score"], "")
         self.assertEqual(export_data[0]["Комментарий"], "")
 
+    def test_scores_export_rows_span_project_batches(self):
+        field = create_program_field(self.program, name="track", label="Track")
+        criteria = Criteria.objects.create(
+            partner_program=self.program,
+            name="Score",
+            type="str",
+        )
+        expert = create_user(prefix="program-rates-batch-expert", last_name="Ivanov")
+        for index in range(5):
+            project = create_project(name=f"Project {index}")
+            program_project = create_program_project(self.program, project=project)
+            PartnerProgramFieldValue.objects.create(
+                program_project=program_project,
+                field=field,
+                value_text=f"track-{index}",
+            )
+            ProjectScore.objects.create(
+                criteria=criteria,
+                user=expert,
+                project=project,
+                value=str(index),
+            )
+
+        rows = list(iter_project_scores_export_rows(self.program.id, chunk_size=2))
+
+        self.assertEqual(
+            [(row["Название проекта"], row["Track"], row["Score"]) for row in rows],
+            [(f"Project {index}", f"track-{index}", str(index)) for index in range(5)],
+        )
+
+    def test_xlsx_file_to_export_keeps_columns_of_all_rows(self):
+        writer = XlsxFileToExport()
+        writer.write_data_to_xlsx([{"a": 1, "b": "x"}, {"a": 2, "c": "y"}])
+
+        workbook = load_workbook(io.BytesIO(writer.get_binary_data_from_self_file()))
+        rows = list(workbook.active.iter_rows(values_only=True))
+        writer.clear_buffer()
+
+        self.assertEqual(rows, [("a", "b", "c"), (1, "x", None), (2, None, "y")])
+
     def test_non_manager_cannot_export_project_scores(self):
         outsider = create_user(prefix="program-rates-export-outsider")
         self.client.force_authenticate(outsider)
@@ -227,7 +227,9 @@ class PartnerProgramProjectExportAPITests(TestCase):
         self.assertEqual(response.status_code, 200)
         self.assertIn(".xlsx", response["Content-Disposition"])
 
-        workbook = load_workbook(io.BytesIO(response.content), read_only=True)
+        workbook = load_workbook(
+            io.BytesIO(b"".join(response.streaming_content)), read_only=True
+        )
         rows = list(workbook["Проекты"].iter_rows(values_only=True))
         workbook.close()
 
@@ -246,7 +246,7 @@ class ReactDevDemoSeedTests(TestCase):
 
         for source in ("program", "project", "user"):
             with self.subTest(source=source):
-                first = client.get("/feed/news/", {"source": source})
+                first = client.get("/feed/news/", {"source": source, "offset": 0})
                 second = client.get(
                     "/feed/news/",
                     {"source": source, "offset": 10},
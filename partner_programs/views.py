@@ -16,7 +16,9 @@ from rest_framework.views import APIView
 from core.serializers import EmptySerializer, SetLikedSerializer, SetViewedSerializer
 from core.services import add_view, set_like
 from core.throttling import PostOnlyScopedRateThrottle
-from core.utils import build_xlsx_download_response
+from core.utils import build_xlsx_streaming_response
+from exports.services import enqueue_export
+from exports.views import export_job_accepted_response
 from partner_programs.models import (
     PartnerProgram,
     PartnerProgramFieldValue,
@@ -434,8 +436,17 @@ class PartnerProgramProjectsAPIView(generics.ListAPIView):
         return Project.objects.filter(program_links__partner_program=program).distinct()
 
 
+def _wants_background_export(request) -> bool:
+    return request.query_params.get("background") in ("1", "true", "True")
+
+
 class PartnerProgramExportRatesAPIView(APIView):
-    """Возвращает Excel-файл с оценками проектов программы."""
+    """
+    Возвращает Excel-файл с оценками проектов программы.
+
+    С `?background=1` файл не строится в запросе: ответ 202 с заданием
+    выгрузки, которое опрашивается через `/exports/<id>/`.
+    """
 
     permission_classes = [IsAdminOrManagerOfProgram]
 
@@ -457,15 +468,23 @@ class PartnerProgramExportRatesAPIView(APIView):
                 {"detail": "Недостаточно прав."}, status=status.HTTP_403_FORBIDDEN
             )
 
+        if _wants_background_export(request):
+            job = enqueue_export("program_scores", {"program_id": program.id}, user)
+            return export_job_accepted_response(job)
+
         export_file = build_program_project_scores_export_file(program=program)
-        return build_xlsx_download_response(
-            export_file.binary_data,
+        return build_xlsx_streaming_response(
+            export_file.file,
             base_name=export_file.base_name,
         )
 
 
 class PartnerProgramExportProjectsAPIView(APIView):
-    """Возвращает Excel-файл со всеми проектами программы."""
+    """
+    Возвращает Excel-файл со всеми проектами программы.
+
+    `?background=1` работает так же, как у выгрузки оценок.
+    """
 
     permission_classes = [IsAdminOrManagerOfProgram]
 
@@ -499,11 +518,19 @@ class PartnerProgramExportProjectsAPIView(APIView):
             "true",
             "True",
         )
+        if _wants_background_export(request):
+            job = enqueue_export(
+                "program_projects",
+                {"program_id": program.id, "only_submitted": only_submitted},
+                request.user,
+            )
+            return export_job_accepted_response(job)
+
         export_file = build_program_projects_export_file(
             program=program,
             only_submitted=only_submitted,
         )
-        return build_xlsx_download_response(
-            export_file.binary_data,
+        return build_xlsx_streaming_response(
+            export_file.file,
             base_name=export_file.base_name,
         )
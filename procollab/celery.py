@@ -26,6 +26,18 @@ app.conf.beat_schedule = {
         "task": "partner_programs.tasks.publish_finished_program_projects_task",
         "schedule": crontab(minute=0, hour=6),
     },
+    "reconcile_news_counters": {
+        "task": "news.tasks.reconcile_news_counters_task",
+        "schedule": crontab(minute=30, hour=3),
+    },
+    "flush_last_activity": {
+        "task": "users.tasks.flush_last_activity_task",
+        "schedule": crontab(minute="*"),
+    },
+    "cleanup_export_jobs": {
+        "task": "exports.tasks.cleanup_export_jobs_task",
+        "schedule": crontab(minute=15),
+    },
 }
 
 if __name__ == "__main__":
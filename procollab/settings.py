@@ -98,6 +98,7 @@ INSTALLED_APPS = [
     "feed.apps.FeedConfig",
     "project_rates.apps.ProjectRatesConfig",
     "notifications.apps.NotificationsConfig",
+    "exports.apps.ExportsConfig",
     # Rest framework
     "rest_framework",
     "rest_framework_simplejwt",
@@ -262,6 +263,11 @@ if DEBUG:
         }
 
     CHANNEL_LAYERS = {"default": {"BACKEND": "channels.layers.InMemoryChannelLayer"}}
+
+    PRESENCE_STORE = {"BACKEND": "core.presence.InMemoryPresenceStore"}
+
+    # буфер в памяти процесса не виден celery beat: локально пишем сразу в базу
+    LAST_ACTIVITY_BUFFER = None
 else:
     # fixme
     CACHES = {
@@ -273,13 +279,28 @@ else:
 
     CHANNEL_LAYERS = {
         "default": {
-            "BACKEND": "channels_redis.core.RedisChannelLayer",
+            "BACKEND": "chats.layers.BulkGroupsRedisChannelLayer",
             "CONFIG": {
                 "hosts": [("redis", 6379)],
             },
         },
     }
 
+    PRESENCE_STORE = {
+        "BACKEND": "core.presence.RedisPresenceStore",
+        "OPTIONS": {
+            "url": "redis://redis:6379",
+            "ttl": config("PRESENCE_TTL_SECONDS", default=90, cast=int),
+        },
+    }
+
+    # Отметки активности копятся в Redis и раз в минуту пишутся в базу
+    # задачей users.tasks.flush_last_activity_task.
+    LAST_ACTIVITY_BUFFER = {
+        "BACKEND": "users.activity_buffer.RedisActivityBuffer",
+        "OPTIONS": {"url": "redis://redis:6379"},
+    }
+
     REST_FRAMEWORK["DEFAULT_RENDERER_CLASSES"] = [
         "rest_framework.renderers.JSONRenderer",
     ]
@@ -368,9 +389,42 @@ default_user_authentication_rule",
 
 JWT_LAST_ACTIVITY_THROTTLE_SECONDS = 15 * 60
 
+# Как часто открытое websocket-соединение продлевает online-присутствие.
+# Должно быть заметно меньше TTL хранилища присутствия; 0 отключает heartbeat.
+PRESENCE_HEARTBEAT_SECONDS = 0 if RUNNING_TESTS else 30
+
+# Сколько new_message помнит, что личный чат уже создан, и не проверяет его
+# в БД. 0 отключает кеш: в тестах база очищается между тестами, а кеш - нет.
+DIRECT_CHAT_EXISTS_CACHE_SECONDS = 0 if RUNNING_TESTS else 7 * 24 * 60 * 60
+
+# Кеш компактной карточки автора в чатах (chats.author_cards). Сохранение
+# профиля сбрасывает карточку сразу, TTL ограничивает устаревание остального
+# (например, переименования специализации). 0 отключает кеш между запросами.
+CHAT_AUTHOR_CARD_CACHE_SECONDS = config(
+    "CHAT_AUTHOR_CARD_CACHE_SECONDS", default=60 * 60, cast=int
+)
+
 if DEBUG:
     SIMPLE_JWT["ACCESS_TOKEN_LIFETIME"] = timedelta(weeks=2)
 
+# Кеш пользователя для JWT и websocket-аутентификации (users.auth_cache).
+# AUTH_USER_CACHE_ENABLED=False - аварийное отключение: пользователь снова
+# читается из базы на каждый запрос.
+AUTH_USER_CACHE_ENABLED = config("AUTH_USER_CACHE_ENABLED", default=True, cast=bool)
+AUTH_USER_CACHE_TIMEOUT_SECONDS = config(
+    "AUTH_USER_CACHE_TIMEOUT_SECONDS", default=60, cast=int
+)
+
+# Метрики запросов в CustomLoguruMiddleware (core.log.instrumentation): время,
+# число и время SQL, операции кеша и размер ответа по имени view одной
+# JSON-строкой в loguru. Медленнее REQUEST_METRICS_SLOW_MS пишутся всегда
+# (WARNING, с SQL), остальные - с вероятностью REQUEST_METRICS_SAMPLE_RATE.
+REQUEST_METRICS_ENABLED = config("REQUEST_METRICS_ENABLED", default=False, cast=bool)
+REQUEST_METRICS_SAMPLE_RATE = config("REQUEST_METRICS_SAMPLE_RATE", default=0.01, cast=float)
+REQUEST_METRICS_SLOW_MS = config("REQUEST_METRICS_SLOW_MS", default=1000, cast=int)
+# Сколько SQL-запросов сохраняется в записи о медленном запросе.
+REQUEST_METRICS_MAX_QUERIES = config("REQUEST_METRICS_MAX_QUERIES", default=50, cast=int)
+
 SESSION_COOKIE_SECURE = not DEBUG
 CSRF_COOKIE_SECURE = not DEBUG
 
@@ -398,6 +452,14 @@ ANYMAIL = {
 }
 
 EMAIL_USER = config("EMAIL_USER", cast=str, default="example@mail.ru")
+# Массовые рассылки: сколько потоков отправляют батчи писем и сколько батчей
+# может быть отрендерено и ждать отправки одновременно.
+MAILING_SEND_WORKERS = config("MAILING_SEND_WORKERS", cast=int, default=4)
+MAILING_MAX_IN_FLIGHT_BATCHES = config(
+    "MAILING_MAX_IN_FLIGHT_BATCHES", cast=int, default=8
+)
+# Сколько скомпилированных шаблонов писем держать в памяти процесса (LRU).
+MAILING_TEMPLATE_CACHE_SIZE = config("MAILING_TEMPLATE_CACHE_SIZE", cast=int, default=128)
 
 SELECTEL_ACCOUNT_ID = config("SELECTEL_ACCOUNT_ID", cast=str, default="123456")
 SELECTEL_CONTAINER_NAME = config(
@@ -414,6 +476,17 @@ SELECTEL_AUTH_TOKEN_URL = "https://api.selcdn.ru/v3/auth/tokens"
 SELECTEL_SWIFT_URL = (
     f"https://api.selcdn.ru/v1/SEL_{SELECTEL_ACCOUNT_ID}/{SELECTEL_CONTAINER_NAME}/"
 )
+SELECTEL_CONNECT_TIMEOUT_SECONDS = config(
+    "SELECTEL_CONNECT_TIMEOUT_SECONDS", cast=float, default=5
+)
+SELECTEL_READ_TIMEOUT_SECONDS = config(
+    "SELECTEL_READ_TIMEOUT_SECONDS", cast=float, default=60
+)
+SELECTEL_REQUEST_RETRIES = config("SELECTEL_REQUEST_RETRIES", cast=int, default=2)
+# Файлы больше этого размера загружаются в Swift сегментами (Static Large Object).
+SELECTEL_SEGMENT_SIZE_BYTES = config(
+    "SELECTEL_SEGMENT_SIZE_BYTES", cast=int, default=256 * 1024 * 1024
+)
 
 LOGURU_LOGGING = {
     "rotation": "300 MB",
@@ -425,6 +498,30 @@ LOGURU_LOGGING = {
 if DEBUG:
     SELECTEL_SWIFT_URL += "debug/"
 
+# Фоновые выгрузки (exports): "local" - каталог EXPORTS_ROOT, годится только
+# когда web и celery делят файловую систему; "swift" - контейнер Selectel.
+EXPORTS_STORAGE = config(
+    "EXPORTS_STORAGE", cast=str, default="local" if DEBUG else "swift"
+)
+EXPORTS_ROOT = config(
+    "EXPORTS_ROOT", cast=str, default=str(BASE_DIR / ".cache" / "exports")
+)
+# В выгрузках персональные данные, поэтому в Swift они лежат в отдельном
+# приватном контейнере, а не в публичном контейнере медиа; читает их только
+# бэкенд со своим токеном.
+EXPORTS_SWIFT_CONTAINER = config(
+    "EXPORTS_SWIFT_CONTAINER", cast=str, default="procollab_exports"
+)
+EXPORTS_SWIFT_URL = (
+    f"https://api.selcdn.ru/v1/SEL_{SELECTEL_ACCOUNT_ID}/{EXPORTS_SWIFT_CONTAINER}/"
+)
+EXPORTS_RESULT_TTL_SECONDS = config(
+    "EXPORTS_RESULT_TTL_SECONDS", cast=int, default=24 * 60 * 60
+)
+EXPORTS_JOB_TIMEOUT_SECONDS = config(
+    "EXPORTS_JOB_TIMEOUT_SECONDS", cast=int, default=2 * 60 * 60
+)
+
 DATA_UPLOAD_MAX_NUMBER_FIELDS = None  # for mailing
 
 
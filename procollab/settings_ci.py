@@ -1,5 +1,8 @@
 # Roadmap: DEV-074
 # Изолированная конфигурация тестов backend на PostgreSQL в CI.
+import tempfile
+from pathlib import Path
+
 from .settings import *  # noqa: F401,F403
 
 from decouple import config
@@ -38,6 +41,10 @@ CHANNEL_LAYERS = {
     }
 }
 
+PRESENCE_STORE = {"BACKEND": "core.presence.InMemoryPresenceStore"}
+
+LAST_ACTIVITY_BUFFER = {"BACKEND": "users.activity_buffer.InMemoryActivityBuffer"}
+
 EMAIL_BACKEND = "django.core.mail.backends.locmem.EmailBackend"
 
 CELERY_TASK_ALWAYS_EAGER = True
@@ -48,3 +55,6 @@ PASSWORD_HASHERS = [
 ]
 
 ALLOW_REACT_DEV_DEMO_SEED = False
+
+EXPORTS_STORAGE = "local"
+EXPORTS_ROOT = str(Path(tempfile.gettempdir()) / "procollab_ci_exports")
@@ -90,6 +90,7 @@ urlpatterns = [
         "notifications/",
         include("notifications.urls", namespace="notifications"),
     ),
+    path("exports/", include("exports.urls", namespace="exports")),
     path(
         "api/token/",
         ThrottledTokenObtainPairView.as_view(),
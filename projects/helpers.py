@@ -1,6 +1,9 @@
+from collections import Counter
 from random import sample
 
+from django.contrib.contenttypes.models import ContentType
 from django.db import transaction
+from django.db.models import Case, Sum, Value, When
 from django.utils import timezone
 from django.contrib.auth import get_user_model
 
@@ -11,37 +14,62 @@ from partner_programs.models import (
     PartnerProgramProject,
     PartnerProgramUserProfile,
 )
+from core.models import SkillToObject
 from projects.models import Project, ProjectLink, Achievement
 from users.models import CustomUser
+from vacancy.models import Vacancy
 
 User = get_user_model()
 
+RECOMMENDATIONS_COUNT = 5
 
-def get_recommended_users(project: Project) -> list[User]:
+
+def get_recommended_users(
+    project: Project,
+    limit: int = RECOMMENDATIONS_COUNT,
+    sample_from: int | None = None,
+) -> list[User]:
     """
-    Searches for users by matching their skills and vacancies required_skills
+    Ranks members by weighted overlap of their skills with vacancies required_skills
+
+    A skill weighs as much as the number of project vacancies that require it.
+    `SkillToObject` indexed by (content_type, skill, object_id) is the inverted
+    index skill -> users, so the ranking is one aggregate query
+    instead of a query per member.
+    Ties are broken by profile completeness (`ordering_score`), then by id.
+    With `sample_from` the result is a random `limit` of the top `sample_from`.
     """
-    RECOMMENDATIONS_COUNT = 5
-    all_needed_skills = set()
-    for vacancy in project.vacancies.all():
-        all_needed_skills.update(set(vacancy.get_required_skills()))
-
-    recommended_users = []
-    for user in User.objects.get_members():
-        if user == project.leader or user.skills_count < 1:
-            continue
-
-        user_skills = set(user.get_skills())
-
-        if all_needed_skills & user_skills:
-            recommended_users.append(user)
-
-    # get some random users
-    sampled_recommended_users = sample(
-        recommended_users, min(RECOMMENDATIONS_COUNT, len(recommended_users))
+    skill_weights = Counter(
+        SkillToObject.objects.filter(
+            content_type=ContentType.objects.get_for_model(Vacancy),
+            object_id__in=project.vacancies.values("id"),
+        ).values_list("skill_id", flat=True)
     )
-
-    return sampled_recommended_users
+    if not skill_weights:
+        return []
+
+    score = Sum(
+        Case(
+            *[
+                When(skills__skill_id=skill_id, then=Value(weight))
+                for skill_id, weight in skill_weights.items()
+            ],
+            default=Value(0),
+        )
+    )
+    candidates = list(
+        User.objects.get_members()
+        .exclude(pk=project.leader_id)
+        .filter(skills__skill_id__in=skill_weights.keys())
+        .annotate(recommendation_score=score)
+        .order_by("-recommendation_score", "-ordering_score", "id")[
+            : max(limit, sample_from or 0)
+        ]
+    )
+    if sample_from is None or len(candidates) <= limit:
+        return candidates[:limit]
+    picked = set(sample(range(len(candidates)), limit))
+    return [user for index, user in enumerate(candidates) if index in picked]
 
 
 def check_related_fields_update(data, pk):
@@ -1,12 +1,14 @@
 from django.contrib.auth import get_user_model
-from django.core.cache import cache
 from django.core.exceptions import ValidationError as DjangoValidationError
 from django.db import transaction
 from rest_framework import serializers
 
-from core.serializers import SkillToObjectSerializer
+from core.serializers import (
+    OnlineStatusListSerializer,
+    OnlineStatusMixin,
+    SkillToObjectSerializer,
+)
 from core.services import get_views_count
-from core.utils import get_user_online_cache_key
 from files.serializers import UserFileSerializer
 from industries.models import Industry
 from partner_programs.models import (
@@ -428,20 +430,12 @@ class AchievementDetailSerializer(serializers.ModelSerializer):
         ref_name = "Projects"
 
 
-class ProjectSubscribersListSerializer(serializers.ModelSerializer):
+class ProjectSubscribersListSerializer(OnlineStatusMixin, serializers.ModelSerializer):
     is_online = serializers.SerializerMethodField()
 
-    def get_is_online(self, user: User) -> bool:
-        request = self.context.get("request")
-        if request and request.user.is_authenticated and request.user.id == user.id:
-            return True
-
-        cache_key = get_user_online_cache_key(user)
-        is_online = cache.get(cache_key, False)
-        return is_online
-
     class Meta:
         model = User
+        list_serializer_class = OnlineStatusListSerializer
         fields = [
             "id",
             "first_name",
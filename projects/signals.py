@@ -3,6 +3,7 @@ from django.dispatch import receiver
 
 from chats.models import ProjectChat
 from feed.services import delete_news_for_model, create_news_for_model
+from feed.visibility import refresh_news_feed_visibility
 from projects.models import Collaborator, Project
 from vacancy.models import Vacancy
 
@@ -35,3 +36,5 @@ def update_vacancy(sender, instance, created, **kwargs):
             delete_news_for_model(vacancy)
         elif old != new and new is True:
             create_news_for_model(vacancy)
+    # Видимость записей вакансий зависит и от is_active, и от draft/is_public проекта.
+    refresh_news_feed_visibility(Vacancy, old_values_by_id)
@@ -0,0 +1,93 @@
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from projects.helpers import get_recommended_users
+from projects.tests.helpers import create_project, create_user
+from users.models import CustomUser
+from vacancy.tests.helpers import create_skill, create_vacancy
+
+
+class ProjectRecommendedUsersTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.leader = create_user(prefix="recommended-leader")
+        self.project = create_project(leader=self.leader)
+        self.python = create_skill(name="Python")
+        self.django = create_skill(name="Django")
+        self.figma = create_skill(name="Figma")
+
+        backend = create_vacancy(project=self.project, role="Backend")
+        backend.required_skills.create(skill=self.python)
+        backend.required_skills.create(skill=self.django)
+        data = create_vacancy(project=self.project, role="Data")
+        data.required_skills.create(skill=self.python)
+
+    def create_member(self, *skills, prefix="recommended-member", **fields):
+        user = create_user(prefix=prefix)
+        CustomUser.objects.filter(pk=user.pk).update(**fields)
+        for skill in skills:
+            user.skills.create(skill=skill)
+        return user
+
+    def test_users_are_ranked_by_weighted_skill_overlap(self):
+        python_only = self.create_member(self.python)
+        django_only = self.create_member(self.django)
+        both = self.create_member(self.python, self.django)
+        self.create_member(self.figma)
+        self.create_member()
+        self.leader.skills.create(skill=self.python)
+
+        recommended = get_recommended_users(self.project)
+
+        # python is required by two vacancies and outweighs django
+        self.assertEqual(recommended, [both, python_only, django_only])
+
+    def test_ties_prefer_fuller_profiles(self):
+        plain = self.create_member(self.python)
+        complete = self.create_member(self.python, ordering_score=50)
+
+        self.assertEqual(get_recommended_users(self.project), [complete, plain])
+
+    def test_only_members_are_recommended(self):
+        self.create_member(self.python, user_type=CustomUser.MENTOR)
+        member = self.create_member(self.python)
+
+        self.assertEqual(get_recommended_users(self.project), [member])
+
+    def test_ranking_does_not_query_per_user(self):
+        for _ in range(10):
+            self.create_member(self.python, self.django)
+
+        with CaptureQueriesContext(connection) as queries:
+            recommended = get_recommended_users(self.project, limit=5)
+
+        self.assertEqual(len(recommended), 5)
+        self.assertEqual(len(queries), 2)
+
+    def test_sampling_picks_from_top_candidates(self):
+        top = [self.create_member(self.python, self.django) for _ in range(3)]
+        self.create_member(self.django)
+
+        recommended = get_recommended_users(self.project, limit=2, sample_from=3)
+
+        self.assertEqual(len(recommended), 2)
+        self.assertTrue(set(recommended) <= set(top))
+
+    def test_project_without_required_skills_has_no_recommendations(self):
+        project = create_project(leader=self.leader)
+        create_vacancy(project=project)
+        self.create_member(self.python)
+
+        self.assertEqual(get_recommended_users(project), [])
+
+    def test_endpoint_returns_ranked_users(self):
+        best = self.create_member(self.python, self.django)
+        other = self.create_member(self.python)
+        self.client.force_authenticate(self.leader)
+
+        response = self.client.get(f"/projects/{self.project.id}/recommended_users")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([item["id"] for item in response.data], [best.id, other.id])
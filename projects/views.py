@@ -343,7 +343,9 @@ class ProjectVacancyResponses(generics.GenericAPIView):
     permission_classes = [IsAuthenticated, ProjectVisibilityPermission]
 
     def get_queryset(self):
-        return VacancyResponse.objects.filter(vacancy__project_id=self.kwargs["id"])
+        return VacancyResponse.objects.filter(
+            vacancy__project_id=self.kwargs["id"]
+        ).select_related("user", "vacancy")
 
     def get(self, *args, **kwargs):
         queryset = self.get_queryset()
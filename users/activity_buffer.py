@@ -0,0 +1,180 @@
+import logging
+import threading
+import time
+from datetime import datetime, timezone as dt_timezone
+from functools import lru_cache
+from itertools import islice
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db.models import Case, DateTimeField, Value, When
+from django.db.models.functions import Coalesce, Greatest
+from django.utils.module_loading import import_string
+
+LAST_ACTIVITY_FLUSH_BATCH_SIZE = 1000
+logger = logging.getLogger(__name__)
+
+
+class BaseActivityBuffer:
+    """
+    Write-behind buffer of `last_activity` touches.
+
+    Requests only record `user_id -> timestamp` (the latest one wins);
+    `flush_last_activity` periodically drains the buffer and writes it to
+    the users table with one UPDATE per batch.
+    """
+
+    def record(self, user_id: int, timestamp: float) -> None:
+        """Stores the touch unless a later one is already buffered."""
+        raise NotImplementedError
+
+    def record_many(self, touches: dict[int, float]) -> None:
+        for user_id, timestamp in touches.items():
+            self.record(user_id, timestamp)
+
+    def drain(self) -> dict[int, float]:
+        """Atomically takes all buffered touches out of the buffer."""
+        raise NotImplementedError
+
+
+class InMemoryActivityBuffer(BaseActivityBuffer):
+    """Process-local buffer for tests: touches are not shared between processes."""
+
+    def __init__(self, **kwargs):
+        self._touches: dict[int, float] = {}
+        self._lock = threading.Lock()
+
+    def record(self, user_id: int, timestamp: float) -> None:
+        with self._lock:
+            if timestamp > self._touches.get(user_id, float("-inf")):
+                self._touches[user_id] = timestamp
+
+    def drain(self) -> dict[int, float]:
+        with self._lock:
+            touches, self._touches = self._touches, {}
+        return touches
+
+
+# Reads and deletes the sorted set in one step, so touches recorded while the
+# flush is running stay in the buffer for the next flush.
+REDIS_DRAIN_SCRIPT = """
+local touches = redis.call('ZRANGE', KEYS[1], 0, -1, 'WITHSCORES')
+redis.call('DEL', KEYS[1])
+return touches
+"""
+
+
+class RedisActivityBuffer(BaseActivityBuffer):
+    """Buffer in a Redis sorted set `<key>`: user id -> timestamp of the touch."""
+
+    def __init__(
+        self,
+        url: str = "redis://localhost:6379/0",
+        key: str = "users:last_activity:buffer",
+        **kwargs,
+    ):
+        # imported here so tests on InMemoryActivityBuffer do not require redis
+        import redis
+
+        self.key = key
+        self.client = redis.Redis.from_url(url)
+        self._drain_script = self.client.register_script(REDIS_DRAIN_SCRIPT)
+
+    def record(self, user_id: int, timestamp: float) -> None:
+        self.client.zadd(self.key, {user_id: timestamp}, gt=True)
+
+    def record_many(self, touches: dict[int, float]) -> None:
+        if touches:
+            self.client.zadd(self.key, touches, gt=True)
+
+    def drain(self) -> dict[int, float]:
+        touches = self._drain_script(keys=[self.key])
+        return {
+            int(user_id): float(timestamp)
+            for user_id, timestamp in zip(touches[::2], touches[1::2])
+        }
+
+
+@lru_cache(maxsize=None)
+def get_activity_buffer() -> BaseActivityBuffer | None:
+    """Configured buffer or `None` when `last_activity` is written synchronously."""
+    config = getattr(settings, "LAST_ACTIVITY_BUFFER", None)
+    if not config:
+        return None
+    buffer_class = import_string(config["BACKEND"])
+    return buffer_class(**config.get("OPTIONS", {}))
+
+
+def _to_datetime(timestamp: float) -> datetime:
+    return datetime.fromtimestamp(timestamp, tz=dt_timezone.utc)
+
+
+def write_last_activity(touches: dict[int, float]) -> int:
+    """
+    Writes touches to the users table, one UPDATE per batch of users.
+
+    `last_activity` never moves backwards. A user without activity simply gets
+    the buffered value: NULL is coalesced first, as GREATEST on SQLite
+    returns NULL for a NULL argument.
+    """
+    user_model = get_user_model()
+    updated = 0
+    items = iter(sorted(touches.items()))
+    while batch := list(islice(items, LAST_ACTIVITY_FLUSH_BATCH_SIZE)):
+        buffered = Case(
+            *(
+                When(id=user_id, then=Value(_to_datetime(timestamp)))
+                for user_id, timestamp in batch
+            ),
+            output_field=DateTimeField(),
+        )
+        updated += user_model.objects.filter(
+            id__in=[user_id for user_id, _ in batch]
+        ).update(last_activity=Greatest(Coalesce("last_activity", buffered), buffered))
+    return updated
+
+
+def flush_last_activity() -> int:
+    """
+    Drains the buffer into the database and returns the number of updated users.
+
+    If the write fails the drained touches are put back, so they are retried
+    by the next flush instead of being lost.
+    """
+    activity_buffer = get_activity_buffer()
+    if activity_buffer is None:
+        return 0
+
+    touches = activity_buffer.drain()
+    if not touches:
+        return 0
+    try:
+        return write_last_activity(touches)
+    except Exception:
+        activity_buffer.record_many(touches)
+        raise
+
+
+def touch_last_activity(user_id: int) -> None:
+    """
+    Records user activity now.
+
+    The touch goes to the buffer; without a configured buffer or when the
+    buffer is unavailable `last_activity` is updated right away.
+    """
+    timestamp = time.time()
+    activity_buffer = get_activity_buffer()
+    if activity_buffer is not None:
+        try:
+            activity_buffer.record(user_id, timestamp)
+            return
+        except Exception:
+            logger.warning(
+                "Failed to buffer last_activity for user_id=%s",
+                user_id,
+                exc_info=True,
+            )
+
+    get_user_model().objects.filter(id=user_id).update(
+        last_activity=_to_datetime(timestamp)
+    )
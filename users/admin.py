@@ -1,20 +1,17 @@
-from datetime import date
-
-import tablib
 from django.conf import settings
 from django.contrib import admin
 from django.contrib.auth.models import Permission
-from django.http import HttpResponse
 from django.shortcuts import redirect
 from django.urls import path
 from django.utils.html import format_html
 from django.utils.timezone import now
 
+from chats.author_cards import invalidate_chat_author_card
 from core.admin import SkillToObjectInline
-from core.utils import XlsxFileToExport, build_xlsx_download_response
+from exports.admin import start_admin_export
 from mailing.views import MailingTemplateRender
+from users.auth_cache import invalidate_auth_user
 from users.models import UserAchievementFile
-from users.services.users_activity import UserActivityDataPreparer
 
 from .helpers import force_verify_user, send_verification_completed_email
 from .models import (
@@ -69,7 +66,12 @@ class UserLanguagesInline(admin.TabularInline):
 
 @admin.action(description="Сделать выбранных пользователей подтверждёнными")
 def make_active(modeladmin, request, queryset):
+    user_ids = list(queryset.values_list("id", flat=True))
     queryset.update(is_active=True, verification_date=now().date())
+    # update() skips post_save, so cached users are dropped here
+    for user_id in user_ids:
+        invalidate_auth_user(user_id)
+        invalidate_chat_author_card(user_id)
 
 
 @admin.register(CustomUser)
@@ -275,8 +277,7 @@ class CustomUserAdmin(admin.ModelAdmin):
         return MailingTemplateRender().render_template(request, None, users, None)
 
     def all_users_email_excel(self, request):
-        users = CustomUser.objects.only("first_name", "last_name", "email").iterator()
-        return self.get_export_users_emails(users)
+        return start_admin_export(request, "users_emails")
 
     def mailing(self, request, user_object):
         user = CustomUser.objects.get(pk=user_object)
@@ -288,108 +289,8 @@ class CustomUserAdmin(admin.ModelAdmin):
         force_verify_user(user)
         return redirect("admin:users_customuser_change", object_id)
 
-    def get_users_activity(self, _) -> HttpResponse:
-        activity_prepare = UserActivityDataPreparer()
-        xlsx_file_writer = XlsxFileToExport("активность_пользователей.xlsx")
-        xlsx_file_writer.write_data_to_xlsx(activity_prepare.get_users_prepared_data())
-        binary_data_to_export: bytes = xlsx_file_writer.get_binary_data_from_self_file()
-        xlsx_file_writer.clear_buffer()
-
-        return build_xlsx_download_response(
-            binary_data_to_export,
-            base_name="активность_пользователей",
-        )
-
-    def get_export_users_emails(self, users):
-        response_data = tablib.Dataset(
-            headers=[
-                "Имя и фамилия",
-                "Возраст",
-                "Город",
-                "Специальность",
-                "Эл. почта",
-            ]
-        )
-
-        today = date.today()
-
-        date_limit_18 = date(today.year - 18, today.month, today.day)
-        date_limit_22 = date(today.year - 22, today.month, today.day)
-        # user_ed = UserEducation.objects.select_related(
-        #     "user", "user__v2_speciality"
-        # ).filter(education_status="Студент")
-        users = (
-            CustomUser.objects.all()
-            .select_related("v2_speciality")
-            .filter(birthday__lte=date_limit_18, birthday__gte=date_limit_22)
-        )
-        # little_mans = users.filter(birthday__lte=date_limit_18)
-        # big_mans = users.exclude(id__in=little_mans.values_list("id", flat=True))
-
-        # whole_quality = users.count()
-        # quantity_little_mans = little_mans.count()
-        # quantity_big_mans = whole_quality - quantity_little_mans
-
-        for user in users:
-            response_data.append(
-                [
-                    user.first_name + " " + user.last_name,
-                    (today.year - user.birthday.year) if user.birthday.year else None,
-                    user.city,
-                    user.v2_speciality if user.v2_speciality else user.speciality,
-                    user.email,
-                ]
-            )
-
-        # for baby in little_mans:
-        #     interests = [
-        #         collab.project.industry.name if collab.project.industry else ""
-        #         for collab in baby.collaborations.all()
-        #     ]
-        #     if not len(interests):
-        #         interests = [
-        #             skill_to_obj.skill.name if skill_to_obj.skill else ""
-        #             for skill_to_obj in baby.skills.all()
-        #         ]
-        #     if not len(interests):
-        #         interests = baby.key_skills.split(",") if baby.key_skills else []
-        #     response_data.append(
-        #         [
-        #             baby.first_name + " " + baby.last_name,
-        #             today.year - baby.birthday.year,
-        #             ", ".join(interests),
-        #             "; ".join(baby.education.values_list("organization_name", flat=True)),
-        #             baby.v2_speciality if baby.v2_speciality else baby.speciality,
-        #             baby.email,
-        #         ]
-        #     )
-        #
-        # for big_man in big_mans:
-        #     industry_names = [
-        #         collab.project.industry.name if collab.project.industry else ""
-        #         for collab in big_man.collaborations.all()
-        #     ]
-        #     response_data.append(
-        #         [
-        #             big_man.first_name + " " + big_man.last_name,
-        #             today.year - big_man.birthday.year,
-        #             ", ".join(industry_names),
-        #             "; ".join(big_man.education.values_list("organization_name", flat=True)),
-        #             big_man.v2_speciality
-        #             if big_man.v2_speciality
-        #             else big_man.speciality,
-        #             big_man.email,
-        #         ]
-        #     )
-
-        # для малолеток указать теги проектов, если нет - навыки
-        # для старших - специальность, вуз, учебное заведение
-
-        # for user in users:
-        #     response_data.append([user.first_name + " " + user.last_name, user.email])
-
-        binary_data = response_data.export("xlsx")
-        return build_xlsx_download_response(binary_data, base_name="users")
+    def get_users_activity(self, request):
+        return start_admin_export(request, "users_activity")
 
 
 class UserAchievementFileInline(admin.TabularInline):
@@ -0,0 +1,78 @@
+import logging
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS
+
+from core.cache import VersionedCacheKey, delete_now_and_on_commit
+
+AUTH_USER_CACHE_KEY = VersionedCacheKey("users:auth", version=1)
+# The password hash never goes to the cache; the other fields are updated with
+# queryset.update(). They are deferred on a cached user: read from the database
+# on access and not overwritten by save() of such an instance.
+AUTH_USER_DEFERRED_FIELDS = frozenset(
+    {"password", "last_login", "last_activity", "ordering_score"}
+)
+logger = logging.getLogger(__name__)
+
+
+def get_auth_user_cache_key(user_id: int) -> str:
+    return AUTH_USER_CACHE_KEY(user_id)
+
+
+def is_auth_user_cache_enabled() -> bool:
+    return bool(getattr(settings, "AUTH_USER_CACHE_ENABLED", True))
+
+
+def _cached_field_names() -> list[str]:
+    return [
+        field.attname
+        for field in get_user_model()._meta.concrete_fields
+        if field.attname not in AUTH_USER_DEFERRED_FIELDS
+    ]
+
+
+def get_auth_user(user_id: int):
+    """
+    Returns the user for authentication or `None` if it does not exist.
+
+    Fields are served from the cache for AUTH_USER_CACHE_TIMEOUT_SECONDS;
+    on a miss they are loaded with one query and cached. With
+    AUTH_USER_CACHE_ENABLED = False the user is always read from the database.
+    """
+    user_model = get_user_model()
+    if not is_auth_user_cache_enabled():
+        return user_model.objects.filter(pk=user_id).first()
+
+    cache_key = get_auth_user_cache_key(user_id)
+    try:
+        values = cache.get(cache_key)
+    except Exception:
+        logger.warning(
+            "Failed to read auth user cache for user_id=%s", user_id, exc_info=True
+        )
+        values = None
+
+    field_names = _cached_field_names()
+    if values is not None and list(values) != field_names:
+        # entry written by another version of the model (e.g. before a migration)
+        values = None
+    if values is None:
+        values = user_model.objects.filter(pk=user_id).values(*field_names).first()
+        if values is None:
+            return None
+        try:
+            cache.set(cache_key, values, timeout=settings.AUTH_USER_CACHE_TIMEOUT_SECONDS)
+        except Exception:
+            logger.warning(
+                "Failed to write auth user cache for user_id=%s", user_id, exc_info=True
+            )
+
+    return user_model.from_db(
+        DEFAULT_DB_ALIAS, field_names, [values[name] for name in field_names]
+    )
+
+
+def invalidate_auth_user(user_id: int) -> None:
+    delete_now_and_on_commit(get_auth_user_cache_key(user_id))
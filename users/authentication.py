@@ -1,10 +1,15 @@
 import logging
 
 from django.conf import settings
-from django.contrib.auth import get_user_model
 from django.core.cache import cache
-from django.utils import timezone
+from django.utils.translation import gettext_lazy as _
 from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.utils import get_md5_hash_password
+
+from users.activity_buffer import touch_last_activity
+from users.auth_cache import get_auth_user
 
 DEFAULT_LAST_ACTIVITY_THROTTLE_SECONDS = 15 * 60
 LAST_ACTIVITY_CACHE_KEY = "users:last_activity:update:{user_id}"
@@ -19,9 +24,34 @@ class ActivityTrackingJWTAuthentication(JWTAuthentication):
     """
     JWT authentication with lightweight user activity tracking.
 
-    `last_activity` is updated at most once per throttle window per user.
+    `last_activity` is touched at most once per throttle window per user;
+    touches are buffered and flushed to the database by
+    `users.tasks.flush_last_activity_task` (`users.activity_buffer`).
+    The user is loaded through the auth user cache (`users.auth_cache`).
     """
 
+    def get_user(self, validated_token):
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken(_("Token contained no recognizable user identification"))
+
+        user = get_auth_user(user_id)
+        if user is None:
+            raise AuthenticationFailed(_("User not found"), code="user_not_found")
+        if not user.is_active:
+            raise AuthenticationFailed(_("User is inactive"), code="user_inactive")
+
+        if api_settings.CHECK_REVOKE_TOKEN:
+            if validated_token.get(
+                api_settings.REVOKE_TOKEN_CLAIM
+            ) != get_md5_hash_password(user.password):
+                raise AuthenticationFailed(
+                    _("The user's password has been changed."), code="password_changed"
+                )
+
+        return user
+
     def authenticate(self, request):
         auth_result = super().authenticate(request)
         if auth_result is None:
@@ -61,9 +91,8 @@ class ActivityTrackingJWTAuthentication(JWTAuthentication):
         if not should_update:
             return
 
-        user_model = get_user_model()
         try:
-            user_model.objects.filter(id=user_id).update(last_activity=timezone.now())
+            touch_last_activity(user_id)
         except Exception:
             logger.warning(
                 "Failed to update last_activity for user_id=%s",
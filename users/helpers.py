@@ -10,6 +10,7 @@ from rest_framework.exceptions import ValidationError
 from rest_framework_simplejwt.tokens import RefreshToken
 
 from files.models import UserFile
+from mailing.template_cache import get_file_template
 from mailing.utils import send_mail
 from users.constants import PROTOCOL
 from users.models import UserAchievement, UserLink
@@ -22,26 +23,23 @@ def verify_email(user, request):
     relative_link = reverse("users:account_email_verification_sent")
     current_site = get_current_site(request).domain
     absolute_url = f"{PROTOCOL}://{current_site}{relative_link}?token={token}"
-    template_content = open(
-        settings.BASE_DIR / "templates/email/confirm-email.html", encoding="utf-8"
-    ).read()
     send_mail(
         user=user,
         subject="Procollab | Подтверждение почты",
-        template_string=template_content,
+        template_string=get_file_template(
+            settings.BASE_DIR / "templates/email/confirm-email.html"
+        ),
         template_context={"absolute_url": absolute_url},
     )
 
 
 def send_verification_completed_email(user: User):
-    template_content = open(
-        settings.BASE_DIR / "templates/email/verification-succeed.html",
-        encoding="utf-8",
-    ).read()
     send_mail(
         user=user,
         subject="Procollab | Верификация",
-        template_string=template_content,
+        template_string=get_file_template(
+            settings.BASE_DIR / "templates/email/verification-succeed.html"
+        ),
     )
 
 
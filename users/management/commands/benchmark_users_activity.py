@@ -0,0 +1,207 @@
+import time
+import tracemalloc
+import uuid
+from datetime import date
+
+from django.contrib.contenttypes.models import ContentType
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.db.models import Count, IntegerField, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from core.models import Like, Skill, SkillCategory, SkillToObject
+from news.models import News
+from partner_programs.models import PartnerProgram, PartnerProgramUserProfile
+from projects.models import Project
+from users.models import CustomUser, UserEducation
+from users.services.users_activity import UserActivityDataPreparer
+
+MODES = ("prefetch", "set")
+
+
+def _count(queryset, group_field):
+    subquery = queryset.values(group_field).annotate(total=Count("id")).values("total")
+    return Coalesce(
+        Subquery(subquery, output_field=IntegerField()),
+        Value(0),
+        output_field=IntegerField(),
+    )
+
+
+def iter_prefetch_rows():
+    """Прежний отчет: prefetch всех связей и четыре `.exists()` на пользователя."""
+    user_content_type = ContentType.objects.get_for_model(CustomUser)
+    users = CustomUser.objects.prefetch_related(
+        "likes",
+        "education",
+        "skills",
+        "v2_speciality",
+        "work_experience",
+        "user_languages",
+        "partner_program_profiles__partner_program",
+    ).annotate(
+        projects_count=Count("leaders_projects"),
+        likes_count=_count(Like.objects.filter(user_id=OuterRef("id")), "user_id"),
+        posts_count=_count(
+            News.objects.filter(content_type=user_content_type, object_id=OuterRef("id")),
+            "object_id",
+        ),
+    )
+    for user in users:
+        yield (
+            user.id,
+            user.education.exists(),
+            user.work_experience.exists(),
+            user.user_languages.exists(),
+            user.skills.exists(),
+            ", ".join(
+                profile.partner_program.name
+                for profile in user.partner_program_profiles.all()
+            ),
+        )
+
+
+class Command(BaseCommand):
+    help = (
+        "Замерить время, пиковую память Python и число запросов отчета "
+        "активности пользователей: prefetch с .exists() на пользователя против "
+        "set-based запроса по чанкам. Данные создаются в транзакции и "
+        "откатываются после замера."
+    )
+    requires_system_checks = []
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--users",
+            type=int,
+            default=50_000,
+            help="Сколько синтетических пользователей создать.",
+        )
+        parser.add_argument(
+            "--mode",
+            choices=(*MODES, "both"),
+            default="both",
+            help="prefetch — прежний отчет, set — UserActivityDataPreparer.",
+        )
+
+    def handle(self, *args, **options):
+        if options["users"] < 1:
+            raise CommandError("--users должно быть >= 1.")
+
+        modes = MODES if options["mode"] == "both" else (options["mode"],)
+        self.stdout.write(f"users={options['users']}")
+        with transaction.atomic():
+            self._seed(options["users"])
+            for mode in modes:
+                self.stdout.write(self._run(mode))
+            transaction.set_rollback(True)
+
+    def _seed(self, count: int) -> None:
+        prefix = uuid.uuid4().hex[:8]
+        users = CustomUser.objects.bulk_create(
+            (
+                CustomUser(
+                    email=f"activity-benchmark-{prefix}-{index}@example.com",
+                    password="!",
+                    first_name="Activity",
+                    last_name=f"Benchmark {index}",
+                    birthday=date(2000, 1, 1),
+                )
+                for index in range(count)
+            ),
+            batch_size=5_000,
+        )
+        user_content_type = ContentType.objects.get_for_model(CustomUser)
+        news_content_type = ContentType.objects.get_for_model(News)
+        now = timezone.now()
+        category, _ = SkillCategory.objects.get_or_create(name="Benchmark")
+        skill = Skill.objects.create(name="Benchmark skill", category=category)
+        program = PartnerProgram.objects.create(
+            name="Activity benchmark",
+            tag=f"activity-benchmark-{prefix}",
+            city="Moscow",
+            datetime_started=now,
+            datetime_registration_ends=now,
+            datetime_finished=now,
+        )
+
+        UserEducation.objects.bulk_create(
+            (
+                UserEducation(user=user, organization_name="University")
+                for user in users[::3]
+            ),
+            batch_size=5_000,
+        )
+        SkillToObject.objects.bulk_create(
+            (
+                SkillToObject(
+                    skill=skill, content_type=user_content_type, object_id=user.id
+                )
+                for user in users[::4]
+            ),
+            batch_size=5_000,
+        )
+        Like.objects.bulk_create(
+            (
+                Like(user=user, content_type=news_content_type, object_id=index)
+                for user in users
+                for index in range(user.id % 5)
+            ),
+            batch_size=5_000,
+        )
+        News.objects.bulk_create(
+            (
+                News(
+                    content_type=user_content_type,
+                    object_id=user.id,
+                    text="Benchmark post",
+                )
+                for user in users[::5]
+            ),
+            batch_size=5_000,
+        )
+        projects = Project.objects.bulk_create(
+            (Project(name="Benchmark project", leader=user) for user in users[::10]),
+            batch_size=5_000,
+        )
+        PartnerProgramUserProfile.objects.bulk_create(
+            (
+                PartnerProgramUserProfile(
+                    user=project.leader,
+                    project=project,
+                    partner_program=program,
+                    partner_program_data={},
+                )
+                for project in projects
+            ),
+            batch_size=5_000,
+        )
+        with connection.cursor() as cursor:
+            for model in (CustomUser, UserEducation, SkillToObject, Like, News, Project):
+                cursor.execute(f"ANALYZE {model._meta.db_table}")
+
+    def _run(self, mode: str) -> str:
+        rows = (
+            iter_prefetch_rows()
+            if mode == "prefetch"
+            else UserActivityDataPreparer().iter_users_prepared_data()
+        )
+        queries = 0
+
+        def count_queries(execute, sql, params, many, context):
+            nonlocal queries
+            queries += 1
+            return execute(sql, params, many, context)
+
+        tracemalloc.start()
+        started = time.perf_counter()
+        with connection.execute_wrapper(count_queries):
+            total = sum(1 for _ in rows)
+        elapsed = time.perf_counter() - started
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        return (
+            f"{mode}: rows={total} time={elapsed:.2f}s "
+            f"peak={peak / 1024 / 1024:.1f}MiB queries={queries}"
+        )
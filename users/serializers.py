@@ -1,7 +1,6 @@
 from typing import Any
 
 from django.contrib.contenttypes.models import ContentType
-from django.core.cache import cache
 from django.core.exceptions import ValidationError as DjangoValidationError
 from django.db import transaction
 from django.forms.models import model_to_dict
@@ -12,9 +11,12 @@ from rest_framework.validators import UniqueValidator
 from rest_framework_simplejwt.serializers import TokenObtainPairSerializer
 
 from core.models import Skill, SkillToObject, Specialization, SpecializationCategory
-from core.serializers import SkillToObjectSerializer
+from core.serializers import (
+    OnlineStatusListSerializer,
+    OnlineStatusMixin,
+    SkillToObjectSerializer,
+)
 from core.services import get_views_count
-from core.utils import get_user_online_cache_key
 from files.models import UserFile
 from files.serializers import UserFileSerializer
 from partner_programs.models import PartnerProgram, PartnerProgramUserProfile
@@ -449,7 +451,7 @@ class UserProgramsSerializer(serializers.ModelSerializer):
 
 
 class UserDetailSerializer(
-    serializers.ModelSerializer[CustomUser], SkillsWriteSerializerMixin
+    OnlineStatusMixin, serializers.ModelSerializer[CustomUser], SkillsWriteSerializerMixin
 ):
     member = MemberSerializer(required=False)
     investor = InvestorSerializer(required=False)
@@ -516,15 +518,9 @@ class UserDetailSerializer(
             raise serializers.ValidationError(errors)
         return value
 
-    def get_is_online(self, user: CustomUser):
-        request = self.context.get("request")
-        if request and request.user.is_authenticated and request.user.id == user.id:
-            return True
-        cache_key = get_user_online_cache_key(user)
-        return cache.get(cache_key, False)
-
     class Meta:
         model = CustomUser
+        list_serializer_class = OnlineStatusListSerializer
         fields = [
             "id",
             "user_type",
@@ -777,18 +773,12 @@ class UserDetailSerializer(
                 raise ValidationError(constants.NOT_VALID_NUMBER_MESSAGE)
 
 
-class UserChatSerializer(serializers.ModelSerializer[CustomUser]):
+class UserChatSerializer(OnlineStatusMixin, serializers.ModelSerializer[CustomUser]):
     is_online = serializers.SerializerMethodField()
 
-    def get_is_online(self, user: CustomUser):
-        request = self.context.get("request")
-        if request and request.user.is_authenticated and request.user.id == user.id:
-            return True
-        cache_key = get_user_online_cache_key(user)
-        return cache.get(cache_key, False)
-
     class Meta:
         model = CustomUser
+        list_serializer_class = OnlineStatusListSerializer
         fields = [
             "id",
             "first_name",
@@ -801,7 +791,7 @@ class UserChatSerializer(serializers.ModelSerializer[CustomUser]):
 
 
 class UserListSerializer(
-    serializers.ModelSerializer[CustomUser], SkillsWriteSerializerMixin
+    OnlineStatusMixin, serializers.ModelSerializer[CustomUser], SkillsWriteSerializerMixin
 ):
     email = serializers.EmailField(
         validators=[
@@ -821,15 +811,6 @@ class UserListSerializer(
     member = MemberSerializer(required=False)
     is_online = serializers.SerializerMethodField()
 
-    def get_is_online(self, user: CustomUser) -> bool:
-        request = self.context.get("request")
-        if request and request.user.is_authenticated and request.user.id == user.id:
-            return True
-
-        cache_key = get_user_online_cache_key(user)
-        is_online = cache.get(cache_key, False)
-        return is_online
-
     def create(self, validated_data) -> CustomUser:
         user = CustomUser(**validated_data)
         user.set_password(validated_data["password"])
@@ -851,6 +832,7 @@ class UserListSerializer(
 
     class Meta:
         model = CustomUser
+        list_serializer_class = OnlineStatusListSerializer
         fields = [
             "id",
             "email",
@@ -877,7 +859,7 @@ class UserListSerializer(
         }
 
 
-class PublicUserSerializer(serializers.ModelSerializer):
+class PublicUserSerializer(OnlineStatusMixin, serializers.ModelSerializer):
     firstName = serializers.CharField(source="first_name")
     lastName = serializers.CharField(source="last_name")
     skills = serializers.SerializerMethodField()
@@ -897,17 +879,9 @@ class PublicUserSerializer(serializers.ModelSerializer):
             )
         return skills
 
-    def get_is_online(self, user: CustomUser) -> bool:
-        """Логика проверки онлайн-статуса"""
-        request = self.context.get("request")
-        if request and request.user.is_authenticated and request.user.id == user.id:
-            return True
-
-        cache_key = get_user_online_cache_key(user)
-        return cache.get(cache_key, False)
-
     class Meta:
         model = CustomUser
+        list_serializer_class = OnlineStatusListSerializer
         fields = [
             "id",
             "firstName",
@@ -0,0 +1,57 @@
+from datetime import date
+from typing import IO
+
+from core.utils import ProgressCallback, XlsxStreamWriter, iter_with_progress
+from users.models import CustomUser
+from users.services.users_activity import UserActivityDataPreparer
+
+EXPORT_CHUNK_SIZE = 500
+USERS_EMAILS_HEADERS = [
+    "Имя и фамилия",
+    "Возраст",
+    "Город",
+    "Специальность",
+    "Эл. почта",
+]
+
+
+def build_users_activity_export_file(
+    progress: ProgressCallback | None = None,
+) -> IO[bytes]:
+    """Баллы активности всех пользователей (`UserActivityDataPreparer`)."""
+    preparer = UserActivityDataPreparer()
+    total = preparer.count_users() if progress else 0
+    writer = XlsxStreamWriter(sheet_name="scores")
+    writer.append_dicts(
+        iter_with_progress(preparer.iter_users_prepared_data(), total, progress),
+        columns=list(preparer.COLUMNS),
+        sanitize=False,
+    )
+    return writer.save()
+
+
+def build_users_emails_export_file(progress: ProgressCallback | None = None) -> IO[bytes]:
+    """Контакты пользователей 18-22 лет."""
+    today = date.today()
+    date_limit_18 = date(today.year - 18, today.month, today.day)
+    date_limit_22 = date(today.year - 22, today.month, today.day)
+    users = CustomUser.objects.select_related("v2_speciality").filter(
+        birthday__lte=date_limit_18, birthday__gte=date_limit_22
+    )
+    total = users.count() if progress else 0
+
+    writer = XlsxStreamWriter(sheet_name="users")
+    writer.append(USERS_EMAILS_HEADERS)
+    for user in iter_with_progress(
+        users.iterator(chunk_size=EXPORT_CHUNK_SIZE), total, progress
+    ):
+        writer.append(
+            [
+                user.first_name + " " + user.last_name,
+                (today.year - user.birthday.year) if user.birthday.year else None,
+                user.city,
+                user.v2_speciality if user.v2_speciality else user.speciality,
+                user.email,
+            ]
+        )
+    return writer.save()
@@ -1,21 +1,28 @@
 from abc import ABC, abstractmethod
+from collections import defaultdict
 from enum import Enum
-from typing import Any
-from django.contrib.contenttypes.models import ContentType
+from itertools import islice
+from typing import Any, Iterator
 
+from django.contrib.contenttypes.models import ContentType
 from django.db.models import (
     Count,
-    Value,
-    QuerySet,
+    Exists,
+    IntegerField,
     OuterRef,
+    QuerySet,
     Subquery,
-    IntegerField,
+    Value,
 )
 from django.db.models.functions import Coalesce
 
-from users.models import CustomUser
+from core.models import Like, SkillToObject
 from news.models import News
 from partner_programs.models import PartnerProgramUserProfile
+from projects.models import Project
+from users.models import CustomUser, UserEducation, UserLanguages, UserWorkExperience
+
+ACTIVITY_CHUNK_SIZE = 2000
 
 
 class ActivityPoints(Enum):
@@ -35,21 +42,55 @@ class AbcstractUserActivityDataPreparer(ABC):
 
 
 class UserActivityDataPreparer(AbcstractUserActivityDataPreparer):
+    """
+    Activity report built with set-based queries.
+
+    All counters and profile flags are annotated onto one user query
+    (`Subquery` counts and `Exists`), which is read with a server-side
+    cursor in chunks. Program names are loaded with one query per chunk, so
+    the number of queries and the memory do not depend on a user's activity.
+    """
+
     __ERROR_FIELD = "ОШИБКА"
+    COLUMNS = (
+        "ID пользователя",
+        "Имя и фамилия",
+        "Возраст",
+        "Баллы за профиль",
+        "Кол-во лайков",
+        "Баллы за лайки",
+        "Кол-во новостей",
+        "Баллы за новости",
+        "Кол-во проектов",
+        "Баллы за проекты",
+        "Участие в программах кол-во",
+        "Программы",
+        "Баллы за программы",
+        "Кол-во проектов в программе",
+        "Баллы за проекты в программе",
+        "Cумма баллов",
+    )
+
+    def __init__(self, chunk_size: int = ACTIVITY_CHUNK_SIZE):
+        self.chunk_size = chunk_size
 
     def get_users_prepared_data(self) -> list[dict[str, Any]]:
         """Returns list of k:v data as table row."""
-        users = self.__get_user_queryset()
-        return [self.__prepare_user_data(user) for user in users]
+        return list(self.iter_users_prepared_data())
 
-    def __prepare_user_data(self, user: CustomUser) -> dict[str, Any]:
-        try:
-            user_posts_count: int = user.posts_count if user.posts_count is not None else 0
-            user_projects_in_program: int = user.projects_in_program if user.projects_in_program is not None else 0
-            user_programs: str = ", ".join(
-                [program.partner_program.name for program in user.partner_program_profiles.all()]
-            )
+    def iter_users_prepared_data(self) -> Iterator[dict[str, Any]]:
+        """Streams table rows, holding at most one chunk of users in memory."""
+        users = self.get_user_queryset().iterator(chunk_size=self.chunk_size)
+        while chunk := list(islice(users, self.chunk_size)):
+            programs = self.__get_program_names([user.id for user in chunk])
+            for user in chunk:
+                yield self.__prepare_user_data(user, programs.get(user.id, []))
 
+    def count_users(self) -> int:
+        return CustomUser.objects.count()
+
+    def __prepare_user_data(self, user: CustomUser, programs: list[str]) -> dict[str, Any]:
+        try:
             user_data = {
                 "ID пользователя": user.id,
                 "Имя и фамилия": user.get_full_name(),
@@ -57,112 +98,80 @@ class UserActivityDataPreparer(AbcstractUserActivityDataPreparer):
                 "Баллы за профиль": self.__get_profile_points(user=user),
                 "Кол-во лайков": user.likes_count,
                 "Баллы за лайки": user.likes_count * ActivityPoints.LIKE.value,
-                "Кол-во новостей": user_posts_count,
-                "Баллы за новости": user_posts_count * ActivityPoints.FEED_POST.value,
+                "Кол-во новостей": user.posts_count,
+                "Баллы за новости": user.posts_count * ActivityPoints.FEED_POST.value,
                 "Кол-во проектов": user.projects_count,
                 "Баллы за проекты": user.projects_count * ActivityPoints.PROJECT.value,
                 "Участие в программах кол-во": user.program_profiles_count,
-                "Программы": user_programs,
+                "Программы": ", ".join(programs),
                 "Баллы за программы": user.program_profiles_count * ActivityPoints.PROGRAM_MEMBER.value,
-                "Кол-во проектов в программе": user_projects_in_program,
-                "Баллы за проекты в программе": user_projects_in_program * ActivityPoints.PROGRAM_PROJECT.value,
+                "Кол-во проектов в программе": user.projects_in_program,
+                "Баллы за проекты в программе": user.projects_in_program * ActivityPoints.PROGRAM_PROJECT.value,
             }
             user_data["Cумма баллов"] = sum((user_data[key] for key in user_data if key.startswith("Баллы ")))
             return user_data
         except Exception:
-            user_data = {
-                "ID пользователя": self.__ERROR_FIELD,
-                "Имя и фамилия": self.__ERROR_FIELD,
-                "Возраст": self.__ERROR_FIELD,
-                "Баллы за профиль": self.__ERROR_FIELD,
-                "Кол-во лайков": self.__ERROR_FIELD,
-                "Баллы за лайки": self.__ERROR_FIELD,
-                "Кол-во новостей": self.__ERROR_FIELD,
-                "Баллы за новости": self.__ERROR_FIELD,
-                "Кол-во проектов": self.__ERROR_FIELD,
-                "Баллы за проекты": self.__ERROR_FIELD,
-                "Участие в программах кол-во": self.__ERROR_FIELD,
-                "Программы": self.__ERROR_FIELD,
-                "Баллы за программы": self.__ERROR_FIELD,
-                "Кол-во проектов в программе": self.__ERROR_FIELD,
-                "Баллы за проекты в программе": self.__ERROR_FIELD,
-                "Cумма баллов": self.__ERROR_FIELD,
-            }
-            return user_data
+            return dict.fromkeys(self.COLUMNS, self.__ERROR_FIELD)
 
-    def __get_user_queryset(self) -> QuerySet[CustomUser]:
+    def get_user_queryset(self) -> QuerySet[CustomUser]:
         user_content_type = ContentType.objects.get_for_model(CustomUser)
-        program_profiles_count_subquery = (
-            PartnerProgramUserProfile.objects
-            .filter(user_id=OuterRef("id"))
-            .values("user_id")
-            .annotate(total=Count("id"))
-            .values("total")
-        )
-        projects_in_program_subquery = (
-            PartnerProgramUserProfile.objects
-            .filter(user_id=OuterRef("id"))
-            .exclude(project=None)
-            .values("user_id")
-            .annotate(total=Count("id"))
-            .values("total")
-        )
-        posts_count_subquery = (
-            News.objects
-            .filter(content_type=user_content_type, object_id=OuterRef("id"))
-            .values("object_id")
-            .annotate(total=Count("id"))
-            .values("total")
-        )
-        likes_count_subquery = (
-            CustomUser.objects
-            .filter(likes__user_id=OuterRef("id"))
-            .annotate(total_likes=Count("likes"))
-            .values("total_likes")
-        )
-
-        users: QuerySet[CustomUser] = (
+        return (
             CustomUser.objects
-            .prefetch_related(
-                "likes",
-                "education",
-                "skills",
-                "v2_speciality",
-                "work_experience",
-                "user_languages",
-                "partner_program_profiles__partner_program",
-            )
+            .only("id", "first_name", "last_name", "birthday", "v2_speciality_id")
+            .order_by("id")
             .annotate(
-                projects_count=Count("leaders_projects"),
-                likes_count=Coalesce(
-                    Subquery(likes_count_subquery, output_field=IntegerField()),
-                    Value(0),
-                    output_field=IntegerField(),
+                projects_count=self.__count(Project.objects.filter(leader_id=OuterRef("id")), "leader_id"),
+                likes_count=self.__count(Like.objects.filter(user_id=OuterRef("id")), "user_id"),
+                program_profiles_count=self.__count(
+                    PartnerProgramUserProfile.objects.filter(user_id=OuterRef("id")), "user_id"
                 ),
-                program_profiles_count=Coalesce(
-                    Subquery(program_profiles_count_subquery, output_field=IntegerField()),
-                    Value(0),
-                    output_field=IntegerField(),
+                projects_in_program=self.__count(
+                    PartnerProgramUserProfile.objects.filter(user_id=OuterRef("id")).exclude(project=None),
+                    "user_id",
                 ),
-                projects_in_program=Coalesce(
-                    Subquery(projects_in_program_subquery, output_field=IntegerField()),
-                    Value(0),
-                    output_field=IntegerField(),
+                posts_count=self.__count(
+                    News.objects.filter(content_type=user_content_type, object_id=OuterRef("id")),
+                    "object_id",
                 ),
-                posts_count=Coalesce(
-                    Subquery(posts_count_subquery, output_field=IntegerField()),
-                    Value(0),
-                    output_field=IntegerField(),
+                has_education=Exists(UserEducation.objects.filter(user_id=OuterRef("id"))),
+                has_work_experience=Exists(UserWorkExperience.objects.filter(user_id=OuterRef("id"))),
+                has_languages=Exists(UserLanguages.objects.filter(user_id=OuterRef("id"))),
+                has_skills=Exists(
+                    SkillToObject.objects.filter(content_type=user_content_type, object_id=OuterRef("id"))
                 ),
             )
         )
-        return users
+
+    @staticmethod
+    def __count(queryset: QuerySet, group_field: str) -> Coalesce:
+        subquery = queryset.order_by().values(group_field).annotate(total=Count("id")).values("total")
+        return Coalesce(
+            Subquery(subquery, output_field=IntegerField()),
+            Value(0),
+            output_field=IntegerField(),
+        )
+
+    @staticmethod
+    def __get_program_names(user_ids: list[int]) -> dict[int, list[str]]:
+        programs = defaultdict(list)
+        profiles = (
+            PartnerProgramUserProfile.objects
+            .filter(user_id__in=user_ids)
+            .order_by("id")
+            .values_list("user_id", "partner_program__name")
+        )
+        for user_id, program_name in profiles:
+            programs[user_id].append(program_name)
+        return programs
 
     def __get_profile_points(self, user: CustomUser) -> int:
         """Checks availability profile fields for aditional points."""
-        education: bool | int = user.education.exists() if user.education else 0
-        work_experience: bool | int = user.work_experience.exists() if user.work_experience else 0
-        user_languages: bool | int = user.user_languages.exists() if user.user_languages else 0
-        skills: bool | int = user.skills.exists() if user.skills else 0
-        v2_speciality: bool = bool(user.v2_speciality)
-        return education + work_experience + user_languages + skills + v2_speciality
+        return sum(
+            (
+                user.has_education,
+                user.has_work_experience,
+                user.has_languages,
+                user.has_skills,
+                user.v2_speciality_id is not None,
+            )
+        )
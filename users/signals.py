@@ -1,14 +1,22 @@
 from django.core.mail import EmailMultiAlternatives
 from django.db import transaction
 from django.conf import settings
-from django.db.models.signals import post_save
+from django.db.models.signals import post_delete, post_save
 from django.dispatch import receiver
 from django.template.loader import render_to_string
 from django_rest_passwordreset.signals import reset_password_token_created
 
+from users.auth_cache import invalidate_auth_user
 from users.models import CustomUser, Expert, Investor, Member, Mentor
 
 
+@receiver(post_save, sender=CustomUser)
+@receiver(post_delete, sender=CustomUser)
+def invalidate_auth_user_cache(sender, instance, **kwargs):
+    """Covers profile edits, deactivation and password changes."""
+    invalidate_auth_user(instance.pk)
+
+
 @receiver(post_save, sender=CustomUser)
 def create_or_update_user_types(sender, instance, created, **kwargs):
     if created:
@@ -37,6 +45,7 @@ def update_dataset_migration_applied(sender, instance, **kwargs):
             CustomUser.objects.filter(pk=instance.pk).update(
                 dataset_migration_applied=dataset_migration_applied
             )
+            invalidate_auth_user(instance.pk)
 
     # Delayed execution until transaction completes.
     transaction.on_commit(update_migration)
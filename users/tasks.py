@@ -1,14 +1,20 @@
+import logging
+
 from django.conf import settings
 from django.core.mail import EmailMessage
 from django.template.loader import render_to_string
 
 from weasyprint import HTML
 
+from mailing.template_cache import get_file_template
 from procollab.celery import app
 from procollab.settings import EMAIL_USER
+from users.activity_buffer import flush_last_activity
 from users.typing import UserCVDataV2
 from users.services.cv_data_prepare import UserCVDataPreparerV2
 
+logger = logging.getLogger(__name__)
+
 
 @app.task
 def send_mail_cv(user_id: int, user_email: str, filename: str):
@@ -21,12 +27,11 @@ def send_mail_cv(user_id: int, user_email: str, filename: str):
     )
     binary_pdf_file: bytes | None = HTML(string=html_string).write_pdf()
 
-    with open(settings.BASE_DIR / "templates/email/email_cv.html", encoding="utf-8") as f:
-        template_content = f.read()
+    template = get_file_template(settings.BASE_DIR / "templates/email/email_cv.html")
 
     email = EmailMessage(
         subject="Procollab | Резюме",
-        body=template_content,
+        body=template.source,
         from_email=EMAIL_USER,
         to=[user_email],
     )
@@ -37,3 +42,12 @@ def send_mail_cv(user_id: int, user_email: str, filename: str):
         mimetype="application/pdf",
     )
     email.send(fail_silently=False)
+
+
+@app.task
+def flush_last_activity_task() -> int:
+    """Writes buffered last_activity touches with bulk UPDATEs."""
+    updated_count = flush_last_activity()
+    if updated_count:
+        logger.info("Flushed last_activity for %s users", updated_count)
+    return updated_count
@@ -7,8 +7,18 @@ from core.models import Skill, SkillCategory, SkillToObject, Specialization, Spe
 from files.models import UserFile
 from partner_programs.models import PartnerProgram, PartnerProgramUserProfile
 from projects.models import Project
+from users.activity_buffer import get_activity_buffer
 from users.models import CustomUser
 
+# DEBUG-настройки пишут last_activity сразу, буфер тестам нужен явно
+IN_MEMORY_ACTIVITY_BUFFER = {"BACKEND": "users.activity_buffer.InMemoryActivityBuffer"}
+
+
+def use_in_memory_activity_buffer(test_case) -> None:
+    """Заводит свежий буфер активности на время теста, при любых настройках."""
+    get_activity_buffer.cache_clear()
+    test_case.addCleanup(get_activity_buffer.cache_clear)
+
 
 def build_user(
     email: str = "user@example.com",
@@ -0,0 +1,105 @@
+from datetime import timedelta
+from unittest.mock import patch
+
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from mailing.tasks import run_program_mailings
+from users.activity_buffer import (
+    InMemoryActivityBuffer,
+    flush_last_activity,
+    get_activity_buffer,
+    touch_last_activity,
+)
+from users.models import CustomUser
+
+from .helpers import (
+    IN_MEMORY_ACTIVITY_BUFFER,
+    build_user,
+    use_in_memory_activity_buffer,
+)
+
+
+class InMemoryActivityBufferTests(TestCase):
+    def test_latest_touch_wins(self):
+        activity_buffer = InMemoryActivityBuffer()
+        activity_buffer.record(1, 20.0)
+        activity_buffer.record(1, 10.0)
+        activity_buffer.record(2, 5.0)
+
+        self.assertEqual(activity_buffer.drain(), {1: 20.0, 2: 5.0})
+        self.assertEqual(activity_buffer.drain(), {})
+
+
+@override_settings(LAST_ACTIVITY_BUFFER=IN_MEMORY_ACTIVITY_BUFFER)
+class FlushLastActivityTests(TestCase):
+    def setUp(self):
+        use_in_memory_activity_buffer(self)
+        self.activity_buffer = get_activity_buffer()
+        self.activity_buffer.drain()
+        self.users = [
+            build_user(email=f"activity-buffer-{index}@example.com") for index in range(3)
+        ]
+        CustomUser.objects.update(last_activity=None)
+
+    def test_touches_are_written_with_one_update(self):
+        for user in self.users:
+            touch_last_activity(user.id)
+        self.assertFalse(CustomUser.objects.filter(last_activity__isnull=False).exists())
+
+        with CaptureQueriesContext(connection) as queries:
+            updated = flush_last_activity()
+
+        self.assertEqual(updated, 3)
+        self.assertEqual(
+            sum(1 for query in queries if query["sql"].startswith("UPDATE")), 1
+        )
+        self.assertEqual(
+            CustomUser.objects.filter(last_activity__isnull=False).count(), 3
+        )
+        self.assertEqual(flush_last_activity(), 0)
+
+    def test_last_activity_does_not_move_backwards(self):
+        user = self.users[0]
+        latest = timezone.now()
+        CustomUser.objects.filter(id=user.id).update(last_activity=latest)
+        self.activity_buffer.record(user.id, (latest - timedelta(hours=1)).timestamp())
+
+        flush_last_activity()
+
+        user.refresh_from_db()
+        self.assertEqual(user.last_activity, latest)
+
+    def test_failed_flush_keeps_touches(self):
+        touch_last_activity(self.users[0].id)
+
+        with patch(
+            "users.activity_buffer.write_last_activity",
+            side_effect=Exception("db is down"),
+        ):
+            with self.assertRaises(Exception):
+                flush_last_activity()
+
+        self.assertEqual(flush_last_activity(), 1)
+
+    def test_unavailable_buffer_falls_back_to_direct_update(self):
+        user = self.users[0]
+        with patch.object(
+            InMemoryActivityBuffer, "record", side_effect=Exception("buffer is down")
+        ):
+            touch_last_activity(user.id)
+
+        user.refresh_from_db()
+        self.assertIsNotNone(user.last_activity)
+        self.assertEqual(self.activity_buffer.drain(), {})
+
+    def test_program_mailings_see_buffered_activity(self):
+        user = self.users[0]
+        touch_last_activity(user.id)
+
+        run_program_mailings()
+
+        user.refresh_from_db()
+        self.assertIsNotNone(user.last_activity)
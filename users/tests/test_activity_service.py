@@ -1,8 +1,19 @@
+from django.contrib.contenttypes.models import ContentType
 from django.test import TestCase
 
+from core.models import Like
+from news.models import News
+from users.models import CustomUser, UserEducation
 from users.services.users_activity import UserActivityDataPreparer
 
-from .helpers import add_user_to_program, build_partner_program, build_project, build_user
+from .helpers import (
+    add_user_to_program,
+    attach_skill,
+    build_partner_program,
+    build_project,
+    build_skill,
+    build_user,
+)
 
 
 class UserActivityDataPreparerTests(TestCase):
@@ -28,3 +39,49 @@ class UserActivityDataPreparerTests(TestCase):
 
         self.assertEqual(user_row["Участие в программах кол-во"], 1)
         self.assertEqual(user_row["Кол-во проектов в программе"], 1)
+
+    def test_activity_data_scores_profile_likes_and_posts(self):
+        user = build_user(email="activity-profile@example.com")
+        other = build_user(email="activity-other@example.com")
+        UserEducation.objects.create(user=user, organization_name="University")
+        attach_skill(user, build_skill())
+        build_project(user)
+        Like.objects.create(
+            user=user, content_type=ContentType.objects.get_for_model(News), object_id=1
+        )
+        News.objects.create(
+            content_type=ContentType.objects.get_for_model(CustomUser),
+            object_id=user.id,
+            text="post",
+        )
+        add_user_to_program(user, build_partner_program(name="First", tag="first"))
+        add_user_to_program(user, build_partner_program(name="Second", tag="second"))
+
+        rows = {
+            row["ID пользователя"]: row
+            for row in UserActivityDataPreparer().get_users_prepared_data()
+        }
+
+        user_row = rows[user.id]
+        self.assertEqual(user_row["Баллы за профиль"], 2)
+        self.assertEqual(user_row["Кол-во лайков"], 1)
+        self.assertEqual(user_row["Кол-во новостей"], 1)
+        self.assertEqual(user_row["Кол-во проектов"], 1)
+        self.assertEqual(user_row["Программы"], "First, Second")
+        self.assertEqual(user_row["Cумма баллов"], 2 + 1 + 3 + 5 + 10)
+        self.assertEqual(rows[other.id]["Cумма баллов"], 0)
+        self.assertEqual(list(user_row), list(UserActivityDataPreparer.COLUMNS))
+
+    def test_activity_data_query_count_does_not_depend_on_user_activity(self):
+        for index in range(5):
+            user = build_user(email=f"activity-queries-{index}@example.com")
+            UserEducation.objects.create(user=user, organization_name="University")
+            add_user_to_program(user, build_partner_program(tag=f"queries-{index}"))
+        ContentType.objects.get_for_model(CustomUser)
+        preparer = UserActivityDataPreparer(chunk_size=2)
+
+        # one streamed user query and one program-names query per chunk of 2
+        with self.assertNumQueries(1 + 3):
+            rows = list(preparer.iter_users_prepared_data())
+
+        self.assertEqual(len(rows), CustomUser.objects.count())
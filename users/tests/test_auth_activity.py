@@ -2,19 +2,28 @@ from datetime import timedelta
 from unittest.mock import MagicMock, patch
 
 from django.core.cache import cache
+from django.test import override_settings
 from django.urls import reverse
 from rest_framework.test import APIClient, APITestCase
 
+from users.activity_buffer import flush_last_activity, get_activity_buffer
 from users.authentication import get_last_activity_cache_key
 
-from .helpers import build_user
+from .helpers import (
+    IN_MEMORY_ACTIVITY_BUFFER,
+    build_user,
+    use_in_memory_activity_buffer,
+)
 
 
+@override_settings(LAST_ACTIVITY_BUFFER=IN_MEMORY_ACTIVITY_BUFFER)
 class JwtActivityTrackingTests(APITestCase):
     def setUp(self):
+        use_in_memory_activity_buffer(self)
         self.email = "activity_test@example.com"
         self.password = "very_strong_password"
         self.user = build_user(email=self.email, password=self.password)
+        get_activity_buffer().drain()
 
     def _obtain_access_token(self) -> str:
         response = self.client.post(
@@ -36,11 +45,16 @@ class JwtActivityTrackingTests(APITestCase):
         first_response = api_client.get("/auth/specialists/")
         self.assertEqual(first_response.status_code, 200)
         self.user.refresh_from_db()
+        self.assertIsNone(self.user.last_activity)
+
+        flush_last_activity()
+        self.user.refresh_from_db()
         first_activity = self.user.last_activity
         self.assertIsNotNone(first_activity)
 
         second_response = api_client.get("/auth/specialists/")
         self.assertEqual(second_response.status_code, 200)
+        flush_last_activity()
         self.user.refresh_from_db()
         self.assertEqual(self.user.last_activity, first_activity)
 
@@ -52,6 +66,7 @@ class JwtActivityTrackingTests(APITestCase):
 
         third_response = api_client.get("/auth/specialists/")
         self.assertEqual(third_response.status_code, 200)
+        flush_last_activity()
         self.user.refresh_from_db()
         self.assertGreater(self.user.last_activity, old_activity)
 
@@ -66,11 +81,18 @@ class JwtActivityTrackingTests(APITestCase):
         response = api_client.get("/auth/specialists/")
 
         self.assertEqual(response.status_code, 200)
+        flush_last_activity()
         self.user.refresh_from_db()
         self.assertIsNotNone(self.user.last_activity)
 
-    @patch("users.authentication.get_user_model")
-    def test_last_activity_db_failure_does_not_break_auth(self, get_user_model_mock):
+    @patch(
+        "users.activity_buffer.InMemoryActivityBuffer.record",
+        side_effect=Exception("buffer is down"),
+    )
+    @patch("users.activity_buffer.get_user_model")
+    def test_last_activity_db_failure_does_not_break_auth(
+        self, get_user_model_mock, _record_mock
+    ):
         fake_qs = MagicMock()
         fake_qs.update.side_effect = Exception("db is down")
         fake_model = MagicMock()
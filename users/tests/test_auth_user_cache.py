@@ -0,0 +1,123 @@
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APIClient, APITestCase
+from rest_framework_simplejwt.tokens import AccessToken
+
+from core.auth.middleware import TokenAuthentication
+from users.admin import make_active
+from users.auth_cache import get_auth_user, get_auth_user_cache_key
+from users.authentication import get_last_activity_cache_key
+from users.models import CustomUser
+
+from .helpers import build_user
+
+USER_SELECT = 'FROM "users_customuser" WHERE "users_customuser"."id"'
+
+
+def _user_selects(queries) -> list[str]:
+    return [
+        query["sql"]
+        for query in queries.captured_queries
+        if query["sql"].startswith("SELECT") and USER_SELECT in query["sql"]
+    ]
+
+
+class AuthUserCacheApiTests(APITestCase):
+    def setUp(self):
+        self.user = build_user(email="auth-cache@example.com")
+        cache.delete(get_auth_user_cache_key(self.user.id))
+        cache.add(get_last_activity_cache_key(self.user.id), "1")
+        self.client = APIClient()
+        self.client.credentials(
+            HTTP_AUTHORIZATION=f"Bearer {AccessToken.for_user(self.user)}"
+        )
+
+    def get_current_user(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get("/auth/users/current/")
+        return response, _user_selects(queries)
+
+    def test_user_is_loaded_from_database_once(self):
+        first_response, first_selects = self.get_current_user()
+        second_response, second_selects = self.get_current_user()
+
+        self.assertEqual(first_response.status_code, 200)
+        self.assertEqual(second_response.status_code, 200)
+        self.assertEqual(second_response.data["email"], self.user.email)
+        self.assertEqual(len(first_selects), 1)
+        self.assertEqual(second_selects, [])
+
+    def test_deactivation_is_seen_on_next_request(self):
+        self.get_current_user()
+
+        self.user.is_active = False
+        self.user.save()
+
+        response, _ = self.get_current_user()
+        self.assertEqual(response.status_code, 401)
+
+    def test_admin_activation_is_seen_on_next_request(self):
+        CustomUser.objects.filter(pk=self.user.pk).update(is_active=False)
+        cache.delete(get_auth_user_cache_key(self.user.id))
+        self.assertEqual(self.get_current_user()[0].status_code, 401)
+
+        make_active(None, None, CustomUser.objects.filter(pk=self.user.pk))
+
+        response, _ = self.get_current_user()
+        self.assertEqual(response.status_code, 200)
+
+    def test_kill_switch_reads_user_on_every_request(self):
+        with override_settings(AUTH_USER_CACHE_ENABLED=False):
+            self.get_current_user()
+            response, selects = self.get_current_user()
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(selects), 1)
+        self.assertIsNone(cache.get(get_auth_user_cache_key(self.user.id)))
+
+
+class AuthUserCacheTests(TestCase):
+    def setUp(self):
+        self.user = build_user(email="auth-cache-unit@example.com")
+        cache.delete(get_auth_user_cache_key(self.user.id))
+
+    def test_password_change_invalidates_cached_user(self):
+        get_auth_user(self.user.id)
+        self.assertIsNotNone(cache.get(get_auth_user_cache_key(self.user.id)))
+
+        self.user.set_password("another_strong_password")
+        self.user.save()
+
+        self.assertIsNone(cache.get(get_auth_user_cache_key(self.user.id)))
+        self.assertTrue(
+            get_auth_user(self.user.id).check_password("another_strong_password")
+        )
+
+    def test_saving_cached_user_keeps_fields_updated_in_bulk(self):
+        get_auth_user(self.user.id)
+        last_activity = timezone.now()
+        CustomUser.objects.filter(pk=self.user.pk).update(last_activity=last_activity)
+
+        cached_user = get_auth_user(self.user.id)
+        cached_user.city = "Kazan"
+        cached_user.save()
+
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.city, "Kazan")
+        self.assertEqual(self.user.last_activity, last_activity)
+
+    def test_missing_user(self):
+        self.assertIsNone(get_auth_user(0))
+
+    def test_websocket_authentication_uses_cache(self):
+        token = str(AccessToken.for_user(self.user))
+        TokenAuthentication().authenticate(token)
+
+        with CaptureQueriesContext(connection) as queries:
+            user = TokenAuthentication().authenticate(token)
+
+        self.assertEqual(user.pk, self.user.pk)
+        self.assertEqual(_user_selects(queries), [])
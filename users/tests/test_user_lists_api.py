@@ -1,6 +1,9 @@
+from unittest.mock import patch
+
 from django.test import TestCase
 from rest_framework.test import APIClient
 
+from core.presence import get_presence_store
 from users.models import LikesOnProject
 
 from .helpers import (
@@ -61,6 +64,26 @@ class PublicUserListAPITests(TestCase):
         self.assertIn(matched_user.id, returned_ids)
         self.assertNotIn(other_user.id, returned_ids)
 
+    def test_public_users_resolve_online_status_with_one_lookup(self):
+        online_user = build_user(email="online@example.com")
+        offline_user = build_user(email="offline@example.com")
+        presence = get_presence_store()
+        presence.clear()
+        presence.touch(online_user.id, "specific.online")
+
+        with patch.object(
+            presence, "online_many", wraps=presence.online_many
+        ) as online_many, patch.object(presence, "is_online") as is_online:
+            response = self.client.get("/auth/public-users/")
+
+        self.assertEqual(response.status_code, 200)
+        statuses = {item["id"]: item["is_online"] for item in response.data["results"]}
+        self.assertTrue(statuses[online_user.id])
+        self.assertFalse(statuses[offline_user.id])
+        online_many.assert_called_once()
+        is_online.assert_not_called()
+        presence.clear()
+
 
 class UserProjectsAPITests(TestCase):
     def setUp(self):
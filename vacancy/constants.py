@@ -1,5 +1,12 @@
 from enum import Enum
 
+OUTDATED_VACANCY_DAYS = 30
+OUTDATED_VACANCY_SCHEMA_ID = 2
+# Сколько писем о просроченных вакансиях отправляет одна задача группы.
+OUTDATED_VACANCY_EMAILS_CHUNK_SIZE = 100
+# Порог `datetime_created`, до которого вакансии уже обработаны прошлым запуском.
+OUTDATED_VACANCY_WATERMARK_CACHE_KEY = "vacancy:outdated:watermark"
+
 
 class ChoicesMixin:
 
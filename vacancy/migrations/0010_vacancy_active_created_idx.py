@@ -0,0 +1,21 @@
+# Generated by Django 4.2.11 on 2026-10-18 05:41
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("vacancy", "0009_vacancy_specialization"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="vacancy",
+            index=models.Index(
+                condition=models.Q(("is_active", True)),
+                fields=["datetime_created"],
+                name="vacancy_active_created_idx",
+            ),
+        ),
+    ]
@@ -112,6 +112,14 @@ class Vacancy(models.Model):
         verbose_name = "Вакансия"
         verbose_name_plural = "Вакансии"
         ordering = ["-datetime_created"]
+        indexes = [
+            # Сканирование просроченных вакансий в email_notificate_vacancy_outdated.
+            models.Index(
+                fields=["datetime_created"],
+                condition=models.Q(is_active=True),
+                name="vacancy_active_created_idx",
+            ),
+        ]
 
 
 class VacancyResponse(models.Model):
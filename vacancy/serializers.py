@@ -4,7 +4,7 @@ from django.utils import timezone
 from rest_framework import serializers
 
 from core.models import Skill, SkillToObject
-from core.serializers import SkillToObjectSerializer
+from core.serializers import OnlineStatusListSerializer, SkillToObjectSerializer
 from core.services import get_views_count
 from files.models import UserFile
 from files.serializers import UserFileSerializer
@@ -338,6 +338,7 @@ class VacancyResponseListSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = VacancyResponse
+        list_serializer_class = OnlineStatusListSerializer
         fields = [
             "id",
             "user",
@@ -355,6 +356,10 @@ class VacancyResponseListSerializer(serializers.ModelSerializer):
     def get_vacancy_role(self, obj: VacancyResponse) -> str:
         return obj.vacancy.role
 
+    @classmethod
+    def get_online_status_users(cls, obj: VacancyResponse) -> list[User]:
+        return [obj.user]
+
     def validate(self, attrs):
         vacancy = attrs["vacancy"]
         user = self.validate_user_exists(attrs["user_id"])
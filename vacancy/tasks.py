@@ -1,9 +1,30 @@
 from datetime import timedelta
 
+from celery import group
+from django.core.cache import cache
+from django.db import transaction
+from django.template import Context
 from django.utils import timezone
+from feed.visibility import refresh_news_feed_visibility
+from mailing.models import MailingSchema
+from mailing.template_cache import get_schema_template
 from mailing.typing import ContextDataDict, EmailDataToPrepare, MailDataDict
-from mailing.utils import prepare_mail_data, send_mass_mail
+from mailing.utils import (
+    build_message,
+    filter_schema_context,
+    iter_message_groups,
+    prepare_mail_data,
+    send_mass_mail,
+    send_message_pairs,
+)
 from procollab.celery import app
+from users.models import CustomUser
+from vacancy.constants import (
+    OUTDATED_VACANCY_DAYS,
+    OUTDATED_VACANCY_EMAILS_CHUNK_SIZE,
+    OUTDATED_VACANCY_SCHEMA_ID,
+    OUTDATED_VACANCY_WATERMARK_CACHE_KEY,
+)
 from vacancy.mapping import (
     CeleryEmailParams,
     EmailParamsType,
@@ -16,43 +37,108 @@ from vacancy.mapping import (
 from vacancy.models import Vacancy
 
 
-@app.task
-def send_email(data: EmailParamsType):
-    context_data = ContextDataDict(
+def _build_email_context(data: EmailParamsType) -> ContextDataDict:
+    return ContextDataDict(
         text=create_text_for_email(data),
         title=message_type_to_title[data["message_type"]],
         button_link=get_link(data),
         button_text=message_type_to_button_text[data["message_type"]],
     )
+
+
+@app.task
+def send_email(data: EmailParamsType):
     mail_data: MailDataDict = prepare_mail_data(
         EmailDataToPrepare(
             users_ids=[data["user_id"]],
             schema_id=data["schema_id"],
             subject=message_type_to_title[data["message_type"]],
-            context_data=context_data,
+            context_data=_build_email_context(data),
         )
     )
     send_mass_mail(**mail_data)
 
 
+@app.task
+def send_outdated_vacancy_emails(items: list[CeleryEmailParams]) -> int:
+    """Письма лидерам пачки просроченных вакансий: одна схема и один запрос лидеров."""
+    if not items:
+        return 0
+
+    mail_schema = MailingSchema.objects.get(pk=OUTDATED_VACANCY_SCHEMA_ID)
+    template = get_schema_template(mail_schema)
+    leaders = CustomUser.objects.in_bulk({item["user_id"] for item in items})
+    subject = message_type_to_title[MessageTypeEnum.OUTDATED.value]
+
+    def iter_message_pairs():
+        for item in items:
+            leader = leaders.get(item["user_id"])
+            if leader is None:
+                continue
+            context = filter_schema_context(mail_schema, _build_email_context(item))
+            context["user"] = leader
+            body = template.render(Context(context))
+            yield leader, build_message(leader, subject, body)
+
+    return send_message_pairs(iter_message_pairs())
+
+
 @app.task
 def email_notificate_vacancy_outdated():
-    """Уведомление лидера по email о том, что вакансия просрочилась"""
-    expiration_check = timezone.now() - timedelta(days=30)
-
-    outdated_active_vacancies = Vacancy.objects.select_related(
-        "project", "project__leader"
-    ).filter(is_active=True, datetime_created__lte=expiration_check)
-
-    for vacancy in outdated_active_vacancies:
-        project = vacancy.project
-        data_to_send = CeleryEmailParams(
-            message_type=MessageTypeEnum.OUTDATED.value,
-            user_id=project.leader.id,
-            project_name=project.name,
-            project_id=project.id,
-            vacancy_role=vacancy.role,
-            schema_id=2,
+    """
+    Закрывает вакансии старше OUTDATED_VACANCY_DAYS и уведомляет лидеров.
+
+    Обрабатываются только вакансии, перешедшие порог после прошлого запуска:
+    нижняя граница `datetime_created` хранится в кеше, а выборка идет по
+    частичному индексу активных вакансий. Без сохраненной границы (первый
+    запуск, сброс кеша) проверяются все активные вакансии старше порога.
+    Письма отправляются группой задач по OUTDATED_VACANCY_EMAILS_CHUNK_SIZE.
+    """
+    now = timezone.now()
+    expiration_check = now - timedelta(days=OUTDATED_VACANCY_DAYS)
+    watermark = cache.get(OUTDATED_VACANCY_WATERMARK_CACHE_KEY)
+
+    outdated_vacancies = Vacancy.objects.filter(
+        is_active=True, datetime_created__lte=expiration_check
+    )
+    if watermark is not None:
+        outdated_vacancies = outdated_vacancies.filter(datetime_created__gt=watermark)
+
+    with transaction.atomic():
+        # без skip_locked: строку, занятую параллельной записью, ждем, иначе
+        # граница уйдет дальше нее и вакансия больше не попадет в выборку
+        rows = list(
+            outdated_vacancies.order_by()
+            .select_for_update(of=("self",))
+            .values_list(
+                "id", "role", "project_id", "project__name", "project__leader_id"
+            )
         )
-        send_email.delay(data_to_send)
-    outdated_active_vacancies.update(is_active=False)
+        outdated_vacancy_ids = [row[0] for row in rows]
+        if outdated_vacancy_ids:
+            Vacancy.objects.filter(id__in=outdated_vacancy_ids).update(
+                is_active=False, datetime_closed=now
+            )
+            refresh_news_feed_visibility(Vacancy, outdated_vacancy_ids)
+
+            items = [
+                CeleryEmailParams(
+                    message_type=MessageTypeEnum.OUTDATED.value,
+                    user_id=leader_id,
+                    project_name=project_name,
+                    project_id=project_id,
+                    vacancy_role=role,
+                    schema_id=OUTDATED_VACANCY_SCHEMA_ID,
+                )
+                for _, role, project_id, project_name, leader_id in rows
+            ]
+            notifications = group(
+                send_outdated_vacancy_emails.s(chunk)
+                for chunk in iter_message_groups(
+                    items, OUTDATED_VACANCY_EMAILS_CHUNK_SIZE
+                )
+            )
+            transaction.on_commit(notifications.apply_async)
+
+    cache.set(OUTDATED_VACANCY_WATERMARK_CACHE_KEY, expiration_check, timeout=None)
+    return len(outdated_vacancy_ids)
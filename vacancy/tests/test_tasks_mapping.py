@@ -1,6 +1,19 @@
+from datetime import timedelta
 from unittest.mock import patch
 
+from django.core import mail
+from django.core.cache import cache
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from mailing.models import MailingSchema
+from procollab.celery import app
+from vacancy.constants import (
+    OUTDATED_VACANCY_SCHEMA_ID,
+    OUTDATED_VACANCY_WATERMARK_CACHE_KEY,
+)
 
 from vacancy.mapping import (
     MessageTypeEnum,
@@ -8,6 +21,7 @@ from vacancy.mapping import (
     get_link,
 )
 from vacancy.tasks import email_notificate_vacancy_outdated, send_email
+from vacancy.models import Vacancy
 from vacancy.tests.helpers import create_old_vacancy, create_project, create_user
 
 
@@ -48,21 +62,77 @@ class VacancyEmailMappingTests(TestCase):
 
 
 class OutdatedVacancyTaskTests(TestCase):
-    @patch("vacancy.tasks.send_email.delay")
-    def test_outdated_task_notifies_leaders_and_closes_old_active_vacancies(
-        self,
-        send_email_delay,
-    ):
+    def setUp(self):
+        cache.delete(OUTDATED_VACANCY_WATERMARK_CACHE_KEY)
+        self.addCleanup(cache.delete, OUTDATED_VACANCY_WATERMARK_CACHE_KEY)
+        # письма уходят group(...).apply_async после коммита: без брокера
+        # выполняем их на месте при любых настройках
+        always_eager = app.conf.task_always_eager
+        app.conf.task_always_eager = True
+        self.addCleanup(setattr, app.conf, "task_always_eager", always_eager)
+        MailingSchema.objects.create(
+            id=OUTDATED_VACANCY_SCHEMA_ID,
+            name="Outdated vacancy",
+            schema={"title": {"title": "Title"}, "text": {"title": "Text"}},
+            template="{{ title }}: {{ text }}",
+        )
+
+    def run_sweep(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            return email_notificate_vacancy_outdated()
+
+    def test_outdated_task_notifies_leaders_and_closes_old_active_vacancies(self):
         leader = create_user(prefix="leader")
         project = create_project(leader=leader)
         old_vacancy = create_old_vacancy(project=project, is_active=True, days=31)
         fresh_vacancy = create_old_vacancy(project=project, is_active=True, days=10)
 
-        email_notificate_vacancy_outdated()
+        self.assertEqual(self.run_sweep(), 1)
 
         old_vacancy.refresh_from_db()
         fresh_vacancy.refresh_from_db()
         self.assertFalse(old_vacancy.is_active)
+        self.assertIsNotNone(old_vacancy.datetime_closed)
         self.assertTrue(fresh_vacancy.is_active)
-        send_email_delay.assert_called_once()
-        self.assertEqual(send_email_delay.call_args.args[0]["user_id"], leader.id)
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertEqual(mail.outbox[0].to, [leader.email])
+        self.assertIn(old_vacancy.role, mail.outbox[0].body)
+
+    def test_sweep_only_processes_vacancies_expired_since_last_run(self):
+        project = create_project()
+        # прошлый запуск был час назад
+        cache.set(
+            OUTDATED_VACANCY_WATERMARK_CACHE_KEY,
+            timezone.now() - timedelta(days=30, hours=1),
+        )
+        skipped = create_old_vacancy(project=project, is_active=True, days=31)
+        expired = create_old_vacancy(project=project, is_active=True, days=30)
+        Vacancy.objects.filter(pk=expired.pk).update(
+            datetime_created=timezone.now() - timedelta(days=30, minutes=30)
+        )
+
+        self.assertEqual(self.run_sweep(), 1)
+
+        skipped.refresh_from_db()
+        expired.refresh_from_db()
+        self.assertTrue(skipped.is_active)
+        self.assertFalse(expired.is_active)
+
+    def test_notifications_are_sent_in_chunks_with_one_schema_lookup(self):
+        project = create_project()
+        for _ in range(5):
+            create_old_vacancy(project=project, is_active=True, days=31)
+
+        with patch(
+            "vacancy.tasks.OUTDATED_VACANCY_EMAILS_CHUNK_SIZE", 2
+        ), CaptureQueriesContext(connection) as queries:
+            self.assertEqual(self.run_sweep(), 5)
+
+        schema_lookups = [
+            query
+            for query in queries.captured_queries
+            if 'FROM "mailing_mailingschema"' in query["sql"]
+        ]
+        self.assertEqual(len(schema_lookups), 3)
+        self.assertEqual(len(mail.outbox), 5)
+        self.assertFalse(Vacancy.objects.filter(is_active=True).exists())